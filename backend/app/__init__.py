@@ -84,6 +84,7 @@ else:
             labs,
             lti,
             mcp,
+            metrics as metrics_routes,
             model_registry,
             outbound,
             tools,
@@ -135,6 +136,12 @@ else:
                 "Install with: pip install slowapi>=0.1.9"
             )
 
+        from .database.query_stats import QueryStatsMiddleware
+
+        # Comptage des requêtes SQL par route (en-têtes X-DB-Query-* si
+        # DB_QUERY_HEADERS est actif)
+        app.add_middleware(QueryStatsMiddleware)
+
         # Add security headers middleware first (outermost)
         app.add_middleware(SecurityHeadersMiddleware)
 
@@ -168,6 +175,7 @@ else:
         app.include_router(lti.router)
         app.include_router(model_registry.router)
         app.include_router(mcp.router)
+        app.include_router(metrics_routes.router)
         if chatkit_routes and hasattr(chatkit_routes, "router"):
             app.include_router(chatkit_routes.router)
         app.include_router(tools.router)
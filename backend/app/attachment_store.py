@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import re
@@ -13,10 +14,12 @@ from fastapi import UploadFile
 from chatkit.store import AttachmentStore, NotFoundError
 from chatkit.types import Attachment, AttachmentCreateParams, FileAttachment
 
+from . import file_io
 from .chatkit_server.context import ChatKitRequestContext
 from .chatkit_store import PostgresChatKitStore
+from .config import env_flag
 from .docx_converter import (
-    convert_docx_to_pdf,
+    DocxConversionPool,
     get_pdf_filename,
     get_pdf_mime_type,
     is_docx_file,
@@ -29,6 +32,8 @@ ATTACHMENT_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 
 DEFAULT_MAX_ATTACHMENT_SIZE = 10 * 1024 * 1024
 _CHUNK_SIZE = 1024 * 1024
+_CONVERSION_CACHE_DIRNAME = ".docx_pdf_cache"
+_BLOB_DIRNAME = ".blobs"
 
 
 class AttachmentUploadError(Exception):
@@ -75,12 +80,23 @@ class LocalAttachmentStore(AttachmentStore[ChatKitRequestContext]):
         base_dir: Path | None = None,
         max_size: int = DEFAULT_MAX_ATTACHMENT_SIZE,
         default_base_url: str | None = None,
+        docx_conversion_pool: DocxConversionPool | None = None,
+        async_docx_conversion: bool | None = None,
     ) -> None:
         self._store = store
         self._base_dir = Path(base_dir or ATTACHMENT_STORAGE_DIR)
         self._base_dir.mkdir(parents=True, exist_ok=True)
         self._max_size = max_size
         self._pending: dict[str, _PendingAttachment] = {}
+        self._docx_pool = docx_conversion_pool or DocxConversionPool.from_env(
+            cache_dir=self._base_dir / _CONVERSION_CACHE_DIRNAME
+        )
+        self._async_docx_conversion = (
+            env_flag("DOCX_CONVERSION_ASYNC")
+            if async_docx_conversion is None
+            else async_docx_conversion
+        )
+        self._conversion_tasks: set[asyncio.Task[None]] = set()
         self._default_base_url = (default_base_url or "http://localhost:8000").rstrip(
             "/"
         )
@@ -135,68 +151,113 @@ class LocalAttachmentStore(AttachmentStore[ChatKitRequestContext]):
         destination = user_dir / target_name
         temp_destination = destination.with_suffix(destination.suffix + ".upload")
 
-        total = 0
         try:
-            with temp_destination.open("wb") as buffer:
-                while True:
-                    chunk = await upload.read(_CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    buffer.write(chunk)
-                    total += len(chunk)
-                    if total > self._max_size:
-                        raise AttachmentUploadError(
-                            "La pièce jointe dépasse la taille maximale autorisée"
-                        )
-            if pending and pending.expected_size and total != pending.expected_size:
+            written = await file_io.write_stream(
+                upload.read,
+                temp_destination,
+                max_size=self._max_size,
+                chunk_size=_CHUNK_SIZE,
+            )
+            if (
+                pending
+                and pending.expected_size
+                and written.size != pending.expected_size
+            ):
                 raise AttachmentUploadError(
                     "La taille de la pièce jointe ne correspond pas à la déclaration "
                     "initiale"
                 )
-            os.replace(temp_destination, destination)
+            await asyncio.to_thread(
+                self._store_deduplicated, temp_destination, destination, written
+            )
+        except file_io.UploadTooLargeError as exc:
+            raise AttachmentUploadError(
+                "La pièce jointe dépasse la taille maximale autorisée"
+            ) from exc
         except Exception:
-            temp_destination.unlink(missing_ok=True)
+            await file_io.unlink(temp_destination)
             raise
         finally:
             await upload.close()
             self._pending.pop(attachment_id, None)
 
-        # Convertir les fichiers DOCX en PDF automatiquement
-        final_name = attachment.name
-        final_mime_type = attachment.mime_type
-        final_destination = destination
-
         if is_docx_file(attachment.name, attachment.mime_type):
             logger.info(f"Conversion DOCX détectée pour: {attachment.name}")
-            try:
-                pdf_destination = destination.with_suffix(".pdf")
-                await convert_docx_to_pdf(destination, pdf_destination)
-
-                # Supprimer le fichier DOCX original après conversion réussie
-                destination.unlink(missing_ok=True)
-
-                # Mettre à jour les métadonnées
-                final_name = get_pdf_filename(attachment.name)
-                final_mime_type = get_pdf_mime_type()
-                final_destination = pdf_destination
-
-                logger.info(f"DOCX converti en PDF: {final_name}")
-            except Exception as e:
-                # En cas d'échec de conversion, garder le fichier DOCX original
-                logger.warning(
-                    f"Échec de la conversion DOCX vers PDF pour {attachment.name}: {e}. "
-                    f"Le fichier DOCX original sera conservé."
+            if self._async_docx_conversion:
+                # La pièce jointe reste disponible en DOCX pendant la conversion ;
+                # son statut est mis à jour une fois le PDF produit.
+                pending_attachment = FileAttachment(
+                    id=attachment.id,
+                    name=attachment.name,
+                    mime_type=attachment.mime_type,
+                    upload_url=None,
+                    conversion_status="pending",
                 )
+                await self._store.save_attachment(pending_attachment, context)
+                task = asyncio.create_task(
+                    self._convert_docx(
+                        pending_attachment, destination, context, written.sha256
+                    )
+                )
+                self._conversion_tasks.add(task)
+                task.add_done_callback(self._conversion_tasks.discard)
+                return pending_attachment
+            return await self._convert_docx(
+                attachment, destination, context, written.sha256
+            )
 
         stored = FileAttachment(
             id=attachment.id,
-            name=final_name,
-            mime_type=final_mime_type,
+            name=attachment.name,
+            mime_type=attachment.mime_type,
             upload_url=None,
         )
         await self._store.save_attachment(stored, context)
         return stored
 
+    async def _convert_docx(
+        self,
+        attachment: FileAttachment,
+        destination: Path,
+        context: ChatKitRequestContext,
+        digest: str | None = None,
+    ) -> FileAttachment:
+        """Convertit un DOCX téléversé en PDF et enregistre le résultat."""
+
+        try:
+            pdf_destination = destination.with_suffix(".pdf")
+            await self._docx_pool.convert(
+                destination, pdf_destination, digest=digest
+            )
+
+            # Supprimer le fichier DOCX original après conversion réussie
+            await asyncio.to_thread(self._release_file, destination)
+
+            stored = FileAttachment(
+                id=attachment.id,
+                name=get_pdf_filename(attachment.name),
+                mime_type=get_pdf_mime_type(),
+                upload_url=None,
+                conversion_status="completed",
+            )
+            logger.info(f"DOCX converti en PDF: {stored.name}")
+        except Exception as e:
+            # En cas d'échec de conversion, garder le fichier DOCX original
+            logger.warning(
+                f"Échec de la conversion DOCX vers PDF pour {attachment.name}: {e}. "
+                f"Le fichier DOCX original sera conservé."
+            )
+            stored = FileAttachment(
+                id=attachment.id,
+                name=attachment.name,
+                mime_type=attachment.mime_type,
+                upload_url=None,
+                conversion_status="failed",
+            )
+
+        await self._store.save_attachment(stored, context)
+        return stored
+
     async def delete_attachment(
         self, attachment_id: str, context: ChatKitRequestContext
     ) -> None:
@@ -215,8 +276,7 @@ class LocalAttachmentStore(AttachmentStore[ChatKitRequestContext]):
 
         user_dir = _user_directory(self._base_dir, context.user_id)
         file_path = user_dir / _attachment_filename(attachment_id, attachment.name)
-        if file_path.is_file():
-            file_path.unlink()
+        await asyncio.to_thread(self._release_file, file_path)
         self._pending.pop(attachment_id, None)
 
     async def open_attachment(
@@ -235,7 +295,7 @@ class LocalAttachmentStore(AttachmentStore[ChatKitRequestContext]):
 
         user_dir = _user_directory(self._base_dir, owner_id)
         file_path = user_dir / _attachment_filename(attachment_id, attachment.name)
-        if not file_path.is_file():
+        if not await file_io.is_file(file_path):
             raise NotFoundError(f"Pièce jointe {attachment_id} introuvable")
         return (
             file_path,
@@ -243,6 +303,56 @@ class LocalAttachmentStore(AttachmentStore[ChatKitRequestContext]):
             attachment.name,
         )
 
+    def _blob_path(self, digest: str) -> Path:
+        return self._base_dir / _BLOB_DIRNAME / digest
+
+    def _store_deduplicated(
+        self, source: Path, destination: Path, written: file_io.WrittenFile
+    ) -> None:
+        """Place ``source`` en ``destination`` en partageant les contenus identiques.
+
+        Les fichiers sont liés (hardlink) à un blob adressé par leur SHA-256 :
+        téléverser plusieurs fois le même document n'occupe qu'une fois le disque.
+        """
+
+        blob = self._blob_path(written.sha256)
+        try:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            if blob.is_file() and blob.stat().st_size == written.size:
+                destination.unlink(missing_ok=True)
+                os.link(blob, destination)
+                source.unlink(missing_ok=True)
+                return
+            os.replace(source, destination)
+            os.link(destination, blob)
+        except FileExistsError:
+            pass
+        except OSError as exc:  # pragma: no cover - systèmes sans hardlink
+            logger.debug("Déduplication impossible pour %s : %s", destination, exc)
+            if source.exists():
+                os.replace(source, destination)
+
+    def _release_file(self, path: Path) -> None:
+        """Supprime ``path`` et le blob ou PDF en cache qui n'est plus référencé."""
+
+        try:
+            links = path.stat().st_nlink
+        except FileNotFoundError:
+            return
+        if links > 1 and path.suffix == ".pdf":
+            self._docx_pool.release(path)
+            links = path.stat().st_nlink
+        digest = file_io.hash_file(path) if links > 1 else None
+        path.unlink(missing_ok=True)
+        if digest is None:
+            return
+        blob = self._blob_path(digest)
+        try:
+            if blob.stat().st_nlink <= 1:
+                blob.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+
     @staticmethod
     def _coerce_file_attachment(value: Any) -> FileAttachment:
         if isinstance(value, FileAttachment):
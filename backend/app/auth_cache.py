@@ -0,0 +1,145 @@
+"""Cache court des utilisateurs authentifiés pour ``get_current_user``.
+
+Chaque requête authentifiée (images de fil, sondage des mises à jour,
+téléchargements de pièces jointes…) relisait l'utilisateur en base. Ce cache
+conserve pendant quelques secondes un instantané des colonnes de l'utilisateur,
+indexé par le ``sub`` du jeton, et reconstruit à chaque accès une instance
+:class:`~app.models.User` détachée afin qu'aucune requête ne partage d'état ORM.
+
+Les compteurs de :class:`AuthCacheStats` sont aussi publiés sur ``/metrics``
+(``chatkit_auth_user_cache_events_total``).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .config import env_float, env_int
+from .metrics import AUTH_USER_CACHE_EVENTS
+from .models import User
+
+# Le hash du mot de passe n'est jamais conservé en mémoire.
+_EXCLUDED_COLUMNS = frozenset({"password_hash"})
+_USER_COLUMNS = tuple(
+    column.key
+    for column in User.__table__.columns
+    if column.key not in _EXCLUDED_COLUMNS
+)
+
+
+@dataclass
+class AuthCacheStats:
+    """Compteurs du chemin d'authentification."""
+
+    hits: int = 0
+    misses: int = 0
+    db_lookups: int = 0
+    rejected: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "db_lookups": self.db_lookups,
+            "rejected": self.rejected,
+            "invalidations": self.invalidations,
+        }
+
+    def record(self, event: str) -> None:
+        """Incrémente le compteur ``event`` et la métrique Prometheus associée."""
+
+        setattr(self, event, getattr(self, event) + 1)
+        AUTH_USER_CACHE_EVENTS.labels(event=event).inc()
+
+
+class UserPrincipalCache:
+    """Cache LRU borné à durée de vie courte des utilisateurs authentifiés."""
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 5.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._max_entries = max(0, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = AuthCacheStats()
+
+    @classmethod
+    def from_env(cls) -> UserPrincipalCache:
+        # ``invalidate`` ne vide que le cache du worker courant : après une
+        # modification ou une suppression par un administrateur, les autres
+        # workers peuvent servir l'ancien utilisateur jusqu'à
+        # ``AUTH_USER_CACHE_TTL`` secondes. D'où une durée courte par défaut.
+        return cls(
+            ttl=env_float("AUTH_USER_CACHE_TTL", 5.0),
+            max_entries=env_int("AUTH_USER_CACHE_SIZE", 1024),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and self._max_entries > 0
+
+    def get(self, subject: str) -> User | None:
+        """Retourne une copie détachée de l'utilisateur en cache, s'il est frais."""
+
+        if not self.enabled:
+            self.stats.record("misses")
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[subject]
+                self.stats.record("misses")
+                return None
+            self._entries.move_to_end(subject)
+            self.stats.record("hits")
+            values = entry[1]
+        return User(**values)
+
+    def put(self, subject: str, user: User) -> None:
+        if not self.enabled:
+            return
+        values = {key: getattr(user, key) for key in _USER_COLUMNS}
+        expires_at = self._clock() + self._ttl
+        with self._lock:
+            self._entries[subject] = (expires_at, values)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int | str) -> None:
+        """Oublie l'utilisateur ``user_id`` (modification, suppression…)."""
+
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.stats.record("invalidations")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_principal_cache = UserPrincipalCache.from_env()
+
+
+__all__ = [
+    "AuthCacheStats",
+    "UserPrincipalCache",
+    "user_principal_cache",
+]
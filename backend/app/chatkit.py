@@ -52,6 +52,15 @@ def get_chatkit_server() -> DemoChatKitServer:
     return _server
 
 
+async def close_chatkit_server() -> None:
+    """Ferme l'instance du serveur ChatKit si elle a été créée."""
+    global _server
+
+    server, _server = _server, None
+    if server is not None:
+        await server.aclose()
+
+
 __all__ = [
     "ChatKitRequestContext",
     "WorkflowExecutionError",
@@ -59,6 +68,7 @@ __all__ = [
     "WorkflowRunSummary",
     "WorkflowStepStreamUpdate",
     "WorkflowStepSummary",
+    "close_chatkit_server",
     "get_chatkit_server",
     "run_workflow",
 ]
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Protocol
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Protocol
 
 from ..workflows.executor import WorkflowEndState
 from .context import ChatKitRequestContext
@@ -11,6 +15,10 @@ from .context import ChatKitRequestContext
 logger = logging.getLogger("chatkit.server")
 
 
+class AGSTransientError(RuntimeError):
+    """Erreur temporaire de la plateforme (429, 5xx, réseau) pouvant être rejouée."""
+
+
 class AGSClientProtocol(Protocol):
     async def ensure_line_item(
         self,
@@ -64,8 +72,13 @@ async def process_workflow_end_state_ags(
     client: AGSClientProtocol | None,
     end_state: WorkflowEndState | None,
     context: ChatKitRequestContext | None,
+    raise_transient: bool = False,
 ) -> None:
-    """Déclenche la publication de note AGS à partir d'un état de fin."""
+    """Déclenche la publication de note AGS à partir d'un état de fin.
+
+    Avec ``raise_transient``, les :class:`AGSTransientError` sont propagées afin
+    que l'appelant puisse rejouer la publication.
+    """
 
     if client is None or end_state is None:
         return
@@ -84,6 +97,11 @@ async def process_workflow_end_state_ags(
             max_score=max_score,
             comment=None,
         )
+    except AGSTransientError:
+        if raise_transient:
+            raise
+        logger.warning("Line item AGS %s temporairement indisponible", variable_id)
+        return
     except Exception as exc:  # pragma: no cover - robustesse réseau
         logger.warning(
             "Impossible de garantir le line item AGS %s", variable_id, exc_info=exc
@@ -100,14 +118,149 @@ async def process_workflow_end_state_ags(
             score=score_value,
             max_score=max_score,
         )
+    except AGSTransientError:
+        if raise_transient:
+            raise
+        logger.warning("Note AGS %s temporairement non publiée", variable_id)
     except Exception as exc:  # pragma: no cover - robustesse réseau
         logger.warning(
             "Impossible de publier la note AGS %s", variable_id, exc_info=exc
         )
 
 
+@dataclass(frozen=True)
+class _AGSPublishJob:
+    end_state: WorkflowEndState
+    context: ChatKitRequestContext | None
+
+
+class AGSPublishQueue:
+    """File de publication des notes AGS traitée hors du chemin de réponse.
+
+    Les publications sont regroupées par lots traités en parallèle ; les
+    erreurs temporaires sont rejouées avec un backoff exponentiel.
+    """
+
+    def __init__(
+        self,
+        client: AGSClientProtocol,
+        *,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._client = client
+        self._batch_size = max(1, batch_size)
+        self._max_attempts = max(1, max_attempts)
+        self._base_delay = max(0.0, base_delay)
+        self._max_delay = max(self._base_delay, max_delay)
+        self._sleep = sleep
+        self._queue: asyncio.Queue[_AGSPublishJob] | None = None
+        self._worker: asyncio.Task[None] | None = None
+
+    def submit(
+        self,
+        *,
+        end_state: WorkflowEndState | None,
+        context: ChatKitRequestContext | None,
+    ) -> bool:
+        """Planifie la publication ; retourne ``False`` si rien n'est à publier."""
+
+        if end_state is None:
+            return False
+        if not end_state.ags_variable_id or end_state.ags_score_value is None:
+            return False
+
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._queue.put_nowait(_AGSPublishJob(end_state=end_state, context=context))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(
+                self._run(), name="ags-publish-queue"
+            )
+        return True
+
+    async def join(self) -> None:
+        """Attend que toutes les publications planifiées soient traitées."""
+
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def aclose(self, *, drain_timeout: float | None = 10.0) -> None:
+        """Traite les publications en attente puis arrête le worker.
+
+        Les publications encore en file après ``drain_timeout`` secondes sont
+        abandonnées.
+        """
+
+        worker = self._worker
+        queue = self._queue
+        if worker is not None and not worker.done() and queue is not None:
+            drain = asyncio.ensure_future(queue.join())
+            done, _ = await asyncio.wait({drain}, timeout=drain_timeout)
+            if not done:
+                drain.cancel()
+                logger.warning(
+                    "Arrêt de la file AGS : %s publication(s) abandonnée(s)",
+                    queue.qsize(),
+                )
+        self._worker = None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self._batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.gather(*(self._publish(job) for job in batch))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _publish(self, job: _AGSPublishJob) -> None:
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                await process_workflow_end_state_ags(
+                    client=self._client,
+                    end_state=job.end_state,
+                    context=job.context,
+                    raise_transient=True,
+                )
+                return
+            except AGSTransientError as exc:
+                if attempt >= self._max_attempts:
+                    logger.warning(
+                        "Publication AGS %s abandonnée après %s tentatives",
+                        job.end_state.ags_variable_id,
+                        attempt,
+                        exc_info=exc,
+                    )
+                    return
+                delay = min(self._max_delay, self._base_delay * 2 ** (attempt - 1))
+                await self._sleep(delay * random.uniform(0.5, 1.0))
+            except Exception as exc:  # pragma: no cover - robustesse
+                logger.warning(
+                    "Publication AGS %s en échec",
+                    job.end_state.ags_variable_id,
+                    exc_info=exc,
+                )
+                return
+
+
 __all__ = [
     "AGSClientProtocol",
+    "AGSPublishQueue",
+    "AGSTransientError",
     "NullAGSClient",
     "process_workflow_end_state_ags",
 ]
@@ -4,13 +4,14 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import contextlib
 import logging
 import re
 import uuid
 from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from agents import Agent, RunConfig, Runner
 from chatkit.actions import Action
@@ -74,11 +75,13 @@ from openai.types.responses import (
 )
 from openai.types.responses.response_input_item_param import Message
 
+from .. import file_io
 from ..attachment_store import LocalAttachmentStore
 from ..chatkit_store import PostgresChatKitStore
-from ..config import Settings
+from ..config import Settings, env_float
 from ..database import SessionLocal
 from ..models import WorkflowStep
+from ..run_limits import RunLimitExceeded, RunScope, RunTicket, get_run_limiter
 from ..widgets import WidgetLibraryService
 from ..workflows import (
     WorkflowService,
@@ -98,8 +101,8 @@ from .actions import (
 )
 from .ags import (
     AGSClientProtocol,
+    AGSPublishQueue,
     NullAGSClient,
-    process_workflow_end_state_ags,
 )
 from .context import (
     AutoStartConfiguration,
@@ -128,10 +131,18 @@ except Exception:  # pragma: no cover - module non initialisé
     WorkflowStepStreamUpdate = Any  # type: ignore[assignment]
     WorkflowStepSummary = Any  # type: ignore[assignment]
 
+if TYPE_CHECKING:  # pragma: no cover - import circulaire à l'exécution
+    from ..workflows.executor_v2 import TokenUsage
+
 
 logger = logging.getLogger("chatkit.server")
 
 
+# Fenêtre (ms) de regroupement des deltas de texte consécutifs dans le flux
+# SSE. 0 conserve une trame par delta.
+CHATKIT_SSE_COALESCE_MS = max(0.0, env_float("CHATKIT_SSE_COALESCE_MS", 0.0))
+
+
 def _log_async_exception(task: asyncio.Task[Any]) -> None:
     try:
         task.result()
@@ -450,7 +461,7 @@ class ImageAwareThreadItemConverter(ThreadItemConverter):
             path, mime_type, filename = await self._open_attachment(
                 attachment.id, self._request_context
             )
-            data = path.read_bytes()
+            data = await file_io.read_bytes(path)
         except Exception as exc:  # pragma: no cover - robustesse vis-à-vis des I/O
             logger.warning(
                 "Impossible de charger la pièce jointe %s pour la conversion",  # noqa: TRY400
@@ -669,6 +680,48 @@ class DemoChatKitServer(ChatKitServer[ChatKitRequestContext]):
         )
         self.attachment_store = attachment_store
         self._ags_client: AGSClientProtocol = ags_client or NullAGSClient()
+        # La publication des notes (token OAuth, line items, score) ne doit pas
+        # retarder la réponse au chat : elle est confiée à une file dédiée.
+        self._ags_queue: AGSPublishQueue | None = (
+            AGSPublishQueue(ags_client) if ags_client is not None else None
+        )
+        self._run_limiter = get_run_limiter()
+
+    async def aclose(self) -> None:
+        """Publie les notes AGS en attente puis ferme le client AGS."""
+        if self._ags_queue is not None:
+            await self._ags_queue.aclose()
+        close_client = getattr(self._ags_client, "aclose", None)
+        if close_client is not None:
+            await close_client()
+
+    def _run_scopes(
+        self, thread: ThreadMetadata, context: ChatKitRequestContext
+    ) -> tuple[RunScope, ...]:
+        """Portées limitées d'une exécution : utilisateur, cours LTI, workflow."""
+        if not self._run_limiter.enabled:
+            return ()
+        thread_metadata = (
+            thread.metadata if isinstance(thread.metadata, Mapping) else {}
+        )
+        workflow_info = thread_metadata.get("workflow")
+        workflow_key: str | None = None
+        if isinstance(workflow_info, Mapping):
+            slug = workflow_info.get("slug")
+            if isinstance(slug, str) and slug.strip():
+                workflow_key = slug.strip()
+        if workflow_key is None and context.lti_resource_link_id is not None:
+            workflow_key = f"link:{context.lti_resource_link_id}"
+        context_key: str | None = None
+        if context.lti_platform_context_id:
+            context_key = (
+                f"{context.lti_registration_id}:{context.lti_platform_context_id}"
+            )
+        return self._run_limiter.scopes_for(
+            user_id=context.user_id,
+            context_id=context_key,
+            workflow=workflow_key,
+        )
 
     def reload_title_agent(self) -> None:
         """Recharge l'agent de génération de titre avec la configuration actuelle."""
@@ -680,6 +733,8 @@ class DemoChatKitServer(ChatKitServer[ChatKitRequestContext]):
     # connections after ~100 s; 30 s keeps us well within that window.
     _SSE_HEARTBEAT_INTERVAL: float = 30.0
 
+    stream_coalesce_window = CHATKIT_SSE_COALESCE_MS / 1000
+
     async def _process_streaming(
         self, request: StreamingReq, context: ChatKitRequestContext,
     ) -> AsyncIterator[bytes]:
@@ -1089,11 +1144,52 @@ class DemoChatKitServer(ChatKitServer[ChatKitRequestContext]):
         if isinstance(previous_response_id, str):
             agent_context.previous_response_id = previous_response_id
 
+        # Admission : créneaux d'exécution et budgets de jetons par
+        # utilisateur, cours LTI et workflow (file d'attente si saturé).
+        run_ticket: RunTicket | None = None
+        was_queued = False
+        run_scopes = self._run_scopes(thread, context)
+        if run_scopes:
+            try:
+                async with contextlib.aclosing(
+                    self._run_limiter.queue(run_scopes)
+                ) as admissions:
+                    async for admission in admissions:
+                        if isinstance(admission, RunTicket):
+                            run_ticket = admission
+                            break
+                        was_queued = True
+                        yield ProgressUpdateEvent(
+                            text=f"En file d'attente : position {admission}"
+                        )
+            except RunLimitExceeded as exc:
+                logger.info(
+                    "Exécution refusée pour le fil %s : limite %s atteinte (%s)",
+                    thread.id,
+                    exc.scope.key,
+                    exc.reason,
+                )
+                yield ErrorEvent(
+                    code=ErrorCode.STREAM_ERROR,
+                    message=(
+                        "Trop de demandes en cours, réessayez dans quelques "
+                        "instants."
+                        if exc.reason == "concurrency"
+                        else "Le quota de jetons est épuisé pour le moment, "
+                        "réessayez plus tard."
+                    ),
+                    allow_retry=True,
+                )
+                return
+
         # Use StreamProcessor instead of direct execution
         processor = self._ensure_stream_processor(thread)
         processor.update_context(context)
 
         # Start workflow within processor
+        from ..workflows.executor_v2 import TokenUsage
+
+        run_usage = TokenUsage()
         workflow_task = asyncio.create_task(
             self._execute_workflow(
                 thread=thread,
@@ -1103,13 +1199,24 @@ class DemoChatKitServer(ChatKitServer[ChatKitRequestContext]):
                 thread_items_history=history.data,
                 thread_item_converter=thread_item_converter,
                 input_user_message=input_user_message,
+                usage=run_usage,
             )
         )
         workflow_task.add_done_callback(_log_async_exception)
+        if run_ticket is not None:
+            # Libéré à la fin de la tâche, même annulée avant de démarrer, avec
+            # les jetons consommés jusque-là (y compris en cas d'erreur).
+            run_ticket.release_when_done(
+                workflow_task,
+                lambda: run_usage.input_tokens + run_usage.output_tokens,
+            )
 
         # Start processor loop
         processor.start(workflow_task)
 
+        if was_queued:
+            yield ProgressUpdateEvent(text="")
+
         # Send initial events
         for event in pre_stream_events:
             yield event
@@ -2042,6 +2149,7 @@ class DemoChatKitServer(ChatKitServer[ChatKitRequestContext]):
         thread_item_converter: ThreadItemConverter | None = None,
         input_user_message: UserMessageItem | None = None,
         runtime_snapshot: Any = None,
+        usage: TokenUsage | None = None,
     ) -> None:
         streamed_step_keys: set[str] = set()
         step_progress_text: dict[str, str] = {}
@@ -2205,6 +2313,7 @@ class DemoChatKitServer(ChatKitServer[ChatKitRequestContext]):
                 thread_items_history=thread_items_history,
                 current_user_message=input_user_message,
                 runtime_snapshot=runtime_snapshot,
+                usage=usage,
             )
 
             end_state = summary.end_state
@@ -2212,11 +2321,11 @@ class DemoChatKitServer(ChatKitServer[ChatKitRequestContext]):
             cleaned_reason: str | None = None
             waiting_state = False
             if end_state is not None:
-                await process_workflow_end_state_ags(
-                    client=self._ags_client,
-                    end_state=end_state,
-                    context=getattr(agent_context, "request_context", None),
-                )
+                if self._ags_queue is not None:
+                    self._ags_queue.submit(
+                        end_state=end_state,
+                        context=getattr(agent_context, "request_context", None),
+                    )
                 status_type_raw = (end_state.status_type or "closed").strip().lower()
                 cleaned_reason = (
                     (end_state.status_reason or end_state.message) or ""
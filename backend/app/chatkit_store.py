@@ -1,24 +1,30 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import datetime as dt
 import html
 import re
 from copy import deepcopy
-from collections.abc import Callable, Mapping
-from typing import TYPE_CHECKING, Any, TypeVar
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import TYPE_CHECKING, Any
 
 from pydantic import TypeAdapter
 import sqlalchemy as sa
 from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
 from chatkit.store import NotFoundError, Store
 from chatkit.types import ActiveStatus, Attachment, Page, ThreadItem, ThreadMetadata
 
+from .database import async_session_factory_for
+from .database.query_stats import track_queries
+from .metrics import STORE_OPERATION_SECONDS
 from .models import ChatAttachment, ChatThread, ChatThreadBranch, ChatThreadItem
 from .workflows import WorkflowService
+from .workflows.tracing import trace_span
 from .services.branch_service import MAIN_BRANCH_ID
 
 # Taille minimale d'une image base64 pour être remplacée par une URL (en caractères)
@@ -30,8 +36,6 @@ if TYPE_CHECKING:
 else:  # pragma: no cover - utilisé uniquement pour éviter les imports circulaires
     ChatKitRequestContext = Any
 
-_T = TypeVar("_T")
-
 
 def _strip_null_bytes(obj: Any) -> Any:
     """Recursively strip \\u0000 (null bytes) from strings in a JSON-like structure.
@@ -55,6 +59,48 @@ def _ensure_timezone(value: dt.datetime | None) -> dt.datetime:
         return value.astimezone(dt.UTC)
     return dt.datetime.now(dt.UTC)
 
+_PREBUFFER = {"prebuffer_rows": True}
+
+
+class _ThreadedSession:
+    """Façade asynchrone d'une :class:`Session` synchrone.
+
+    Utilisée quand aucun moteur asynchrone n'est associé à la fabrique de
+    sessions (SQLite en mémoire, ``DATABASE_ASYNC_ENABLED=false``) : chaque
+    aller-retour SQL part dans le pool de threads et les résultats sont lus
+    d'avance, comme avec :class:`AsyncSession`.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.sync_session = session
+
+    @property
+    def dirty(self) -> Any:
+        return self.sync_session.dirty
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Iterable[Any]) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement: Any) -> Any:
+        return await asyncio.to_thread(
+            self.sync_session.execute, statement, execution_options=_PREBUFFER
+        )
+
+    async def get(self, entity: Any, ident: Any) -> Any:
+        return await asyncio.to_thread(self.sync_session.get, entity, ident)
+
+    async def commit(self) -> None:
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await asyncio.to_thread(self.sync_session.rollback)
+
+
+_StoreSession = AsyncSession | _ThreadedSession
+
 
 class PostgresChatKitStore(Store[ChatKitRequestContext]):
     """Implémentation du store ChatKit reposant sur PostgreSQL."""
@@ -63,8 +109,12 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         self,
         session_factory: sessionmaker[Session],
         workflow_service: WorkflowService | None = None,
+        async_session_factory: async_sessionmaker[AsyncSession] | None = None,
     ) -> None:
         self._session_factory = session_factory
+        if async_session_factory is None:
+            async_session_factory = async_session_factory_for(session_factory)
+        self._async_session_factory = async_session_factory
         self._attachment_adapter = TypeAdapter(Attachment)
         self._thread_item_adapter = TypeAdapter(ThreadItem)
         self._workflow_service = workflow_service or WorkflowService()
@@ -74,9 +124,9 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             raise NotFoundError("Thread introuvable")
         return context.user_id
 
-    def _resolve_owner_id_for_thread(
+    async def _resolve_owner_id_for_thread(
         self,
-        session: Session,
+        session: _StoreSession,
         thread_id: str,
         context: ChatKitRequestContext,
     ) -> str:
@@ -85,17 +135,64 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             return owner_id
 
         stmt = select(ChatThread.owner_id).where(ChatThread.id == thread_id)
-        record_owner = session.execute(stmt).scalar_one_or_none()
+        record_owner = (await session.execute(stmt)).scalar_one_or_none()
         if record_owner is None:
             raise NotFoundError(f"Thread {thread_id} introuvable")
         return str(record_owner)
 
-    async def _run(self, func: Callable[[Session], _T]) -> _T:
-        return await asyncio.to_thread(self._run_sync, func)
+    @contextlib.asynccontextmanager
+    async def _session(self, method: str) -> AsyncIterator[_StoreSession]:
+        # Les requêtes SQL et la latence sont agrégées par méthode publique du
+        # store (``save_item``, ``load_thread_items``…).
+        label = f"store.{method}"
+        latency = STORE_OPERATION_SECONDS.labels(method=method)
+        with trace_span(label) as span, track_queries(label) as stats, latency.time():
+            try:
+                if self._async_session_factory is not None:
+                    # Le pilote asynchrone libère la boucle pendant les E/S ;
+                    # le travail CPU (validation, images) part dans le pool de
+                    # threads au cas par cas.
+                    async with self._async_session_factory() as session:
+                        yield session
+                else:
+                    sync_session = self._session_factory()
+                    try:
+                        yield _ThreadedSession(sync_session)
+                    finally:
+                        await asyncio.to_thread(sync_session.close)
+            finally:
+                if span is not None:
+                    span.set_attributes(db_queries=stats.queries)
+
+    async def _expected_workflow(self) -> dict[str, Any]:
+        # ``get_current`` charge la définition complète et peut la compléter
+        # puis valider : hors de la boucle, dans sa propre session.
+        return await asyncio.to_thread(self._current_workflow_metadata)
+
+    @staticmethod
+    def _dump_item(item: ThreadItem) -> dict[str, Any]:
+        return _strip_null_bytes(item.model_dump(mode="json"))
 
-    def _run_sync(self, func: Callable[[Session], _T]) -> _T:
-        with self._session_factory() as session:
-            return func(session)
+    def _prepare_thread_items(
+        self, thread_id: str, records: list[tuple[str, dict[str, Any]]]
+    ) -> tuple[list[dict[str, Any] | None], list[ThreadItem]]:
+        """Normalise et valide les éléments ``(id, payload)`` renvoyés au client.
+
+        Retourne aussi, pour chaque élément, le payload normalisé à enregistrer
+        (``None`` s'il est inchangé). Appelée dans le pool de threads.
+        """
+        updates: list[dict[str, Any] | None] = []
+        items: list[ThreadItem] = []
+        for item_id, stored in records:
+            payload = self._normalize_thread_item_payload(stored)
+            updates.append(payload if payload != stored else None)
+            # Transformer les données d'image volumineuses en URLs de référence
+            # (sans modifier les données stockées en base)
+            response_payload = self._strip_image_data_for_response(
+                payload, thread_id, item_id
+            )
+            items.append(self._thread_item_adapter.validate_python(response_payload))
+        return updates, items
 
     @staticmethod
     def _normalize_text_block(text: str) -> str:
@@ -313,10 +410,12 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
 
         Retourne un tuple (données, mime_type) ou None si non trouvé.
         """
-        def _load(session: Session) -> tuple[bytes, str] | None:
-            owner_id = self._resolve_owner_id_for_thread(session, thread_id, context)
-            expected = self._current_workflow_metadata()
-            self._require_thread_record(
+        async with self._session("get_thread_image_data") as session:
+            owner_id = await self._resolve_owner_id_for_thread(
+                session, thread_id, context
+            )
+            expected = await self._expected_workflow()
+            await self._require_thread_record(
                 session,
                 thread_id,
                 owner_id,
@@ -328,7 +427,7 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 ChatThreadItem.thread_id == thread_id,
                 ChatThreadItem.owner_id == owner_id,
             )
-            record = session.execute(stmt).scalar_one_or_none()
+            record = (await session.execute(stmt)).scalar_one_or_none()
             if record is None:
                 return None
 
@@ -336,42 +435,47 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             if not isinstance(payload, dict):
                 return None
 
-            # Chercher dans les workflows
-            if payload.get("type") == "workflow":
-                workflow = payload.get("workflow")
-                if isinstance(workflow, dict):
-                    tasks = workflow.get("tasks")
-                    if isinstance(tasks, list):
-                        for task in tasks:
-                            if not isinstance(task, dict):
-                                continue
-
-                            task_type = task.get("type")
-
-                            # Chercher dans ImageTask
-                            if task_type == "image":
-                                images = task.get("images")
-                                if isinstance(images, list):
-                                    for image in images:
-                                        if not isinstance(image, dict):
-                                            continue
-                                        if image.get("id") == image_id:
-                                            return self._extract_image_bytes(image)
-
-                            # Chercher dans ComputerUseTask screenshots
-                            elif task_type == "computer_use":
-                                screenshots = task.get("screenshots")
-                                if isinstance(screenshots, list):
-                                    for idx, screenshot in enumerate(screenshots):
-                                        if not isinstance(screenshot, dict):
-                                            continue
-                                        expected_id = f"screenshot_{idx}"
-                                        if expected_id == image_id:
-                                            return self._extract_image_bytes(screenshot)
-
-            return None
-
-        return await self._run(_load)
+        # Le décodage base64 se fait hors de la boucle.
+        return await asyncio.to_thread(self._find_image_bytes, payload, image_id)
+
+    @classmethod
+    def _find_image_bytes(
+        cls, payload: dict[str, Any], image_id: str
+    ) -> tuple[bytes, str] | None:
+        # Chercher dans les workflows
+        if payload.get("type") == "workflow":
+            workflow = payload.get("workflow")
+            if isinstance(workflow, dict):
+                tasks = workflow.get("tasks")
+                if isinstance(tasks, list):
+                    for task in tasks:
+                        if not isinstance(task, dict):
+                            continue
+
+                        task_type = task.get("type")
+
+                        # Chercher dans ImageTask
+                        if task_type == "image":
+                            images = task.get("images")
+                            if isinstance(images, list):
+                                for image in images:
+                                    if not isinstance(image, dict):
+                                        continue
+                                    if image.get("id") == image_id:
+                                        return cls._extract_image_bytes(image)
+
+                        # Chercher dans ComputerUseTask screenshots
+                        elif task_type == "computer_use":
+                            screenshots = task.get("screenshots")
+                            if isinstance(screenshots, list):
+                                for idx, screenshot in enumerate(screenshots):
+                                    if not isinstance(screenshot, dict):
+                                        continue
+                                    expected_id = f"screenshot_{idx}"
+                                    if expected_id == image_id:
+                                        return cls._extract_image_bytes(screenshot)
+
+        return None
 
     @staticmethod
     def _extract_image_bytes(image_data: dict[str, Any]) -> tuple[bytes, str] | None:
@@ -455,54 +559,23 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             and metadata.get("definition_id") == expected.get("definition_id")
         )
 
-    def _normalize_thread_record(
+    async def _normalize_thread_record(
         self,
         record: ChatThread,
         *,
         owner_id: str,
-        session: Session,
+        session: _StoreSession,
         expected_workflow: Mapping[str, Any],
     ) -> tuple[dict[str, Any], bool]:
-        payload = dict(record.payload)
-        metadata = dict(payload.get("metadata") or {})
-        changed = False
-
-        if metadata.get("owner_id") != owner_id:
-            metadata["owner_id"] = owner_id
-            changed = True
-
-        workflow_metadata = metadata.get("workflow")
-        matches = self._workflow_matches(workflow_metadata, expected_workflow)
-        if not matches:
-            if (
-                isinstance(workflow_metadata, Mapping)
-                and workflow_metadata.get("slug") == expected_workflow.get("slug")
-            ):
-                # Le workflow a été mis à jour (nouveau definition_id) mais le slug
-                # reste le même : conserver le fil en l'alignant sur la version active
-                metadata["workflow"] = dict(expected_workflow)
-                matches = True
-                changed = True
-            elif self._has_complete_workflow_metadata(workflow_metadata):
-                # Le thread appartient à un workflow différent mais a des métadonnées
-                # complètes : autoriser le chargement pour permettre de voir les
-                # conversations d'autres workflows
-                matches = True
-            elif not self._has_complete_workflow_metadata(workflow_metadata):
-                metadata["workflow"] = dict(expected_workflow)
-                matches = True
-                changed = True
-
-        payload["metadata"] = metadata
-
-        if changed:
-            record.payload = payload
+        stored = record.payload
+        payload, matches = self._normalize_thread_record_no_commit(
+            record, owner_id=owner_id, expected_workflow=expected_workflow
+        )
+        if record.payload is not stored:
             # Ne pas mettre à jour updated_at lors de la synchronisation des métadonnées
             # internes (definition_id, owner_id) pour éviter de modifier l'ordre de tri
             # des conversations dans la sidebar
-            session.add(record)
-            session.commit()
-
+            await session.commit()
         return payload, matches
 
     def _normalize_thread_record_no_commit(
@@ -564,9 +637,9 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             workflow.get("definition_id") if isinstance(workflow, dict) else None
         )
 
-    def _require_thread_record(
+    async def _require_thread_record(
         self,
-        session: Session,
+        session: _StoreSession,
         thread_id: str,
         owner_id: str,
         expected_workflow: Mapping[str, Any],
@@ -574,10 +647,10 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         stmt = select(ChatThread).where(
             ChatThread.id == thread_id, ChatThread.owner_id == owner_id
         )
-        record = session.execute(stmt).scalar_one_or_none()
+        record = (await session.execute(stmt)).scalar_one_or_none()
         if record is None:
             raise NotFoundError(f"Thread {thread_id} introuvable")
-        payload, matches = self._normalize_thread_record(
+        payload, matches = await self._normalize_thread_record(
             record,
             owner_id=owner_id,
             session=session,
@@ -587,48 +660,60 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             raise NotFoundError(f"Thread {thread_id} introuvable")
         return record, payload
 
-    async def load_thread(
-        self, thread_id: str, context: ChatKitRequestContext
-    ) -> ThreadMetadata:
-        def _load(session: Session) -> ThreadMetadata:
-            owner_id = self._resolve_owner_id_for_thread(session, thread_id, context)
-            expected = self._current_workflow_metadata()
-
-            if context.is_admin:
-                # Admins can view any thread regardless of workflow match
-                stmt = select(ChatThread).where(
-                    ChatThread.id == thread_id, ChatThread.owner_id == owner_id
-                )
-                record = session.execute(stmt).scalar_one_or_none()
-                if record is None:
-                    raise NotFoundError(f"Thread {thread_id} introuvable")
-                payload, _matches = self._normalize_thread_record(
-                    record,
-                    owner_id=owner_id,
-                    session=session,
-                    expected_workflow=expected,
-                )
-                return ThreadMetadata.model_validate(payload)
-
-            _record, payload = self._require_thread_record(
+    async def _load_thread_payload(
+        self,
+        session: _StoreSession,
+        thread_id: str,
+        owner_id: str,
+        expected_workflow: Mapping[str, Any],
+        context: ChatKitRequestContext,
+    ) -> dict[str, Any]:
+        if not context.is_admin:
+            _record, payload = await self._require_thread_record(
                 session,
                 thread_id,
                 owner_id,
-                expected,
+                expected_workflow,
             )
-            return ThreadMetadata.model_validate(payload)
+            return payload
 
-        return await self._run(_load)
+        # Admins can view any thread regardless of workflow match
+        stmt = select(ChatThread).where(
+            ChatThread.id == thread_id, ChatThread.owner_id == owner_id
+        )
+        record = (await session.execute(stmt)).scalar_one_or_none()
+        if record is None:
+            raise NotFoundError(f"Thread {thread_id} introuvable")
+        payload, _matches = await self._normalize_thread_record(
+            record,
+            owner_id=owner_id,
+            session=session,
+            expected_workflow=expected_workflow,
+        )
+        return payload
+
+    async def load_thread(
+        self, thread_id: str, context: ChatKitRequestContext
+    ) -> ThreadMetadata:
+        async with self._session("load_thread") as session:
+            owner_id = await self._resolve_owner_id_for_thread(
+                session, thread_id, context
+            )
+            expected = await self._expected_workflow()
+            payload = await self._load_thread_payload(
+                session, thread_id, owner_id, expected, context
+            )
+        return ThreadMetadata.model_validate(payload)
 
     async def save_thread(
         self, thread: ThreadMetadata, context: ChatKitRequestContext
     ) -> None:
-        def _save(session: Session) -> None:
+        async with self._session("save_thread") as session:
             # Resolve the actual thread owner for admins operating on
             # student threads.  Fall back to the current user ID when the
             # thread does not exist yet (creation path).
             try:
-                owner_id = self._resolve_owner_id_for_thread(
+                owner_id = await self._resolve_owner_id_for_thread(
                     session, thread.id, context
                 )
             except NotFoundError:
@@ -642,7 +727,6 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             else:
                 metadata = _strip_null_bytes(dict(payload.get("metadata") or {}))
             metadata.setdefault("owner_id", owner_id)
-            expected_workflow = self._current_workflow_metadata()
             workflow_metadata = metadata.get("workflow")
             if self._has_complete_workflow_metadata(workflow_metadata):
                 # Garder les métadonnées de workflow existantes
@@ -650,14 +734,14 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 pass
             else:
                 # Assigner le workflow actuel si pas de métadonnées complètes
-                metadata["workflow"] = dict(expected_workflow)
+                metadata["workflow"] = dict(await self._expected_workflow())
             thread.metadata = metadata
             payload["metadata"] = metadata
             payload = _strip_null_bytes(payload)
             now = dt.datetime.now(dt.UTC)
             created_at = _ensure_timezone(thread.created_at)
             stmt = select(ChatThread).where(ChatThread.id == thread.id)
-            existing = session.execute(stmt).scalar_one_or_none()
+            existing = (await session.execute(stmt)).scalar_one_or_none()
             if existing is None:
                 new_record = ChatThread(
                     id=thread.id,
@@ -683,13 +767,11 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 existing.created_at = created_at
                 existing.updated_at = now
                 self._sync_denormalized_columns(existing, payload)
-            session.commit()
+            await session.commit()
 
-        await self._run(_save)
-
-    def _get_branch_fork_chain(
+    async def _get_branch_fork_chain(
         self,
-        session: Session,
+        session: _StoreSession,
         thread_id: str,
         branch_id: str,
     ) -> list[dict[str, Any]]:
@@ -701,10 +783,12 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         current_branch_id = branch_id
 
         while current_branch_id and current_branch_id != MAIN_BRANCH_ID:
-            branch = session.execute(
-                select(ChatThreadBranch).where(
-                    ChatThreadBranch.thread_id == thread_id,
-                    ChatThreadBranch.branch_id == current_branch_id,
+            branch = (
+                await session.execute(
+                    select(ChatThreadBranch).where(
+                        ChatThreadBranch.thread_id == thread_id,
+                        ChatThreadBranch.branch_id == current_branch_id,
+                    )
                 )
             ).scalar_one_or_none()
 
@@ -799,29 +883,14 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         context: ChatKitRequestContext,
         branch_id: str | None = None,
     ) -> Page[ThreadItem]:
-        def _load(session: Session) -> Page[ThreadItem]:
-            owner_id = self._resolve_owner_id_for_thread(session, thread_id, context)
-            expected = self._current_workflow_metadata()
-
-            if context.is_admin:
-                # Admin bypass: look up thread without workflow-match check
-                stmt = select(ChatThread).where(
-                    ChatThread.id == thread_id, ChatThread.owner_id == owner_id
-                )
-                record = session.execute(stmt).scalar_one_or_none()
-                if record is None:
-                    raise NotFoundError(f"Thread {thread_id} introuvable")
-                thread_payload, _matches = self._normalize_thread_record(
-                    record, owner_id=owner_id, session=session,
-                    expected_workflow=expected,
-                )
-            else:
-                _record, thread_payload = self._require_thread_record(
-                    session,
-                    thread_id,
-                    owner_id,
-                    expected,
-                )
+        async with self._session("load_thread_items") as session:
+            owner_id = await self._resolve_owner_id_for_thread(
+                session, thread_id, context
+            )
+            expected = await self._expected_workflow()
+            thread_payload = await self._load_thread_payload(
+                session, thread_id, owner_id, expected, context
+            )
 
             # Determine which branch to load
             effective_branch_id = branch_id
@@ -846,10 +915,10 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 ChatThreadItem.thread_id == thread_id,
                 ChatThreadItem.owner_id == owner_id,
             ).order_by(ChatThreadItem.created_at.asc(), ChatThreadItem.id.asc())
-            all_records = list(session.execute(stmt).scalars().all())
+            all_records = list((await session.execute(stmt)).scalars().all())
 
             # Filter records for the branch
-            fork_chain = self._get_branch_fork_chain(
+            fork_chain = await self._get_branch_fork_chain(
                 session, thread_id, effective_branch_id
             )
             logger.info(
@@ -877,39 +946,31 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             sliced = records[start_index : start_index + effective_limit]
             has_more = start_index + effective_limit < len(records)
             next_after = sliced[-1].id if has_more and sliced else None
-            items: list[ThreadItem] = []
-            changed_records: list[ChatThreadItem] = []
 
-            for record in sliced:
-                payload = self._normalize_thread_item_payload(record.payload)
-                if payload != record.payload:
+            updates, items = await asyncio.to_thread(
+                self._prepare_thread_items,
+                thread_id,
+                [(record.id, record.payload) for record in sliced],
+            )
+            changed = False
+            for record, payload in zip(sliced, updates, strict=True):
+                if payload is not None:
                     record.payload = payload
-                    changed_records.append(record)
-
-                # Transformer les données d'image volumineuses en URLs de référence
-                # (sans modifier les données stockées en base)
-                response_payload = self._strip_image_data_for_response(
-                    payload, thread_id, record.id
-                )
-                items.append(self._thread_item_adapter.validate_python(response_payload))
-
-            if changed_records:
-                session.add_all(changed_records)
-                session.commit()
-            return Page(data=items, has_more=has_more, after=next_after)
-
-        return await self._run(_load)
+                    changed = True
+            if changed:
+                await session.commit()
+        return Page(data=items, has_more=has_more, after=next_after)
 
     async def save_attachment(
         self, attachment: Attachment, context: ChatKitRequestContext
     ) -> None:
         owner_id = self._require_user_id(context)
 
-        def _save(session: Session) -> None:
+        async with self._session("save_attachment") as session:
             payload = attachment.model_dump(mode="json")
             now = dt.datetime.now(dt.UTC)
             stmt = select(ChatAttachment).where(ChatAttachment.id == attachment.id)
-            existing = session.execute(stmt).scalar_one_or_none()
+            existing = (await session.execute(stmt)).scalar_one_or_none()
             if existing is None:
                 session.add(
                     ChatAttachment(
@@ -923,14 +984,12 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 if existing.owner_id != owner_id:
                     raise NotFoundError(f"Pièce jointe {attachment.id} introuvable")
                 existing.payload = payload
-            session.commit()
-
-        await self._run(_save)
+            await session.commit()
 
     async def load_attachment(
         self, attachment_id: str, context: ChatKitRequestContext
     ) -> Attachment:
-        def _load(session: Session) -> Attachment:
+        async with self._session("load_attachment") as session:
             if context.is_admin:
                 stmt = select(ChatAttachment).where(ChatAttachment.id == attachment_id)
             else:
@@ -939,57 +998,55 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                     ChatAttachment.id == attachment_id,
                     ChatAttachment.owner_id == owner_id,
                 )
-            record = session.execute(stmt).scalar_one_or_none()
+            record = (await session.execute(stmt)).scalar_one_or_none()
             if record is None:
                 raise NotFoundError(f"Pièce jointe {attachment_id} introuvable")
             return self._attachment_adapter.validate_python(record.payload)
 
-        return await self._run(_load)
-
     async def load_attachment_owner(
         self, attachment_id: str, context: ChatKitRequestContext
     ) -> str:
-        def _load(session: Session) -> str:
+        async with self._session("load_attachment_owner") as session:
             stmt = select(ChatAttachment.owner_id).where(
                 ChatAttachment.id == attachment_id
             )
             if not context.is_admin:
                 owner_id = self._require_user_id(context)
                 stmt = stmt.where(ChatAttachment.owner_id == owner_id)
-            owner_id = session.execute(stmt).scalar_one_or_none()
+            owner_id = (await session.execute(stmt)).scalar_one_or_none()
             if owner_id is None:
                 raise NotFoundError(f"Pièce jointe {attachment_id} introuvable")
             return owner_id
 
-        return await self._run(_load)
-
     async def delete_attachment(
         self, attachment_id: str, context: ChatKitRequestContext
     ) -> None:
         owner_id = self._require_user_id(context)
 
-        def _delete(session: Session) -> None:
+        async with self._session("delete_attachment") as session:
             stmt = delete(ChatAttachment).where(
                 ChatAttachment.id == attachment_id,
                 ChatAttachment.owner_id == owner_id,
             )
-            session.execute(stmt)
-            session.commit()
+            await session.execute(stmt)
+            await session.commit()
 
-        await self._run(_delete)
-
-    def _keyset_filter(
+    async def _keyset_filter(
         self,
         stmt,
-        session: Session,
+        session: _StoreSession,
         after: str | None,
         desc_order: bool,
     ):
         """Apply keyset pagination filter to the statement."""
         if not after:
             return stmt
-        cursor_row = session.execute(
-            select(ChatThread.updated_at, ChatThread.id).where(ChatThread.id == after)
+        cursor_row = (
+            await session.execute(
+                select(ChatThread.updated_at, ChatThread.id).where(
+                    ChatThread.id == after
+                )
+            )
         ).one_or_none()
         if cursor_row is None:
             return stmt
@@ -1023,26 +1080,23 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         all_workflows: bool = True,
     ) -> Page[ThreadMetadata]:
         owner_id = self._require_user_id(context)
+        effective_limit = limit or 20
+        desc_order = order == "desc"
 
-        def _load(session: Session) -> Page[ThreadMetadata]:
-            expected = self._current_workflow_metadata()
-            effective_limit = limit or 20
-            desc_order = order == "desc"
-
+        async with self._session("load_threads") as session:
             if all_workflows:
-                return self._load_threads_lightweight(
+                return await self._load_threads_lightweight(
                     session, owner_id, effective_limit, after, desc_order,
                 )
 
-            return self._load_threads_with_filter(
+            expected = await self._expected_workflow()
+            return await self._load_threads_with_filter(
                 session, owner_id, expected, effective_limit, after, desc_order,
             )
 
-        return await self._run(_load)
-
-    def _load_threads_lightweight(
+    async def _load_threads_lightweight(
         self,
-        session: Session,
+        session: _StoreSession,
         owner_id: str,
         effective_limit: int,
         after: str | None,
@@ -1068,10 +1122,10 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         else:
             stmt = stmt.order_by(ChatThread.updated_at.asc(), ChatThread.id.asc())
 
-        stmt = self._keyset_filter(stmt, session, after, desc_order)
+        stmt = await self._keyset_filter(stmt, session, after, desc_order)
         stmt = stmt.limit(effective_limit + 1)
 
-        rows = session.execute(stmt).all()
+        rows = (await session.execute(stmt)).all()
         has_more = len(rows) > effective_limit
         rows = rows[:effective_limit]
 
@@ -1095,9 +1149,9 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         next_after = rows[-1].id if has_more and rows else None
         return Page(data=data, has_more=has_more, after=next_after)
 
-    def _load_threads_with_filter(
+    async def _load_threads_with_filter(
         self,
-        session: Session,
+        session: _StoreSession,
         owner_id: str,
         expected: Mapping[str, Any],
         effective_limit: int,
@@ -1112,12 +1166,12 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         else:
             stmt = stmt.order_by(ChatThread.updated_at.asc(), ChatThread.id.asc())
 
-        stmt = self._keyset_filter(stmt, session, after, desc_order)
+        stmt = await self._keyset_filter(stmt, session, after, desc_order)
 
         # Fetch in larger batches since we filter by workflow match
         fetch_size = effective_limit * 3
         stmt = stmt.limit(fetch_size + 1)
-        records = session.execute(stmt).scalars().all()
+        records = (await session.execute(stmt)).scalars().all()
 
         results: list[dict[str, Any]] = []
         dirty = False
@@ -1135,7 +1189,7 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
             if matches:
                 results.append(payload)
         if dirty:
-            session.commit()
+            await session.commit()
 
         has_more = len(results) > effective_limit
         results = results[:effective_limit]
@@ -1151,31 +1205,17 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
         context: ChatKitRequestContext,
         branch_id: str | None = None,
     ) -> None:
-        def _add(session: Session) -> None:
-            owner_id = self._resolve_owner_id_for_thread(session, thread_id, context)
-            expected = self._current_workflow_metadata()
+        # Ne PAS normaliser lors de la sauvegarde pour préserver les données d'image
+        payload = await asyncio.to_thread(self._dump_item, item)
 
-            if context.is_admin:
-                # Admin bypass: look up thread without workflow-match check
-                stmt = select(ChatThread).where(
-                    ChatThread.id == thread_id, ChatThread.owner_id == owner_id
-                )
-                record = session.execute(stmt).scalar_one_or_none()
-                if record is None:
-                    raise NotFoundError(f"Thread {thread_id} introuvable")
-                thread_payload, _matches = self._normalize_thread_record(
-                    record, owner_id=owner_id, session=session,
-                    expected_workflow=expected,
-                )
-            else:
-                _record, thread_payload = self._require_thread_record(
-                    session,
-                    thread_id,
-                    owner_id,
-                    expected,
-                )
-            # Ne PAS normaliser lors de la sauvegarde pour préserver les données d'image
-            payload = _strip_null_bytes(item.model_dump(mode="json"))
+        async with self._session("add_thread_item") as session:
+            owner_id = await self._resolve_owner_id_for_thread(
+                session, thread_id, context
+            )
+            expected = await self._expected_workflow()
+            thread_payload = await self._load_thread_payload(
+                session, thread_id, owner_id, expected, context
+            )
 
             # Determine branch_id - use provided value or get from thread metadata
             effective_branch_id = branch_id
@@ -1200,7 +1240,7 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 payload["branch_id"] = effective_branch_id
 
             created_at = _ensure_timezone(getattr(item, "created_at", None))
-            existing = session.get(ChatThreadItem, item.id)
+            existing = await session.get(ChatThreadItem, item.id)
             if existing is None:
                 session.add(
                     ChatThreadItem(
@@ -1219,12 +1259,12 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 existing.payload = payload
                 existing.created_at = created_at
             try:
-                session.commit()
+                await session.commit()
             except IntegrityError:
                 # Concurrent insert with the same item id can happen while streaming.
                 # Retry as update if the row belongs to this thread/owner.
-                session.rollback()
-                persisted = session.get(ChatThreadItem, item.id)
+                await session.rollback()
+                persisted = await session.get(ChatThreadItem, item.id)
                 if persisted is None:
                     raise
                 if persisted.owner_id != owner_id or persisted.thread_id != thread_id:
@@ -1233,43 +1273,46 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                     )
                 persisted.payload = payload
                 persisted.created_at = created_at
-                session.commit()
-
-        await self._run(_add)
+                await session.commit()
 
     async def save_item(
         self, thread_id: str, item: ThreadItem, context: ChatKitRequestContext
     ) -> None:
-        def _save(session: Session) -> None:
-            owner_id = self._resolve_owner_id_for_thread(session, thread_id, context)
-            expected = self._current_workflow_metadata()
+        # Ne PAS normaliser lors de la sauvegarde pour préserver les données d'image
+        payload = await asyncio.to_thread(self._dump_item, item)
+        created_at = _ensure_timezone(getattr(item, "created_at", None))
+
+        async with self._session("save_item") as session:
+            owner_id = await self._resolve_owner_id_for_thread(
+                session, thread_id, context
+            )
 
             if context.is_admin:
                 # Admin bypass: verify thread exists without workflow-match check
                 stmt_thread = select(ChatThread).where(
                     ChatThread.id == thread_id, ChatThread.owner_id == owner_id
                 )
-                if session.execute(stmt_thread).scalar_one_or_none() is None:
+                if (await session.execute(stmt_thread)).scalar_one_or_none() is None:
                     raise NotFoundError(f"Thread {thread_id} introuvable")
             else:
-                self._require_thread_record(
+                await self._require_thread_record(
                     session,
                     thread_id,
                     owner_id,
-                    expected,
+                    await self._expected_workflow(),
                 )
             stmt = select(ChatThreadItem).where(
                 ChatThreadItem.id == item.id,
                 ChatThreadItem.thread_id == thread_id,
                 ChatThreadItem.owner_id == owner_id,
             )
-            record = session.execute(stmt).scalar_one_or_none()
+            record = (await session.execute(stmt)).scalar_one_or_none()
             if record is None:
                 # Race-tolerant path: during streamed workflow updates, an item can be
                 # updated before the initial insert is visible from this code path.
                 # If the ID is not bound to another thread/owner, create it instead
                 # of failing the whole request.
-                existing_any = session.get(ChatThreadItem, item.id)
+                existing_any = await session.get(ChatThreadItem, item.id)
                 if existing_any is not None and (
                     existing_any.thread_id != thread_id
                     or existing_any.owner_id != owner_id
@@ -1277,23 +1320,22 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                     raise NotFoundError(
                         f"Élément {item.id} introuvable dans le fil {thread_id}"
                     )
-                payload = _strip_null_bytes(item.model_dump(mode="json"))
                 session.add(
                     ChatThreadItem(
                         id=item.id,
                         thread_id=thread_id,
                         owner_id=owner_id,
-                        created_at=_ensure_timezone(getattr(item, "created_at", None)),
+                        created_at=created_at,
                         payload=payload,
                     )
                 )
                 try:
-                    session.commit()
+                    await session.commit()
                 except IntegrityError:
                     # Same race condition as add_thread_item: another concurrent
                     # path inserted the row between our read and commit.
-                    session.rollback()
-                    persisted = session.get(ChatThreadItem, item.id)
+                    await session.rollback()
+                    persisted = await session.get(ChatThreadItem, item.id)
                     if persisted is None:
                         raise
                     if (
@@ -1304,30 +1346,26 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                             f"Élément {item.id} introuvable dans le fil {thread_id}"
                         )
                     persisted.payload = payload
-                    persisted.created_at = _ensure_timezone(
-                        getattr(item, "created_at", None)
-                    )
-                    session.commit()
+                    persisted.created_at = created_at
+                    await session.commit()
                 return
-            # Ne PAS normaliser lors de la sauvegarde pour préserver les données d'image
-            new_payload = _strip_null_bytes(item.model_dump(mode="json"))
             # Preserve branch_id from existing record if present
             existing_branch_id = record.payload.get("branch_id")
             if existing_branch_id:
-                new_payload["branch_id"] = existing_branch_id
-            record.payload = new_payload
-            record.created_at = _ensure_timezone(getattr(item, "created_at", None))
-            session.commit()
-
-        await self._run(_save)
+                payload["branch_id"] = existing_branch_id
+            record.payload = payload
+            record.created_at = created_at
+            await session.commit()
 
     async def load_item(
         self, thread_id: str, item_id: str, context: ChatKitRequestContext
     ) -> ThreadItem:
-        def _load(session: Session) -> ThreadItem:
-            owner_id = self._resolve_owner_id_for_thread(session, thread_id, context)
-            expected = self._current_workflow_metadata()
-            self._require_thread_record(
+        async with self._session("load_item") as session:
+            owner_id = await self._resolve_owner_id_for_thread(
+                session, thread_id, context
+            )
+            expected = await self._expected_workflow()
+            await self._require_thread_record(
                 session,
                 thread_id,
                 owner_id,
@@ -1338,33 +1376,29 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 ChatThreadItem.thread_id == thread_id,
                 ChatThreadItem.owner_id == owner_id,
             )
-            record = session.execute(stmt).scalar_one_or_none()
+            record = (await session.execute(stmt)).scalar_one_or_none()
             if record is None:
                 raise NotFoundError(
                     f"Élément {item_id} introuvable dans le fil {thread_id}"
                 )
-            payload = self._normalize_thread_item_payload(record.payload)
-            if payload != record.payload:
-                record.payload = payload
-                session.add(record)
-                session.commit()
-            # Transformer les données d'image volumineuses en URLs de référence
-            # et marquer les workflows comme terminés
-            response_payload = self._strip_image_data_for_response(
-                payload, thread_id, record.id
+            # Normaliser, alléger les images et marquer les workflows comme
+            # terminés hors de la boucle
+            (update,), (item,) = await asyncio.to_thread(
+                self._prepare_thread_items, thread_id, [(record.id, record.payload)]
             )
-            return self._thread_item_adapter.validate_python(response_payload)
-
-        return await self._run(_load)
+            if update is not None:
+                record.payload = update
+                await session.commit()
+        return item
 
     async def delete_thread(
         self, thread_id: str, context: ChatKitRequestContext
     ) -> None:
         owner_id = self._require_user_id(context)
 
-        def _delete(session: Session) -> None:
-            expected = self._current_workflow_metadata()
-            self._require_thread_record(
+        async with self._session("delete_thread") as session:
+            expected = await self._expected_workflow()
+            await self._require_thread_record(
                 session,
                 thread_id,
                 owner_id,
@@ -1374,19 +1408,17 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 ChatThread.id == thread_id,
                 ChatThread.owner_id == owner_id,
             )
-            session.execute(stmt)
-            session.commit()
-
-        await self._run(_delete)
+            await session.execute(stmt)
+            await session.commit()
 
     async def delete_thread_item(
         self, thread_id: str, item_id: str, context: ChatKitRequestContext
     ) -> None:
         owner_id = self._require_user_id(context)
 
-        def _delete(session: Session) -> None:
-            expected = self._current_workflow_metadata()
-            self._require_thread_record(
+        async with self._session("delete_thread_item") as session:
+            expected = await self._expected_workflow()
+            await self._require_thread_record(
                 session,
                 thread_id,
                 owner_id,
@@ -1397,7 +1429,5 @@ class PostgresChatKitStore(Store[ChatKitRequestContext]):
                 ChatThreadItem.thread_id == thread_id,
                 ChatThreadItem.owner_id == owner_id,
             )
-            session.execute(stmt)
-            session.commit()
-
-        await self._run(_delete)
+            await session.execute(stmt)
+            await session.commit()
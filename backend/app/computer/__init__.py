@@ -3,6 +3,7 @@
 from .hosted_browser import HostedBrowser, HostedBrowserError
 from .hosted_ssh import HostedSSH, HostedSSHError, SSHConfig
 from .hosted_vnc import HostedVNC, HostedVNCError, VNCConfig
+from .screenshot_pipeline import ScreenshotSettings, ScreenshotStats
 
 __all__ = [
     "HostedBrowser",
@@ -12,5 +13,7 @@ __all__ = [
     "SSHConfig",
     "HostedVNC",
     "HostedVNCError",
+    "ScreenshotSettings",
+    "ScreenshotStats",
     "VNCConfig",
 ]
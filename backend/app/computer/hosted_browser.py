@@ -16,6 +16,8 @@ from dataclasses import dataclass
 
 from agents.computer import AsyncComputer, Button, Environment
 
+from .screenshot_pipeline import ScreenshotPipeline, ScreenshotSettings, ScreenshotStats
+
 logger = logging.getLogger("chatkit.computer.hosted_browser")
 
 try:  # pragma: no cover - playwright n'est pas toujours installé dans les tests
@@ -99,6 +101,17 @@ class _BaseBrowserDriver:
     async def screenshot(self) -> str:  # pragma: no cover - défini par les sous-classes
         raise NotImplementedError
 
+    async def capture(
+        self,
+        *,
+        full_page: bool = False,
+        image_type: str = "png",
+        quality: int | None = None,
+    ) -> bytes:  # pragma: no cover - défini par les sous-classes
+        """Return the raw bytes of a capture of the current page."""
+
+        raise NotImplementedError
+
     async def click(self, x: int, y: int, button: Button) -> None:
         raise NotImplementedError  # pragma: no cover - défini par les sous-classes
 
@@ -441,10 +454,27 @@ class _PlaywrightDriver(_BaseBrowserDriver):
         return self._page
 
     async def screenshot(self) -> str:
+        image_bytes = await self.capture(full_page=True)
+        return base64.b64encode(image_bytes).decode("ascii")
+
+    async def capture(
+        self,
+        *,
+        full_page: bool = False,
+        image_type: str = "png",
+        quality: int | None = None,
+    ) -> bytes:
         await self.ensure_ready()
         page = self._require_page()
-        image_bytes = await page.screenshot(full_page=True, type="png")
-        return base64.b64encode(image_bytes).decode("ascii")
+        options: dict[str, object] = {
+            "full_page": full_page,
+            "type": image_type,
+            # Évite de produire des captures en pixels physiques (HiDPI).
+            "scale": "css",
+        }
+        if image_type == "jpeg" and quality is not None:
+            options["quality"] = quality
+        return await page.screenshot(**options)
 
     async def click(self, x: int, y: int, button: Button) -> None:
         await self.ensure_ready()
@@ -587,6 +617,16 @@ class _FallbackDriver(_BaseBrowserDriver):
             self._placeholder_cache = self._build_placeholder_screenshot()
         return self._placeholder_cache
 
+    async def capture(
+        self,
+        *,
+        full_page: bool = False,
+        image_type: str = "png",
+        quality: int | None = None,
+    ) -> bytes:
+        # Le placeholder est toujours un PNG ; le pipeline le ré-encode au besoin.
+        return base64.b64decode(await self.screenshot())
+
     def _build_placeholder_screenshot(self) -> str:
         width = max(1, min(self.width, 1024))
         height = max(1, min(self.height, 1024))
@@ -694,6 +734,7 @@ class HostedBrowser(AsyncComputer):
         height: int,
         environment: str,
         start_url: str | None = None,
+        screenshot_settings: ScreenshotSettings | None = None,
     ) -> None:
         self._width = max(1, min(width, 4096))
         self._height = max(1, min(height, 4096))
@@ -707,6 +748,10 @@ class HostedBrowser(AsyncComputer):
         self._driver: _BaseBrowserDriver | None = None
         self._lock = asyncio.Lock()
         self._pending_navigation_url: str | None = None
+        self._screenshots = ScreenshotPipeline(
+            settings=screenshot_settings or ScreenshotSettings.from_env()
+        )
+        self._scale = self._screenshots.settings.scale_for(self._width, self._height)
 
     @property
     def environment(self) -> Environment:
@@ -714,7 +759,25 @@ class HostedBrowser(AsyncComputer):
 
     @property
     def dimensions(self) -> tuple[int, int]:
-        return (self._width, self._height)
+        # Le modèle raisonne dans le repère des captures réduites ; les actions
+        # sont remises à l'échelle du viewport dans ``_to_viewport``.
+        if self._scale >= 1.0:
+            return (self._width, self._height)
+        return (
+            max(1, round(self._width * self._scale)),
+            max(1, round(self._height * self._scale)),
+        )
+
+    @property
+    def screenshot_stats(self) -> ScreenshotStats:
+        """Counters of the screenshot pipeline for this browser session."""
+
+        return self._screenshots.stats
+
+    def _to_viewport(self, x: int, y: int) -> tuple[int, int]:
+        if self._scale >= 1.0:
+            return x, y
+        return round(x / self._scale), round(y / self._scale)
 
     @property
     def debug_url(self) -> str | None:
@@ -783,27 +846,33 @@ class HostedBrowser(AsyncComputer):
     async def screenshot(self) -> str:
         driver = await self._get_driver()
         await self._handle_pending_navigation()
-        return await driver.screenshot()
+        settings = self._screenshots.settings
+        image_bytes = await driver.capture(
+            full_page=settings.full_page,
+            image_type=settings.capture_type,
+            quality=settings.quality,
+        )
+        return self._screenshots.process(image_bytes, scale=self._scale)
 
     async def click(self, x: int, y: int, button: Button) -> None:
         driver = await self._get_driver()
         await self._handle_pending_navigation()
-        await driver.click(x, y, button)
+        await driver.click(*self._to_viewport(x, y), button)
 
     async def double_click(self, x: int, y: int) -> None:
         driver = await self._get_driver()
         await self._handle_pending_navigation()
-        await driver.double_click(x, y)
+        await driver.double_click(*self._to_viewport(x, y))
 
     async def scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> None:
         driver = await self._get_driver()
         await self._handle_pending_navigation()
-        await driver.scroll(x, y, scroll_x, scroll_y)
+        await driver.scroll(*self._to_viewport(x, y), scroll_x, scroll_y)
 
     async def move(self, x: int, y: int) -> None:
         driver = await self._get_driver()
         await self._handle_pending_navigation()
-        await driver.move(x, y)
+        await driver.move(*self._to_viewport(x, y))
 
     async def type(self, text: str) -> None:
         driver = await self._get_driver()
@@ -818,7 +887,7 @@ class HostedBrowser(AsyncComputer):
     async def drag(self, path: Sequence[tuple[int, int]]) -> None:
         driver = await self._get_driver()
         await self._handle_pending_navigation()
-        await driver.drag(path)
+        await driver.drag([self._to_viewport(x, y) for x, y in path])
 
     async def wait(self) -> None:
         driver = await self._get_driver()
@@ -833,10 +902,16 @@ class HostedBrowser(AsyncComputer):
     async def close(self) -> None:
         if self._driver is None:
             return
+        stats = self._screenshots.stats
+        if stats.frames:
+            logger.info(
+                "Captures du navigateur hébergé : %s", stats.as_dict()
+            )
         try:
             await self._driver.close()
         finally:
             self._driver = None
+            self._screenshots.reset()
 
 
 __all__ = ["HostedBrowser", "HostedBrowserError"]
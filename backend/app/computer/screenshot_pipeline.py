@@ -0,0 +1,255 @@
+"""Screenshot post-processing for the hosted computer-use browser.
+
+Les captures produites par le navigateur hébergé sont injectées dans l'entrée
+de l'agent puis persistées dans les ``ChatThreadItem``. Ce module centralise
+la réduction de leur coût : format et qualité configurables, capture limitée
+au viewport, réduction à la résolution cible du modèle et déduplication des
+images inchangées d'une action à l'autre.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Literal
+
+from ..config import env_flag, env_int
+
+logger = logging.getLogger("chatkit.computer.screenshot_pipeline")
+
+try:  # pragma: no cover - Pillow est optionnel
+    from PIL import Image  # type: ignore[import-not-found]
+except Exception:  # pragma: no cover - compatibilité sans Pillow
+    Image = None  # type: ignore[assignment]
+
+ScreenshotFormat = Literal["png", "jpeg", "webp"]
+
+_SUPPORTED_FORMATS: frozenset[str] = frozenset({"png", "jpeg", "webp"})
+# Formats que Playwright sait produire nativement.
+_NATIVE_FORMATS: frozenset[str] = frozenset({"png", "jpeg"})
+
+
+def pillow_available() -> bool:
+    """Return ``True`` when Pillow can be used to decode and re-encode images."""
+
+    return Image is not None
+
+
+@dataclass(frozen=True)
+class ScreenshotSettings:
+    """Configuration of the screenshot pipeline."""
+
+    format: ScreenshotFormat = "png"
+    quality: int = 80
+    full_page: bool = False
+    max_width: int | None = None
+    max_height: int | None = None
+    dedupe: bool = True
+    perceptual_dedupe: bool = False
+    hash_size: int = 16
+    hash_threshold: int = 0
+
+    def __post_init__(self) -> None:
+        normalized = str(self.format).strip().lower()
+        if normalized == "jpg":
+            normalized = "jpeg"
+        if normalized not in _SUPPORTED_FORMATS:
+            logger.warning(
+                "Format de capture %r non supporté, utilisation de PNG", self.format
+            )
+            normalized = "png"
+        object.__setattr__(self, "format", normalized)
+        object.__setattr__(self, "quality", max(1, min(int(self.quality), 100)))
+        object.__setattr__(self, "hash_size", max(4, int(self.hash_size)))
+        object.__setattr__(self, "hash_threshold", max(0, int(self.hash_threshold)))
+        for name in ("max_width", "max_height"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                object.__setattr__(self, name, None)
+
+    @classmethod
+    def from_env(cls) -> ScreenshotSettings:
+        """Build the settings from ``CHATKIT_HOSTED_BROWSER_SCREENSHOT_*``."""
+
+        prefix = "CHATKIT_HOSTED_BROWSER_SCREENSHOT_"
+        return cls(
+            format=os.getenv(f"{prefix}FORMAT", "png"),  # type: ignore[arg-type]
+            quality=env_int(f"{prefix}QUALITY", 80),
+            full_page=env_flag(f"{prefix}FULL_PAGE", False),
+            max_width=env_int(f"{prefix}MAX_WIDTH", 0),
+            max_height=env_int(f"{prefix}MAX_HEIGHT", 0),
+            dedupe=env_flag(f"{prefix}DEDUPE", True),
+            perceptual_dedupe=env_flag(f"{prefix}PERCEPTUAL_DEDUPE", False),
+            hash_size=env_int(f"{prefix}HASH_SIZE", 16),
+            hash_threshold=env_int(f"{prefix}HASH_THRESHOLD", 0),
+        )
+
+    @property
+    def capture_type(self) -> Literal["png", "jpeg"]:
+        """Image type requested from the browser before any re-encoding."""
+
+        if self.format in _NATIVE_FORMATS:
+            return self.format  # type: ignore[return-value]
+        # WebP nécessite un ré-encodage : on capture sans perte.
+        return "png"
+
+    def scale_for(self, width: int, height: int) -> float:
+        """Return the downscaling factor applied to a ``width`` x ``height`` frame."""
+
+        if not pillow_available():
+            return 1.0
+        factors = [1.0]
+        if self.max_width is not None and width > self.max_width:
+            factors.append(self.max_width / width)
+        if self.max_height is not None and height > self.max_height:
+            factors.append(self.max_height / height)
+        return min(factors)
+
+
+@dataclass
+class ScreenshotStats:
+    """Per-session counters exposed for monitoring."""
+
+    frames: int = 0
+    deduplicated_frames: int = 0
+    raw_bytes: int = 0
+    encoded_bytes: int = 0
+    deduplicated_bytes: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes that did not have to be emitted thanks to the pipeline."""
+
+        return max(0, self.raw_bytes - self.encoded_bytes) + self.deduplicated_bytes
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "frames": self.frames,
+            "deduplicated_frames": self.deduplicated_frames,
+            "raw_bytes": self.raw_bytes,
+            "encoded_bytes": self.encoded_bytes,
+            "deduplicated_bytes": self.deduplicated_bytes,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+def _difference_hash(image: Image.Image, hash_size: int) -> int:
+    """Compute a horizontal difference hash (dHash) of ``image``."""
+
+    resample = getattr(Image, "Resampling", Image).BILINEAR
+    small = image.convert("L").resize((hash_size + 1, hash_size), resample)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | int(pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+@dataclass
+class ScreenshotPipeline:
+    """Encode browser captures and drop frames identical to the previous one."""
+
+    settings: ScreenshotSettings = field(default_factory=ScreenshotSettings)
+    stats: ScreenshotStats = field(default_factory=ScreenshotStats)
+
+    def __post_init__(self) -> None:
+        self._last_digest: bytes | None = None
+        self._last_phash: int | None = None
+        self._last_encoded: str | None = None
+        self._last_size = 0
+
+    def reset(self) -> None:
+        """Forget the previous frame (e.g. after the browser was restarted)."""
+
+        self._last_digest = None
+        self._last_phash = None
+        self._last_encoded = None
+        self._last_size = 0
+
+    def process(self, image_bytes: bytes, *, scale: float = 1.0) -> str:
+        """Return the base64 payload to hand to the model for ``image_bytes``.
+
+        When the frame is unchanged compared to the previous one, the previous
+        payload is returned as-is so downstream consumers (agent input, task
+        tracker) can recognise and skip it.
+        """
+
+        settings = self.settings
+        self.stats.frames += 1
+        self.stats.raw_bytes += len(image_bytes)
+
+        digest = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        image = None
+        phash: int | None = None
+        needs_reencode = settings.format != settings.capture_type or scale < 1.0
+        # Le dHash ignore les petits changements réels (caractère saisi,
+        # curseur) : la comparaison perceptuelle reste donc optionnelle.
+        perceptual = settings.dedupe and settings.perceptual_dedupe
+        if Image is not None and (needs_reencode or perceptual):
+            try:
+                image = Image.open(io.BytesIO(image_bytes))
+                image.load()
+            except Exception as exc:  # pragma: no cover - dépend des captures
+                logger.debug("Capture illisible par Pillow : %s", exc)
+                image = None
+            if image is not None and perceptual:
+                phash = _difference_hash(image, settings.hash_size)
+
+        if settings.dedupe and self._last_encoded is not None:
+            if digest == self._last_digest or (
+                phash is not None
+                and self._last_phash is not None
+                and bin(phash ^ self._last_phash).count("1")
+                <= settings.hash_threshold
+            ):
+                self.stats.deduplicated_frames += 1
+                self.stats.deduplicated_bytes += self._last_size
+                self.stats.encoded_bytes += self._last_size
+                return self._last_encoded
+
+        payload = image_bytes
+        if image is not None and needs_reencode:
+            payload = self._reencode(image, scale)
+
+        encoded = base64.b64encode(payload).decode("ascii")
+        self.stats.encoded_bytes += len(payload)
+        self._last_size = len(payload)
+        self._last_digest = digest
+        self._last_phash = phash
+        self._last_encoded = encoded
+        return encoded
+
+    def _reencode(self, image: Image.Image, scale: float) -> bytes:
+        settings = self.settings
+        if scale < 1.0:
+            size = (
+                max(1, round(image.width * scale)),
+                max(1, round(image.height * scale)),
+            )
+            resample = getattr(Image, "Resampling", Image).LANCZOS
+            image = image.resize(size, resample)
+        buffer = io.BytesIO()
+        if settings.format == "png":
+            image.save(buffer, format="PNG", optimize=True)
+        else:
+            if image.mode not in {"RGB", "L"}:
+                image = image.convert("RGB")
+            image.save(
+                buffer, format=settings.format.upper(), quality=settings.quality
+            )
+        return buffer.getvalue()
+
+
+__all__ = [
+    "ScreenshotFormat",
+    "ScreenshotPipeline",
+    "ScreenshotSettings",
+    "ScreenshotStats",
+    "pillow_available",
+]
@@ -44,6 +44,44 @@ ADMIN_MODEL_API_KEY_ENV = "APP_SETTINGS_MODEL_API_KEY"
 _RUNTIME_SETTINGS_OVERRIDES: dict[str, Any] | None = None
 _RUNTIME_SETTINGS_LOCK = RLock()
 
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Lit un booléen (``1``/``true``/``yes``/``on``) ; vide = ``default``."""
+
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in _TRUE_VALUES
+
+
+def env_int(name: str, default: int, *, minimum: int | None = None) -> int:
+    """Lit un entier ; une valeur vide ou invalide renvoie ``default``."""
+
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        value = int(raw.strip())
+    except ValueError:
+        logger.warning("Valeur invalide pour %s : %r", name, raw)
+        return default
+    return value if minimum is None else max(minimum, value)
+
+
+def env_float(name: str, default: float) -> float:
+    """Lit un flottant ; une valeur vide ou invalide renvoie ``default``."""
+
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw.strip())
+    except ValueError:
+        logger.warning("Valeur invalide pour %s : %r", name, raw)
+        return default
+
 
 def _normalize_pem(value: str | None) -> str | None:
     """Return a normalized PEM string with Unix newlines and trailing newline."""
@@ -579,6 +617,9 @@ class Settings:
                     "when MODEL_PROVIDER=litellm"
                 )
             model_api_base = litellm_base.rstrip("/")
+        elif model_provider == "fake":
+            # Fournisseur simulé en mémoire (tests de charge, cf. model_providers.fake).
+            model_api_base = "http://fake-model.local"
         else:
             raise RuntimeError(
                 "MODEL_API_BASE environment variable is required when MODEL_PROVIDER="
@@ -597,6 +638,8 @@ class Settings:
             model_api_key_env = "OPENAI_API_KEY"
         elif model_provider == "litellm":
             model_api_key_env = "LITELLM_API_KEY"
+        elif model_provider == "fake":
+            model_api_key_env = "FAKE_MODEL_API_KEY"
         else:
             raise RuntimeError(
                 "MODEL_API_KEY_ENV environment variable is required when "
@@ -604,6 +647,8 @@ class Settings:
             )
 
         key_value = get_stripped(model_api_key_env)
+        if key_value is None and model_provider == "fake":
+            key_value = "fake"
         if key_value is None:
             if model_provider == "openai" and model_api_key_env == "OPENAI_API_KEY":
                 model_api_key = require("OPENAI_API_KEY")
@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import logging
+import os
 import time
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import TYPE_CHECKING, TypeVar
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, sessionmaker
 
-from ..config import get_settings
+try:  # pragma: no cover - dépend de l'installation de SQLAlchemy
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+except ImportError:  # pragma: no cover - extension asynchrone absente
+    async_sessionmaker = None  # type: ignore[assignment]
+    create_async_engine = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..config import env_int, get_settings
+from ..metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from .query_stats import install_query_instrumentation
 
 logger = logging.getLogger("chatkit.server")
 settings = get_settings()
@@ -17,11 +32,107 @@ settings = get_settings()
 _engine_options = {"future": True, "pool_pre_ping": True}
 if not settings.database_url.startswith("sqlite"):
     _engine_options.update(pool_size=20, max_overflow=30, pool_timeout=60)
+    if InstrumentedQueuePool is not None:
+        _engine_options["poolclass"] = InstrumentedQueuePool
 engine: Engine = create_engine(settings.database_url, **_engine_options)
 SessionLocal = sessionmaker(
     bind=engine, autoflush=False, autocommit=False, expire_on_commit=False
 )
 
+_T = TypeVar("_T")
+
+
+def _async_database_url(database_url: str) -> str | None:
+    """Return the async driver URL matching ``database_url``.
+
+    ``asyncpg`` is preferred for PostgreSQL, with psycopg 3 (which ships its
+    own async driver) as a fallback. In-memory SQLite databases cannot be
+    shared between two engines, so they stay on the synchronous engine.
+    """
+
+    override = os.getenv("DATABASE_ASYNC_URL", "").strip()
+    if override:
+        return override
+    if os.getenv("DATABASE_ASYNC_ENABLED", "true").strip().lower() in {
+        "0",
+        "false",
+        "no",
+        "off",
+    }:
+        return None
+
+    try:
+        from sqlalchemy.engine import make_url
+        from sqlalchemy.exc import ArgumentError
+    except ImportError:  # pragma: no cover - extension asynchrone absente
+        return None
+
+    try:
+        url = make_url(database_url)
+    except ArgumentError:
+        return None
+
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        if importlib.util.find_spec("asyncpg") is not None:
+            query = dict(url.query)
+            # asyncpg n'accepte pas sslmode : on le traduit en paramètre ssl.
+            sslmode = query.pop("sslmode", None)
+            if sslmode is not None:
+                query["ssl"] = sslmode
+            url = url.set(drivername="postgresql+asyncpg", query=query)
+        elif importlib.util.find_spec("psycopg") is not None:
+            url = url.set(drivername="postgresql+psycopg")
+        else:
+            return None
+        return url.render_as_string(hide_password=False)
+    if backend == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return None
+        if importlib.util.find_spec("aiosqlite") is None:
+            return None
+        url = url.set(drivername="sqlite+aiosqlite")
+        return url.render_as_string(hide_password=False)
+    return None
+
+
+def _create_async_engine(database_url: str) -> AsyncEngine | None:
+    if create_async_engine is None:
+        return None
+    async_url = _async_database_url(database_url)
+    if async_url is None:
+        return None
+    options: dict[str, object] = {"pool_pre_ping": True}
+    if not async_url.startswith("sqlite"):
+        # Ce pool s'ajoute à celui du moteur synchrone (jusqu'à 50 connexions)
+        # pour chaque worker : il reste volontairement petit.
+        options.update(
+            pool_size=env_int("DATABASE_ASYNC_POOL_SIZE", 5, minimum=1),
+            max_overflow=env_int("DATABASE_ASYNC_MAX_OVERFLOW", 5, minimum=0),
+            pool_timeout=60,
+        )
+        if InstrumentedAsyncQueuePool is not None:
+            options["poolclass"] = InstrumentedAsyncQueuePool
+    try:
+        return create_async_engine(async_url, **options)
+    except Exception as exc:  # pragma: no cover - dépend du pilote installé
+        logger.warning(
+            "Moteur asynchrone indisponible, repli sur le moteur synchrone : %s",
+            exc,
+        )
+        return None
+
+
+async_engine: AsyncEngine | None = _create_async_engine(settings.database_url)
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = (
+    async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    if async_engine is not None
+    else None
+)
+install_query_instrumentation(engine, async_engine)
+
 
 def get_session() -> Iterator[Session]:
     """Provide a transactional database session with proper cleanup.
@@ -40,6 +151,49 @@ def get_session() -> Iterator[Session]:
         session.close()  # Always close the session and return connection to pool
 
 
+def async_session_factory_for(
+    session_factory: sessionmaker[Session],
+) -> async_sessionmaker[AsyncSession] | None:
+    """Return the async factory paired with ``session_factory``, if any."""
+
+    if session_factory is SessionLocal:
+        return AsyncSessionLocal
+    return None
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Asynchronous counterpart of :func:`get_session`."""
+
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Aucun moteur de base de données asynchrone configuré")
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def _run_sync_session(func: Callable[[Session], _T]) -> _T:
+    with SessionLocal() as session:
+        return func(session)
+
+
+async def run_in_session(func: Callable[[Session], _T]) -> _T:
+    """Run ``func`` with an ORM session without blocking the event loop.
+
+    When an async engine is configured, ``func`` receives the synchronous
+    facade of an :class:`AsyncSession` and its queries are awaited on the
+    loop. Otherwise it runs in the default thread pool.
+    """
+
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(func)
+    return await asyncio.to_thread(_run_sync_session, func)
+
+
 def wait_for_database() -> None:
     retries = settings.database_connect_retries
     delay = settings.database_connect_delay
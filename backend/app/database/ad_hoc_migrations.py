@@ -62,6 +62,59 @@ def _run_ad_hoc_migrations() -> None:
                     connection.execute(
                         text(f"ALTER TABLE app_settings ADD COLUMN {name} VARCHAR(128)")
                     )
+        if "github_repo_syncs" in table_names:
+            columns = {
+                column["name"]
+                for column in inspect(connection).get_columns("github_repo_syncs")
+            }
+            for name, definition in (
+                ("last_tree_sha", "VARCHAR(40)"),
+                ("last_tree_mapping_count", "INTEGER"),
+            ):
+                if name not in columns:
+                    connection.execute(
+                        text(
+                            "ALTER TABLE github_repo_syncs "
+                            f"ADD COLUMN {name} {definition}"
+                        )
+                    )
+        if "outbound_calls" in table_names:
+            columns = {
+                column["name"]
+                for column in inspect(connection).get_columns("outbound_calls")
+            }
+            for name, definition in (
+                ("campaign_id", "VARCHAR(64)"),
+                ("attempt_count", "INTEGER NOT NULL DEFAULT 0"),
+                ("max_attempts", "INTEGER NOT NULL DEFAULT 1"),
+                ("next_attempt_at", "TIMESTAMP WITH TIME ZONE"),
+            ):
+                if name not in columns:
+                    connection.execute(
+                        text(
+                            "ALTER TABLE outbound_calls "
+                            f"ADD COLUMN {name} {definition}"
+                        )
+                    )
+            connection.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_outbound_calls_campaign_id "
+                    "ON outbound_calls(campaign_id)"
+                )
+            )
+        if "sip_accounts" in table_names:
+            columns = {
+                column["name"]
+                for column in inspect(connection).get_columns("sip_accounts")
+            }
+            for name, definition in (
+                ("max_concurrent_calls", "INTEGER"),
+                ("calls_per_second", "FLOAT"),
+            ):
+                if name not in columns:
+                    connection.execute(
+                        text(f"ALTER TABLE sip_accounts ADD COLUMN {name} {definition}")
+                    )
         if "users" in table_names:
             columns = {column["name"] for column in inspect(connection).get_columns("users")}
             if "display_name" not in columns:
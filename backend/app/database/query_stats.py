@@ -0,0 +1,364 @@
+"""Instrumentation SQL par requête HTTP et par méthode du store ChatKit.
+
+Les écouteurs ``before/after_cursor_execute`` de SQLAlchemy alimentent les
+portées ouvertes avec :func:`track_queries` dans le contexte courant (une
+``ContextVar`` qui suit les tâches asyncio, ``asyncio.to_thread`` et
+``AsyncSession.run_sync``). Chaque portée compte les requêtes, les lignes
+signalées par le pilote et le temps passé en base ; à sa fermeture, les
+chiffres sont agrégés par libellé dans :data:`query_metrics` et une
+suspicion de N+1 est journalisée lorsqu'une même instruction se répète.
+
+* :class:`QueryStatsMiddleware` ouvre une portée par requête HTTP, ajoute les
+  en-têtes ``X-DB-Query-*`` si ``DB_QUERY_HEADERS`` est actif et contrôle le
+  budget déclaré avec :func:`query_budget` sur la route ;
+* :func:`assert_max_queries` et :func:`enforce_query_budgets` sont des aides
+  de test qui échouent lorsqu'un budget est dépassé.
+
+Le nombre de lignes repose sur ``cursor.rowcount`` : exact avec psycopg, il
+vaut ``-1`` pour les SELECT SQLite et n'est alors pas compté.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from ..config import env_flag, env_int
+
+logger = logging.getLogger("chatkit.server")
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+QUERY_STATS_ENABLED = env_flag("DB_QUERY_STATS", default=True)
+QUERY_HEADERS_ENABLED = env_flag("DB_QUERY_HEADERS")
+N_PLUS_ONE_THRESHOLD = env_int("DB_N_PLUS_ONE_THRESHOLD", 5)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Levée par les aides de test lorsqu'un budget de requêtes est dépassé."""
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Compteurs d'une portée instrumentée."""
+
+    label: str
+    queries: int = 0
+    rows: int = 0
+    duration: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+_active_scopes: ContextVar[tuple[QueryStats, ...]] = ContextVar(
+    "db_query_scopes", default=()
+)
+
+
+def current_query_stats() -> QueryStats | None:
+    """Portée la plus interne du contexte courant, s'il y en a une."""
+
+    scopes = _active_scopes.get()
+    return scopes[-1] if scopes else None
+
+
+# ── Agrégation ───────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class QueryMetric:
+    calls: int = 0
+    queries: int = 0
+    rows: int = 0
+    duration: float = 0.0
+    max_queries: int = 0
+    n_plus_one: int = 0
+    budget_violations: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "queries": self.queries,
+            "rows": self.rows,
+            "duration_seconds": round(self.duration, 6),
+            "max_queries": self.max_queries,
+            "mean_queries": round(self.queries / self.calls, 2) if self.calls else 0.0,
+            "n_plus_one": self.n_plus_one,
+            "budget_violations": self.budget_violations,
+        }
+
+
+class QueryMetrics:
+    """Agrégats cumulés par libellé (route HTTP ou méthode du store)."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, QueryMetric] = {}
+        self._lock = threading.Lock()
+        self._violation_listeners: list[list[str]] = []
+
+    def record(self, stats: QueryStats, *, n_plus_one: bool = False) -> None:
+        with self._lock:
+            metric = self._metrics.setdefault(stats.label, QueryMetric())
+            metric.calls += 1
+            metric.queries += stats.queries
+            metric.rows += stats.rows
+            metric.duration += stats.duration
+            metric.max_queries = max(metric.max_queries, stats.queries)
+            if n_plus_one:
+                metric.n_plus_one += 1
+
+    def record_budget_violation(self, label: str, used: int, budget: int) -> None:
+        message = f"{label} : {used} requêtes SQL pour un budget de {budget}"
+        with self._lock:
+            self._metrics.setdefault(label, QueryMetric()).budget_violations += 1
+            for listener in self._violation_listeners:
+                listener.append(message)
+        logger.warning("Budget de requêtes dépassé — %s", message)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {label: metric.as_dict() for label, metric in self._metrics.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    @contextlib.contextmanager
+    def collect_violations(self) -> Iterator[list[str]]:
+        collected: list[str] = []
+        with self._lock:
+            self._violation_listeners.append(collected)
+        try:
+            yield collected
+        finally:
+            with self._lock:
+                self._violation_listeners.remove(collected)
+
+
+query_metrics = QueryMetrics()
+
+
+# ── Portées ──────────────────────────────────────────────────────────────
+
+
+def _close_scope(stats: QueryStats, *, record: bool) -> None:
+    repeated = stats.repeated_statements(N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        statement, count = repeated[0]
+        logger.warning(
+            "Suspicion de N+1 dans %s : %d exécutions de « %s » (%d requêtes au total)",
+            stats.label,
+            count,
+            " ".join(statement.split())[:200],
+            stats.queries,
+        )
+    if record:
+        query_metrics.record(stats, n_plus_one=bool(repeated))
+
+
+@contextlib.contextmanager
+def track_queries(label: str, *, record: bool = True) -> Iterator[QueryStats]:
+    """Compte les requêtes SQL exécutées dans le bloc (portées imbriquables)."""
+
+    stats = QueryStats(label=label)
+    token = _active_scopes.set((*_active_scopes.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active_scopes.reset(token)
+        _close_scope(stats, record=record)
+
+
+@contextlib.contextmanager
+def assert_max_queries(limit: int, label: str = "bloc testé") -> Iterator[QueryStats]:
+    """Aide de test : échoue si le bloc exécute plus de ``limit`` requêtes."""
+
+    with track_queries(label, record=False) as stats:
+        yield stats
+    if stats.queries > limit:
+        details = "\n".join(
+            f"  {count} × {' '.join(statement.split())[:160]}"
+            for statement, count in stats.statements.most_common(5)
+        )
+        raise QueryBudgetExceeded(
+            f"{label} : {stats.queries} requêtes SQL pour un budget de {limit}\n"
+            f"{details}"
+        )
+
+
+@contextlib.contextmanager
+def enforce_query_budgets() -> Iterator[list[str]]:
+    """Aide de test : échoue si une route dépasse son :func:`query_budget`."""
+
+    with query_metrics.collect_violations() as violations:
+        yield violations
+    if violations:
+        raise QueryBudgetExceeded("\n".join(violations))
+
+
+def query_budget(limit: int) -> Callable[[_F], _F]:
+    """Déclare le nombre maximal de requêtes SQL attendu pour une route."""
+
+    def _decorate(endpoint: _F) -> _F:
+        endpoint.__query_budget__ = limit  # type: ignore[attr-defined]
+        return endpoint
+
+    return _decorate
+
+
+# ── Écouteurs SQLAlchemy ─────────────────────────────────────────────────
+
+
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    if _active_scopes.get():
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    scopes = _active_scopes.get()
+    if not scopes:
+        return
+    started_stack = conn.info.get("query_stats_started")
+    elapsed = time.perf_counter() - started_stack.pop() if started_stack else 0.0
+    rowcount = getattr(cursor, "rowcount", -1)
+    rows = rowcount if isinstance(rowcount, int) and rowcount > 0 else 0
+    for stats in scopes:
+        stats.queries += 1
+        stats.rows += rows
+        stats.duration += elapsed
+        stats.statements[statement] += 1
+
+
+_instrumented: set[int] = set()
+
+
+def install_query_instrumentation(*engines: Any) -> None:
+    """Branche les écouteurs sur les moteurs donnés (synchrones ou asynchrones)."""
+
+    if not QUERY_STATS_ENABLED:
+        return
+    try:
+        from sqlalchemy import event
+    except ImportError:  # pragma: no cover - SQLAlchemy simulé dans certains tests
+        return
+
+    for engine in engines:
+        if engine is None:
+            continue
+        sync_engine = getattr(engine, "sync_engine", engine)
+        if id(sync_engine) in _instrumented:
+            continue
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        _instrumented.add(id(sync_engine))
+
+
+# ── Middleware ASGI ──────────────────────────────────────────────────────
+
+
+# Libellé commun aux requêtes sans route : le chemin brut (404, scans) ou une
+# méthode non déclarée ferait croître les agrégats sans limite.
+UNMATCHED_ROUTE_LABEL = "<unmatched>"
+
+
+def _route_label(scope: dict[str, Any]) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    method = scope.get("method", "GET")
+    methods = getattr(route, "methods", None)
+    if not path or (methods is not None and method not in methods):
+        return UNMATCHED_ROUTE_LABEL
+    return f"{method} {path}"
+
+
+class QueryStatsMiddleware:
+    """Ouvre une portée par requête HTTP et contrôle les budgets des routes.
+
+    Les en-têtes reflètent les requêtes exécutées avant l'envoi des en-têtes
+    de réponse ; les agrégats et le contrôle du budget couvrent aussi le
+    corps des réponses en streaming.
+    """
+
+    def __init__(self, app: Any, *, expose_headers: bool | None = None) -> None:
+        self.app = app
+        self.expose_headers = (
+            QUERY_HEADERS_ENABLED if expose_headers is None else expose_headers
+        )
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(label="")
+        token = _active_scopes.set((*_active_scopes.get(), stats))
+
+        async def _send(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = list(message.get("headers") or [])
+                headers.extend(
+                    (
+                        (b"x-db-query-count", str(stats.queries).encode()),
+                        (b"x-db-query-rows", str(stats.rows).encode()),
+                        (
+                            b"x-db-query-time-ms",
+                            f"{stats.duration * 1000:.2f}".encode(),
+                        ),
+                    )
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _active_scopes.reset(token)
+            stats.label = _route_label(scope)
+            _close_scope(stats, record=True)
+            budget = getattr(scope.get("endpoint"), "__query_budget__", None)
+            if isinstance(budget, int) and stats.queries > budget:
+                query_metrics.record_budget_violation(
+                    stats.label, stats.queries, budget
+                )
+
+
+__all__ = [
+    "QueryBudgetExceeded",
+    "QueryMetrics",
+    "QueryStats",
+    "QueryStatsMiddleware",
+    "assert_max_queries",
+    "current_query_stats",
+    "enforce_query_budgets",
+    "install_query_instrumentation",
+    "query_budget",
+    "query_metrics",
+    "track_queries",
+]
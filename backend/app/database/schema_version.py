@@ -0,0 +1,221 @@
+"""Empreinte du schéma et verrou de leader pour les migrations de démarrage.
+
+Chaque worker exécutait au démarrage ``create_all``, les migrations ad hoc et
+la création des index vectoriels, soit des dizaines de requêtes d'inspection
+et de DDL en concurrence entre workers. Ce module calcule une empreinte du
+schéma attendu (tables déclarées et sources des migrations) et la compare à
+celle enregistrée dans ``schema_version`` : si elles sont identiques, tout le
+balayage est ignoré. Sinon, un seul worker l'exécute sous un verrou
+consultatif PostgreSQL pendant que les autres attendent puis relisent
+l'empreinte.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import logging
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    delete,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from ..config import env_flag
+
+logger = logging.getLogger("chatkit.server")
+
+# À incrémenter pour forcer un nouveau balayage sans changement de modèle.
+SCHEMA_REVISION = 1
+
+_version_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version",
+    _version_metadata,
+    Column("component", String(64), primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+_MIGRATION_SOURCES: tuple[str, ...] = (
+    "migrations.py",
+    "database/__init__.py",
+    "database/ad_hoc_migrations.py",
+)
+
+
+def _advisory_key(name: str) -> int:
+    digest = hashlib.blake2b(f"chatkit:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def compute_schema_fingerprint(
+    metadata: MetaData | None = None,
+    *,
+    sources: tuple[Path, ...] | None = None,
+) -> str:
+    """Calcule l'empreinte SHA-256 du schéma attendu par le code courant."""
+
+    if metadata is None:
+        from ..models import Base
+
+        metadata = Base.metadata
+    if sources is None:
+        app_dir = Path(__file__).resolve().parents[1]
+        sources = tuple(app_dir / relative for relative in _MIGRATION_SOURCES)
+
+    digest = hashlib.sha256(f"revision:{SCHEMA_REVISION}\n".encode())
+    for table in metadata.sorted_tables:
+        digest.update(f"table:{table.name}\n".encode())
+        for column in table.columns:
+            digest.update(
+                f"  {column.name}:{column.type!r}:{column.nullable}:"
+                f"{column.primary_key}\n".encode()
+            )
+        for index in sorted(table.indexes, key=lambda item: item.name or ""):
+            columns = ",".join(column.name for column in index.columns)
+            digest.update(f"  index:{index.name}:{columns}:{index.unique}\n".encode())
+        for constraint in sorted(
+            table.constraints, key=lambda item: str(item.name or "")
+        ):
+            columns = ",".join(column.name for column in constraint.columns)
+            digest.update(
+                f"  constraint:{type(constraint).__name__}:{constraint.name}:"
+                f"{columns}\n".encode()
+            )
+    for source in sources:
+        try:
+            digest.update(source.read_bytes())
+        except OSError:
+            digest.update(f"missing:{source.name}".encode())
+    return digest.hexdigest()
+
+
+def read_fingerprint(engine: Engine, component: str = "schema") -> str | None:
+    """Retourne l'empreinte enregistrée, ou ``None`` si absente."""
+
+    try:
+        with engine.connect() as connection:
+            return connection.scalar(
+                select(schema_version_table.c.fingerprint).where(
+                    schema_version_table.c.component == component
+                )
+            )
+    except DBAPIError:
+        # Table absente : première installation.
+        return None
+
+
+def write_fingerprint(
+    connection: Connection, fingerprint: str, component: str = "schema"
+) -> None:
+    schema_version_table.create(connection, checkfirst=True)
+    connection.execute(
+        delete(schema_version_table).where(
+            schema_version_table.c.component == component
+        )
+    )
+    connection.execute(
+        insert(schema_version_table).values(
+            component=component,
+            fingerprint=fingerprint,
+            updated_at=datetime.datetime.now(datetime.UTC),
+        )
+    )
+
+
+@contextmanager
+def leader_lock(
+    engine: Engine, name: str, *, blocking: bool = True
+) -> Iterator[bool]:
+    """Verrou consultatif PostgreSQL partagé par tous les workers.
+
+    Retourne ``True`` si le verrou est détenu. Avec ``blocking=False``, les
+    workers qui ne l'obtiennent pas reçoivent ``False`` immédiatement. Hors
+    PostgreSQL, le verrou est considéré comme toujours obtenu.
+    """
+
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    key = _advisory_key(name)
+    with engine.connect() as connection:
+        if blocking:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            acquired = True
+        else:
+            acquired = bool(
+                connection.scalar(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+                )
+            )
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": key}
+                )
+                connection.commit()
+
+
+def ensure_schema_up_to_date(
+    sweep: Callable[[], None],
+    *,
+    engine: Engine | None = None,
+    fingerprint: str | None = None,
+    force: bool | None = None,
+) -> bool:
+    """Exécute ``sweep`` uniquement si l'empreinte du schéma a changé.
+
+    Retourne ``True`` lorsque ce worker a exécuté les migrations.
+    """
+
+    if engine is None:
+        from . import engine as default_engine
+
+        engine = default_engine
+    if fingerprint is None:
+        fingerprint = compute_schema_fingerprint()
+    if force is None:
+        force = env_flag("CHATKIT_FORCE_MIGRATIONS")
+
+    if not force and read_fingerprint(engine) == fingerprint:
+        logger.info("Schéma à jour (%s), migrations ignorées", fingerprint[:12])
+        return False
+
+    with leader_lock(engine, "schema-migrations"):
+        # Un autre worker a pu migrer pendant que nous attendions le verrou.
+        if not force and read_fingerprint(engine) == fingerprint:
+            logger.info("Schéma migré par un autre worker, migrations ignorées")
+            return False
+        logger.info("Application des migrations du schéma (%s)", fingerprint[:12])
+        sweep()
+        with engine.begin() as connection:
+            write_fingerprint(connection, fingerprint)
+    return True
+
+
+__all__ = [
+    "SCHEMA_REVISION",
+    "compute_schema_fingerprint",
+    "ensure_schema_up_to_date",
+    "leader_lock",
+    "read_fingerprint",
+    "schema_version_table",
+    "write_fingerprint",
+]
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from .auth_cache import user_principal_cache
 from .config import get_settings
 from .database import SessionLocal, get_session
 from .models import User
@@ -20,6 +23,16 @@ http_bearer = HTTPBearer(auto_error=False)
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
     session: Session = Depends(get_session),
+) -> User:
+    try:
+        return await _authenticate(credentials, session)
+    except HTTPException:
+        user_principal_cache.stats.record("rejected")
+        raise
+
+
+async def _authenticate(
+    credentials: HTTPAuthorizationCredentials | None, session: Session
 ) -> User:
     if credentials is None:
         raise HTTPException(
@@ -40,11 +53,20 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalide"
         ) from exc
 
-    user = session.get(User, user_pk)
+    subject = str(user_pk)
+    cached = user_principal_cache.get(subject)
+    if cached is not None:
+        return cached
+
+    user_principal_cache.stats.record("db_lookups")
+    # La session vient de ``get_session`` (surchargeable) ; seule la requête
+    # part dans le pool de threads pour ne pas bloquer la boucle.
+    user = await asyncio.to_thread(session.get, User, user_pk)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Utilisateur introuvable"
         )
+    user_principal_cache.put(subject, user)
     return user
 
 
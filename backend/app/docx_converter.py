@@ -8,12 +8,17 @@ en PDF pour une meilleure compatibilité avec les modèles d'IA.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
+import os
 import shutil
 import subprocess
 import tempfile
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from .config import env_int
+
 logger = logging.getLogger(__name__)
 
 # Types MIME pour les fichiers DOCX
@@ -72,6 +77,7 @@ async def convert_docx_to_pdf(
     input_path: Path,
     output_path: Path | None = None,
     timeout: int = 60,
+    user_installation: Path | None = None,
 ) -> Path:
     """
     Convertit un fichier DOCX en PDF en utilisant LibreOffice.
@@ -80,6 +86,9 @@ async def convert_docx_to_pdf(
         input_path: Chemin vers le fichier DOCX source
         output_path: Chemin de destination pour le PDF (optionnel)
         timeout: Timeout en secondes pour la conversion
+        user_installation: Profil LibreOffice à réutiliser (optionnel). Un
+            profil déjà initialisé évite le coût du premier démarrage et
+            permet d'exécuter plusieurs conversions en parallèle.
 
     Returns:
         Chemin vers le fichier PDF généré
@@ -108,16 +117,22 @@ async def convert_docx_to_pdf(
         temp_dir_path = Path(temp_dir)
 
         # Commande LibreOffice pour conversion
-        cmd = [
-            libreoffice_path,
-            "--headless",
-            "--convert-to", "pdf",
-            "--outdir", str(temp_dir_path),
-            str(input_path),
-        ]
+        cmd = [libreoffice_path]
+        if user_installation is not None:
+            cmd.append(f"-env:UserInstallation={user_installation.resolve().as_uri()}")
+        cmd.extend(
+            [
+                "--headless",
+                "--norestore",
+                "--convert-to", "pdf",
+                "--outdir", str(temp_dir_path),
+                str(input_path),
+            ]
+        )
 
         logger.info(f"Conversion DOCX vers PDF: {input_path.name}")
 
+        process = None
         try:
             # Exécuter la conversion de manière asynchrone
             process = await asyncio.create_subprocess_exec(
@@ -153,6 +168,9 @@ async def convert_docx_to_pdf(
             return output_path
 
         except asyncio.TimeoutError:
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
             raise RuntimeError(
                 f"Timeout lors de la conversion DOCX vers PDF "
                 f"(limite: {timeout}s)"
@@ -250,3 +268,234 @@ def get_pdf_filename(original_filename: str) -> str:
 def get_pdf_mime_type() -> str:
     """Retourne le type MIME pour les fichiers PDF."""
     return "application/pdf"
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Place ``source`` en ``destination`` par lien physique, ou par copie."""
+
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:  # pragma: no cover - systèmes sans hardlink
+        shutil.copyfile(source, destination)
+
+
+@dataclass
+class _ConversionJob:
+    input_path: Path
+    output_path: Path
+    future: asyncio.Future[Path]
+
+
+@dataclass
+class DocxConversionStats:
+    """Compteurs exposés par :class:`DocxConversionPool`."""
+
+    conversions: int = 0
+    cache_hits: int = 0
+    shared_inflight: int = 0
+    failures: int = 0
+
+
+@dataclass
+class DocxConversionPool:
+    """
+    Pool borné de convertisseurs LibreOffice avec file d'attente et cache.
+
+    Chaque worker possède un profil LibreOffice persistant, initialisé une
+    seule fois et réutilisé pour toutes ses conversions : les conversions
+    concurrentes ne se disputent plus le profil par défaut et le nombre de
+    processus lourds simultanés est limité à ``size``. Les PDF produits sont
+    mis en cache par empreinte SHA-256 du document source, de sorte qu'un
+    document identique n'est converti qu'une fois.
+
+    Les PDF remis aux appelants sont des liens physiques vers l'entrée de
+    cache : :meth:`release` supprime l'entrée lorsque son dernier fichier est
+    libéré, et le cache ne conserve jamais plus de ``cache_max_entries``
+    entrées (les plus anciennes sont évincées).
+    """
+
+    size: int = 2
+    timeout: int = 60
+    cache_dir: Path | None = None
+    cache_max_entries: int = 256
+    stats: DocxConversionStats = field(default_factory=DocxConversionStats)
+
+    def __post_init__(self) -> None:
+        self.size = max(1, int(self.size))
+        self.cache_max_entries = max(1, int(self.cache_max_entries))
+        self._queue: asyncio.Queue[_ConversionJob] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._inflight: dict[str, asyncio.Future[Path]] = {}
+        self._profiles_dir: Path | None = None
+        if self.cache_dir is not None:
+            self.cache_dir = Path(self.cache_dir)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, *, cache_dir: Path | None = None) -> DocxConversionPool:
+        """Construit un pool à partir des variables ``DOCX_CONVERSION_*``."""
+
+        return cls(
+            size=env_int("DOCX_CONVERSION_WORKERS", 2),
+            timeout=env_int("DOCX_CONVERSION_TIMEOUT", 60),
+            cache_dir=cache_dir,
+            cache_max_entries=env_int(
+                "DOCX_CONVERSION_CACHE_MAX_ENTRIES", 256, minimum=1
+            ),
+        )
+
+    async def convert(
+        self,
+        input_path: Path,
+        output_path: Path | None = None,
+        *,
+        digest: str | None = None,
+    ) -> Path:
+        """Convertit ``input_path`` en PDF via le pool et retourne ``output_path``.
+
+        ``digest`` (SHA-256 du document) évite de relire le fichier lorsque
+        l'appelant l'a déjà calculé, par exemple pendant l'upload.
+        """
+
+        if not input_path.exists():
+            raise FileNotFoundError(f"Fichier source non trouvé: {input_path}")
+        if output_path is None:
+            output_path = input_path.with_suffix(".pdf")
+
+        if digest is None:
+            digest = await asyncio.to_thread(_hash_file, input_path)
+        cached = self._cache_path(digest)
+        if cached is not None and cached.exists():
+            self.stats.cache_hits += 1
+            await asyncio.to_thread(_link_or_copy, cached, output_path)
+            return output_path
+
+        future = self._inflight.get(digest)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[digest] = future
+            future.add_done_callback(lambda _: self._inflight.pop(digest, None))
+            target = cached if cached is not None else output_path
+            self._ensure_workers()
+            assert self._queue is not None
+            self._queue.put_nowait(_ConversionJob(input_path, target, future))
+        else:
+            self.stats.shared_inflight += 1
+
+        result = await asyncio.shield(future)
+        if result != output_path:
+            await asyncio.to_thread(_link_or_copy, result, output_path)
+        if cached is not None and result == cached:
+            await asyncio.to_thread(self._prune_cache)
+        return output_path
+
+    def release(self, path: Path) -> None:
+        """Supprime l'entrée de cache liée à ``path`` si elle n'est plus partagée.
+
+        À appeler avant de supprimer ``path`` : l'entrée n'est retirée que si
+        ``path`` en était le dernier lien physique hors du cache.
+        """
+
+        if self.cache_dir is None:
+            return
+        try:
+            released = path.stat()
+        except FileNotFoundError:
+            return
+        if released.st_nlink != 2:
+            return
+        for entry in self.cache_dir.glob("*.pdf"):
+            try:
+                if os.path.samestat(entry.stat(), released):
+                    entry.unlink(missing_ok=True)
+                    return
+            except FileNotFoundError:
+                continue
+
+    def _cache_path(self, digest: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{digest}.pdf"
+
+    def _prune_cache(self) -> None:
+        """Évince les entrées les plus anciennes au-delà de ``cache_max_entries``."""
+
+        assert self.cache_dir is not None
+        entries = []
+        for entry in self.cache_dir.glob("*.pdf"):
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry))
+            except FileNotFoundError:
+                continue
+        excess = len(entries) - self.cache_max_entries
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, entry in entries[:excess]:
+            # Les fichiers déjà remis restent valides : seul le lien du cache
+            # disparaît.
+            entry.unlink(missing_ok=True)
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._profiles_dir is None:
+            self._profiles_dir = Path(tempfile.mkdtemp(prefix="chatkit-soffice-"))
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.size:
+            index = len(self._workers)
+            self._workers.append(
+                asyncio.create_task(self._worker(index), name=f"docx-converter-{index}")
+            )
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None and self._profiles_dir is not None
+        profile = self._profiles_dir / f"worker-{index}"
+        profile.mkdir(parents=True, exist_ok=True)
+        while True:
+            job = await self._queue.get()
+            try:
+                # Écriture atomique : un PDF partiel ne doit jamais être servi
+                # depuis le cache.
+                partial = job.output_path.with_suffix(".pdf.partial")
+                await convert_docx_to_pdf(
+                    job.input_path,
+                    partial,
+                    timeout=self.timeout,
+                    user_installation=profile,
+                )
+                os.replace(partial, job.output_path)
+                self.stats.conversions += 1
+                if not job.future.done():
+                    job.future.set_result(job.output_path)
+            except Exception as exc:
+                self.stats.failures += 1
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            finally:
+                self._queue.task_done()
+
+    async def aclose(self) -> None:
+        """Arrête les workers et supprime les profils temporaires."""
+
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        for task in workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._profiles_dir is not None:
+            shutil.rmtree(self._profiles_dir, ignore_errors=True)
+            self._profiles_dir = None
@@ -0,0 +1,171 @@
+"""Entrées/sorties fichier non bloquantes pour les routes asynchrones.
+
+Les opérations disque (écriture des uploads, lecture des pièces jointes,
+``stat``/``unlink``) sont déléguées au pool de threads afin de ne jamais
+bloquer la boucle d'événements qui sert les flux SSE des autres utilisateurs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+
+class UploadTooLargeError(Exception):
+    """Levée lorsque le flux téléversé dépasse la taille maximale autorisée."""
+
+
+@dataclass(frozen=True)
+class WrittenFile:
+    """Résultat d'une écriture en flux : taille et empreinte SHA-256."""
+
+    size: int
+    sha256: str
+
+
+async def is_file(path: Path) -> bool:
+    return await asyncio.to_thread(path.is_file)
+
+
+async def read_bytes(path: Path) -> bytes:
+    return await asyncio.to_thread(path.read_bytes)
+
+
+async def unlink(path: Path, *, missing_ok: bool = True) -> None:
+    await asyncio.to_thread(path.unlink, missing_ok=missing_ok)
+
+
+async def replace(source: Path, destination: Path) -> None:
+    await asyncio.to_thread(os.replace, source, destination)
+
+
+async def stat(path: Path) -> os.stat_result | None:
+    try:
+        return await asyncio.to_thread(path.stat)
+    except FileNotFoundError:
+        return None
+
+
+async def write_stream(
+    read_chunk: Callable[[int], Awaitable[bytes]],
+    destination: Path,
+    *,
+    max_size: int | None = None,
+    chunk_size: int = 1024 * 1024,
+) -> WrittenFile:
+    """Écrit un flux asynchrone dans ``destination`` en calculant son SHA-256.
+
+    Chaque ``write`` est exécuté hors de la boucle d'événements. En cas
+    d'erreur (dont :class:`UploadTooLargeError`), le fichier partiel est
+    supprimé.
+    """
+
+    digest = hashlib.sha256()
+    total = 0
+    handle: BinaryIO = await asyncio.to_thread(destination.open, "wb")
+    try:
+        while True:
+            chunk = await read_chunk(chunk_size)
+            if not chunk:
+                break
+            total += len(chunk)
+            if max_size is not None and total > max_size:
+                raise UploadTooLargeError(destination.name)
+            digest.update(chunk)
+            await asyncio.to_thread(handle.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(handle.close)
+        await unlink(destination)
+        raise
+    await asyncio.to_thread(handle.close)
+    return WrittenFile(size=total, sha256=digest.hexdigest())
+
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    candidates = {value.strip() for value in header_value.split(",")}
+    if "*" in candidates:
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == bare for candidate in candidates)
+
+
+async def conditional_file_response(
+    request: Request,
+    path: Path,
+    *,
+    media_type: str | None = None,
+    filename: str | None = None,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """Sert ``path`` avec ETag, ``If-None-Match`` (304) et requêtes ``Range``.
+
+    Le support des plages d'octets (``206 Partial Content``) et de
+    ``If-Range`` est assuré par :class:`FileResponse` à partir de l'ETag
+    calculé ici.
+    """
+
+    stat_result = await stat(path)
+    if stat_result is None:
+        raise FileNotFoundError(path)
+
+    # Les pièces jointes identiques partagent le même inode (hardlink vers le
+    # blob dédupliqué) et donc le même ETag.
+    etag = (
+        f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}'
+        f'-{stat_result.st_size:x}"'
+    )
+    response_headers = {"etag": etag, "accept-ranges": "bytes"}
+    if headers:
+        response_headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        not_modified_headers = {
+            key: value
+            for key, value in response_headers.items()
+            if key.lower() in {"etag", "cache-control", "accept-ranges"}
+        }
+        return Response(status_code=304, headers=not_modified_headers)
+
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        headers=response_headers,
+        stat_result=stat_result,
+    )
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def sha256_file(path: Path) -> str:
+    return await asyncio.to_thread(hash_file, path)
+
+
+__all__ = [
+    "UploadTooLargeError",
+    "WrittenFile",
+    "conditional_file_response",
+    "hash_file",
+    "is_file",
+    "read_bytes",
+    "replace",
+    "sha256_file",
+    "stat",
+    "unlink",
+    "write_stream",
+]
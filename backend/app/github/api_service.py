@@ -2,21 +2,30 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import fnmatch
+import hashlib
 import logging
+import os
 import secrets
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
 from typing import Any
 from urllib.parse import quote
 
 import httpx
 
+from ..config import env_int
 from ..models import GitHubIntegration
 from ..secret_utils import decrypt_secret, encrypt_secret
 
 logger = logging.getLogger("chatkit.github.api")
 
-GITHUB_API_URL = "https://api.github.com"
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_FETCH_CONCURRENCY = env_int("GITHUB_FETCH_CONCURRENCY", 8, minimum=1)
+GITHUB_ETAG_CACHE_SIZE = env_int("GITHUB_ETAG_CACHE_SIZE", 1024, minimum=1)
 
 
 def _encode_path(path: str) -> str:
@@ -34,6 +43,12 @@ def _encode_path(path: str) -> str:
     return "/".join(quote(segment, safe="") for segment in path.split("/"))
 
 
+def git_blob_sha(content: str) -> str:
+    """Compute the git blob SHA GitHub will assign to ``content``."""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
 class GitHubAPIError(Exception):
     """GitHub API error with status code."""
 
@@ -42,18 +57,94 @@ class GitHubAPIError(Exception):
         self.status_code = status_code
 
 
+class _ETagCache:
+    """Bounded LRU of ``(etag, payload)`` for conditional GET requests.
+
+    GitHub answers ``304 Not Modified`` to a matching ``If-None-Match`` header
+    without counting the call against the rate limit, so the payload is
+    reused as-is. Entries are keyed per integration to keep tokens isolated.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Any, ...], tuple[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[Any, ...]) -> tuple[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple[Any, ...], etag: str, payload: Any) -> None:
+        with self._lock:
+            self._entries[key] = (etag, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+etag_cache = _ETagCache(GITHUB_ETAG_CACHE_SIZE)
+
+
 class GitHubAPIService:
-    """GitHub REST API wrapper with authentication."""
+    """GitHub REST API wrapper with authentication.
+
+    Used as an async context manager, the service keeps one pooled
+    ``httpx.AsyncClient`` for all its calls; otherwise each call opens its own
+    client.
+    """
 
-    def __init__(self, integration: GitHubIntegration):
+    def __init__(
+        self,
+        integration: GitHubIntegration,
+        *,
+        base_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
         """
         Initialize the API service.
 
         Args:
             integration: The GitHub integration with access token
+            base_url: API root (defaults to ``GITHUB_API_URL``)
+            transport: Optional httpx transport (e.g. a local fake server)
         """
         self.integration = integration
         self._access_token: str | None = None
+        self.base_url = (base_url or GITHUB_API_URL).rstrip("/")
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.request_count = 0
+
+    async def __aenter__(self) -> GitHubAPIService:
+        if self._client is None:
+            self._client = self._build_client()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled client, if any."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=GITHUB_FETCH_CONCURRENCY,
+                max_keepalive_connections=GITHUB_FETCH_CONCURRENCY,
+            ),
+            timeout=30.0,
+        )
 
     @property
     def access_token(self) -> str:
@@ -76,6 +167,7 @@ class GitHubAPIService:
         self,
         method: str,
         endpoint: str,
+        conditional: bool = False,
         **kwargs: Any,
     ) -> Any:
         """
@@ -84,6 +176,8 @@ class GitHubAPIService:
         Args:
             method: HTTP method
             endpoint: API endpoint (without base URL)
+            conditional: Send ``If-None-Match`` with the cached ETag and
+                reuse the cached payload on ``304 Not Modified`` (GET only)
             **kwargs: Additional arguments for httpx
 
         Returns:
@@ -92,39 +186,78 @@ class GitHubAPIService:
         Raises:
             GitHubAPIError: If the request fails
         """
-        url = f"{GITHUB_API_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
         headers = self._headers()
         if "headers" in kwargs:
             headers.update(kwargs.pop("headers"))
 
-        async with httpx.AsyncClient() as client:
+        cache_key: tuple[Any, ...] | None = None
+        cached: tuple[str, Any] | None = None
+        if conditional and method == "GET":
+            params = kwargs.get("params") or {}
+            cache_key = (
+                self.integration.id,
+                url,
+                tuple(sorted(params.items())),
+            )
+            cached = etag_cache.get(cache_key)
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
+
+        if self._client is not None:
+            return await self._send(
+                self._client, method, url, headers, cache_key, cached, **kwargs
+            )
+        async with self._build_client() as client:
+            return await self._send(
+                client, method, url, headers, cache_key, cached, **kwargs
+            )
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        cache_key: tuple[Any, ...] | None,
+        cached: tuple[str, Any] | None,
+        **kwargs: Any,
+    ) -> Any:
+        """Send one request and map HTTP failures to :class:`GitHubAPIError`."""
+        self.request_count += 1
+        try:
+            response = await client.request(
+                method,
+                url,
+                headers=headers,
+                **kwargs,
+            )
+            if response.status_code == 304 and cached is not None:
+                return cached[1]
+
+            response.raise_for_status()
+
+            if response.status_code == 204:
+                return None
+
+            payload = response.json()
+            etag = response.headers.get("ETag")
+            if cache_key is not None and etag:
+                etag_cache.put(cache_key, etag, payload)
+            return payload
+
+        except httpx.HTTPStatusError as e:
+            error_body = {}
             try:
-                response = await client.request(
-                    method,
-                    url,
-                    headers=headers,
-                    timeout=30.0,
-                    **kwargs,
-                )
-                response.raise_for_status()
-
-                if response.status_code == 204:
-                    return None
-
-                return response.json()
-
-            except httpx.HTTPStatusError as e:
-                error_body = {}
-                try:
-                    error_body = e.response.json()
-                except Exception:
-                    pass
-                message = error_body.get("message", str(e))
-                logger.error(f"GitHub API error: {e.response.status_code} - {message}")
-                raise GitHubAPIError(message, e.response.status_code) from e
-            except httpx.RequestError as e:
-                logger.error(f"GitHub API request failed: {e}")
-                raise GitHubAPIError(str(e)) from e
+                error_body = e.response.json()
+            except Exception:
+                pass
+            message = error_body.get("message", str(e))
+            logger.error(f"GitHub API error: {e.response.status_code} - {message}")
+            raise GitHubAPIError(message, e.response.status_code) from e
+        except httpx.RequestError as e:
+            logger.error(f"GitHub API request failed: {e}")
+            raise GitHubAPIError(str(e)) from e
 
     async def get_user(self) -> dict[str, Any]:
         """Get the authenticated user's info."""
@@ -335,14 +468,174 @@ class GitHubAPIService:
         return await self._request(
             "GET",
             f"/repos/{repo_full_name}/git/trees/{tree_sha}",
+            conditional=True,
             params=params if params else None,
         )
 
+    async def create_tree(
+        self,
+        repo_full_name: str,
+        entries: list[dict[str, Any]],
+        base_tree: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Create a tree, optionally on top of an existing one.
+
+        Args:
+            repo_full_name: Repository full name (owner/repo)
+            entries: Tree entries (``path``, ``mode``, ``type`` and ``content``
+                or ``sha``; ``sha: None`` deletes the path)
+            base_tree: SHA of the tree to update
+
+        Returns:
+            Tree object
+        """
+        data: dict[str, Any] = {"tree": entries}
+        if base_tree:
+            data["base_tree"] = base_tree
+
+        return await self._request(
+            "POST",
+            f"/repos/{repo_full_name}/git/trees",
+            json=data,
+        )
+
+    async def create_commit(
+        self,
+        repo_full_name: str,
+        message: str,
+        tree_sha: str,
+        parents: list[str],
+    ) -> dict[str, Any]:
+        """
+        Create a commit object.
+
+        Args:
+            repo_full_name: Repository full name (owner/repo)
+            message: Commit message
+            tree_sha: SHA of the commit tree
+            parents: Parent commit SHAs
+
+        Returns:
+            Commit object
+        """
+        return await self._request(
+            "POST",
+            f"/repos/{repo_full_name}/git/commits",
+            json={"message": message, "tree": tree_sha, "parents": parents},
+        )
+
+    async def update_ref(
+        self,
+        repo_full_name: str,
+        branch: str,
+        commit_sha: str,
+        force: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Move a branch to a commit.
+
+        Args:
+            repo_full_name: Repository full name (owner/repo)
+            branch: Branch name
+            commit_sha: Target commit SHA
+            force: Allow non fast-forward updates
+
+        Returns:
+            Reference object
+        """
+        return await self._request(
+            "PATCH",
+            f"/repos/{repo_full_name}/git/refs/heads/{branch}",
+            json={"sha": commit_sha, "force": force},
+        )
+
+    async def get_branch_head(
+        self,
+        repo_full_name: str,
+        branch: str,
+    ) -> tuple[str, str]:
+        """
+        Get the head commit SHA and root tree SHA of a branch.
+
+        Args:
+            repo_full_name: Repository full name (owner/repo)
+            branch: Branch name
+
+        Returns:
+            Tuple of (commit_sha, tree_sha)
+        """
+        result = await self.get_branch(repo_full_name, branch)
+        commit = result.get("commit") or {}
+        tree = (commit.get("commit") or {}).get("tree") or {}
+        return commit.get("sha", ""), tree.get("sha", "")
+
+    async def get_blob(
+        self,
+        repo_full_name: str,
+        blob_sha: str,
+    ) -> str:
+        """
+        Get a blob's decoded content by SHA.
+
+        Blobs are immutable, so repeated fetches are answered with
+        ``304 Not Modified`` from the ETag cache.
+
+        Args:
+            repo_full_name: Repository full name (owner/repo)
+            blob_sha: Blob SHA
+
+        Returns:
+            Decoded UTF-8 content
+        """
+        result = await self._request(
+            "GET",
+            f"/repos/{repo_full_name}/git/blobs/{blob_sha}",
+            conditional=True,
+        )
+        if result.get("encoding", "base64") != "base64":
+            return result.get("content", "")
+        return base64.b64decode(result.get("content", "")).decode("utf-8")
+
+    async def fetch_blobs(
+        self,
+        repo_full_name: str,
+        blob_shas: Iterable[str],
+        concurrency: int = GITHUB_FETCH_CONCURRENCY,
+    ) -> dict[str, str | GitHubAPIError]:
+        """
+        Fetch several blobs concurrently.
+
+        Args:
+            repo_full_name: Repository full name (owner/repo)
+            blob_shas: Blob SHAs to fetch (duplicates are fetched once)
+            concurrency: Maximum number of requests in flight
+
+        Returns:
+            Mapping of SHA to decoded content, or to the error raised for it
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _fetch(sha: str) -> tuple[str, str | GitHubAPIError]:
+            async with semaphore:
+                try:
+                    return sha, await self.get_blob(repo_full_name, sha)
+                except GitHubAPIError as e:
+                    return sha, e
+                except UnicodeDecodeError as e:
+                    return sha, GitHubAPIError(f"Blob {sha} is not UTF-8: {e}")
+
+        results = await asyncio.gather(
+            *(_fetch(sha) for sha in dict.fromkeys(blob_shas))
+        )
+        return dict(results)
+
     async def scan_files_matching_pattern(
         self,
         repo_full_name: str,
         branch: str,
         pattern: str,
+        tree_sha: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Scan repository for files matching a glob pattern.
@@ -351,12 +644,13 @@ class GitHubAPIService:
             repo_full_name: Repository full name (owner/repo)
             branch: Branch name
             pattern: Glob pattern (e.g., "workflows/*.json")
+            tree_sha: Root tree SHA to scan instead of the branch head
 
         Returns:
             List of matching file objects with path, sha, size
         """
         # Get the full tree recursively
-        tree = await self.get_tree(repo_full_name, branch, recursive=True)
+        tree = await self.get_tree(repo_full_name, tree_sha or branch, recursive=True)
 
         matching_files = []
         for item in tree.get("tree", []):
@@ -483,6 +777,7 @@ class GitHubAPIService:
         return await self._request(
             "GET",
             f"/repos/{repo_full_name}/branches/{branch}",
+            conditional=True,
         )
 
     async def list_branches(
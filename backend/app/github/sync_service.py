@@ -18,7 +18,7 @@ from ..models import (
     WorkflowGitHubMapping,
 )
 from ..workflows.service import WorkflowPersistenceService, serialize_definition_graph
-from .api_service import GitHubAPIService, GitHubAPIError
+from .api_service import GitHubAPIService, GitHubAPIError, git_blob_sha
 
 logger = logging.getLogger("chatkit.github.sync")
 
@@ -114,45 +114,105 @@ class WorkflowSyncService:
         self,
         repo_sync: GitHubRepoSync,
         progress_callback: callable | None = None,
+        force: bool = False,
     ) -> dict[str, Any]:
         """
         Pull workflows from GitHub to local database.
 
+        The branch's root tree SHA is compared with the last complete pull
+        first: when it is unchanged, nothing else is fetched. Otherwise only
+        the blobs whose SHA differs from ``WorkflowGitHubMapping.github_sha``
+        are downloaded, concurrently through one pooled client.
+
         Args:
             repo_sync: Repository sync configuration
             progress_callback: Optional callback for progress updates
+            force: Re-download and re-import every matching file
 
         Returns:
             Summary of sync operation
         """
         api = self._get_api_service(repo_sync)
 
-        # Get matching files
-        files = await api.scan_files_matching_pattern(
-            repo_sync.repo_full_name,
-            repo_sync.branch,
-            repo_sync.file_pattern,
-        )
-
-        total_files = len(files)
-        imported = 0
-        updated = 0
-        skipped = 0
-        errors = []
-
         # Get existing mappings
         existing_mappings = {
             m.file_path: m
             for m in repo_sync.workflow_mappings
         }
 
-        for i, file_info in enumerate(files):
+        async with api:
+            _, tree_sha = await api.get_branch_head(
+                repo_sync.repo_full_name,
+                repo_sync.branch,
+            )
+
+            if (
+                not force
+                and tree_sha
+                and tree_sha == repo_sync.last_tree_sha
+                and repo_sync.last_tree_mapping_count == len(existing_mappings)
+            ):
+                logger.info(
+                    f"Tree {tree_sha[:7]} unchanged for "
+                    f"{repo_sync.repo_full_name}@{repo_sync.branch}, nothing to pull"
+                )
+                repo_sync.last_sync_at = datetime.datetime.now(datetime.UTC)
+                repo_sync.last_sync_status = "success"
+                repo_sync.last_sync_error = None
+                self.session.commit()
+                return {
+                    "operation": "pull",
+                    "total_files": len(existing_mappings),
+                    "imported": 0,
+                    "updated": 0,
+                    "skipped": len(existing_mappings),
+                    "errors": [],
+                    "tree_sha": tree_sha,
+                    "tree_unchanged": True,
+                    "api_requests": api.request_count,
+                }
+
+            # Get matching files
+            files = await api.scan_files_matching_pattern(
+                repo_sync.repo_full_name,
+                repo_sync.branch,
+                repo_sync.file_pattern,
+                tree_sha=tree_sha or None,
+            )
+
+            # Only changed or unmapped files are downloaded
+            changed_files = []
+            for file_info in files:
+                mapping = existing_mappings.get(file_info["path"])
+                if force or not mapping or mapping.github_sha != file_info["sha"]:
+                    changed_files.append(file_info)
+
+            total_files = len(files)
+            skipped = total_files - len(changed_files)
+
+            if progress_callback:
+                progress_callback(
+                    current=skipped,
+                    total=total_files,
+                    message=f"Downloading {len(changed_files)} changed files",
+                )
+
+            contents = await api.fetch_blobs(
+                repo_sync.repo_full_name,
+                (file_info["sha"] for file_info in changed_files),
+            )
+
+        imported = 0
+        updated = 0
+        errors = []
+
+        for i, file_info in enumerate(changed_files):
             file_path = file_info["path"]
-            file_sha = file_info["sha"]
+            sha = file_info["sha"]
 
             if progress_callback:
                 progress_callback(
-                    current=i + 1,
+                    current=skipped + i + 1,
                     total=total_files,
                     message=f"Processing {file_path}",
                 )
@@ -160,19 +220,14 @@ class WorkflowSyncService:
             try:
                 mapping = existing_mappings.get(file_path)
 
-                # Check if file changed
-                if mapping and mapping.github_sha == file_sha:
-                    skipped += 1
-                    logger.debug(f"Skipping unchanged file: {file_path}")
+                content = contents.get(sha)
+                if isinstance(content, GitHubAPIError) or content is None:
+                    errors.append({
+                        "file_path": file_path,
+                        "error": str(content or "Blob not downloaded"),
+                    })
                     continue
 
-                # Fetch file content
-                content, sha = await api.get_file_content(
-                    repo_sync.repo_full_name,
-                    file_path,
-                    repo_sync.branch,
-                )
-
                 # Parse JSON
                 try:
                     graph_payload = json.loads(content)
@@ -264,6 +319,14 @@ class WorkflowSyncService:
                 })
                 self.session.rollback()
 
+        # Remember the tree only when every file is in sync with it
+        if errors or not tree_sha:
+            repo_sync.last_tree_sha = None
+            repo_sync.last_tree_mapping_count = None
+        else:
+            repo_sync.last_tree_sha = tree_sha
+            repo_sync.last_tree_mapping_count = len(existing_mappings) + imported
+
         # Update repo sync status
         repo_sync.last_sync_at = datetime.datetime.now(datetime.UTC)
         repo_sync.last_sync_status = "success" if not errors else "partial"
@@ -279,6 +342,9 @@ class WorkflowSyncService:
             "updated": updated,
             "skipped": skipped,
             "errors": errors,
+            "tree_sha": tree_sha,
+            "tree_unchanged": False,
+            "api_requests": api.request_count,
         }
 
     async def push_workflow(
@@ -375,6 +441,183 @@ class WorkflowSyncService:
             "html_url": result.get("content", {}).get("html_url"),
         }
 
+    async def push_workflows(
+        self,
+        repo_sync: GitHubRepoSync,
+        mappings: list[WorkflowGitHubMapping] | None = None,
+        commit_message: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Push several workflows to GitHub in a single commit.
+
+        Uses the Git Data API: one recursive tree read detects conflicts for
+        every file, then one tree, one commit and one ref update publish all
+        changes. Mappings are updated in one transaction once the branch has
+        moved.
+
+        Args:
+            repo_sync: Repository sync configuration
+            mappings: Mappings to push (defaults to local changes and pending)
+            commit_message: Optional commit message
+
+        Returns:
+            Push summary
+        """
+        if mappings is None:
+            mappings = [
+                m for m in repo_sync.workflow_mappings
+                if m.sync_status in ("local_changes", "pending")
+            ]
+
+        errors = []
+
+        # Export workflows to JSON
+        exports = []
+        for mapping in mappings:
+            workflow = mapping.workflow
+            active_version = self.session.get(
+                WorkflowDefinition,
+                workflow.active_version_id,
+            )
+            if not active_version:
+                errors.append({
+                    "file_path": mapping.file_path,
+                    "error": f"Workflow {workflow.slug} has no active version",
+                })
+                continue
+
+            graph = serialize_definition_graph(active_version)
+            content = json.dumps(
+                graph, indent=2, ensure_ascii=False, default=_json_serial
+            )
+            exports.append((mapping, content, active_version))
+
+        summary: dict[str, Any] = {
+            "operation": "push",
+            "pushed": 0,
+            "unchanged": 0,
+            "commit_sha": None,
+            "errors": errors,
+            "api_requests": 0,
+        }
+        if not exports:
+            return summary
+
+        api = self._get_api_service(repo_sync)
+        async with api:
+            for attempt in range(2):
+                head_sha, tree_sha = await api.get_branch_head(
+                    repo_sync.repo_full_name,
+                    repo_sync.branch,
+                )
+                tree = await api.get_tree(
+                    repo_sync.repo_full_name, tree_sha, recursive=True
+                )
+                remote_shas = {
+                    item.get("path"): item.get("sha")
+                    for item in tree.get("tree", [])
+                    if item.get("type") == "blob"
+                }
+
+                # Conflict detection against the remote tree
+                to_push = []
+                unchanged = []
+                conflicts = []
+                for mapping, content, version in exports:
+                    remote_sha = remote_shas.get(mapping.file_path)
+                    if (
+                        mapping.github_sha
+                        and remote_sha is not None
+                        and remote_sha != mapping.github_sha
+                    ):
+                        conflicts.append(mapping)
+                    elif remote_sha == git_blob_sha(content):
+                        unchanged.append((mapping, content, version))
+                    else:
+                        to_push.append((mapping, content, version))
+
+                commit_sha = None
+                if not to_push:
+                    break
+
+                if not commit_message:
+                    if len(to_push) == 1:
+                        workflow = to_push[0][0].workflow
+                        commit_message = (
+                            f"Update workflow: {workflow.display_name or workflow.slug}"
+                        )
+                    else:
+                        commit_message = f"Update {len(to_push)} workflows"
+
+                new_tree = await api.create_tree(
+                    repo_sync.repo_full_name,
+                    [
+                        {
+                            "path": mapping.file_path,
+                            "mode": "100644",
+                            "type": "blob",
+                            "content": content,
+                        }
+                        for mapping, content, _ in to_push
+                    ],
+                    base_tree=tree_sha,
+                )
+                commit = await api.create_commit(
+                    repo_sync.repo_full_name,
+                    commit_message,
+                    new_tree["sha"],
+                    [head_sha],
+                )
+                try:
+                    await api.update_ref(
+                        repo_sync.repo_full_name,
+                        repo_sync.branch,
+                        commit["sha"],
+                    )
+                except GitHubAPIError as e:
+                    # 422: the branch moved since it was read, diff again once
+                    if e.status_code == 422 and attempt == 0:
+                        logger.info(
+                            f"Branch {repo_sync.branch} moved during push, retrying"
+                        )
+                        continue
+                    raise
+                commit_sha = commit["sha"]
+                break
+
+        # Update every mapping at once
+        now = datetime.datetime.now(datetime.UTC)
+        for mapping in conflicts:
+            mapping.sync_status = "conflict"
+            errors.append({
+                "file_path": mapping.file_path,
+                "error": (
+                    f"Remote file {mapping.file_path} has changed since last sync"
+                ),
+            })
+        for mapping, content, version in to_push + unchanged:
+            mapping.github_sha = git_blob_sha(content)
+            if commit_sha:
+                mapping.github_commit_sha = commit_sha
+            mapping.last_synced_version_id = version.id
+            mapping.sync_status = "synced"
+            mapping.last_push_at = now
+        self.session.commit()
+
+        logger.info(
+            f"Pushed {len(to_push)} workflows to {repo_sync.repo_full_name}"
+            f"@{repo_sync.branch} in commit {commit_sha} "
+            f"({len(unchanged)} unchanged, {len(conflicts)} conflicts)"
+        )
+
+        summary.update(
+            pushed=len(to_push),
+            unchanged=len(unchanged),
+            commit_sha=commit_sha,
+            api_requests=api.request_count,
+        )
+        return summary
+
     async def push_new_workflow(
         self,
         workflow_id: int,
@@ -460,32 +703,33 @@ class WorkflowSyncService:
         # First, pull from GitHub
         pull_result = await self.pull_workflows(repo_sync, progress_callback)
 
-        # Then, push any local changes
-        push_results = []
-        push_errors = []
-
-        for mapping in repo_sync.workflow_mappings:
-            if mapping.sync_status in ("local_changes", "pending"):
-                try:
-                    result = await self.push_workflow(mapping)
-                    push_results.append(result)
-                except ConflictError as e:
-                    push_errors.append({
-                        "file_path": mapping.file_path,
-                        "error": str(e),
-                    })
-                except Exception as e:
-                    push_errors.append({
-                        "file_path": mapping.file_path,
-                        "error": str(e),
-                    })
+        # Then, push any local changes in a single commit
+        mappings = [
+            m for m in repo_sync.workflow_mappings
+            if m.sync_status in ("local_changes", "pending")
+        ]
+        try:
+            push_result = await self.push_workflows(repo_sync, mappings)
+        except Exception as e:
+            # The batch fails as a whole: report it per file, keep the pull
+            logger.exception(f"Push to {repo_sync.repo_full_name} failed: {e}")
+            self.session.rollback()
+            push_result = {
+                "pushed": 0,
+                "commit_sha": None,
+                "errors": [
+                    {"file_path": mapping.file_path, "error": str(e)}
+                    for mapping in mappings
+                ],
+            }
 
         return {
             "operation": "sync",
             "pull": pull_result,
             "push": {
-                "pushed": len(push_results),
-                "errors": push_errors,
+                "pushed": push_result["pushed"],
+                "commit_sha": push_result["commit_sha"],
+                "errors": push_result["errors"],
             },
         }
 
@@ -0,0 +1,376 @@
+"""Traduction par lots des dictionnaires d'interface.
+
+Le dictionnaire source (``translations.en.ts``) est découpé en lots de clés
+traduits en parallèle, avec une concurrence bornée par un sémaphore. Chaque
+réponse est validée lot par lot (clés attendues, valeurs textuelles,
+espaces réservés ``{{variable}}`` conservés) ; seules les clés invalides ou
+manquantes sont renvoyées au modèle lors des nouvelles tentatives.
+
+Une mémoire de traduction persistante (:class:`~app.models.TranslationMemory`),
+indexée par l'empreinte du texte source (combinée à celle du modèle et du
+prompt utilisés) et la langue cible, permet le mode incrémental : seules les
+chaînes nouvelles ou modifiées partent au modèle.
+Les chaînes sources identiques portées par plusieurs clés ne sont envoyées
+qu'une fois.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .config import env_int
+from .models import TranslationMemory
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_PATTERN = re.compile(r'"([^"]+)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+_MEMORY_LOOKUP_CHUNK = 500
+
+
+BATCH_SIZE = env_int("LANGUAGE_GENERATION_BATCH_SIZE", 100, minimum=1)
+BATCH_MAX_CHARS = env_int("LANGUAGE_GENERATION_BATCH_MAX_CHARS", 12_000, minimum=1)
+CONCURRENCY = env_int("LANGUAGE_GENERATION_CONCURRENCY", 4, minimum=1)
+MAX_ATTEMPTS = env_int("LANGUAGE_GENERATION_MAX_ATTEMPTS", 3, minimum=1)
+
+TranslateBatch = Callable[[dict[str, str]], Awaitable[str]]
+ProgressCallback = Callable[[int, int], None]
+
+
+class TranslationBatchError(ValueError):
+    """Un lot reste invalide après toutes les tentatives."""
+
+    def __init__(self, errors: Mapping[str, str], attempts: int) -> None:
+        self.errors = dict(errors)
+        sample = ", ".join(
+            f"{key} ({reason})" for key, reason in list(errors.items())[:5]
+        )
+        super().__init__(
+            f"{len(errors)} clé(s) non traduite(s) après {attempts} "
+            f"tentative(s) : {sample}"
+        )
+
+
+@dataclass
+class TranslationReport:
+    """Statistiques d'une traduction par lots."""
+
+    total_keys: int = 0
+    reused_keys: int = 0
+    sent_keys: int = 0
+    batches: int = 0
+    requests: int = 0
+    retried_keys: int = 0
+
+
+def _unescape(value: str) -> str:
+    try:
+        return json.loads(f'"{value}"')
+    except json.JSONDecodeError:
+        return value
+
+
+def parse_source_translations(content: str) -> dict[str, str]:
+    """Extrait les paires clé/valeur d'un fichier ``translations.*.ts``.
+
+    Les séquences d'échappement (``\\"``, ``\\n``...) sont décodées afin que le
+    modèle et la mémoire de traduction travaillent sur le texte réel ;
+    :func:`render_translation_file` les réintroduit.
+    """
+
+    return {key: _unescape(value) for key, value in _ENTRY_PATTERN.findall(content)}
+
+
+def source_hash(text: str, context: str = "") -> str:
+    payload = f"{context}\0{text}" if context else text
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def translation_context(model: str | None, prompt: str | None = None) -> str:
+    """Empreinte du modèle et du prompt personnalisé d'une traduction.
+
+    Combinée à l'empreinte du texte source, elle évite de reprendre dans la
+    mémoire une traduction produite avec un autre modèle ou un autre prompt.
+    """
+
+    if not model and not prompt:
+        return ""
+    payload = f"{model or ''}\0{prompt or ''}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def placeholders(text: str) -> set[str]:
+    return set(_PLACEHOLDER_PATTERN.findall(text))
+
+
+def extract_json_object(text: str) -> dict[str, object]:
+    """Extrait l'objet JSON d'une réponse de modèle (balises Markdown tolérées)."""
+
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("Failed to extract JSON from AI response")
+    payload = json.loads(text[start : end + 1])
+    if not isinstance(payload, dict):
+        raise ValueError("AI response is not a JSON object")
+    return payload
+
+
+def validate_batch(
+    source: Mapping[str, str], candidate: Mapping[str, object]
+) -> tuple[dict[str, str], dict[str, str]]:
+    """Sépare les traductions valides des clés à renvoyer au modèle.
+
+    Retourne ``(valides, erreurs)`` où ``erreurs`` associe chaque clé rejetée
+    à la raison du rejet. Les clés inconnues du lot sont ignorées.
+    """
+
+    valid: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    for key, original in source.items():
+        if key not in candidate:
+            errors[key] = "missing"
+            continue
+        value = candidate[key]
+        if not isinstance(value, str):
+            errors[key] = "not a string"
+        elif original.strip() and not value.strip():
+            errors[key] = "empty"
+        elif placeholders(value) != placeholders(original):
+            errors[key] = "placeholders"
+        else:
+            valid[key] = value
+    return valid, errors
+
+
+def split_batches(
+    entries: Mapping[str, str],
+    *,
+    max_keys: int = BATCH_SIZE,
+    max_chars: int = BATCH_MAX_CHARS,
+) -> list[dict[str, str]]:
+    """Découpe ``entries`` en lots bornés en nombre de clés et en taille."""
+
+    batches: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    size = 0
+    for key, value in entries.items():
+        entry_size = len(key) + len(value)
+        if current and (len(current) >= max_keys or size + entry_size > max_chars):
+            batches.append(current)
+            current, size = {}, 0
+        current[key] = value
+        size += entry_size
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def translate_entries(
+    entries: Mapping[str, str],
+    translate_batch: TranslateBatch,
+    *,
+    batch_size: int = BATCH_SIZE,
+    max_chars: int = BATCH_MAX_CHARS,
+    concurrency: int = CONCURRENCY,
+    max_attempts: int = MAX_ATTEMPTS,
+    retry_delay: float = 1.0,
+    on_progress: ProgressCallback | None = None,
+    report: TranslationReport | None = None,
+) -> dict[str, str]:
+    """Traduit ``entries`` par lots concurrents et retourne ``{clé: traduction}``.
+
+    ``translate_batch`` reçoit un lot ``{clé: texte source}`` et retourne la
+    réponse brute du modèle. Les valeurs dupliquées ne sont envoyées qu'une
+    fois, sous la première clé qui les porte.
+    """
+
+    report = report if report is not None else TranslationReport()
+    representatives: dict[str, str] = {}
+    for key, value in entries.items():
+        representatives.setdefault(value, key)
+    unique = {key: value for value, key in representatives.items()}
+
+    batches = split_batches(unique, max_keys=batch_size, max_chars=max_chars)
+    report.sent_keys += len(unique)
+    report.batches += len(batches)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results: dict[str, str] = {}
+    done = 0
+
+    async def _run(batch: dict[str, str]) -> None:
+        nonlocal done
+        pending = batch
+        errors: dict[str, str] = {}
+        for attempt in range(1, max_attempts + 1):
+            if attempt > 1:
+                report.retried_keys += len(pending)
+                if retry_delay:
+                    await asyncio.sleep(retry_delay * (attempt - 1))
+            async with semaphore:
+                report.requests += 1
+                try:
+                    candidate = extract_json_object(await translate_batch(pending))
+                except Exception as exc:  # réponse illisible ou erreur du fournisseur
+                    logger.warning(
+                        "Échec du lot de %s clé(s) (tentative %s/%s) : %s",
+                        len(pending), attempt, max_attempts, exc,
+                    )
+                    errors = {key: "invalid response" for key in pending}
+                    continue
+            valid, errors = validate_batch(pending, candidate)
+            results.update(valid)
+            done += len(valid)
+            if on_progress is not None:
+                on_progress(done, len(unique))
+            if not errors:
+                return
+            logger.info(
+                "Lot : %s clé(s) rejetée(s) (tentative %s/%s)",
+                len(errors), attempt, max_attempts,
+            )
+            pending = {key: pending[key] for key in errors}
+        raise TranslationBatchError(errors, max_attempts)
+
+    await asyncio.gather(*(_run(batch) for batch in batches))
+
+    return {key: results[representatives[value]] for key, value in entries.items()}
+
+
+def load_translation_memory(
+    session: Session, language_code: str, sources: Iterable[str], context: str = ""
+) -> dict[str, str]:
+    """Retourne ``{texte source: traduction}`` connus pour ``language_code``.
+
+    ``context`` est l'empreinte renvoyée par :func:`translation_context`.
+    """
+
+    by_hash = {source_hash(text, context): text for text in sources}
+    hashes = list(by_hash)
+    found: dict[str, str] = {}
+    for start in range(0, len(hashes), _MEMORY_LOOKUP_CHUNK):
+        chunk = hashes[start : start + _MEMORY_LOOKUP_CHUNK]
+        rows = session.execute(
+            select(TranslationMemory.source_hash, TranslationMemory.translation).where(
+                TranslationMemory.language_code == language_code,
+                TranslationMemory.source_hash.in_(chunk),
+            )
+        )
+        for digest, translation in rows:
+            found[by_hash[digest]] = translation
+    return found
+
+
+def save_translation_memory(
+    session: Session, language_code: str, pairs: Mapping[str, str], context: str = ""
+) -> int:
+    """Enregistre ``{texte source: traduction}`` dans la mémoire (sans commit)."""
+
+    by_hash = {
+        source_hash(text, context): (text, translation)
+        for text, translation in pairs.items()
+    }
+    hashes = list(by_hash)
+    existing: dict[str, TranslationMemory] = {}
+    for start in range(0, len(hashes), _MEMORY_LOOKUP_CHUNK):
+        chunk = hashes[start : start + _MEMORY_LOOKUP_CHUNK]
+        for entry in session.scalars(
+            select(TranslationMemory).where(
+                TranslationMemory.language_code == language_code,
+                TranslationMemory.source_hash.in_(chunk),
+            )
+        ):
+            existing[entry.source_hash] = entry
+
+    for digest, (text, translation) in by_hash.items():
+        entry = existing.get(digest)
+        if entry is None:
+            session.add(
+                TranslationMemory(
+                    source_hash=digest,
+                    language_code=language_code,
+                    source_text=text,
+                    translation=translation,
+                )
+            )
+        elif entry.translation != translation:
+            entry.translation = translation
+    session.flush()
+    return len(by_hash)
+
+
+async def translate_dictionary(
+    session: Session,
+    language_code: str,
+    source: Mapping[str, str],
+    translate_batch: TranslateBatch,
+    *,
+    incremental: bool = True,
+    context: str = "",
+    report: TranslationReport | None = None,
+    **options: Any,
+) -> dict[str, str]:
+    """Traduit ``source`` en s'appuyant sur la mémoire de traduction.
+
+    En mode incrémental, les chaînes déjà présentes dans la mémoire pour le
+    même ``context`` (voir :func:`translation_context`) sont reprises telles
+    quelles. Les nouvelles traductions sont enregistrées dans
+    la session (le commit reste à la charge de l'appelant). Le résultat suit
+    l'ordre des clés de ``source``.
+    """
+
+    report = report if report is not None else TranslationReport()
+    report.total_keys = len(source)
+    known = (
+        load_translation_memory(session, language_code, source.values(), context)
+        if incremental
+        else {}
+    )
+    pending = {key: value for key, value in source.items() if value not in known}
+    report.reused_keys = len(source) - len(pending)
+    logger.info(
+        "Traduction %s : %s clé(s), %s reprise(s) de la mémoire, %s à traduire",
+        language_code, len(source), report.reused_keys, len(pending),
+    )
+
+    translated = (
+        await translate_entries(pending, translate_batch, report=report, **options)
+        if pending
+        else {}
+    )
+    if translated:
+        save_translation_memory(
+            session,
+            language_code,
+            {source[key]: value for key, value in translated.items()},
+            context,
+        )
+
+    return {
+        key: translated[key] if key in translated else known[value]
+        for key, value in source.items()
+    }
+
+
+def render_translation_file(code: str, translations: Mapping[str, str]) -> str:
+    """Produit le contenu de ``translations.<code>.ts``."""
+
+    lines = [
+        'import type { TranslationDictionary } from "./translations";',
+        "",
+        f"export const {code}: TranslationDictionary = {{",
+    ]
+    for key, value in translations.items():
+        lines.append(f'  "{key}": {json.dumps(value, ensure_ascii=False)},')
+    lines.append("};")
+    return "\n".join(lines) + "\n"
@@ -1,16 +1,50 @@
-"""In-memory pub/sub for live workflow content updates via SSE + polling."""
+"""Pub/sub for live workflow content updates via SSE + polling.
+
+Two backends share the same subscriber semantics:
+
+* :class:`LiveUpdateManager` keeps everything in the current process. It is
+  the default and is enough for a single worker.
+* :class:`RedisLiveUpdateManager` publishes to one Redis stream per workflow,
+  so subscribers on every uvicorn worker see every update. The stream doubles
+  as the replay log for ``Last-Event-ID`` reconnections.
+
+Select the backend with ``LIVE_UPDATES_BACKEND=memory|redis``.
+
+Each subscriber gets a bounded queue. A subscriber that falls
+``LIVE_UPDATES_QUEUE_SIZE`` events behind is closed (its queue receives
+``None``) instead of growing without limit. The SSE client then reconnects
+and replays what it missed from the last event id it received.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import os
 import time
-from dataclasses import dataclass, field
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
 from typing import Any
 
+from .config import env_int
+
 logger = logging.getLogger(__name__)
 
 
+LIVE_UPDATES_BACKEND = os.getenv("LIVE_UPDATES_BACKEND", "memory").strip().lower()
+LIVE_UPDATES_REDIS_URL = os.getenv("LIVE_UPDATES_REDIS_URL") or os.getenv(
+    "CELERY_BROKER_URL", "redis://localhost:6379/0"
+)
+# Pending events per subscriber before it is considered too slow.
+LIVE_UPDATES_QUEUE_SIZE = env_int("LIVE_UPDATES_QUEUE_SIZE", 256, minimum=2)
+# Events kept per workflow for Last-Event-ID replay.
+LIVE_UPDATES_HISTORY = env_int("LIVE_UPDATES_HISTORY", 1000, minimum=1)
+
+Subscription = asyncio.Queue["StepContentUpdate | None"]
+
+
 @dataclass
 class StepContentUpdate:
     """Event representing a live edit of a workflow step's message."""
@@ -18,6 +52,8 @@ class StepContentUpdate:
     workflow_id: int
     step_slug: str
     new_text: str
+    # Assigned by the manager on publish; sent as the SSE ``id:`` field.
+    event_id: str | None = None
 
 
 class LiveUpdateManager:
@@ -26,19 +62,83 @@ class LiveUpdateManager:
     Also tracks per-workflow update timestamps for polling-based clients.
     """
 
-    def __init__(self) -> None:
-        self._subscribers: dict[int, list[asyncio.Queue[StepContentUpdate | None]]] = {}
+    def __init__(
+        self,
+        *,
+        queue_size: int = LIVE_UPDATES_QUEUE_SIZE,
+        history_size: int = LIVE_UPDATES_HISTORY,
+    ) -> None:
+        self._subscribers: dict[int, list[Subscription]] = {}
         # Track last update timestamp per workflow for polling
         self._last_updated: dict[int, float] = {}
+        self._queue_size = queue_size
+        self._history_size = history_size
+        self._history: dict[int, deque[StepContentUpdate]] = {}
+        self._sequence = itertools.count(1)
 
-    def subscribe(self, workflow_id: int) -> asyncio.Queue[StepContentUpdate | None]:
-        queue: asyncio.Queue[StepContentUpdate | None] = asyncio.Queue()
+    # ── Local fan-out, shared by every backend ────────────────────────────
+
+    def _add_subscriber(self, workflow_id: int) -> Subscription:
+        queue: Subscription = asyncio.Queue(maxsize=self._queue_size)
         self._subscribers.setdefault(workflow_id, []).append(queue)
         logger.info("Live update subscriber added for workflow %s (total: %s)",
                      workflow_id, len(self._subscribers[workflow_id]))
         return queue
 
-    def unsubscribe(self, workflow_id: int, queue: asyncio.Queue[StepContentUpdate | None]) -> None:
+    def _deliver(self, event: StepContentUpdate) -> None:
+        subs = self._subscribers.get(event.workflow_id, [])
+        if not subs:
+            return
+        logger.info("Publishing live update for workflow %s step %s to %s subscriber(s)",
+                     event.workflow_id, event.step_slug, len(subs))
+        for queue in list(subs):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(
+                    "Live update subscriber for workflow %s is %s events behind, "
+                    "closing it",
+                    event.workflow_id,
+                    queue.qsize(),
+                )
+                self._close(event.workflow_id, queue)
+
+    def _close(self, workflow_id: int, queue: Subscription) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+        self.unsubscribe(workflow_id, queue)
+
+    def _prepend(
+        self, workflow_id: int, queue: Subscription, events: Iterable[StepContentUpdate]
+    ) -> None:
+        """Queue replayed ``events`` ahead of live events already delivered."""
+        live = []
+        while not queue.empty():
+            live.append(queue.get_nowait())
+        # Keep the most recent events if the backlog exceeds the queue.
+        backlog = [*events, *live][-self._queue_size:]
+        for event in backlog:
+            queue.put_nowait(event)
+
+    # ── Public API ────────────────────────────────────────────────────────
+
+    async def subscribe(
+        self, workflow_id: int, last_event_id: str | None = None
+    ) -> Subscription:
+        """Return a queue receiving updates for ``workflow_id``.
+
+        When ``last_event_id`` is given, retained events published after it
+        are queued first.
+        """
+        queue = self._add_subscriber(workflow_id)
+        if last_event_id:
+            self._prepend(
+                workflow_id, queue, self._events_after(workflow_id, last_event_id)
+            )
+        return queue
+
+    def unsubscribe(self, workflow_id: int, queue: Subscription) -> None:
         subs = self._subscribers.get(workflow_id, [])
         try:
             subs.remove(queue)
@@ -48,25 +148,213 @@ class LiveUpdateManager:
             self._subscribers.pop(workflow_id, None)
         logger.info("Live update subscriber removed for workflow %s", workflow_id)
 
-    def get_last_updated(self, workflow_id: int) -> float:
+    async def get_last_updated(self, workflow_id: int) -> float:
         return self._last_updated.get(workflow_id, 0.0)
 
     async def publish(self, event: StepContentUpdate) -> None:
         self._last_updated[event.workflow_id] = time.time()
-        subs = self._subscribers.get(event.workflow_id, [])
-        if not subs:
+        event.event_id = str(next(self._sequence))
+        history = self._history.get(event.workflow_id)
+        if history is None:
+            history = self._history[event.workflow_id] = deque(
+                maxlen=self._history_size
+            )
+        history.append(event)
+        self._deliver(event)
+
+    async def aclose(self) -> None:
+        """Release backend resources (nothing to do in memory)."""
+
+    def _events_after(self, workflow_id: int, last_event_id: str) -> list[StepContentUpdate]:
+        try:
+            last = int(last_event_id)
+        except ValueError:
+            return []
+        return [
+            event
+            for event in self._history.get(workflow_id, ())
+            if int(event.event_id or 0) > last
+        ]
+
+
+class RedisLiveUpdateManager(LiveUpdateManager):
+    """Cross-worker pub/sub backed by one Redis stream per workflow.
+
+    ``publish`` appends to the stream (trimmed to about ``history_size``
+    entries) and records the timestamp polled by
+    ``/api/chatkit/live-updates/poll`` in a shared hash. Each worker runs one
+    blocking ``XREAD`` reader per workflow that has local subscribers and
+    fans the entries out to their queues. Stream entry ids are the event ids.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        *,
+        url: str = LIVE_UPDATES_REDIS_URL,
+        prefix: str = "chatkit:live_updates",
+        block_ms: int = 5000,
+        retry_delay: float = 1.0,
+        queue_size: int = LIVE_UPDATES_QUEUE_SIZE,
+        history_size: int = LIVE_UPDATES_HISTORY,
+    ) -> None:
+        super().__init__(queue_size=queue_size, history_size=history_size)
+        if client is None:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(url, decode_responses=True)
+        self._redis = client
+        self._prefix = prefix
+        self._block_ms = block_ms
+        self._retry_delay = retry_delay
+        # Last stream id delivered locally, per workflow being read.
+        self._cursors: dict[int, str] = {}
+        self._readers: dict[int, asyncio.Task[None]] = {}
+
+    def _stream_key(self, workflow_id: int) -> str:
+        return f"{self._prefix}:{workflow_id}"
+
+    @property
+    def _last_updated_key(self) -> str:
+        return f"{self._prefix}:last_updated"
+
+    async def subscribe(
+        self, workflow_id: int, last_event_id: str | None = None
+    ) -> Subscription:
+        queue = self._add_subscriber(workflow_id)
+        try:
+            await self._ensure_reader(workflow_id)
+            if last_event_id:
+                await self._replay(workflow_id, queue, last_event_id)
+        except Exception:
+            self.unsubscribe(workflow_id, queue)
+            raise
+        return queue
+
+    def unsubscribe(self, workflow_id: int, queue: Subscription) -> None:
+        super().unsubscribe(workflow_id, queue)
+        if workflow_id not in self._subscribers:
+            reader = self._readers.pop(workflow_id, None)
+            self._cursors.pop(workflow_id, None)
+            if reader is not None:
+                reader.cancel()
+
+    async def get_last_updated(self, workflow_id: int) -> float:
+        try:
+            value = await self._redis.hget(self._last_updated_key, str(workflow_id))
+        except Exception:
+            logger.warning("Redis unavailable, using local live update timestamp",
+                           exc_info=True)
+            return await super().get_last_updated(workflow_id)
+        return float(value) if value else 0.0
+
+    async def publish(self, event: StepContentUpdate) -> None:
+        now = time.time()
+        self._last_updated[event.workflow_id] = now
+        try:
+            event.event_id = await self._redis.xadd(
+                self._stream_key(event.workflow_id),
+                {"step_slug": event.step_slug, "new_text": event.new_text},
+                maxlen=self._history_size,
+                approximate=True,
+            )
+            await self._redis.hset(
+                self._last_updated_key, str(event.workflow_id), repr(now)
+            )
+        except Exception:
+            # Keep same-worker subscribers working while Redis is down.
+            logger.warning("Redis unavailable, delivering live update locally only",
+                           exc_info=True)
+            event.event_id = None
+            self._deliver(event)
+
+    async def aclose(self) -> None:
+        readers = list(self._readers.values())
+        self._readers.clear()
+        self._cursors.clear()
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        await self._redis.aclose()
+
+    async def _ensure_reader(self, workflow_id: int) -> None:
+        if workflow_id in self._readers:
             return
-        logger.info("Publishing live update for workflow %s step %s to %s subscriber(s)",
-                     event.workflow_id, event.step_slug, len(subs))
-        dead: list[asyncio.Queue[StepContentUpdate | None]] = []
-        for queue in subs:
+        latest = await self._redis.xrevrange(
+            self._stream_key(workflow_id), "+", "-", count=1
+        )
+        # Another subscriber may have started the reader meanwhile, or every
+        # local subscriber may already be gone.
+        if workflow_id in self._readers or workflow_id not in self._subscribers:
+            return
+        self._cursors[workflow_id] = latest[0][0] if latest else "0-0"
+        self._readers[workflow_id] = asyncio.create_task(self._read(workflow_id))
+
+    async def _replay(
+        self, workflow_id: int, queue: Subscription, last_event_id: str
+    ) -> None:
+        cursor = self._cursors.get(workflow_id)
+        if cursor is None:
+            return
+        try:
+            entries = await self._redis.xrange(
+                self._stream_key(workflow_id), f"({last_event_id}", cursor
+            )
+        except Exception:
+            # Malformed id, or an id newer than the cursor: nothing to replay.
+            logger.debug("Cannot replay live updates after %r", last_event_id,
+                         exc_info=True)
+            return
+        # Entries after ``cursor`` are already queued by the reader.
+        self._prepend(
+            workflow_id,
+            queue,
+            (self._decode(workflow_id, entry_id, fields) for entry_id, fields in entries),
+        )
+
+    async def _read(self, workflow_id: int) -> None:
+        key = self._stream_key(workflow_id)
+        while workflow_id in self._cursors:
             try:
-                queue.put_nowait(event)
+                response = await self._redis.xread(
+                    {key: self._cursors[workflow_id]},
+                    count=100,
+                    block=self._block_ms,
+                )
+            except asyncio.CancelledError:
+                raise
             except Exception:
-                dead.append(queue)
-        for q in dead:
-            self.unsubscribe(event.workflow_id, q)
+                logger.warning("Live update stream read failed for workflow %s",
+                               workflow_id, exc_info=True)
+                await asyncio.sleep(self._retry_delay)
+                continue
+            for _stream, entries in response or ():
+                for entry_id, fields in entries:
+                    if workflow_id not in self._cursors:
+                        return
+                    self._cursors[workflow_id] = entry_id
+                    self._deliver(self._decode(workflow_id, entry_id, fields))
+
+    @staticmethod
+    def _decode(
+        workflow_id: int, entry_id: str, fields: dict[str, str]
+    ) -> StepContentUpdate:
+        return StepContentUpdate(
+            workflow_id=workflow_id,
+            step_slug=fields.get("step_slug", ""),
+            new_text=fields.get("new_text", ""),
+            event_id=entry_id,
+        )
+
+
+def create_live_update_manager(backend: str = LIVE_UPDATES_BACKEND) -> LiveUpdateManager:
+    if backend == "redis":
+        logger.info("Live updates use Redis streams at %s", LIVE_UPDATES_REDIS_URL)
+        return RedisLiveUpdateManager()
+    if backend != "memory":
+        logger.warning("Unknown LIVE_UPDATES_BACKEND %r, using memory", backend)
+    return LiveUpdateManager()
 
 
 # Global singleton
-live_update_manager = LiveUpdateManager()
+live_update_manager = create_live_update_manager()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
 import json
 import logging
 import secrets
-from collections.abc import Callable, Mapping, Sequence
+import time
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
 from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
 from typing import Any
 from urllib.parse import urlencode
 
@@ -13,7 +16,7 @@ import httpx
 import jwt
 from sqlalchemy.orm import Session
 
-from ..chatkit_server.ags import AGSClientProtocol
+from ..chatkit_server.ags import AGSClientProtocol, AGSTransientError
 from ..chatkit_server.context import ChatKitRequestContext
 from ..config import Settings, get_settings
 from ..models import LTIRegistration
@@ -26,19 +29,35 @@ _LINEITEM_READONLY_SCOPE = (
     "https://purl.imsglobal.org/spec/lti-ags/scope/lineitem.readonly"
 )
 
+# Marge retirée de ``expires_in`` pour ne jamais présenter un token expiré.
+_TOKEN_EXPIRY_MARGIN_SECONDS = 30.0
+# Durée de vie retenue lorsque la plateforme ne renvoie pas ``expires_in``.
+_DEFAULT_TOKEN_TTL_SECONDS = 300.0
+_LINE_ITEM_CACHE_TTL_SECONDS = 600.0
+_TRANSIENT_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
 AsyncClientFactory = Callable[[], AbstractAsyncContextManager[httpx.AsyncClient]]
 
 
-@asynccontextmanager
-async def _default_http_client_factory() -> (
-    AbstractAsyncContextManager[httpx.AsyncClient]
-):
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        yield client
+@dataclass(frozen=True)
+class _CachedToken:
+    value: str
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class _CachedLineItem:
+    payload: Mapping[str, Any]
+    expires_at: float
 
 
 class LTIAGSClient(AGSClientProtocol):
-    """Client AGS utilisant l'intégration LTI configurée."""
+    """Client AGS utilisant l'intégration LTI configurée.
+
+    Les tokens OAuth sont mis en cache par (registration, ensemble de scopes)
+    jusqu'à leur expiration, les line items sont mémorisés par resource link et
+    un unique client HTTP keep-alive est partagé entre les appels.
+    """
 
     def __init__(
         self,
@@ -46,10 +65,49 @@ class LTIAGSClient(AGSClientProtocol):
         session_factory: Callable[[], Session],
         settings: Settings | None = None,
         http_client_factory: AsyncClientFactory | None = None,
+        line_item_cache_ttl: float = _LINE_ITEM_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
         self._session_factory = session_factory
         self._settings = settings or get_settings()
-        self._http_client_factory = http_client_factory or _default_http_client_factory
+        self._http_client_factory = (
+            http_client_factory or self._shared_http_client
+        )
+        self._shared_client: httpx.AsyncClient | None = None
+        self._clock = clock
+        self._line_item_cache_ttl = max(0.0, line_item_cache_ttl)
+        self._token_cache: dict[tuple[Any, ...], _CachedToken] = {}
+        self._token_locks: dict[tuple[Any, ...], asyncio.Lock] = {}
+        self._line_item_cache: dict[tuple[str, ...], _CachedLineItem] = {}
+
+    @asynccontextmanager
+    async def _shared_http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        client = self._shared_client
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(
+                    max_connections=20,
+                    max_keepalive_connections=10,
+                    keepalive_expiry=60.0,
+                ),
+            )
+            self._shared_client = client
+        yield client
+
+    async def aclose(self) -> None:
+        """Ferme le client HTTP partagé."""
+
+        client = self._shared_client
+        self._shared_client = None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    def invalidate_caches(self) -> None:
+        """Oublie les tokens et line items mémorisés."""
+
+        self._token_cache.clear()
+        self._line_item_cache.clear()
 
     async def ensure_line_item(
         self,
@@ -86,23 +144,37 @@ class LTIAGSClient(AGSClientProtocol):
         if token is None:
             return context.ags_line_item_endpoint
 
-        existing = await self._lookup_line_item(
+        lookup_key = (
+            "lookup",
             line_items_endpoint,
-            token,
+            context.lti_resource_link_ref or "",
             variable_key,
-            resource_link_ref=context.lti_resource_link_ref,
         )
+        existing = self._get_cached_line_item(lookup_key)
+        if existing is None:
+            existing = await self._lookup_line_item(
+                line_items_endpoint,
+                token,
+                variable_key,
+                resource_link_ref=context.lti_resource_link_ref,
+            )
+            if existing is not None:
+                self._store_line_item(lookup_key, existing)
         if existing is not None:
             line_item_id = existing.get("id") or context.ags_line_item_endpoint
             if line_item_id and max_score is not None:
-                await self._update_line_item_if_needed(
+                updated = await self._update_line_item_if_needed(
                     line_item_id,
                     token,
                     variable_key,
                     max_score,
                     comment,
                     resource_link_ref=context.lti_resource_link_ref,
+                    current=existing,
                 )
+                if updated is not None:
+                    self._store_line_item(lookup_key, updated)
+                    self._line_item_cache.pop(("details", line_item_id), None)
             return line_item_id
 
         created = await self._create_line_item(
@@ -113,7 +185,10 @@ class LTIAGSClient(AGSClientProtocol):
             comment,
             context=context,
         )
-        return created or context.ags_line_item_endpoint
+        if created is not None:
+            self._store_line_item(lookup_key, created)
+            return created["id"]
+        return context.ags_line_item_endpoint
 
     async def publish_score(
         self,
@@ -162,7 +237,12 @@ class LTIAGSClient(AGSClientProtocol):
             )
             return
 
-        fetched = await self._get_line_item_details(target, token)
+        details_key = ("details", target)
+        fetched = self._get_cached_line_item(details_key)
+        if fetched is None:
+            fetched = await self._get_line_item_details(target, token)
+            if fetched is not None:
+                self._store_line_item(details_key, fetched)
         if fetched is None:
             logger.debug(
                 "LTI AGS: impossible de récupérer le line item %s", target
@@ -209,6 +289,19 @@ class LTIAGSClient(AGSClientProtocol):
                 )
                 response.raise_for_status()
         except httpx.HTTPError as exc:
+            if (
+                isinstance(exc, httpx.HTTPStatusError)
+                and exc.response.status_code == 401
+            ):
+                # Token révoqué côté plateforme : on le jette et on réessaie.
+                self._forget_token(token)
+                raise AGSTransientError(
+                    f"Token AGS refusé par {scores_endpoint}"
+                ) from exc
+            if self._is_transient(exc):
+                raise AGSTransientError(
+                    f"Publication AGS temporairement impossible vers {scores_endpoint}"
+                ) from exc
             logger.warning(
                 "Impossible de publier la note AGS %s vers %s",
                 variable_id,
@@ -216,6 +309,38 @@ class LTIAGSClient(AGSClientProtocol):
                 exc_info=exc,
             )
 
+    @staticmethod
+    def _is_transient(exc: httpx.HTTPError) -> bool:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code in _TRANSIENT_STATUS_CODES
+        return isinstance(exc, httpx.TransportError)
+
+    def _forget_token(self, token: str) -> None:
+        for key, cached in list(self._token_cache.items()):
+            if cached.value == token:
+                self._token_cache.pop(key, None)
+
+    def _get_cached_line_item(
+        self, key: tuple[str, ...]
+    ) -> Mapping[str, Any] | None:
+        cached = self._line_item_cache.get(key)
+        if cached is None:
+            return None
+        if cached.expires_at <= self._clock():
+            self._line_item_cache.pop(key, None)
+            return None
+        return cached.payload
+
+    def _store_line_item(
+        self, key: tuple[str, ...], payload: Mapping[str, Any]
+    ) -> None:
+        if self._line_item_cache_ttl <= 0:
+            return
+        self._line_item_cache[key] = _CachedLineItem(
+            payload=dict(payload),
+            expires_at=self._clock() + self._line_item_cache_ttl,
+        )
+
     @staticmethod
     def _format_score_timestamp(
         value: datetime.datetime | None = None,
@@ -287,6 +412,36 @@ class LTIAGSClient(AGSClientProtocol):
             logger.debug("LTI AGS: client_id manquant")
             return None
 
+        scope_value = " ".join(sorted(set(scopes)))
+        cache_key = (registration.id, token_endpoint, client_id, scope_value)
+        cached = self._token_cache.get(cache_key)
+        if cached is not None and cached.expires_at > self._clock():
+            return cached.value
+
+        # Un seul échange OAuth à la fois par clé : les requêtes concurrentes
+        # d'une même classe réutilisent le token obtenu par la première.
+        lock = self._token_locks.setdefault(cache_key, asyncio.Lock())
+        async with lock:
+            cached = self._token_cache.get(cache_key)
+            if cached is not None and cached.expires_at > self._clock():
+                return cached.value
+            return await self._request_access_token(
+                cache_key,
+                private_key=private_key,
+                token_endpoint=token_endpoint,
+                client_id=client_id,
+                scope_value=scope_value,
+            )
+
+    async def _request_access_token(
+        self,
+        cache_key: tuple[Any, ...],
+        *,
+        private_key: str,
+        token_endpoint: str,
+        client_id: str,
+        scope_value: str,
+    ) -> str | None:
         now = datetime.datetime.now(datetime.UTC)
         claim = {
             "iss": client_id,
@@ -307,7 +462,6 @@ class LTIAGSClient(AGSClientProtocol):
             headers=headers or None,
         )
 
-        scope_value = " ".join(sorted(set(scopes)))
         data = {
             "grant_type": "client_credentials",
             "client_assertion_type": (
@@ -334,6 +488,17 @@ class LTIAGSClient(AGSClientProtocol):
         if not isinstance(access_token, str) or not access_token:
             logger.warning("LTI AGS: réponse token invalide (%s)", payload)
             return None
+
+        try:
+            expires_in = float(payload.get("expires_in"))
+        except (TypeError, ValueError):
+            expires_in = _DEFAULT_TOKEN_TTL_SECONDS
+        ttl = expires_in - _TOKEN_EXPIRY_MARGIN_SECONDS
+        if ttl > 0:
+            self._token_cache[cache_key] = _CachedToken(
+                value=access_token,
+                expires_at=self._clock() + ttl,
+            )
         return access_token
 
     async def _lookup_line_item(
@@ -407,7 +572,14 @@ class LTIAGSClient(AGSClientProtocol):
         comment: str | None,
         *,
         resource_link_ref: str | None,
-    ) -> None:
+        current: Mapping[str, Any] | None = None,
+    ) -> Mapping[str, Any] | None:
+        """Met à jour le line item s'il diffère de ``current``.
+
+        Renvoie le line item mis à jour, ou ``None`` si aucune requête n'a
+        abouti (rien à changer ou échec).
+        """
+
         payload: dict[str, Any] = {
             "label": comment or variable_id,
             "resourceId": variable_id,
@@ -419,6 +591,14 @@ class LTIAGSClient(AGSClientProtocol):
         if resource_link_ref:
             payload["resourceLinkId"] = resource_link_ref
 
+        if (
+            current is not None
+            and current.get("label") == payload["label"]
+            and self._coerce_score(current.get("scoreMaximum"), fallback=None)
+            == payload.get("scoreMaximum")
+        ):
+            return None
+
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/vnd.ims.lis.v2.lineitem+json",
@@ -435,6 +615,8 @@ class LTIAGSClient(AGSClientProtocol):
                 line_item_id,
                 exc_info=exc,
             )
+            return None
+        return {**(current or {}), **payload, "id": line_item_id}
 
     async def _create_line_item(
         self,
@@ -445,7 +627,7 @@ class LTIAGSClient(AGSClientProtocol):
         comment: str | None,
         *,
         context: ChatKitRequestContext,
-    ) -> str | None:
+    ) -> Mapping[str, Any] | None:
         payload: dict[str, Any] = {
             "label": comment or context.ags_default_label or variable_id,
             "resourceId": variable_id,
@@ -486,7 +668,7 @@ class LTIAGSClient(AGSClientProtocol):
         if isinstance(created, Mapping):
             line_item_id = created.get("id")
             if isinstance(line_item_id, str) and line_item_id:
-                return line_item_id
+                return {**payload, **created}
         return None
 
     @staticmethod
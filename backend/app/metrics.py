@@ -0,0 +1,453 @@
+"""Métriques Prometheus des chemins chauds du backend.
+
+Les compteurs sont définis ici et alimentés par les modules concernés :
+
+* pool SQLAlchemy : emprunts, attente d'une connexion, délais dépassés et
+  connexions empruntées (:class:`InstrumentedQueuePool`, branché via
+  ``poolclass`` sur les moteurs PostgreSQL) ;
+* latence des méthodes de :class:`~app.chatkit_store.PostgresChatKitStore` ;
+* cache des utilisateurs authentifiés : succès, échecs, lectures en base,
+  rejets et invalidations ;
+* durée de ``run_workflow_v2``, nombre de nœuds exécutés et appels par
+  type de nœud ;
+* délai avant le premier jeton et jetons consommés, par modèle ;
+* latence de recherche de :class:`~app.vector_store.service.JsonVectorStoreService` ;
+* appels SIP et sessions Realtime actifs, comptes SIP enregistrés ;
+* gigue et pertes RTP des flux audio téléphoniques ;
+* longueur des files Celery, lue dans Redis au moment de la collecte.
+
+Avec plusieurs workers uvicorn, définir ``PROMETHEUS_MULTIPROC_DIR`` (un
+répertoire vide au démarrage) : chaque processus y écrit ses valeurs et
+``/metrics`` les agrège, quel que soit le worker qui répond.
+
+Sans ``prometheus_client`` (ou avec ``METRICS_ENABLED=false``), toutes les
+métriques sont des objets inertes et ``/metrics`` répond 503.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any, TypeVar
+
+from .config import env_flag
+
+logger = logging.getLogger("chatkit.server")
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+try:  # pragma: no cover - dépend de l'installation
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - dépendance optionnelle absente
+    prometheus_client = None  # type: ignore[assignment]
+    multiprocess = None  # type: ignore[assignment]
+    GaugeMetricFamily = None  # type: ignore[assignment,misc]
+
+METRICS_ENABLED = prometheus_client is not None and env_flag(
+    "METRICS_ENABLED", default=True
+)
+METRICS_BEARER_TOKEN = os.getenv("METRICS_BEARER_TOKEN", "").strip() or None
+METRICS_CELERY_QUEUES = tuple(
+    name.strip()
+    for name in os.getenv("METRICS_CELERY_QUEUES", "celery").split(",")
+    if name.strip()
+)
+MULTIPROCESS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv(
+    "prometheus_multiproc_dir"
+)
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_RUN_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+_JITTER_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.04, 0.08, 0.16, 0.32)
+
+
+class _NoopMetric:
+    """Métrique inerte utilisée lorsque Prometheus est indisponible."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> _NoopMetric:
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def time(self) -> contextlib.nullcontext[None]:
+        return contextlib.nullcontext()
+
+
+def _metric(kind: str, name: str, *args: Any, **kwargs: Any) -> Any:
+    if not METRICS_ENABLED:
+        return _NoopMetric()
+    try:
+        return getattr(prometheus_client, kind)(name, *args, **kwargs)
+    except ValueError:
+        # Module réimporté (tests) : la métrique existe déjà dans le registre.
+        return prometheus_client.REGISTRY._names_to_collectors[name]
+
+
+def _counter(name: str, documentation: str, labels: tuple[str, ...] = ()) -> Any:
+    return _metric("Counter", name, documentation, labels)
+
+
+def _histogram(
+    name: str,
+    documentation: str,
+    labels: tuple[str, ...] = (),
+    *,
+    buckets: tuple[float, ...] = _LATENCY_BUCKETS,
+) -> Any:
+    return _metric("Histogram", name, documentation, labels, buckets=buckets)
+
+
+def _gauge(name: str, documentation: str, labels: tuple[str, ...] = ()) -> Any:
+    # ``livesum`` : somme des processus vivants en mode multiprocessus.
+    return _metric("Gauge", name, documentation, labels, multiprocess_mode="livesum")
+
+
+# ── Base de données ──────────────────────────────────────────────────────
+
+DB_POOL_CHECKOUTS = _counter(
+    "chatkit_db_pool_checkouts_total",
+    "Connexions empruntées au pool SQLAlchemy.",
+    ("engine",),
+)
+DB_POOL_CHECKOUT_WAIT = _histogram(
+    "chatkit_db_pool_checkout_wait_seconds",
+    "Attente avant d'obtenir une connexion du pool SQLAlchemy.",
+    ("engine",),
+)
+DB_POOL_TIMEOUTS = _counter(
+    "chatkit_db_pool_timeouts_total",
+    "Emprunts abandonnés après pool_timeout.",
+    ("engine",),
+)
+DB_POOL_CHECKED_OUT = _gauge(
+    "chatkit_db_pool_checked_out",
+    "Connexions actuellement empruntées au pool SQLAlchemy.",
+    ("engine",),
+)
+STORE_OPERATION_SECONDS = _histogram(
+    "chatkit_store_operation_seconds",
+    "Durée des méthodes du store ChatKit.",
+    ("method",),
+)
+
+# ── Authentification ─────────────────────────────────────────────────────
+
+AUTH_USER_CACHE_EVENTS = _counter(
+    "chatkit_auth_user_cache_events_total",
+    "Événements du cache des utilisateurs authentifiés.",
+    ("event",),
+)
+
+# ── Workflows et modèles ─────────────────────────────────────────────────
+
+WORKFLOW_RUN_SECONDS = _histogram(
+    "chatkit_workflow_run_seconds",
+    "Durée d'une exécution de workflow.",
+    ("workflow", "outcome"),
+    buckets=_RUN_BUCKETS,
+)
+WORKFLOW_RUN_NODES = _histogram(
+    "chatkit_workflow_run_nodes",
+    "Nœuds exécutés par exécution de workflow.",
+    ("workflow",),
+    buckets=_COUNT_BUCKETS,
+)
+WORKFLOW_NODE_EXECUTIONS = _counter(
+    "chatkit_workflow_node_executions_total",
+    "Nœuds exécutés, par type de nœud.",
+    ("node_type",),
+)
+MODEL_TIME_TO_FIRST_TOKEN = _histogram(
+    "chatkit_model_time_to_first_token_seconds",
+    "Délai entre l'appel du modèle et le premier jeton reçu.",
+    ("model",),
+    buckets=_RUN_BUCKETS,
+)
+MODEL_TOKENS = _counter(
+    "chatkit_model_tokens_total",
+    "Jetons consommés, par modèle et par sens.",
+    ("model", "direction"),
+)
+
+# ── Recherche vectorielle ────────────────────────────────────────────────
+
+VECTOR_SEARCH_SECONDS = _histogram(
+    "chatkit_vector_search_seconds",
+    "Durée des recherches dans les vector stores.",
+    ("operation",),
+)
+
+# ── Voix et téléphonie ───────────────────────────────────────────────────
+
+REALTIME_SESSIONS_ACTIVE = _gauge(
+    "chatkit_realtime_sessions_active",
+    "Sessions Realtime ouvertes.",
+)
+SIP_ACTIVE_CALLS = _gauge(
+    "chatkit_sip_active_calls",
+    "Appels SIP en cours.",
+)
+SIP_REGISTERED_ACCOUNTS = _gauge(
+    "chatkit_sip_registered_accounts",
+    "Comptes SIP gérés par le gestionnaire multi-comptes.",
+)
+RTP_JITTER_SECONDS = _histogram(
+    "chatkit_rtp_jitter_seconds",
+    "Gigue d'arrivée des flux RTP reçus (RFC 3550), mesurée en fin de flux.",
+    ("source",),
+    buckets=_JITTER_BUCKETS,
+)
+RTP_PACKETS_RECEIVED = _counter(
+    "chatkit_rtp_packets_received_total",
+    "Paquets RTP reçus.",
+    ("source",),
+)
+RTP_PACKETS_LOST = _counter(
+    "chatkit_rtp_packets_lost_total",
+    "Paquets RTP perdus (numéros de séquence manquants).",
+    ("source",),
+)
+
+
+# ── Aides d'instrumentation ──────────────────────────────────────────────
+
+
+def timed(histogram: Any, **labels: str) -> Callable[[_F], _F]:
+    """Décorateur : observe la durée d'une fonction synchrone."""
+
+    def _decorate(func: _F) -> _F:
+        @functools.wraps(func)
+        def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.labels(**labels).observe(time.perf_counter() - started)
+
+        return _wrapper  # type: ignore[return-value]
+
+    return _decorate
+
+
+def observe_workflow_run(
+    workflow: str,
+    seconds: float,
+    *,
+    nodes: int,
+    handler_calls: Mapping[str, int],
+    outcome: str,
+) -> None:
+    label = workflow or "unknown"
+    WORKFLOW_RUN_SECONDS.labels(workflow=label, outcome=outcome).observe(seconds)
+    WORKFLOW_RUN_NODES.labels(workflow=label).observe(nodes)
+    for node_type, count in handler_calls.items():
+        if count:
+            WORKFLOW_NODE_EXECUTIONS.labels(node_type=node_type).inc(count)
+
+
+def observe_time_to_first_token(model: str | None, seconds: float) -> None:
+    MODEL_TIME_TO_FIRST_TOKEN.labels(model=model or "unknown").observe(seconds)
+
+
+def record_model_tokens(
+    model: str | None, input_tokens: int, output_tokens: int
+) -> None:
+    label = model or "unknown"
+    if input_tokens > 0:
+        MODEL_TOKENS.labels(model=label, direction="input").inc(input_tokens)
+    if output_tokens > 0:
+        MODEL_TOKENS.labels(model=label, direction="output").inc(output_tokens)
+
+
+def record_rtp_stats(
+    source: str,
+    *,
+    jitter_seconds: float,
+    packets_received: int,
+    packets_lost: int,
+) -> None:
+    """Publie le bilan d'un flux RTP reçu (ignoré si aucun paquet)."""
+
+    if packets_received <= 0:
+        return
+    RTP_JITTER_SECONDS.labels(source=source).observe(max(0.0, jitter_seconds))
+    RTP_PACKETS_RECEIVED.labels(source=source).inc(packets_received)
+    if packets_lost > 0:
+        RTP_PACKETS_LOST.labels(source=source).inc(packets_lost)
+
+
+# ── Pool SQLAlchemy ──────────────────────────────────────────────────────
+
+
+class _TimedCheckoutMixin:
+    """Chronomètre ``_do_get`` : SQLAlchemy n'a pas d'événement avant emprunt."""
+
+    _metrics_engine = "sync"
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(engine=self._metrics_engine).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(engine=self._metrics_engine).observe(
+                time.perf_counter() - started
+            )
+        DB_POOL_CHECKOUTS.labels(engine=self._metrics_engine).inc()
+        DB_POOL_CHECKED_OUT.labels(engine=self._metrics_engine).inc()
+        return record
+
+    def _do_return_conn(self, record: Any) -> None:
+        DB_POOL_CHECKED_OUT.labels(engine=self._metrics_engine).dec()
+        super()._do_return_conn(record)  # type: ignore[misc]
+
+
+try:  # pragma: no cover - dépend de l'installation de SQLAlchemy
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+except ImportError:  # pragma: no cover - SQLAlchemy simulé dans certains tests
+    InstrumentedQueuePool = None
+    InstrumentedAsyncQueuePool = None
+else:
+
+    class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+        """``QueuePool`` qui publie ses emprunts et leur temps d'attente."""
+
+    class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+        """Équivalent de :class:`InstrumentedQueuePool` pour le moteur asynchrone."""
+
+        _metrics_engine = "async"
+
+
+# ── Collecte ─────────────────────────────────────────────────────────────
+
+
+class _CeleryQueueCollector:
+    """Lit la longueur des files Celery dans Redis à chaque collecte."""
+
+    def __init__(self, broker_url: str, queues: tuple[str, ...]) -> None:
+        self._broker_url = broker_url
+        self._queues = queues
+        self._client: Any = None
+
+    def describe(self) -> list[Any]:
+        # Évite une lecture Redis à l'enregistrement du collecteur.
+        return []
+
+    def collect(self) -> Iterator[Any]:
+        redis_broker = self._broker_url.startswith(("redis://", "rediss://"))
+        if not self._queues or not redis_broker:
+            return
+        try:
+            if self._client is None:
+                import redis
+
+                self._client = redis.Redis.from_url(
+                    self._broker_url, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+            with self._client.pipeline(transaction=False) as pipe:
+                for queue in self._queues:
+                    pipe.llen(queue)
+                lengths = pipe.execute()
+        except Exception as exc:
+            logger.debug("Longueur des files Celery indisponible : %s", exc)
+            return
+        family = GaugeMetricFamily(
+            "chatkit_celery_queue_length",
+            "Tâches en attente dans les files Celery.",
+            labels=["queue"],
+        )
+        for queue, length in zip(self._queues, lengths, strict=True):
+            family.add_metric([queue], int(length))
+        yield family
+
+
+_scrape_registry: Any = None
+
+
+def _registry() -> Any:
+    global _scrape_registry
+    if _scrape_registry is None:
+        if MULTIPROCESS_DIR:
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        registry.register(
+            _CeleryQueueCollector(
+                os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+                METRICS_CELERY_QUEUES,
+            )
+        )
+        _scrape_registry = registry
+    return _scrape_registry
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Exposition texte de toutes les métriques (agrégées entre workers)."""
+
+    if not METRICS_ENABLED:
+        raise RuntimeError("Métriques Prometheus désactivées")
+    return (
+        prometheus_client.generate_latest(_registry()),
+        prometheus_client.CONTENT_TYPE_LATEST,
+    )
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    """Retire les jauges ``livesum`` d'un worker qui s'arrête."""
+
+    if METRICS_ENABLED and MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid(), MULTIPROCESS_DIR)
+
+
+__all__ = [
+    "AUTH_USER_CACHE_EVENTS",
+    "DB_POOL_CHECKED_OUT",
+    "DB_POOL_CHECKOUTS",
+    "DB_POOL_CHECKOUT_WAIT",
+    "DB_POOL_TIMEOUTS",
+    "InstrumentedAsyncQueuePool",
+    "InstrumentedQueuePool",
+    "METRICS_BEARER_TOKEN",
+    "METRICS_ENABLED",
+    "MODEL_TIME_TO_FIRST_TOKEN",
+    "MODEL_TOKENS",
+    "REALTIME_SESSIONS_ACTIVE",
+    "RTP_JITTER_SECONDS",
+    "RTP_PACKETS_LOST",
+    "RTP_PACKETS_RECEIVED",
+    "SIP_ACTIVE_CALLS",
+    "SIP_REGISTERED_ACCOUNTS",
+    "STORE_OPERATION_SECONDS",
+    "VECTOR_SEARCH_SECONDS",
+    "WORKFLOW_NODE_EXECUTIONS",
+    "WORKFLOW_RUN_NODES",
+    "WORKFLOW_RUN_SECONDS",
+    "mark_process_dead",
+    "observe_time_to_first_token",
+    "observe_workflow_run",
+    "record_model_tokens",
+    "record_rtp_stats",
+    "render_latest",
+    "timed",
+]
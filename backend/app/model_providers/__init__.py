@@ -30,6 +30,12 @@ def configure_model_provider(settings: Settings) -> None:
         configure_litellm_client(settings)
     elif provider == "openai":
         configure_openai_client(settings)
+    elif provider == "fake":
+        # Import différé : le transport simulé ne sert qu'aux tests de charge
+        # et certains tests remplacent httpx par un module minimal.
+        from .fake import configure_fake_client
+
+        configure_fake_client(settings)
     else:
         logger.warning(
             "Fournisseur de modèles %s non pris en charge pour la "
@@ -0,0 +1,545 @@
+"""Fournisseur de modèles local et déterministe pour les tests de charge.
+
+Le client ``AsyncOpenAI`` enregistré dans le SDK Agents parle à un transport
+httpx en mémoire qui imite les API Responses et Chat Completions (réponses
+complètes ou en streaming SSE). Les réponses dépendent uniquement de la
+requête, ce qui permet de mesurer le débit du backend sans appel facturé :
+
+* ``FAKE_MODEL_LATENCY_MS`` : délai avant le premier jeton ;
+* ``FAKE_MODEL_TOKENS_PER_SECOND`` : débit des deltas (0 = sans attente) ;
+* ``FAKE_MODEL_OUTPUT_TOKENS`` : longueur des réponses générées ;
+* ``FAKE_MODEL_TOOL_CALLS`` : appelle le premier outil déclaré avant de
+  répondre ;
+* ``FAKE_MODEL_RULES`` : liste JSON ``[{"match": regex, "reply": texte}]``
+  de réponses scriptées, testées sur les instructions et l'entrée.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from agents import set_default_openai_client
+from openai import AsyncOpenAI
+
+from ..config import env_flag, env_float, env_int
+
+if TYPE_CHECKING:  # pragma: no cover - uniquement pour l'analyse statique
+    from ..config import Settings
+
+logger = logging.getLogger("chatkit.model_providers.fake")
+
+FAKE_MODEL_API_BASE = "http://fake-model.local/v1"
+
+_VOCABULARY = (
+    "le", "modèle", "simulé", "répond", "avec", "une", "phrase", "stable",
+    "pour", "mesurer", "débit", "du", "workflow", "sans", "appel", "réseau",
+    "chaque", "jeton", "arrive", "au", "rythme", "configuré", "et", "la",
+)
+_TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+
+@dataclass(frozen=True)
+class FakeModelRule:
+    """Réponse imposée lorsque ``pattern`` apparaît dans la requête."""
+
+    pattern: re.Pattern[str]
+    reply: str
+
+    @classmethod
+    def from_mapping(cls, payload: Mapping[str, Any]) -> FakeModelRule:
+        return cls(
+            pattern=re.compile(str(payload["match"]), re.IGNORECASE | re.DOTALL),
+            reply=str(payload.get("reply", "")),
+        )
+
+
+@dataclass(frozen=True)
+class FakeModelConfig:
+    latency: float = 0.05
+    tokens_per_second: float = 200.0
+    output_tokens: int = 40
+    tool_calls: bool = False
+    rules: tuple[FakeModelRule, ...] = ()
+
+    @classmethod
+    def from_env(cls) -> FakeModelConfig:
+        rules: list[FakeModelRule] = []
+        raw_rules = os.getenv("FAKE_MODEL_RULES")
+        if raw_rules and raw_rules.strip():
+            try:
+                rules = [
+                    FakeModelRule.from_mapping(entry) for entry in json.loads(raw_rules)
+                ]
+            except (ValueError, TypeError, KeyError, re.error):
+                logger.warning("FAKE_MODEL_RULES invalide, règles ignorées")
+        return cls(
+            latency=env_float("FAKE_MODEL_LATENCY_MS", 50.0) / 1000,
+            tokens_per_second=env_float("FAKE_MODEL_TOKENS_PER_SECOND", 200.0),
+            output_tokens=env_int("FAKE_MODEL_OUTPUT_TOKENS", 40),
+            tool_calls=env_flag("FAKE_MODEL_TOOL_CALLS"),
+            rules=tuple(rules),
+        )
+
+
+@dataclass
+class FakeModelStats:
+    requests: int = 0
+    streamed: int = 0
+    tool_calls: int = 0
+    output_tokens: int = 0
+    by_endpoint: dict[str, int] = field(default_factory=dict)
+
+
+def _text_of(value: Any) -> str:
+    """Concatène le texte d'une entrée Responses/Chat (chaînes, parts, items)."""
+
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, Mapping):
+        parts = [
+            _text_of(value.get(key))
+            for key in ("text", "content", "output", "arguments")
+            if key in value
+        ]
+        return "\n".join(part for part in parts if part)
+    if isinstance(value, Iterable):
+        return "\n".join(part for part in (_text_of(item) for item in value) if part)
+    return str(value)
+
+
+def _schema_instance(schema: Mapping[str, Any] | None) -> Any:
+    """Construit la plus petite valeur valide pour un schéma JSON simple."""
+
+    if not isinstance(schema, Mapping):
+        return {}
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf"):
+        options = schema.get(key)
+        if isinstance(options, Sequence) and options:
+            return _schema_instance(options[0])
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((item for item in kind if item != "null"), None)
+    if kind == "object" or "properties" in schema:
+        properties = schema.get("properties") or {}
+        return {name: _schema_instance(spec) for name, spec in properties.items()}
+    if kind == "array":
+        return []
+    if kind in {"integer", "number"}:
+        return 0
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    return "ok"
+
+
+class FakeModelTransport(httpx.AsyncBaseTransport):
+    """Transport httpx répondant comme l'API OpenAI, sans réseau."""
+
+    def __init__(self, config: FakeModelConfig | None = None) -> None:
+        self.config = config or FakeModelConfig()
+        self.stats = FakeModelStats()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.rstrip("/")
+        try:
+            payload = json.loads(await request.aread() or b"{}")
+        except ValueError:
+            payload = {}
+        self.stats.requests += 1
+        if path.endswith("/responses"):
+            endpoint = "responses"
+        elif path.endswith("/chat/completions"):
+            endpoint = "chat"
+        else:
+            return httpx.Response(
+                404, json={"error": {"message": f"Route simulée inconnue : {path}"}}
+            )
+        self.stats.by_endpoint[endpoint] = self.stats.by_endpoint.get(endpoint, 0) + 1
+
+        plan = self._plan(endpoint, payload)
+        model = str(payload.get("model") or "fake-model")
+        if payload.get("stream"):
+            self.stats.streamed += 1
+            builder = (
+                self._responses_events
+                if endpoint == "responses"
+                else self._chat_chunks
+            )
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=self._sse(builder(model, plan)),
+            )
+        await asyncio.sleep(self.config.latency + self._stream_duration(plan))
+        body = (
+            self._responses_body(model, plan)
+            if endpoint == "responses"
+            else self._chat_body(model, plan)
+        )
+        return httpx.Response(200, json=body)
+
+    # ── Génération déterministe ──────────────────────────────────────────
+
+    def _plan(self, endpoint: str, payload: Mapping[str, Any]) -> dict[str, Any]:
+        if endpoint == "responses":
+            instructions = _text_of(payload.get("instructions"))
+            items = payload.get("input")
+            prompt = instructions + "\n" + _text_of(items)
+            tools = [
+                tool.get("name")
+                for tool in payload.get("tools") or []
+                if isinstance(tool, Mapping) and tool.get("type") == "function"
+            ]
+            tool_specs = {
+                tool.get("name"): tool.get("parameters")
+                for tool in payload.get("tools") or []
+                if isinstance(tool, Mapping)
+            }
+            answered = any(
+                isinstance(item, Mapping) and item.get("type") == "function_call_output"
+                for item in (items if isinstance(items, list) else [])
+            )
+            text_format = (payload.get("text") or {}).get("format") or {}
+            schema = (
+                text_format.get("schema")
+                if text_format.get("type") == "json_schema"
+                else None
+            )
+        else:
+            messages = payload.get("messages") or []
+            prompt = _text_of(messages)
+            functions = [
+                tool.get("function") or {}
+                for tool in payload.get("tools") or []
+                if isinstance(tool, Mapping)
+            ]
+            tools = [function.get("name") for function in functions]
+            tool_specs = {
+                function.get("name"): function.get("parameters")
+                for function in functions
+            }
+            answered = any(
+                isinstance(message, Mapping) and message.get("role") == "tool"
+                for message in messages
+            )
+            response_format = payload.get("response_format") or {}
+            schema = (
+                (response_format.get("json_schema") or {}).get("schema")
+                if response_format.get("type") == "json_schema"
+                else None
+            )
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        # Le contenu est déterministe, mais les identifiants doivent rester
+        # uniques : le store ChatKit indexe les éléments par identifiant.
+        response_id = uuid.uuid4().hex
+        if self.config.tool_calls and tools and tools[0] and not answered:
+            self.stats.tool_calls += 1
+            arguments = json.dumps(_schema_instance(tool_specs.get(tools[0])))
+            call = (f"call_{response_id[:24]}", tools[0], arguments)
+            return {"id": response_id, "tool": call}
+
+        text = self._reply(prompt, digest, schema)
+        tokens = _TOKEN_PATTERN.findall(text) or [text]
+        self.stats.output_tokens += len(tokens)
+        return {"id": response_id, "text": text, "tokens": tokens}
+
+    def _reply(self, prompt: str, digest: str, schema: Mapping[str, Any] | None) -> str:
+        for rule in self.config.rules:
+            if rule.pattern.search(prompt):
+                return rule.reply
+        if schema is not None:
+            return json.dumps(_schema_instance(schema), ensure_ascii=False)
+        seed = int(digest[:8], 16)
+        words = [
+            _VOCABULARY[(seed + index * 7) % len(_VOCABULARY)]
+            for index in range(max(1, self.config.output_tokens))
+        ]
+        return " ".join(words).capitalize() + "."
+
+    def _stream_duration(self, plan: Mapping[str, Any]) -> float:
+        rate = self.config.tokens_per_second
+        if rate <= 0:
+            return 0.0
+        return len(plan.get("tokens") or ()) / rate
+
+    async def _pace(self, first: bool) -> None:
+        if first:
+            await asyncio.sleep(self.config.latency)
+        elif self.config.tokens_per_second > 0:
+            await asyncio.sleep(1 / self.config.tokens_per_second)
+
+    @staticmethod
+    async def _sse(events: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+        async for event in events:
+            if event is None:
+                yield b"data: [DONE]\n\n"
+                continue
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode()
+
+    # ── API Responses ────────────────────────────────────────────────────
+
+    @staticmethod
+    def _responses_output(plan: Mapping[str, Any]) -> dict[str, Any]:
+        if "tool" in plan:
+            call_id, name, arguments = plan["tool"]
+            return {
+                "id": f"fc_{plan['id']}",
+                "type": "function_call",
+                "call_id": call_id,
+                "name": name,
+                "arguments": arguments,
+                "status": "completed",
+            }
+        return {
+            "id": f"msg_{plan['id']}",
+            "type": "message",
+            "role": "assistant",
+            "status": "completed",
+            "content": [
+                {"type": "output_text", "text": plan["text"], "annotations": []}
+            ],
+        }
+
+    def _responses_body(
+        self, model: str, plan: Mapping[str, Any], *, output: bool = True
+    ) -> dict[str, Any]:
+        output_tokens = len(plan.get("tokens") or ())
+        return {
+            "id": f"resp_{plan['id']}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed" if output else "in_progress",
+            "output": [self._responses_output(plan)] if output else [],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": 0,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": output_tokens,
+            },
+        }
+
+    async def _responses_events(
+        self, model: str, plan: Mapping[str, Any]
+    ) -> AsyncIterator[dict[str, Any]]:
+        sequence = iter(range(1_000_000))
+        item = self._responses_output(plan)
+        yield {
+            "type": "response.created",
+            "sequence_number": next(sequence),
+            "response": self._responses_body(model, plan, output=False),
+        }
+        await self._pace(first=True)
+        if "tool" in plan:
+            yield {
+                "type": "response.output_item.added",
+                "sequence_number": next(sequence),
+                "output_index": 0,
+                "item": {**item, "arguments": "", "status": "in_progress"},
+            }
+            yield {
+                "type": "response.function_call_arguments.delta",
+                "sequence_number": next(sequence),
+                "item_id": item["id"],
+                "output_index": 0,
+                "delta": item["arguments"],
+            }
+            yield {
+                "type": "response.function_call_arguments.done",
+                "sequence_number": next(sequence),
+                "item_id": item["id"],
+                "output_index": 0,
+                "arguments": item["arguments"],
+            }
+        else:
+            yield {
+                "type": "response.output_item.added",
+                "sequence_number": next(sequence),
+                "output_index": 0,
+                "item": {**item, "content": [], "status": "in_progress"},
+            }
+            empty_part = {"type": "output_text", "text": "", "annotations": []}
+            yield {
+                "type": "response.content_part.added",
+                "sequence_number": next(sequence),
+                "item_id": item["id"],
+                "output_index": 0,
+                "content_index": 0,
+                "part": empty_part,
+            }
+            for index, token in enumerate(plan["tokens"]):
+                if index:
+                    await self._pace(first=False)
+                yield {
+                    "type": "response.output_text.delta",
+                    "sequence_number": next(sequence),
+                    "item_id": item["id"],
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": token,
+                    "logprobs": [],
+                }
+            yield {
+                "type": "response.output_text.done",
+                "sequence_number": next(sequence),
+                "item_id": item["id"],
+                "output_index": 0,
+                "content_index": 0,
+                "text": plan["text"],
+                "logprobs": [],
+            }
+            yield {
+                "type": "response.content_part.done",
+                "sequence_number": next(sequence),
+                "item_id": item["id"],
+                "output_index": 0,
+                "content_index": 0,
+                "part": item["content"][0],
+            }
+        yield {
+            "type": "response.output_item.done",
+            "sequence_number": next(sequence),
+            "output_index": 0,
+            "item": item,
+        }
+        yield {
+            "type": "response.completed",
+            "sequence_number": next(sequence),
+            "response": self._responses_body(model, plan),
+        }
+
+    # ── API Chat Completions ─────────────────────────────────────────────
+
+    def _chat_body(self, model: str, plan: Mapping[str, Any]) -> dict[str, Any]:
+        message: dict[str, Any] = {"role": "assistant", "content": plan.get("text")}
+        finish_reason = "stop"
+        if "tool" in plan:
+            call_id, name, arguments = plan["tool"]
+            message["tool_calls"] = [
+                {
+                    "id": call_id,
+                    "type": "function",
+                    "function": {"name": name, "arguments": arguments},
+                }
+            ]
+            finish_reason = "tool_calls"
+        output_tokens = len(plan.get("tokens") or ())
+        return {
+            "id": f"chatcmpl-{plan['id']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": finish_reason}
+            ],
+            "usage": {
+                "prompt_tokens": 0,
+                "completion_tokens": output_tokens,
+                "total_tokens": output_tokens,
+            },
+        }
+
+    async def _chat_chunks(
+        self, model: str, plan: Mapping[str, Any]
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        base = {
+            "id": f"chatcmpl-{plan['id']}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+        }
+
+        def _chunk(
+            delta: dict[str, Any], finish_reason: str | None = None
+        ) -> dict[str, Any]:
+            return {
+                **base,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+
+        await self._pace(first=True)
+        if "tool" in plan:
+            call_id, name, arguments = plan["tool"]
+            yield _chunk(
+                {
+                    "role": "assistant",
+                    "tool_calls": [
+                        {
+                            "index": 0,
+                            "id": call_id,
+                            "type": "function",
+                            "function": {"name": name, "arguments": arguments},
+                        }
+                    ],
+                }
+            )
+            finish_reason = "tool_calls"
+        else:
+            for index, token in enumerate(plan["tokens"]):
+                if index:
+                    await self._pace(first=False)
+                delta = {"content": token}
+                if not index:
+                    delta["role"] = "assistant"
+                yield _chunk(delta)
+            finish_reason = "stop"
+        final = _chunk({}, finish_reason)
+        final["usage"] = self._chat_body(model, plan)["usage"]
+        yield final
+        yield None
+
+
+def build_fake_client(config: FakeModelConfig | None = None) -> AsyncOpenAI:
+    """Client ``AsyncOpenAI`` branché sur un :class:`FakeModelTransport`."""
+
+    transport = FakeModelTransport(config or FakeModelConfig.from_env())
+    return AsyncOpenAI(
+        api_key="fake",
+        base_url=FAKE_MODEL_API_BASE,
+        http_client=httpx.AsyncClient(transport=transport),
+        max_retries=0,
+    )
+
+
+def fake_transport_of(client: AsyncOpenAI) -> FakeModelTransport | None:
+    """Retourne le transport simulé d'un client, pour lire ses statistiques."""
+
+    transport = getattr(getattr(client, "_client", None), "_transport", None)
+    return transport if isinstance(transport, FakeModelTransport) else None
+
+
+def configure_fake_client(settings: Settings) -> None:
+    """Enregistre le client simulé comme client par défaut du SDK Agents."""
+
+    config = FakeModelConfig.from_env()
+    set_default_openai_client(build_fake_client(config))
+    logger.info(
+        "Client de modèles simulé configuré (latence=%.0f ms, débit=%s jetons/s)",
+        config.latency * 1000,
+        config.tokens_per_second,
+    )
@@ -415,6 +415,9 @@ class SipAccount(Base):
     )
     is_default: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # Cadence des campagnes d'appels sortants (None = valeurs par défaut)
+    max_concurrent_calls: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    calls_per_second: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -1015,6 +1018,16 @@ class OutboundCall(Base):
     )
     trigger_node_slug: Mapped[str | None] = mapped_column(String(128), nullable=True)
 
+    # Campagne (file d'attente persistée des appels à composer)
+    campaign_id: Mapped[str | None] = mapped_column(
+        String(64), nullable=True, index=True
+    )
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    next_attempt_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     # États
     status: Mapped[str] = mapped_column(
         String(32), nullable=False, default="queued", index=True
@@ -1399,6 +1412,40 @@ class LanguageGenerationTask(Base):
     language: Mapped[Language | None] = relationship("Language")
 
 
+class TranslationMemory(Base):
+    """Mémoire de traduction : une chaîne source traduite dans une langue.
+
+    La clé est l'empreinte SHA-256 du texte source, combinée à celle du
+    modèle et du prompt personnalisé ; une chaîne modifiée (ou traduite avec
+    un autre modèle ou un autre prompt) change d'empreinte et sera donc
+    retraduite.
+    """
+
+    __tablename__ = "translation_memory"
+    __table_args__ = (
+        UniqueConstraint(
+            "source_hash", "language_code", name="uq_translation_memory_source_lang"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    source_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    language_code: Mapped[str] = mapped_column(String(2), nullable=False, index=True)
+    source_text: Mapped[str] = mapped_column(Text, nullable=False)
+    translation: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.datetime.now(datetime.UTC),
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.datetime.now(datetime.UTC),
+        onupdate=lambda: datetime.datetime.now(datetime.UTC),
+    )
+
+
 class WorkflowGenerationPrompt(Base):
     """Configuration de prompt pour la génération de workflows.
 
@@ -1579,6 +1626,12 @@ class GitHubRepoSync(Base):
         String(20), nullable=True
     )  # "success", "partial", "failed"
     last_sync_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_tree_sha: Mapped[str | None] = mapped_column(
+        String(40), nullable=True
+    )  # root tree SHA of the last complete pull
+    last_tree_mapping_count: Mapped[int | None] = mapped_column(
+        Integer, nullable=True
+    )  # mappings after that pull
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True),
@@ -0,0 +1,413 @@
+"""Préchauffage des sessions vocales Realtime.
+
+Deux réserves sortent le travail réseau du chemin critique d'ouverture d'une
+session vocale :
+
+* :class:`ClientSecretPool` garde quelques client secrets Realtime déjà émis
+  par configuration de session (fournisseur, modèle, voix, empreinte des
+  instructions et des outils) et suit leur expiration ;
+* :class:`McpServerPool` garde des serveurs MCP déjà connectés pour une liste
+  de configurations, nettoyés s'ils ne sont pas réclamés à temps.
+
+Une ouverture de session prend une ressource prête, attend une préparation
+déjà en cours pour la même clé, ou à défaut l'obtient elle-même comme
+auparavant. Les clés sont calculées par :func:`voice_session_key` et
+:func:`mcp_configs_key` à partir des mêmes paramètres que l'ouverture ; un
+secret est émis au nom d'un utilisateur et n'est donc remis qu'à lui.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from .config import env_float, env_int
+
+logger = logging.getLogger("chatkit.realtime.prewarm")
+
+
+# Secrets gardés prêts par configuration préchauffée (0 désactive la réserve).
+REALTIME_SECRET_POOL_SIZE = env_int("REALTIME_SECRET_POOL_SIZE", 1, minimum=0)
+# Un secret qui expire plus tôt que ce délai (s) n'est plus distribué.
+REALTIME_SECRET_MIN_TTL = env_float("REALTIME_SECRET_MIN_TTL", 10.0)
+# Durée de vie supposée (s) quand la réponse n'indique pas ``expires_at``.
+REALTIME_SECRET_DEFAULT_TTL = env_float("REALTIME_SECRET_DEFAULT_TTL", 60.0)
+# Une configuration reste réapprovisionnée tant qu'elle a servi récemment (s).
+REALTIME_PREWARM_IDLE_TTL = env_float("REALTIME_PREWARM_IDLE_TTL", 300.0)
+REALTIME_PREWARM_MAX_KEYS = env_int("REALTIME_PREWARM_MAX_KEYS", 32, minimum=1)
+# Durée (s) pendant laquelle des serveurs MCP préconnectés attendent une
+# session avant d'être fermés (0 désactive le préchauffage MCP).
+REALTIME_MCP_PREWARM_TTL = env_float("REALTIME_MCP_PREWARM_TTL", 120.0)
+
+
+def _digest(value: Any) -> str:
+    def _default(obj: Any) -> str:
+        # Objets d'outils du SDK : seul leur type et leur nom sont stables.
+        return f"{type(obj).__name__}:{getattr(obj, 'name', '')}"
+
+    encoded = json.dumps(value, sort_keys=True, default=_default, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def voice_session_key(
+    *,
+    user_id: str,
+    model: str,
+    instructions: str,
+    voice: str | None = None,
+    provider_id: str | None = None,
+    provider_slug: str | None = None,
+    realtime: Mapping[str, Any] | None = None,
+    tools: Sequence[Any] | None = None,
+    handoffs: Sequence[Any] | None = None,
+) -> str:
+    """Clé d'un client secret : tout ce qui entre dans la requête d'émission."""
+
+    return _digest(
+        {
+            "user_id": user_id,
+            "provider_id": provider_id or "",
+            "provider_slug": (provider_slug or "").lower(),
+            "model": model,
+            "voice": voice or "",
+            "instructions": hashlib.sha256(
+                instructions.encode("utf-8")
+            ).hexdigest(),
+            "realtime": dict(realtime) if isinstance(realtime, Mapping) else None,
+            "tools": list(tools) if tools else [],
+            "handoffs": list(handoffs) if handoffs else [],
+        }
+    )
+
+
+def mcp_configs_key(configs: Sequence[Mapping[str, Any]]) -> str:
+    """Clé d'un ensemble de serveurs MCP, identifiants compris (hachés)."""
+
+    entries = []
+    for config in configs:
+        entry = {
+            key: value for key, value in config.items() if not key.startswith("__")
+        }
+        context = config.get("__context__")
+        if context is not None:
+            entry["__context__"] = {
+                "server_id": getattr(context, "server_id", None),
+                "server_url": getattr(context, "server_url", None),
+                "transport": getattr(context, "transport", None),
+                "authorization": _digest(getattr(context, "authorization", None)),
+                "token": _digest(getattr(context, "authorization_token", None)),
+                "allowlist": list(getattr(context, "allowlist", None) or ()),
+            }
+        entries.append(entry)
+    return _digest(entries)
+
+
+def client_secret_expires_at(payload: Mapping[str, Any]) -> float | None:
+    """Extrait l'expiration (epoch, secondes) d'une réponse client_secret."""
+
+    candidates: list[Any] = [payload.get("expires_at")]
+    nested = payload.get("client_secret")
+    if isinstance(nested, Mapping):
+        candidates.append(nested.get("expires_at"))
+    for candidate in candidates:
+        if isinstance(candidate, int | float) and not isinstance(candidate, bool):
+            return float(candidate)
+    return None
+
+
+@dataclass(slots=True)
+class _PooledSecret:
+    payload: dict[str, Any]
+    expires_at: float
+
+
+@dataclass
+class _SecretSlot:
+    mint: Callable[[], Awaitable[dict[str, Any]]] | None = None
+    secrets: deque[_PooledSecret] = field(default_factory=deque)
+    inflight: asyncio.Task[None] | None = None
+    warm_until: float = 0.0
+
+
+class ClientSecretPool:
+    """Réserve de client secrets Realtime prêts à l'emploi, par configuration.
+
+    Seules les configurations annoncées par :meth:`prewarm` sont
+    réapprovisionnées, et seulement tant qu'elles servent : une ouverture de
+    session sans préchauffage se comporte exactement comme avant.
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int = REALTIME_SECRET_POOL_SIZE,
+        min_ttl: float = REALTIME_SECRET_MIN_TTL,
+        default_ttl: float = REALTIME_SECRET_DEFAULT_TTL,
+        idle_ttl: float = REALTIME_PREWARM_IDLE_TTL,
+        max_keys: int = REALTIME_PREWARM_MAX_KEYS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._size = size
+        self._min_ttl = min_ttl
+        self._default_ttl = default_ttl
+        self._idle_ttl = idle_ttl
+        self._max_keys = max_keys
+        self._clock = clock
+        self._slots: OrderedDict[str, _SecretSlot] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.minted = 0
+        self.expired = 0
+
+    def _slot(self, key: str) -> _SecretSlot:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _SecretSlot()
+            while len(self._slots) > self._max_keys:
+                _, evicted = self._slots.popitem(last=False)
+                if evicted.inflight is not None:
+                    evicted.inflight.cancel()
+        else:
+            self._slots.move_to_end(key)
+        return slot
+
+    def _pop_valid(self, slot: _SecretSlot) -> dict[str, Any] | None:
+        deadline = self._clock() + self._min_ttl
+        while slot.secrets:
+            entry = slot.secrets.popleft()
+            if entry.expires_at >= deadline:
+                return entry.payload
+            self.expired += 1
+        return None
+
+    async def acquire(
+        self, key: str, mint: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Retourne un secret préémis pour ``key`` ou en émet un avec ``mint``."""
+
+        slot = self._slot(key)
+        payload = self._pop_valid(slot)
+        if payload is None and slot.inflight is not None:
+            # Une émission anticipée est déjà partie : l'attendre est plus
+            # court que d'en lancer une nouvelle.
+            await asyncio.wait({slot.inflight})
+            payload = self._pop_valid(slot)
+        if payload is None:
+            self.misses += 1
+            return await mint()
+        self.hits += 1
+        if slot.mint is not None:
+            slot.warm_until = self._clock() + self._idle_ttl
+        self._schedule_refill(slot)
+        return payload
+
+    def prewarm(
+        self, key: str, mint: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> asyncio.Task[None] | None:
+        """Annonce une session prochaine : émet des secrets en arrière-plan."""
+
+        if self._size <= 0:
+            return None
+        slot = self._slot(key)
+        slot.mint = mint
+        slot.warm_until = self._clock() + self._idle_ttl
+        return self._schedule_refill(slot)
+
+    def _schedule_refill(self, slot: _SecretSlot) -> asyncio.Task[None] | None:
+        if slot.inflight is not None:
+            return slot.inflight
+        if slot.mint is None or self._clock() > slot.warm_until:
+            return None
+        deadline = self._clock() + self._min_ttl
+        valid = sum(1 for entry in slot.secrets if entry.expires_at >= deadline)
+        if valid >= self._size:
+            return None
+        slot.inflight = asyncio.create_task(self._mint_one(slot))
+        return slot.inflight
+
+    async def _mint_one(self, slot: _SecretSlot) -> None:
+        assert slot.mint is not None
+        started = time.perf_counter()
+        try:
+            payload = await slot.mint()
+        except asyncio.CancelledError:
+            slot.inflight = None
+            raise
+        except Exception:
+            slot.inflight = None
+            logger.warning(
+                "Préémission d'un client secret Realtime échouée", exc_info=True
+            )
+            return
+        expires_at = client_secret_expires_at(payload)
+        if expires_at is None:
+            expires_at = self._clock() + self._default_ttl
+        slot.secrets.append(_PooledSecret(payload, expires_at))
+        self.minted += 1
+        slot.inflight = None
+        logger.debug(
+            "Client secret Realtime préémis en %.0f ms (réserve=%d)",
+            (time.perf_counter() - started) * 1000,
+            len(slot.secrets),
+        )
+        self._schedule_refill(slot)
+
+    async def aclose(self) -> None:
+        tasks = [slot.inflight for slot in self._slots.values() if slot.inflight]
+        self._slots.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "minted": self.minted,
+            "expired": self.expired,
+            "pooled": sum(len(slot.secrets) for slot in self._slots.values()),
+            "keys": len(self._slots),
+        }
+
+
+@dataclass
+class _McpSlot:
+    inflight: asyncio.Task[None] | None = None
+    servers: list[Any] | None = None
+    expiry: asyncio.TimerHandle | None = None
+
+
+class McpServerPool:
+    """Serveurs MCP connectés à l'avance pour la prochaine session vocale.
+
+    Chaque préchauffage connecte un jeu de serveurs, remis à une seule
+    session ; faute de preneur après ``ttl`` secondes il est nettoyé.
+    """
+
+    def __init__(self, *, ttl: float = REALTIME_MCP_PREWARM_TTL) -> None:
+        self._ttl = ttl
+        self._slots: dict[str, _McpSlot] = {}
+        self._cleanups: set[asyncio.Task[None]] = set()
+        self.hits = 0
+        self.misses = 0
+
+    async def acquire(
+        self, key: str, connect: Callable[[], Awaitable[list[Any]]]
+    ) -> list[Any]:
+        slot = self._slots.get(key)
+        if slot is not None and slot.inflight is not None:
+            await asyncio.wait({slot.inflight})
+        if (
+            slot is not None
+            and self._slots.get(key) is slot
+            and slot.servers is not None
+        ):
+            del self._slots[key]
+            if slot.expiry is not None:
+                slot.expiry.cancel()
+            self.hits += 1
+            return slot.servers
+        self.misses += 1
+        return await connect()
+
+    def prewarm(
+        self,
+        key: str,
+        connect: Callable[[], Awaitable[list[Any]]],
+        cleanup: Callable[[list[Any]], Awaitable[None]],
+    ) -> asyncio.Task[None] | None:
+        if self._ttl <= 0:
+            return None
+        existing = self._slots.get(key)
+        if existing is not None:
+            return existing.inflight
+        slot = self._slots[key] = _McpSlot()
+        slot.inflight = asyncio.create_task(self._connect(key, slot, connect, cleanup))
+        return slot.inflight
+
+    async def _connect(
+        self,
+        key: str,
+        slot: _McpSlot,
+        connect: Callable[[], Awaitable[list[Any]]],
+        cleanup: Callable[[list[Any]], Awaitable[None]],
+    ) -> None:
+        try:
+            servers = await connect()
+        except asyncio.CancelledError:
+            self._discard(key, slot)
+            raise
+        except Exception:
+            self._discard(key, slot)
+            logger.warning("Préconnexion des serveurs MCP échouée", exc_info=True)
+            return
+        finally:
+            slot.inflight = None
+        if self._slots.get(key) is not slot:
+            await cleanup(servers)
+            return
+        slot.servers = servers
+        slot.expiry = asyncio.get_running_loop().call_later(
+            self._ttl, self._expire, key, slot, cleanup
+        )
+        logger.debug("%d serveur(s) MCP préconnecté(s)", len(servers))
+
+    def _discard(self, key: str, slot: _McpSlot) -> None:
+        if self._slots.get(key) is slot:
+            del self._slots[key]
+
+    def _expire(
+        self,
+        key: str,
+        slot: _McpSlot,
+        cleanup: Callable[[list[Any]], Awaitable[None]],
+    ) -> None:
+        if self._slots.get(key) is not slot or slot.servers is None:
+            return
+        del self._slots[key]
+        logger.debug("Serveurs MCP préconnectés non utilisés : fermeture")
+        task = asyncio.create_task(cleanup(slot.servers))
+        self._cleanups.add(task)
+        task.add_done_callback(self._cleanups.discard)
+
+    async def aclose(self, cleanup: Callable[[list[Any]], Awaitable[None]]) -> None:
+        slots = list(self._slots.values())
+        self._slots.clear()
+        for slot in slots:
+            if slot.inflight is not None:
+                slot.inflight.cancel()
+            if slot.expiry is not None:
+                slot.expiry.cancel()
+        await asyncio.gather(
+            *(slot.inflight for slot in slots if slot.inflight),
+            return_exceptions=True,
+        )
+        for slot in slots:
+            if slot.servers:
+                await cleanup(slot.servers)
+        await asyncio.gather(*self._cleanups, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "ready": sum(
+                1 for slot in self._slots.values() if slot.servers is not None
+            ),
+        }
+
+
+__all__ = [
+    "ClientSecretPool",
+    "McpServerPool",
+    "client_secret_expires_at",
+    "mcp_configs_key",
+    "voice_session_key",
+]
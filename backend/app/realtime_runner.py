@@ -32,6 +32,13 @@ from fastapi import HTTPException, status
 
 from .admin_settings import resolve_model_provider_credentials
 from .config import get_settings
+from .metrics import REALTIME_SESSIONS_ACTIVE
+from .realtime_prewarm import (
+    ClientSecretPool,
+    McpServerPool,
+    mcp_configs_key,
+    voice_session_key,
+)
 from .token_sanitizer import sanitize_value
 from .tool_factory import (
     ResolvedMcpServerContext,
@@ -548,6 +555,7 @@ class RealtimeVoiceSessionRegistry:
             self._sessions[handle.session_id] = handle
             if handle.client_secret:
                 self._sessions_by_secret[handle.client_secret] = handle.session_id
+            REALTIME_SESSIONS_ACTIVE.set(len(self._sessions))
 
     async def remove(
         self,
@@ -564,6 +572,7 @@ class RealtimeVoiceSessionRegistry:
                 handle = self._sessions.pop(target_id, None)
             if handle and handle.client_secret:
                 self._sessions_by_secret.pop(handle.client_secret, None)
+            REALTIME_SESSIONS_ACTIVE.set(len(self._sessions))
             return handle
 
     async def get(self, session_id: str) -> VoiceSessionHandle | None:
@@ -581,6 +590,9 @@ class RealtimeVoiceSessionOrchestrator:
         # Track active sessions by thread_id to prevent SSE connection leaks
         self._sessions_by_thread: dict[str, str] = {}  # thread_id -> session_id
         self._thread_lock = asyncio.Lock()
+        # Secrets et serveurs MCP préparés avant l'ouverture des sessions.
+        self._secret_pool = ClientSecretPool()
+        self._mcp_pool = McpServerPool()
 
     @staticmethod
     def _clean_voice(value: Any) -> str:
@@ -1016,8 +1028,45 @@ class RealtimeVoiceSessionOrchestrator:
         agent_mcp_servers: list[MCPServer] = []
         handle: VoiceSessionHandle | None = None
 
+        secret_key = voice_session_key(
+            user_id=user_id,
+            model=model,
+            instructions=instructions,
+            voice=voice,
+            provider_id=provider_id,
+            provider_slug=provider_slug,
+            realtime=realtime,
+            tools=normalized_tools,
+            handoffs=handoffs,
+        )
+
+        async def _mint_client_secret() -> dict[str, Any]:
+            return await self._request_client_secret(
+                user_id=user_id,
+                model=model,
+                instructions=instructions,
+                voice=voice,
+                provider_id=provider_id,
+                provider_slug=provider_slug,
+                realtime=realtime,
+                tools=normalized_tools,
+                handoffs=handoffs,
+            )
+
         try:
-            agent_mcp_servers = await _connect_mcp_servers(mcp_server_configs)
+            # Le secret et les serveurs MCP sont indépendants : on les obtient
+            # en parallèle, depuis les réserves préchauffées si possible.
+            mcp_result, secret_result = await asyncio.gather(
+                self._acquire_mcp_servers(mcp_server_configs),
+                self._secret_pool.acquire(secret_key, _mint_client_secret),
+                return_exceptions=True,
+            )
+            if not isinstance(mcp_result, BaseException):
+                agent_mcp_servers = mcp_result
+            for result in (mcp_result, secret_result):
+                if isinstance(result, BaseException):
+                    raise result
+            payload = secret_result
 
             agent = self._base_agent.clone(
                 instructions=instructions,
@@ -1031,18 +1080,6 @@ class RealtimeVoiceSessionOrchestrator:
             }
             runner = RealtimeRunner(agent, config=runner_config)
 
-            payload = await self._request_client_secret(
-                user_id=user_id,
-                model=model,
-                instructions=instructions,
-                voice=voice,
-                provider_id=provider_id,
-                provider_slug=provider_slug,
-                realtime=realtime,
-                tools=normalized_tools,
-                handoffs=handoffs,
-            )
-
             session_id = uuid.uuid4().hex
             client_secret = None
             if isinstance(payload, Mapping):
@@ -1140,6 +1177,84 @@ class RealtimeVoiceSessionOrchestrator:
                 await _cleanup_mcp_servers(agent_mcp_servers)
             raise
 
+    async def _acquire_mcp_servers(
+        self, configs: Sequence[Mapping[str, Any]]
+    ) -> list[MCPServer]:
+        if not configs:
+            return await _connect_mcp_servers(configs)
+        return await self._mcp_pool.acquire(
+            mcp_configs_key(configs), lambda: _connect_mcp_servers(configs)
+        )
+
+    def prewarm_voice_session(
+        self,
+        *,
+        user_id: str,
+        model: str,
+        instructions: str,
+        provider_id: str | None = None,
+        provider_slug: str | None = None,
+        voice: str | None = None,
+        realtime: Mapping[str, Any] | None = None,
+        tools: Sequence[Any] | None = None,
+        handoffs: Sequence[Any] | None = None,
+    ) -> None:
+        """Prépare en arrière-plan une session vocale sur le point de s'ouvrir.
+
+        Émet un client secret pour exactement ces paramètres, au nom de
+        ``user_id``, et connecte les serveurs MCP déclarés ;
+        :meth:`open_voice_session` les réutilise s'ils sont prêts (ou en cours
+        de préparation) à l'ouverture pour le même utilisateur.
+        """
+
+        mcp_server_configs: list[dict[str, Any]] = []
+        normalized_tools = _normalize_realtime_tools_payload(
+            tools, mcp_server_configs=mcp_server_configs
+        )
+        secret_key = voice_session_key(
+            user_id=user_id,
+            model=model,
+            instructions=instructions,
+            voice=voice,
+            provider_id=provider_id,
+            provider_slug=provider_slug,
+            realtime=realtime,
+            tools=normalized_tools,
+            handoffs=handoffs,
+        )
+        self._secret_pool.prewarm(
+            secret_key,
+            lambda: self._request_client_secret(
+                user_id=user_id,
+                model=model,
+                instructions=instructions,
+                voice=voice,
+                provider_id=provider_id,
+                provider_slug=provider_slug,
+                realtime=realtime,
+                tools=normalized_tools,
+                handoffs=handoffs,
+            ),
+        )
+        if mcp_server_configs:
+            self._mcp_pool.prewarm(
+                mcp_configs_key(mcp_server_configs),
+                lambda: _connect_mcp_servers(mcp_server_configs),
+                lambda servers: _cleanup_mcp_servers(servers),
+            )
+
+    def prewarm_stats(self) -> dict[str, Any]:
+        return {
+            "client_secrets": self._secret_pool.stats(),
+            "mcp_servers": self._mcp_pool.stats(),
+        }
+
+    async def aclose(self) -> None:
+        """Libère les ressources préchauffées non utilisées."""
+
+        await self._secret_pool.aclose()
+        await self._mcp_pool.aclose(_cleanup_mcp_servers)
+
     async def close_voice_session(
         self,
         *,
@@ -1231,6 +1346,33 @@ async def close_voice_session(
     )
 
 
+def prewarm_voice_session(
+    *,
+    user_id: str,
+    model: str,
+    instructions: str,
+    provider_id: str | None = None,
+    provider_slug: str | None = None,
+    voice: str | None = None,
+    realtime: Mapping[str, Any] | None = None,
+    tools: Sequence[Any] | None = None,
+    handoffs: Sequence[Any] | None = None,
+) -> None:
+    """Prépare une session vocale imminente (client secret, serveurs MCP)."""
+
+    _ORCHESTRATOR.prewarm_voice_session(
+        user_id=user_id,
+        model=model,
+        instructions=instructions,
+        provider_id=provider_id,
+        provider_slug=provider_slug,
+        voice=voice,
+        realtime=realtime,
+        tools=tools,
+        handoffs=handoffs,
+    )
+
+
 async def get_voice_session_handle(session_id: str) -> VoiceSessionHandle | None:
     """Retourne le handle d'une session vocale active si elle existe."""
 
@@ -1248,6 +1390,7 @@ __all__ = [
     "RealtimeVoiceSessionOrchestrator",
     "open_voice_session",
     "close_voice_session",
+    "prewarm_voice_session",
     "get_voice_session_handle",
     "get_realtime_session_orchestrator",
 ]
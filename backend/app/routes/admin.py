@@ -5,6 +5,7 @@ import datetime
 import logging
 import re
 import uuid
+from typing import Any
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
@@ -22,8 +23,10 @@ from ..admin_settings import (
     update_appearance_settings,
     update_lti_tool_settings,
 )
+from ..auth_cache import user_principal_cache
 from ..config import get_settings
 from ..database import SessionLocal, get_session
+from ..database.query_stats import query_budget, query_metrics
 from ..dependencies import require_admin
 from ..i18n_utils import resolve_frontend_i18n_path
 from ..mcp.server_service import McpServerService
@@ -81,6 +84,44 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+@router.get("/api/admin/metrics/db-queries")
+async def get_db_query_metrics(
+    _: User = Depends(require_admin),
+) -> dict[str, dict[str, float]]:
+    """Requêtes SQL cumulées par route HTTP et par méthode du store ChatKit."""
+    return query_metrics.snapshot()
+
+
+@router.get("/api/admin/workflows/traces")
+async def list_workflow_traces(
+    limit: int = 20,
+    _: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """Dernières traces d'exécution échantillonnées (anneau en mémoire)."""
+    from ..workflows.tracing import workflow_tracer
+
+    return {
+        "sample_rate": workflow_tracer.sample_rate,
+        "traces": workflow_tracer.recent(max(1, min(limit, 200))),
+    }
+
+
+@router.get("/api/admin/workflows/traces/{trace_id}")
+async def get_workflow_trace(
+    trace_id: str,
+    _: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """Détail d'une trace : spans et temps cumulé par type de span."""
+    from ..workflows.tracing import workflow_tracer
+
+    trace = workflow_tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Trace introuvable"
+        )
+    return trace
+
+
 @router.get("/api/admin/app-settings", response_model=AppSettingsResponse)
 async def get_app_settings(
     session: Session = Depends(get_session),
@@ -514,6 +555,7 @@ async def update_user(
         session.add(user)
         session.commit()
         session.refresh(user)
+        user_principal_cache.invalidate(user.id)
 
     return user
 
@@ -532,6 +574,7 @@ async def delete_user(
 
     session.delete(user)
     session.commit()
+    user_principal_cache.invalidate(user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -844,6 +887,8 @@ async def create_sip_account(
         contact_transport=payload.contact_transport,
         is_default=payload.is_default,
         is_active=payload.is_active,
+        max_concurrent_calls=payload.max_concurrent_calls,
+        calls_per_second=payload.calls_per_second,
     )
     session.add(account)
     session.commit()
@@ -922,6 +967,10 @@ async def update_sip_account(
     if payload.is_active is not None:
         account.is_active = payload.is_active
         updated = True
+    for field in ("max_concurrent_calls", "calls_per_second"):
+        if field in payload.model_fields_set:
+            setattr(account, field, getattr(payload, field))
+            updated = True
 
     if updated:
         account.updated_at = datetime.datetime.now(datetime.UTC)
@@ -1102,6 +1151,7 @@ class LanguageGenerateRequest(BaseModel):
     provider_slug: str | None = None
     custom_prompt: str | None = None
     save_to_db: bool = False  # Sauvegarder en BD en plus du téléchargement
+    incremental: bool = True  # Réutiliser la mémoire de traduction
 
 
 class LanguagesListResponse(BaseModel):
@@ -1317,7 +1367,8 @@ async def generate_language_file(
         provider_id=provider_id,
         provider_slug=provider_slug,
         custom_prompt=custom_prompt,
-        save_to_db=save_to_db
+        save_to_db=save_to_db,
+        incremental=request.incremental,
     )
 
     return TaskStartedResponse(
@@ -2524,6 +2575,7 @@ def _extract_text_from_content(content: object) -> str:
     "/api/admin/workflows/{workflow_id}/threads",
     response_model=list[WorkflowThreadSummary],
 )
+@query_budget(50)
 async def list_workflow_threads(
     workflow_id: int,
     session: Session = Depends(get_session),
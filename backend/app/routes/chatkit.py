@@ -3,9 +3,11 @@ from __future__ import annotations
 import logging
 import json
 import uuid
+from collections.abc import Callable
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Annotated, Any
+from typing import TYPE_CHECKING, Annotated, Any, TypeVar
 
 from fastapi import (
     APIRouter,
@@ -18,7 +20,7 @@ from fastapi import (
     WebSocket,
     status,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from starlette.requests import ClientDisconnect
 
@@ -61,6 +63,7 @@ except (ModuleNotFoundError, ImportError):  # pragma: no cover - fallback sans S
 
         pass
 
+from .. import file_io
 from ..admin_settings import resolve_appearance_settings
 from ..attachment_store import AttachmentUploadError
 from ..chatkit_server.context import (
@@ -74,7 +77,7 @@ from ..chatkit_sessions import (
     summarize_payload_shape,
 )
 from ..config import Settings, get_settings
-from ..database import SessionLocal, get_session
+from ..database import get_session, run_in_session
 from ..dependencies import get_current_user, get_optional_user
 from ..image_utils import AGENT_IMAGE_STORAGE_DIR
 from ..models import ChatThread, User
@@ -387,12 +390,13 @@ async def create_session(
 @router.get("/api/chatkit/images/{image_name}")
 async def get_generated_image(
     image_name: str,
+    request: Request,
     token: str | None = None,
     current_user: User | None = Depends(get_optional_user),
 ):
     safe_name = Path(image_name).name
     file_path = AGENT_IMAGE_STORAGE_DIR / safe_name
-    if not file_path.is_file():
+    if not await file_io.is_file(file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Image introuvable",
@@ -419,7 +423,13 @@ async def get_generated_image(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Accès à l'image refusé",
             )
-    return FileResponse(file_path)
+    # Les images générées sont immuables : le navigateur peut les garder en cache
+    # et les revalider par ETag.
+    return await file_io.conditional_file_response(
+        request,
+        file_path,
+        headers={"cache-control": "private, max-age=86400"},
+    )
 
 
 @router.get("/api/chatkit/thread-images/{thread_id}/{item_id}/{image_id}")
@@ -614,7 +624,15 @@ async def download_chatkit_attachment(
             detail="Pièce jointe introuvable",
         ) from exc
 
-    return FileResponse(file_path, media_type=mime_type, filename=filename)
+    try:
+        return await file_io.conditional_file_response(
+            request, file_path, media_type=mime_type, filename=filename
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pièce jointe introuvable",
+        ) from exc
 
 
 @router.post(
@@ -945,8 +963,7 @@ async def realtime_voice_gateway_endpoint(websocket: WebSocket) -> None:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    with SessionLocal() as session:
-        user = session.get(User, user_id)
+    user = await run_in_session(lambda session: session.get(User, user_id))
 
     if user is None:
         logger.error(f"WebSocket Realtime: utilisateur {user_id} introuvable")
@@ -1529,6 +1546,17 @@ async def chatkit_endpoint(
 # Branch Management Endpoints
 # =============================================================================
 
+_T = TypeVar("_T")
+
+
+async def _run_branch_service(func: Callable[[BranchService], _T]) -> _T:
+    """Exécute ``func`` avec un BranchService partageant une session unique."""
+
+    def _call(session: Session) -> _T:
+        return func(BranchService(lambda: nullcontext(session)))
+
+    return await run_in_session(_call)
+
 
 @router.get("/api/chatkit/threads/{thread_id}/branches")
 async def list_thread_branches(
@@ -1537,11 +1565,14 @@ async def list_thread_branches(
     current_user: User = Depends(get_current_user),
 ):
     """List all branches for a thread."""
-    branch_service = BranchService(SessionLocal)
     owner_id = str(current_user.id)
 
-    branches = branch_service.list_branches(thread_id, owner_id)
-    current_branch_id = branch_service.get_current_branch_id(thread_id, owner_id)
+    branches, current_branch_id = await _run_branch_service(
+        lambda branch_service: (
+            branch_service.list_branches(thread_id, owner_id),
+            branch_service.get_current_branch_id(thread_id, owner_id),
+        )
+    )
 
     return {
         "branches": branches,
@@ -1587,23 +1618,28 @@ async def create_thread_branch(
         )
     edited_content = body.get("edited_content")
 
-    branch_service = BranchService(SessionLocal)
     owner_id = str(current_user.id)
 
     # Check if we can create a branch (respects max_branches limit if configured)
     # For now, use 0 (unlimited) - this can be made configurable per workflow
-    if not branch_service.can_create_branch(thread_id, owner_id, max_branches=0):
+    if not await _run_branch_service(
+        lambda branch_service: branch_service.can_create_branch(
+            thread_id, owner_id, max_branches=0
+        )
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"error": "Maximum number of branches reached"},
         )
 
-    result = branch_service.create_branch(
-        thread_id=thread_id,
-        fork_after_item_id=fork_after_item_id,
-        edited_item_id=edited_item_id,
-        owner_id=owner_id,
-        name=name,
+    result = await _run_branch_service(
+        lambda branch_service: branch_service.create_branch(
+            thread_id=thread_id,
+            fork_after_item_id=fork_after_item_id,
+            edited_item_id=edited_item_id,
+            owner_id=owner_id,
+            name=name,
+        )
     )
 
     if result is None:
@@ -1626,10 +1662,13 @@ async def switch_thread_branch(
     current_user: User = Depends(get_current_user),
 ):
     """Switch to a different branch."""
-    branch_service = BranchService(SessionLocal)
     owner_id = str(current_user.id)
 
-    result = branch_service.switch_branch(thread_id, branch_id, owner_id)
+    result = await _run_branch_service(
+        lambda branch_service: branch_service.switch_branch(
+            thread_id, branch_id, owner_id
+        )
+    )
 
     if result is None:
         raise HTTPException(
@@ -1648,10 +1687,13 @@ async def get_thread_branch(
     current_user: User = Depends(get_current_user),
 ):
     """Get info about a specific branch."""
-    branch_service = BranchService(SessionLocal)
     owner_id = str(current_user.id)
 
-    result = branch_service.get_branch_info(thread_id, branch_id, owner_id)
+    result = await _run_branch_service(
+        lambda branch_service: branch_service.get_branch_info(
+            thread_id, branch_id, owner_id
+        )
+    )
 
     if result is None:
         raise HTTPException(
@@ -1667,6 +1709,34 @@ async def get_thread_branch(
 # =============================================================================
 
 
+def _resolve_thread_workflow_id(
+    session: Session, thread_id: str
+) -> tuple[bool, int | None]:
+    """Retourne (thread trouvé, identifiant du workflow associé)."""
+
+    from sqlalchemy import select as sa_select
+
+    from ..models import Workflow as WorkflowModel
+
+    thread = session.get(ChatThread, thread_id)
+    if thread is None:
+        return False, None
+    # Resolve workflow_id from thread metadata
+    workflow_slug = thread.workflow_slug
+    if not workflow_slug:
+        payload = thread.payload or {}
+        metadata = payload.get("metadata", {})
+        wf_meta = metadata.get("workflow", {})
+        workflow_slug = wf_meta.get("slug")
+
+    if not workflow_slug:
+        return True, None
+    workflow_id = session.scalar(
+        sa_select(WorkflowModel.id).where(WorkflowModel.slug == workflow_slug)
+    )
+    return True, workflow_id
+
+
 @router.get("/api/chatkit/live-updates/poll")
 async def live_updates_poll(
     thread_id: str,
@@ -1678,37 +1748,15 @@ async def live_updates_poll(
     Returns {"changed": true, "ts": <timestamp>} if the workflow has been
     updated since the given `since` timestamp.  Clients poll every few seconds.
     """
-    from sqlalchemy import select as sa_select
-
     from ..live_updates import live_update_manager
-    from ..models import Workflow as WorkflowModel
-
-    session = SessionLocal()
-    try:
-        thread = session.get(ChatThread, thread_id)
-        if thread is None:
-            return {"changed": False, "ts": 0.0}
-        workflow_slug = thread.workflow_slug
-        if not workflow_slug:
-            payload = thread.payload or {}
-            metadata = payload.get("metadata", {})
-            wf_meta = metadata.get("workflow", {})
-            workflow_slug = wf_meta.get("slug")
-
-        workflow_id: int | None = None
-        if workflow_slug:
-            wf = session.scalar(
-                sa_select(WorkflowModel).where(WorkflowModel.slug == workflow_slug)
-            )
-            if wf:
-                workflow_id = wf.id
-    finally:
-        session.close()
 
-    if workflow_id is None:
+    thread_found, workflow_id = await run_in_session(
+        lambda session: _resolve_thread_workflow_id(session, thread_id)
+    )
+    if not thread_found or workflow_id is None:
         return {"changed": False, "ts": 0.0}
 
-    last_updated = live_update_manager.get_last_updated(workflow_id)
+    last_updated = await live_update_manager.get_last_updated(workflow_id)
     return {"changed": last_updated > since, "ts": last_updated}
 
 
@@ -1716,46 +1764,29 @@ async def live_updates_poll(
 async def live_updates_sse(
     request: Request,
     thread_id: str,
+    last_event_id: str | None = None,
     current_user: User | None = Depends(get_optional_user),
 ):
     """SSE endpoint for receiving live step content updates.
 
     The client provides a thread_id; the backend resolves its workflow_id
-    and subscribes to live updates for that workflow.
+    and subscribes to live updates for that workflow. On reconnection, the
+    ``Last-Event-ID`` header (or ``last_event_id`` query parameter) replays
+    the updates missed in between.
     """
     import asyncio as _asyncio
     import json as _json
 
-    from sqlalchemy import select as sa_select
-
     from ..live_updates import live_update_manager
-    from ..models import Workflow as WorkflowModel
 
-    session = SessionLocal()
-    try:
-        thread = session.get(ChatThread, thread_id)
-        if thread is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Thread not found",
-            )
-        # Resolve workflow_id from thread metadata
-        workflow_slug = thread.workflow_slug
-        if not workflow_slug:
-            payload = thread.payload or {}
-            metadata = payload.get("metadata", {})
-            wf_meta = metadata.get("workflow", {})
-            workflow_slug = wf_meta.get("slug")
-
-        workflow_id: int | None = None
-        if workflow_slug:
-            wf = session.scalar(
-                sa_select(WorkflowModel).where(WorkflowModel.slug == workflow_slug)
-            )
-            if wf:
-                workflow_id = wf.id
-    finally:
-        session.close()
+    thread_found, workflow_id = await run_in_session(
+        lambda session: _resolve_thread_workflow_id(session, thread_id)
+    )
+    if not thread_found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thread not found",
+        )
 
     if workflow_id is None:
         raise HTTPException(
@@ -1763,7 +1794,10 @@ async def live_updates_sse(
             detail="No workflow associated with this thread",
         )
 
-    queue = live_update_manager.subscribe(workflow_id)
+    queue = await live_update_manager.subscribe(
+        workflow_id,
+        last_event_id=request.headers.get("last-event-id") or last_event_id,
+    )
 
     # Cloudflare Tunnel buffers small SSE chunks. We pad events to ~2KB
     # so they exceed the buffering threshold and get flushed immediately.
@@ -1801,7 +1835,8 @@ async def live_updates_sse(
                     "step_slug": event.step_slug,
                     "new_text": event.new_text,
                 })
-                yield _pad_sse(f"data: {data}\n\n")
+                event_id = f"id: {event.event_id}\n" if event.event_id else ""
+                yield _pad_sse(f"{event_id}data: {data}\n\n")
         finally:
             live_update_manager.unsubscribe(workflow_id, queue)
 
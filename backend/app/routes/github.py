@@ -356,6 +356,10 @@ async def update_repo_sync(
         repo_sync.branch = payload.branch
     if payload.file_pattern is not None:
         repo_sync.file_pattern = payload.file_pattern
+    if payload.branch is not None or payload.file_pattern is not None:
+        # Force a full tree diff on the next pull
+        repo_sync.last_tree_sha = None
+        repo_sync.last_tree_mapping_count = None
     if payload.sync_direction is not None:
         repo_sync.sync_direction = payload.sync_direction
     if payload.auto_sync_enabled is not None:
@@ -416,10 +416,13 @@ async def grade_attempt(
         )
         variable_id = f"lab-{attempt.activity_id}"
         client = LTIAGSClient(settings=get_settings(), session_factory=SessionLocal)
-        line_item = await client.ensure_line_item(context=context, variable_id=variable_id,
-            max_score=payload.maximum, comment=payload.feedback)
-        await client.publish_score(context=context, line_item_id=line_item or variable_id,
-            variable_id=variable_id, score=payload.score, max_score=payload.maximum)
+        try:
+            line_item = await client.ensure_line_item(context=context, variable_id=variable_id,
+                max_score=payload.maximum, comment=payload.feedback)
+            await client.publish_score(context=context, line_item_id=line_item or variable_id,
+                variable_id=variable_id, score=payload.score, max_score=payload.maximum)
+        finally:
+            await client.aclose()
         attempt.payload = {**attempt.payload, "ags_status": "published"}
     return _attempt_payload(attempt)
 
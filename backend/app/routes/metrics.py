@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from .. import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request) -> Response:
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Métriques Prometheus indisponibles",
+        )
+    if metrics.METRICS_BEARER_TOKEN is not None:
+        expected = f"Bearer {metrics.METRICS_BEARER_TOKEN}"
+        provided = request.headers.get("authorization", "")
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    # La collecte lit les fichiers multiprocessus et interroge Redis : hors
+    # de la boucle d'événements.
+    payload, content_type = await run_in_threadpool(metrics.render_latest)
+    return Response(content=payload, media_type=content_type)
@@ -11,7 +11,7 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from ..database import get_session
@@ -20,6 +20,10 @@ from ..models import OutboundCall, SipAccount, User, WorkflowDefinition
 from ..security import decode_access_token
 from ..telephony.audio_stream_manager import get_audio_stream_manager
 from ..telephony.outbound_call_manager import get_outbound_call_manager
+from ..telephony.outbound_campaigns import (
+    OUTBOUND_CAMPAIGN_MAX_ATTEMPTS,
+    get_outbound_campaign_dialer,
+)
 
 logger = logging.getLogger("chatkit.routes.outbound")
 
@@ -60,6 +64,24 @@ class InitiateCallRequest(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class CampaignTarget(BaseModel):
+    """Numéro d'une campagne, avec ses métadonnées propres."""
+
+    to_number: str
+    metadata: dict[str, Any] | None = None
+
+
+class CreateCampaignRequest(BaseModel):
+    """Requête pour lancer une campagne d'appels sortants."""
+
+    targets: list[str | CampaignTarget] = Field(min_length=1)
+    voice_workflow_id: int
+    sip_account_id: int | None = None
+    max_attempts: int = Field(default=OUTBOUND_CAMPAIGN_MAX_ATTEMPTS, ge=1, le=10)
+    retry_delay_seconds: float | None = Field(default=None, ge=0)
+    metadata: dict[str, Any] | None = None
+
+
 class CallStatusResponse(BaseModel):
     """Réponse avec le statut d'un appel."""
 
@@ -160,6 +182,89 @@ async def initiate_single_call(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.post("/api/outbound/campaigns")
+async def create_campaign(
+    request: CreateCampaignRequest,
+    db: Session = Depends(get_session),
+    _: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    Met en file une campagne d'appels sortants.
+
+    Les appels sont composés en arrière-plan selon la cadence du compte SIP
+    (appels simultanés, appels par seconde) et relancés s'ils sont occupés
+    ou sans réponse.
+
+    Returns:
+        Identifiant et progression de la campagne
+    """
+    workflow = (
+        db.query(WorkflowDefinition)
+        .filter_by(id=request.voice_workflow_id)
+        .first()
+    )
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    if request.sip_account_id:
+        sip_account = db.query(SipAccount).filter_by(id=request.sip_account_id).first()
+        if not sip_account:
+            raise HTTPException(status_code=404, detail="SIP account not found")
+    else:
+        sip_account = db.query(SipAccount).filter_by(
+            is_default=True, is_active=True
+        ).first()
+        if not sip_account:
+            raise HTTPException(
+                status_code=400, detail="No default SIP account configured"
+            )
+
+    dialer = get_outbound_campaign_dialer()
+    campaign_id = dialer.enqueue_campaign(
+        db,
+        targets=[
+            target if isinstance(target, str) else target.model_dump()
+            for target in request.targets
+        ],
+        workflow_id=request.voice_workflow_id,
+        sip_account_id=sip_account.id,
+        from_number=sip_account.contact_host or "unknown",
+        max_attempts=request.max_attempts,
+        retry_delay=request.retry_delay_seconds,
+        metadata=request.metadata,
+    )
+    dialer.start()
+    return dialer.campaign_stats(db, campaign_id) or {"campaign_id": campaign_id}
+
+
+@router.get("/api/outbound/campaigns/{campaign_id}")
+async def get_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_session),
+    _: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """Récupère la progression d'une campagne d'appels sortants."""
+    stats = get_outbound_campaign_dialer().campaign_stats(db, campaign_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return stats
+
+
+@router.post("/api/outbound/campaigns/{campaign_id}/cancel")
+async def cancel_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_session),
+    _: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """Annule les appels d'une campagne qui n'ont pas encore été composés."""
+    dialer = get_outbound_campaign_dialer()
+    cancelled = dialer.cancel_campaign(db, campaign_id)
+    stats = dialer.campaign_stats(db, campaign_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return {**stats, "cancelled": cancelled}
+
+
 @router.get("/api/outbound/call/{call_id}")
 async def get_call_status(
     call_id: str,
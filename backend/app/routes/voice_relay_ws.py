@@ -7,7 +7,11 @@ and streams audio back.
 Protocol (client ↔ backend):
   Client sends:
     {"type": "start", "workflow_id": 30}          — start session
+    {"type": "start", "workflow_id": 30,
+     "audio_transport": "binary",
+     "audio_format": "pcm16"}                      — start session, binary audio
     {"type": "audio", "data": "<base64 PCM16>"}   — user audio chunk
+    <binary frame>                                 — user audio chunk (binary mode)
     {"type": "switch_workflow", "workflow_id": 42} — switch active workflow
     {"type": "stop"}                               — end session
 
@@ -15,9 +19,15 @@ Protocol (client ↔ backend):
     {"type": "ready"}                              — session established
     {"type": "ready", "workflow_name": "..."}      — session re-established after switch
     {"type": "audio", "data": "<base64 PCM16>"}   — agent audio chunk
+    <binary frame>                                 — agent audio chunk (binary mode)
     {"type": "status", "text": "..."}              — status message
     {"type": "workflows", "data": [...]}           — list of available workflows
     {"type": "error", "message": "..."}            — error
+
+In binary mode (negotiated via ``audio_transport`` in ``start`` and echoed in
+``ready``), audio travels as raw WebSocket binary messages in both directions
+while control events stay JSON. Base64 is only produced for the upstream
+``input_audio_buffer.append`` events required by OpenAI Realtime.
 """
 
 from __future__ import annotations
@@ -39,6 +49,17 @@ from ..database import SessionLocal
 from ..models import User, Workflow, WorkflowDefinition, WorkflowStep
 from ..dependencies import get_current_user
 from ..security import decode_access_token, decode_refresh_token
+from ..voice_relay_framing import (
+    FramingNegotiationError,
+    FramingTimer,
+    InvalidAudioPayloadError,
+    RelayFraming,
+    VoiceRelayStats,
+    client_audio_text,
+    extract_audio_delta,
+    upstream_append_from_bytes,
+    upstream_append_from_client,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -146,6 +167,7 @@ def _build_session_config(
     tools: list[dict[str, Any]],
     voice: str = "ash",
     model: str = "gpt-realtime-1.5",
+    audio_format: str = "pcm16",
 ) -> dict[str, Any]:
     """Build the session.update payload for OpenAI Realtime."""
     from .workflows import _get_admin_voice_tools_definitions, _get_config_fields, _get_editable_fields
@@ -220,8 +242,8 @@ def _build_session_config(
             "modalities": ["audio", "text"],
             "instructions": instructions,
             "voice": voice,
-            "input_audio_format": "pcm16",
-            "output_audio_format": "pcm16",
+            "input_audio_format": audio_format,
+            "output_audio_format": audio_format,
             "input_audio_transcription": {"model": "gpt-4o-mini-transcribe"},
             "tools": tools,
             "turn_detection": {
@@ -263,6 +285,8 @@ async def voice_relay_websocket(websocket: WebSocket):
     logger.info("[VOICE_RELAY] Client connected")
 
     openai_ws = None
+    framing = RelayFraming()
+    stats = VoiceRelayStats()
 
     async def _load_workflow_context(wf_id: int):
         """Load workflow, steps, tools and build session config. Returns (config, workflow_name) or raises."""
@@ -288,7 +312,9 @@ async def voice_relay_websocket(websocket: WebSocket):
             ).all()
 
             tools_defs = _get_admin_voice_tools_definitions()
-            config = _build_session_config(workflow, steps, tools_defs)
+            config = _build_session_config(
+                workflow, steps, tools_defs, audio_format=framing.audio_format
+            )
             return config, workflow.display_name
         finally:
             db.close()
@@ -317,6 +343,13 @@ async def voice_relay_websocket(websocket: WebSocket):
             await websocket.send_json({"type": "error", "message": "Missing workflow_id"})
             return
 
+        try:
+            framing = RelayFraming.negotiate(raw)
+        except FramingNegotiationError as exc:
+            await websocket.send_json({"type": "error", "message": str(exc)})
+            return
+        stats.binary = framing.binary
+
         session_config, wf_name = await _load_workflow_context(workflow_id)
         if not session_config:
             await websocket.send_json({"type": "error", "message": "Workflow not found or no active definition"})
@@ -341,7 +374,7 @@ async def voice_relay_websocket(websocket: WebSocket):
 
         # Configure the session
         await openai_ws.send(json.dumps(session_config))
-        await websocket.send_json({"type": "ready", "workflow_name": wf_name})
+        await websocket.send_json(framing.ready_payload(workflow_name=wf_name))
 
         # Shared state for workflow switching
         switch_event = asyncio.Event()
@@ -353,14 +386,35 @@ async def voice_relay_websocket(websocket: WebSocket):
             nonlocal workflow_id
             try:
                 while True:
-                    msg = await websocket.receive_json()
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        raise WebSocketDisconnect(message.get("code", 1000))
+
+                    chunk = message.get("bytes")
+                    if chunk is not None:
+                        # Binary frame: raw audio, base64 only for upstream
+                        with FramingTimer(stats):
+                            event = upstream_append_from_bytes(chunk)
+                        stats.record_inbound(len(chunk), len(event))
+                        await openai_ws.send(event)
+                        continue
+
+                    text = message.get("text") or ""
+                    msg = json.loads(text)
+                    if not isinstance(msg, dict):
+                        continue
                     msg_type = msg.get("type")
 
                     if msg_type == "audio":
-                        await openai_ws.send(json.dumps({
-                            "type": "input_audio_buffer.append",
-                            "audio": msg["data"],
-                        }))
+                        try:
+                            event = upstream_append_from_client(msg.get("data"))
+                        except InvalidAudioPayloadError as exc:
+                            await websocket.send_json(
+                                {"type": "error", "message": str(exc)}
+                            )
+                            continue
+                        stats.record_inbound(len(text), len(event))
+                        await openai_ws.send(event)
                     elif msg_type == "switch_workflow":
                         # Client explicitly requests workflow switch
                         switch_target["workflow_id"] = msg.get("workflow_id")
@@ -378,18 +432,26 @@ async def voice_relay_websocket(websocket: WebSocket):
             nonlocal workflow_id
             try:
                 async for raw_msg in openai_ws:
+                    with FramingTimer(stats):
+                        delta = extract_audio_delta(raw_msg)
+                        if delta and framing.binary:
+                            frame = base64.b64decode(delta)
+                    if delta is not None:
+                        if not delta:
+                            continue
+                        if framing.binary:
+                            stats.record_outbound(len(frame))
+                            await websocket.send_bytes(frame)
+                        else:
+                            text = client_audio_text(delta)
+                            stats.record_outbound(len(text))
+                            await websocket.send_text(text)
+                        continue
+
                     event = json.loads(raw_msg)
                     event_type = event.get("type", "")
 
-                    if event_type == "response.audio.delta":
-                        delta = event.get("delta", "")
-                        if delta:
-                            await websocket.send_json({
-                                "type": "audio",
-                                "data": delta,
-                            })
-
-                    elif event_type == "response.function_call_arguments.done":
+                    if event_type == "response.function_call_arguments.done":
                         call_id = event.get("call_id", "")
                         tool_name = event.get("name", "")
                         args_str = event.get("arguments", "{}")
@@ -516,10 +578,7 @@ async def voice_relay_websocket(websocket: WebSocket):
                 max_size=None,
             )
             await openai_ws.send(json.dumps(new_config))
-            await websocket.send_json({
-                "type": "ready",
-                "workflow_name": new_name,
-            })
+            await websocket.send_json(framing.ready_payload(workflow_name=new_name))
             logger.info(f"[VOICE_RELAY] Switched to workflow '{new_name}' (id={new_wf_id})")
 
     except WebSocketDisconnect:
@@ -529,4 +588,4 @@ async def voice_relay_websocket(websocket: WebSocket):
     finally:
         if openai_ws:
             await openai_ws.close()
-        logger.info("[VOICE_RELAY] Session ended")
+        logger.info("[VOICE_RELAY] Session ended: %s", stats.as_dict())
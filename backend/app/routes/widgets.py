@@ -23,6 +23,13 @@ from ..widgets import (
 router = APIRouter()
 
 
+def _invalidate_compiled_plans() -> None:
+    # Les plans compilés embarquent le modèle de sortie dérivé du widget.
+    from ..workflows.runtime.plan import clear_compiled_plans
+
+    clear_compiled_plans()
+
+
 def _serialize_widget(widget: WidgetTemplateEntry) -> WidgetTemplateResponse:
     return WidgetTemplateResponse.model_validate(widget.as_response())
 
@@ -92,6 +99,7 @@ async def create_widget(
     except Exception as exc:  # pragma: no cover - mutualisé via _handle_widget_error
         _handle_widget_error(exc)
     session.commit()
+    _invalidate_compiled_plans()
     return _serialize_widget(widget)
 
 
@@ -134,6 +142,7 @@ async def update_widget(
     except Exception as exc:  # pragma: no cover - mutualisé via _handle_widget_error
         _handle_widget_error(exc)
     session.commit()
+    _invalidate_compiled_plans()
     return _serialize_widget(widget)
 
 
@@ -149,6 +158,7 @@ async def delete_widget(
     except Exception as exc:  # pragma: no cover - mutualisé via _handle_widget_error
         _handle_widget_error(exc)
     session.commit()
+    _invalidate_compiled_plans()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -67,6 +67,8 @@ manager = ConnectionManager()
 DEFAULT_THREAD_SCAN_LIMIT = 500
 MAX_THREAD_SCAN_LIMIT = 2000
 DEFAULT_LOOKBACK_HOURS: int | None = None
+# Résumés des dernières traces échantillonnées joints à chaque mise à jour
+MONITOR_TRACE_LIMIT = 20
 
 
 def _parse_int_query(value: str | None, *, default: int | None, min_value: int, max_value: int) -> int | None:
@@ -344,6 +346,7 @@ async def workflow_monitor_websocket(
     WebSocket lifetime, causing connection pool exhaustion.
     """
     from ..database import SessionLocal
+    from ..workflows.tracing import workflow_tracer
 
     # Vérifier l'authentification via token
     token = websocket.query_params.get("token")
@@ -403,6 +406,7 @@ async def workflow_monitor_websocket(
             "data": {
                 "sessions": sessions,
                 "total_count": len(sessions),
+                "traces": workflow_tracer.recent(MONITOR_TRACE_LIMIT),
             }
         })
 
@@ -421,6 +425,7 @@ async def workflow_monitor_websocket(
                     "data": {
                         "sessions": sessions,
                         "total_count": len(sessions),
+                        "traces": workflow_tracer.recent(MONITOR_TRACE_LIMIT),
                     }
                 })
 
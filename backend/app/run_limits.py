@@ -0,0 +1,540 @@
+"""Admission control for agent runs: concurrency slots and rolling token budgets.
+
+``rate_limit.py`` counts HTTP requests; what actually runs out is provider
+quota. :class:`RunLimiter` admits or queues workflow runs per *scope* (the
+user, the LTI course context and the workflow), each with an optional limit
+on concurrent runs and an optional token budget over a rolling window. Token
+usage is recorded when a run's task finishes, from the totals the executor
+accumulated so far: failed and cancelled runs are charged too.
+
+Waiting runs are served first-in first-out within a scope; a run blocked on
+one scope does not hold up runs that share no scope with it. While waiting,
+:meth:`RunLimiter.queue` yields the run's queue position so the caller can
+tell the user.
+
+Two stores are available (``RUN_LIMITS_BACKEND=memory|redis``):
+
+* :class:`MemoryRunLimitStore` keeps slots and usage in process.
+* :class:`RedisRunLimitStore` shares them across uvicorn workers. Admission is
+  one Lua script, slots are leases refreshed while the run is alive, and
+  Redis outages fail open.
+
+Every limit defaults to 0 (unlimited); set the ``RUN_LIMIT_*`` variables to
+enable them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from .config import env_float, env_int
+
+logger = logging.getLogger("chatkit.run_limits")
+
+
+RUN_LIMITS_BACKEND = os.getenv("RUN_LIMITS_BACKEND", "memory").strip().lower()
+RUN_LIMITS_REDIS_URL = os.getenv("RUN_LIMITS_REDIS_URL") or os.getenv(
+    "CELERY_BROKER_URL", "redis://localhost:6379/0"
+)
+RUN_LIMIT_TOKEN_WINDOW = max(1.0, env_float("RUN_LIMIT_TOKEN_WINDOW", 3600.0))
+RUN_LIMIT_QUEUE_TIMEOUT = max(0.0, env_float("RUN_LIMIT_QUEUE_TIMEOUT", 120.0))
+RUN_LIMIT_LEASE_SECONDS = max(5.0, env_float("RUN_LIMIT_LEASE_SECONDS", 60.0))
+
+SCOPE_KINDS = ("user", "context", "workflow")
+
+
+@dataclass(frozen=True)
+class ScopeLimits:
+    """Limits applied to every scope of one kind (0 disables a limit)."""
+
+    max_concurrent: int = 0
+    token_budget: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0 or self.token_budget > 0
+
+
+def limits_from_env() -> dict[str, ScopeLimits]:
+    return {
+        kind: ScopeLimits(
+            max_concurrent=env_int(
+                f"RUN_LIMIT_{kind.upper()}_CONCURRENT", 0, minimum=0
+            ),
+            token_budget=env_int(f"RUN_LIMIT_{kind.upper()}_TOKENS", 0, minimum=0),
+        )
+        for kind in SCOPE_KINDS
+    }
+
+
+@dataclass(frozen=True)
+class RunScope:
+    """One limited dimension of a run, e.g. ``user:42`` or ``workflow:quiz``."""
+
+    key: str
+    max_concurrent: int = 0
+    token_budget: int = 0
+
+
+class RunLimitExceeded(RuntimeError):
+    """Raised when a run could not be admitted before the queue timeout."""
+
+    def __init__(self, scope: RunScope, reason: str) -> None:
+        super().__init__(f"Run limit reached for {scope.key} ({reason})")
+        self.scope = scope
+        self.reason = reason
+
+
+class RunLimitStore(Protocol):
+    async def try_acquire(
+        self, run_id: str, scopes: Sequence[RunScope], window: float
+    ) -> tuple[RunScope, str] | None:
+        """Take a slot in every scope, or return the blocking scope and reason
+        (``"concurrency"`` or ``"tokens"``) without taking anything."""
+
+    async def refresh(self, run_id: str, scopes: Sequence[RunScope]) -> None: ...
+
+    async def release(self, run_id: str, scopes: Sequence[RunScope]) -> None: ...
+
+    async def record_tokens(
+        self, run_id: str, scopes: Sequence[RunScope], tokens: int, window: float
+    ) -> None: ...
+
+    async def usage(self, scope_key: str, window: float) -> dict[str, int]: ...
+
+    async def aclose(self) -> None: ...
+
+
+class MemoryRunLimitStore:
+    """Single-process store: slot sets and timestamped token entries."""
+
+    lease_seconds: float | None = None
+
+    def __init__(self, *, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._slots: dict[str, set[str]] = {}
+        self._tokens: dict[str, deque[tuple[float, int]]] = {}
+
+    def _used_tokens(self, key: str, window: float) -> int:
+        entries = self._tokens.get(key)
+        if not entries:
+            return 0
+        horizon = self._clock() - window
+        while entries and entries[0][0] <= horizon:
+            entries.popleft()
+        return sum(tokens for _, tokens in entries)
+
+    async def try_acquire(self, run_id, scopes, window):
+        for scope in scopes:
+            running = self._slots.get(scope.key, ())
+            if scope.max_concurrent and len(running) >= scope.max_concurrent:
+                return scope, "concurrency"
+            if scope.token_budget and (
+                self._used_tokens(scope.key, window) >= scope.token_budget
+            ):
+                return scope, "tokens"
+        for scope in scopes:
+            self._slots.setdefault(scope.key, set()).add(run_id)
+        return None
+
+    async def refresh(self, run_id, scopes) -> None:
+        pass
+
+    async def release(self, run_id, scopes) -> None:
+        for scope in scopes:
+            slots = self._slots.get(scope.key)
+            if slots is not None:
+                slots.discard(run_id)
+                if not slots:
+                    del self._slots[scope.key]
+
+    async def record_tokens(self, run_id, scopes, tokens, window) -> None:
+        now = self._clock()
+        for scope in scopes:
+            self._tokens.setdefault(scope.key, deque()).append((now, tokens))
+
+    async def usage(self, scope_key, window):
+        return {
+            "running": len(self._slots.get(scope_key, ())),
+            "tokens": self._used_tokens(scope_key, window),
+        }
+
+    async def aclose(self) -> None:
+        pass
+
+
+# KEYS: the slot sorted sets, then the token sorted sets (n of each).
+# ARGV: run_id, now, lease expiry, window start, n, then limit/budget pairs.
+# Returns 0 when admitted, i (1-based) when scope i is out of slots, -i when
+# scope i is out of tokens.
+_ACQUIRE_SCRIPT = """
+local n = tonumber(ARGV[5])
+for i = 1, n do
+  local limit = tonumber(ARGV[4 + 2 * i])
+  local budget = tonumber(ARGV[5 + 2 * i])
+  redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', ARGV[2])
+  if limit > 0 and redis.call('ZCARD', KEYS[i]) >= limit then
+    return i
+  end
+  if budget > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[n + i], '-inf', ARGV[4])
+    local used = 0
+    for _, member in ipairs(redis.call('ZRANGE', KEYS[n + i], 0, -1)) do
+      used = used + tonumber(string.match(member, ':(%d+)$'))
+    end
+    if used >= budget then
+      return -i
+    end
+  end
+end
+for i = 1, n do
+  redis.call('ZADD', KEYS[i], ARGV[3], ARGV[1])
+  redis.call('EXPIREAT', KEYS[i], math.ceil(tonumber(ARGV[3])))
+end
+return 0
+"""
+
+
+class RedisRunLimitStore:
+    """Store shared by all workers.
+
+    Slots are sorted-set members scored by lease expiry: a worker that dies
+    mid-run stops refreshing and its slots free themselves. Token usage is a
+    sorted set of ``run_id:tokens`` members scored by completion time.
+    """
+
+    def __init__(
+        self,
+        client: Any | None = None,
+        *,
+        url: str = RUN_LIMITS_REDIS_URL,
+        prefix: str = "chatkit:run_limits",
+        lease_seconds: float = RUN_LIMIT_LEASE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if client is None:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(url, decode_responses=True)
+        self._redis = client
+        self._prefix = prefix
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+
+    def _slots_key(self, key: str) -> str:
+        return f"{self._prefix}:slots:{key}"
+
+    def _tokens_key(self, key: str) -> str:
+        return f"{self._prefix}:tokens:{key}"
+
+    async def try_acquire(self, run_id, scopes, window):
+        now = self._clock()
+        args: list[Any] = [
+            run_id, now, now + self.lease_seconds, now - window, len(scopes)
+        ]
+        for scope in scopes:
+            args.extend((scope.max_concurrent, scope.token_budget))
+        keys = [self._slots_key(s.key) for s in scopes] + [
+            self._tokens_key(s.key) for s in scopes
+        ]
+        try:
+            result = int(await self._acquire(keys=keys, args=args))
+        except Exception as exc:
+            logger.warning("Redis unavailable, admitting run without limits: %s", exc)
+            return None
+        if result == 0:
+            return None
+        return scopes[abs(result) - 1], "concurrency" if result > 0 else "tokens"
+
+    async def refresh(self, run_id, scopes) -> None:
+        expiry = self._clock() + self.lease_seconds
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.zadd(self._slots_key(scope.key), {run_id: expiry}, xx=True)
+                await pipe.execute()
+        except Exception as exc:
+            logger.warning("Could not refresh run lease %s: %s", run_id, exc)
+
+    async def release(self, run_id, scopes) -> None:
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.zrem(self._slots_key(scope.key), run_id)
+                await pipe.execute()
+        except Exception as exc:
+            logger.warning("Could not release run slots %s: %s", run_id, exc)
+
+    async def record_tokens(self, run_id, scopes, tokens, window) -> None:
+        now = self._clock()
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    key = self._tokens_key(scope.key)
+                    pipe.zadd(key, {f"{run_id}:{tokens}": now})
+                    pipe.expireat(key, int(now + window) + 1)
+                await pipe.execute()
+        except Exception as exc:
+            logger.warning("Could not record token usage for %s: %s", run_id, exc)
+
+    async def usage(self, scope_key, window):
+        now = self._clock()
+        running = await self._redis.zcount(self._slots_key(scope_key), now, "+inf")
+        members = await self._redis.zrangebyscore(
+            self._tokens_key(scope_key), now - window, "+inf"
+        )
+        tokens = sum(int(member.rsplit(":", 1)[1]) for member in members)
+        return {"running": int(running), "tokens": tokens}
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+
+@dataclass(eq=False)
+class _Waiter:
+    run_id: str
+    scopes: tuple[RunScope, ...]
+    keys: frozenset[str]
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    granted: bool = False
+    blocked: tuple[RunScope, str] | None = None
+
+
+# Releases scheduled from done callbacks, kept alive until they finish.
+_pending_releases: set[asyncio.Task[None]] = set()
+
+
+class RunTicket:
+    """An admitted run; release it with the tokens the run consumed."""
+
+    def __init__(
+        self, limiter: RunLimiter, run_id: str, scopes: tuple[RunScope, ...]
+    ) -> None:
+        self.run_id = run_id
+        self.scopes = scopes
+        self._limiter = limiter
+        self._released = False
+        self._heartbeat: asyncio.Task[None] | None = None
+        lease = getattr(limiter.store, "lease_seconds", None)
+        if lease and scopes:
+            self._heartbeat = asyncio.create_task(self._keep_alive(lease / 3))
+
+    async def _keep_alive(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self._limiter.store.refresh(self.run_id, self.scopes)
+
+    async def release(self, tokens: int = 0) -> None:
+        if self._released:
+            return
+        self._released = True
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        await self._limiter._release(self, tokens)
+
+    def release_when_done(
+        self, task: asyncio.Future[Any], tokens: Callable[[], int]
+    ) -> None:
+        """Release the ticket once ``task`` finishes, charging ``tokens()``.
+
+        Unlike a ``finally`` in the run's coroutine, a done callback also fires
+        when the task is cancelled before its first step.
+        """
+
+        def _release(_task: asyncio.Future[Any]) -> None:
+            pending = asyncio.ensure_future(self.release(tokens()))
+            _pending_releases.add(pending)
+            pending.add_done_callback(_pending_releases.discard)
+
+        task.add_done_callback(_release)
+
+
+class RunLimiter:
+    """Admits runs against a :class:`RunLimitStore`, queueing the overflow."""
+
+    def __init__(
+        self,
+        store: RunLimitStore | None = None,
+        *,
+        limits: dict[str, ScopeLimits] | None = None,
+        token_window: float = RUN_LIMIT_TOKEN_WINDOW,
+        queue_timeout: float = RUN_LIMIT_QUEUE_TIMEOUT,
+        poll_interval: float = 0.5,
+    ) -> None:
+        self.store: RunLimitStore = store or MemoryRunLimitStore()
+        self.limits = limits if limits is not None else limits_from_env()
+        self.token_window = token_window
+        self.queue_timeout = queue_timeout
+        self._poll_interval = poll_interval
+        self._waiters: list[_Waiter] = []
+        self._pump_lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return any(limits.enabled for limits in self.limits.values())
+
+    def scopes_for(
+        self,
+        *,
+        user_id: str | None = None,
+        context_id: str | None = None,
+        workflow: str | None = None,
+    ) -> tuple[RunScope, ...]:
+        """Build the limited scopes of a run; unset or unlimited ones are skipped."""
+        values = {"user": user_id, "context": context_id, "workflow": workflow}
+        scopes = []
+        for kind in SCOPE_KINDS:
+            limits = self.limits.get(kind)
+            value = values[kind]
+            if value and limits is not None and limits.enabled:
+                scopes.append(
+                    RunScope(
+                        f"{kind}:{value}", limits.max_concurrent, limits.token_budget
+                    )
+                )
+        return tuple(scopes)
+
+    def queue_length(self) -> int:
+        return len(self._waiters)
+
+    async def usage(self, scope_key: str) -> dict[str, int]:
+        return await self.store.usage(scope_key, self.token_window)
+
+    async def admit(self, scopes: Iterable[RunScope]) -> RunTicket:
+        """Wait for admission without reporting queue positions."""
+        async with contextlib.aclosing(self.queue(scopes)) as admissions:
+            async for admission in admissions:
+                if isinstance(admission, RunTicket):
+                    return admission
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def queue(
+        self, scopes: Iterable[RunScope], *, timeout: float | None = None
+    ) -> AsyncIterator[int | RunTicket]:
+        """Yield the run's queue position whenever it changes, then its ticket.
+
+        The ticket is always the last item. Raises :class:`RunLimitExceeded`
+        when the run is still queued after ``timeout`` (defaults to
+        ``queue_timeout``). Use with ``contextlib.aclosing`` so that an
+        abandoned run leaves the queue at once.
+        """
+        scopes = tuple(scopes)
+        run_id = uuid.uuid4().hex
+        if not scopes:
+            yield RunTicket(self, run_id, scopes)
+            return
+
+        waiter = _Waiter(run_id, scopes, frozenset(s.key for s in scopes))
+        self._waiters.append(waiter)
+        handed_over = False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.queue_timeout if timeout is None else timeout)
+        last_position = 0
+        try:
+            while True:
+                await self._pump()
+                if waiter.granted:
+                    break
+                position = self._position(waiter)
+                if position != last_position:
+                    last_position = position
+                    yield position
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    scope, reason = waiter.blocked or (scopes[0], "concurrency")
+                    raise RunLimitExceeded(scope, reason)
+                await self._wait(waiter, min(self._poll_interval, remaining))
+            ticket = RunTicket(self, run_id, scopes)
+            handed_over = True
+            yield ticket
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._wake_all()
+            if waiter.granted and not handed_over:
+                await self.store.release(run_id, scopes)
+                self._wake_all()
+
+    @staticmethod
+    async def _wait(waiter: _Waiter, timeout: float) -> None:
+        waiter.wakeup.clear()
+        # ``asyncio.wait`` rather than ``wait_for``: it never swallows a
+        # cancellation of the queued run.
+        wakeup = asyncio.ensure_future(waiter.wakeup.wait())
+        try:
+            await asyncio.wait({wakeup}, timeout=timeout)
+        finally:
+            wakeup.cancel()
+
+    def _position(self, waiter: _Waiter) -> int:
+        """1 + the number of earlier waiters sharing a scope with ``waiter``."""
+        ahead = itertools.takewhile(lambda other: other is not waiter, self._waiters)
+        return 1 + sum(1 for other in ahead if other.keys & waiter.keys)
+
+    async def _pump(self) -> None:
+        """Admit queued runs in order, skipping those behind a blocked scope."""
+        async with self._pump_lock:
+            blocked_keys: set[str] = set()
+            for waiter in list(self._waiters):
+                if waiter.granted or waiter not in self._waiters:
+                    continue
+                if waiter.keys & blocked_keys:
+                    blocked_keys |= waiter.keys
+                    continue
+                blocking = await self.store.try_acquire(
+                    waiter.run_id, waiter.scopes, self.token_window
+                )
+                if blocking is None:
+                    waiter.granted = True
+                    self._waiters.remove(waiter)
+                    waiter.wakeup.set()
+                else:
+                    waiter.blocked = blocking
+                    blocked_keys |= waiter.keys
+
+    async def _release(self, ticket: RunTicket, tokens: int) -> None:
+        if not ticket.scopes:
+            return
+        await self.store.release(ticket.run_id, ticket.scopes)
+        if tokens > 0:
+            await self.store.record_tokens(
+                ticket.run_id, ticket.scopes, tokens, self.token_window
+            )
+        self._wake_all()
+
+    def _wake_all(self) -> None:
+        for waiter in self._waiters:
+            waiter.wakeup.set()
+
+    async def aclose(self) -> None:
+        await self.store.aclose()
+
+
+def create_run_limiter(backend: str = RUN_LIMITS_BACKEND) -> RunLimiter:
+    if backend == "redis":
+        logger.info("Run limits use Redis at %s", RUN_LIMITS_REDIS_URL)
+        return RunLimiter(RedisRunLimitStore())
+    if backend != "memory":
+        logger.warning("Unknown RUN_LIMITS_BACKEND %r, using memory", backend)
+    return RunLimiter()
+
+
+_run_limiter: RunLimiter | None = None
+
+
+def get_run_limiter() -> RunLimiter:
+    global _run_limiter
+    if _run_limiter is None:
+        _run_limiter = create_run_limiter()
+    return _run_limiter
@@ -735,6 +735,8 @@ class SipAccountBase(BaseModel):
     contact_transport: Literal["udp", "tcp", "tls"] | None = "udp"
     is_default: bool = False
     is_active: bool = True
+    max_concurrent_calls: int | None = Field(default=None, ge=1)
+    calls_per_second: float | None = Field(default=None, ge=0)
 
     @field_validator("trunk_uri")
     @classmethod
@@ -775,6 +777,8 @@ class SipAccountUpdateRequest(BaseModel):
     contact_transport: Literal["udp", "tcp", "tls"] | None = None
     is_default: bool | None = None
     is_active: bool | None = None
+    max_concurrent_calls: int | None = Field(default=None, ge=1)
+    calls_per_second: float | None = Field(default=None, ge=0)
 
 
 class SipAccountResponse(SipAccountBase):
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import time
 import uuid
 from collections.abc import Callable
 from typing import Any
@@ -23,6 +24,7 @@ from ..database import (
     wait_for_database,
 )
 from ..database.ad_hoc_migrations import run_ad_hoc_migrations
+from ..database.schema_version import ensure_schema_up_to_date, leader_lock
 from ..docs import DocumentationService
 from ..migrations import check_and_apply_migrations
 from ..model_providers import configure_model_provider
@@ -418,84 +420,132 @@ def configure_sip_layer(
     return sip_contact_host, sip_contact_port
 
 
+def _run_schema_sweep() -> None:
+    """Balayage complet du schéma, exécuté uniquement par le worker leader."""
+
+    ensure_database_extensions()
+    Base.metadata.create_all(bind=engine)
+    check_and_apply_migrations()
+    run_ad_hoc_migrations()
+    ensure_vector_indexes()
+
+
+def _ensure_initial_admin() -> None:
+    if not (settings.admin_email and settings.admin_password):
+        return
+    normalized_email = settings.admin_email.lower()
+    with SessionLocal() as session:
+        existing = session.scalar(select(User).where(User.email == normalized_email))
+        if not existing:
+            logger.info("Creating initial admin user %s", normalized_email)
+            user = User(
+                email=normalized_email,
+                password_hash=hash_password(settings.admin_password),
+                is_admin=True,
+            )
+            session.add(user)
+            session.commit()
+
+
+def _seed_documentation() -> None:
+    if not settings.docs_seed_documents:
+        return
+    with SessionLocal() as session:
+        service = DocumentationService(session)
+        for seed in settings.docs_seed_documents:
+            slug = str(seed.get("slug") or "").strip()
+            if not slug:
+                logger.warning("Entrée de seed documentation ignorée : slug manquant")
+                continue
+            if service.get_document(slug) is not None:
+                continue
+            metadata = {
+                key: value
+                for key, value in seed.items()
+                if key
+                not in {
+                    "slug",
+                    "title",
+                    "summary",
+                    "language",
+                    "content_markdown",
+                }
+            }
+            try:
+                service.create_document(
+                    slug,
+                    title=seed.get("title"),
+                    summary=seed.get("summary"),
+                    language=seed.get("language"),
+                    content_markdown=seed.get("content_markdown"),
+                    metadata=metadata,
+                )
+                session.commit()
+                logger.info("Document de documentation initial importé : %s", slug)
+            except Exception as exc:  # pragma: no cover - dépend externe
+                session.rollback()
+                logger.warning(
+                    "Impossible d'ingérer le document de seed %s : %s",
+                    slug,
+                    exc,
+                )
+
+
+def run_startup_seeding() -> bool:
+    """Initialise les données de référence (idempotent).
+
+    Un seul worker exécute l'initialisation ; les autres l'ignorent
+    immédiatement. Retourne ``True`` si ce worker l'a exécutée.
+    """
+
+    with leader_lock(engine, "startup-seeding", blocking=False) as acquired:
+        if not acquired:
+            logger.info("Initialisation des données déjà prise en charge")
+            return False
+        started = time.perf_counter()
+        with SessionLocal() as session:
+            from ..labs import sync_bundled_labs
+
+            sync_bundled_labs(session)
+        _ensure_protected_vector_store()
+        _ensure_initial_admin()
+        _seed_documentation()
+        logger.info(
+            "Initialisation des données terminée en %.2fs",
+            time.perf_counter() - started,
+        )
+        return True
+
+
 def register_database_startup(app: FastAPI) -> None:
     """Enregistre l'événement de démarrage lié à la base de données."""
 
     @app.on_event("startup")
     def _on_startup() -> None:
+        started = time.perf_counter()
         wait_for_database()
-        ensure_database_extensions()
-        Base.metadata.create_all(bind=engine)
-        check_and_apply_migrations()
-        run_ad_hoc_migrations()
-        ensure_vector_indexes()
+        migrated = ensure_schema_up_to_date(_run_schema_sweep)
         with SessionLocal() as session:
-            from ..labs import sync_bundled_labs
-
-            sync_bundled_labs(session)
             override = get_thread_title_prompt_override(session)
             runtime_settings = apply_runtime_model_overrides(override)
         configure_model_provider(runtime_settings)
-        _ensure_protected_vector_store()
-        if settings.admin_email and settings.admin_password:
-            normalized_email = settings.admin_email.lower()
-            with SessionLocal() as session:
-                existing = session.scalar(
-                    select(User).where(User.email == normalized_email)
+        logger.info(
+            "Base de données prête en %.2fs (migrations %s)",
+            time.perf_counter() - started,
+            "appliquées" if migrated else "ignorées",
+        )
+
+    @app.on_event("startup")
+    async def _schedule_startup_seeding() -> None:
+        async def _seed() -> None:
+            try:
+                await asyncio.to_thread(run_startup_seeding)
+            except Exception as exc:  # pragma: no cover - dépend de la base
+                logger.warning(
+                    "Échec de l'initialisation des données : %s", exc, exc_info=True
                 )
-                if not existing:
-                    logger.info("Creating initial admin user %s", normalized_email)
-                    user = User(
-                        email=normalized_email,
-                        password_hash=hash_password(settings.admin_password),
-                        is_admin=True,
-                    )
-                    session.add(user)
-                    session.commit()
-        if settings.docs_seed_documents:
-            with SessionLocal() as session:
-                service = DocumentationService(session)
-                for seed in settings.docs_seed_documents:
-                    slug = str(seed.get("slug") or "").strip()
-                    if not slug:
-                        logger.warning(
-                            "Entrée de seed documentation ignorée : slug manquant"
-                        )
-                        continue
-                    if service.get_document(slug) is not None:
-                        continue
-                    metadata = {
-                        key: value
-                        for key, value in seed.items()
-                        if key
-                        not in {
-                            "slug",
-                            "title",
-                            "summary",
-                            "language",
-                            "content_markdown",
-                        }
-                    }
-                    try:
-                        service.create_document(
-                            slug,
-                            title=seed.get("title"),
-                            summary=seed.get("summary"),
-                            language=seed.get("language"),
-                            content_markdown=seed.get("content_markdown"),
-                            metadata=metadata,
-                        )
-                        session.commit()
-                        logger.info(
-                            "Document de documentation initial importé : %s", slug
-                        )
-                    except Exception as exc:  # pragma: no cover - dépend externe
-                        session.rollback()
-                        logger.warning(
-                            "Impossible d'ingérer le document de seed %s : %s",
-                            slug,
-                            exc,
-                        )
+
+        app.state.startup_seeding_task = asyncio.create_task(_seed())
 
 
 def register_telephony_events(
@@ -534,6 +584,13 @@ def register_telephony_events(
                 get_outbound_call_manager(pjsua_adapter=pjsua_adapter)
                 logger.info("OutboundCallManager initialisé avec PJSUA")
 
+                # Reprendre les campagnes d'appels sortants en file d'attente
+                from ..telephony.outbound_campaigns import (
+                    get_outbound_campaign_dialer,
+                )
+
+                get_outbound_campaign_dialer().start()
+
                 # Configurer le callback pour les appels entrants
                 incoming_call_handler = _build_pjsua_incoming_call_handler(app)
                 pjsua_adapter.set_incoming_call_callback(incoming_call_handler)
@@ -600,6 +657,10 @@ def register_telephony_events(
 
     @app.on_event("shutdown")
     async def _stop_sip_registration() -> None:
+        from ..telephony.outbound_campaigns import get_outbound_campaign_dialer
+
+        await get_outbound_campaign_dialer().stop()
+
         if USE_PJSUA:
             # Arrêter PJSUA
             pjsua_adapter: PJSUAAdapter = app.state.pjsua_adapter
@@ -686,3 +747,21 @@ def register_startup_events(app: FastAPI) -> None:
         # Run warm-up in background - don't block server startup
         logger.info("Starting Playwright warm-up in background...")
         asyncio.create_task(_warmup_browser())
+
+    @app.on_event("shutdown")
+    async def _close_chatkit_server() -> None:
+        from ..chatkit import close_chatkit_server
+
+        await close_chatkit_server()
+
+    @app.on_event("shutdown")
+    async def _close_live_updates() -> None:
+        from ..live_updates import live_update_manager
+
+        await live_update_manager.aclose()
+
+    @app.on_event("shutdown")
+    def _release_worker_metrics() -> None:
+        from ..metrics import mark_process_dead
+
+        mark_process_dead()
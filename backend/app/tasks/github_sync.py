@@ -113,37 +113,33 @@ def sync_repo_task(
                         sync_service.pull_workflows(repo_sync, progress_callback)
                     )
                 elif operation == "push":
-                    # Push all pending local changes
-                    push_results = []
-                    push_errors = []
-
+                    # Push all pending local changes in a single commit
                     mappings_to_push = [
                         m for m in repo_sync.workflow_mappings
                         if m.sync_status in ("local_changes", "pending")
                     ]
 
-                    for i, mapping in enumerate(mappings_to_push):
-                        progress_callback(
-                            i + 1,
-                            len(mappings_to_push),
-                            f"Pushing {mapping.file_path}",
+                    progress_callback(
+                        0,
+                        len(mappings_to_push),
+                        f"Pushing {len(mappings_to_push)} workflows",
+                    )
+                    try:
+                        result = asyncio.run(
+                            sync_service.push_workflows(repo_sync, mappings_to_push)
                         )
-                        try:
-                            push_result = asyncio.run(
-                                sync_service.push_workflow(mapping)
-                            )
-                            push_results.append(push_result)
-                        except Exception as e:
-                            push_errors.append({
-                                "file_path": mapping.file_path,
-                                "error": str(e),
-                            })
-
-                    result = {
-                        "operation": "push",
-                        "pushed": len(push_results),
-                        "errors": push_errors,
-                    }
+                    except Exception as e:
+                        logger.exception(f"Task {task_id}: push failed: {e}")
+                        session.rollback()
+                        result = {
+                            "operation": "push",
+                            "pushed": 0,
+                            "commit_sha": None,
+                            "errors": [
+                                {"file_path": mapping.file_path, "error": str(e)}
+                                for mapping in mappings_to_push
+                            ],
+                        }
                 else:
                     # Bidirectional sync
                     result = asyncio.run(
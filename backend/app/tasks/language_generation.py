@@ -6,12 +6,18 @@ from __future__ import annotations
 import datetime
 import json
 import logging
-import re
 
 from sqlalchemy import select
 
 from ..celery_app import celery_app
 from ..database import SessionLocal
+from ..i18n_translation import (
+    TranslationReport,
+    parse_source_translations,
+    render_translation_file,
+    translate_dictionary,
+    translation_context,
+)
 from ..i18n_utils import resolve_frontend_i18n_path
 from ..models import AvailableModel, Language, LanguageGenerationTask
 
@@ -29,6 +35,7 @@ def generate_language_task(
     provider_slug: str | None,
     custom_prompt: str | None,
     save_to_db: bool,
+    incremental: bool = True,
 ):
     """
     Tâche Celery pour générer une langue en background.
@@ -37,8 +44,8 @@ def generate_language_task(
     1. Charge le modèle et provider
     2. Extrait les traductions EN
     3. Met à jour le statut et la progression
-    4. Crée un agent pour la traduction
-    5. Exécute la traduction
+    4. Prépare le modèle et le prompt appliqué à chaque lot
+    5. Traduit par lots concurrents en réutilisant la mémoire de traduction
     6. Sauvegarde en BD si demandé
     7. Génère le fichier .ts
     8. Met à jour le statut final
@@ -53,6 +60,7 @@ def generate_language_task(
         provider_slug: Slug du provider
         custom_prompt: Prompt personnalisé
         save_to_db: Sauvegarder en BD
+        incremental: Ne traduire que les chaînes absentes de la mémoire
     """
     # Imports locaux pour éviter les problèmes de sérialisation Celery
     import asyncio
@@ -82,15 +90,11 @@ def generate_language_task(
                 if not path_exists or not en_file.exists():
                     raise ValueError("Source language file (English) not found")
 
-                en_content = en_file.read_text()
-                pattern = r'"([^"]+)"\s*:\s*"([^"]*(?:\\.[^"]*)*)"'
-                matches = re.findall(pattern, en_content)
+                en_translations = parse_source_translations(en_file.read_text())
 
-                if not matches:
+                if not en_translations:
                     raise ValueError("No translations found in source file")
 
-                en_translations = {key: value for key, value in matches}
-
                 # Mettre à jour: status = running, progress = 10
                 task.status = "running"
                 task.progress = 10
@@ -140,17 +144,16 @@ def generate_language_task(
                         f"Failed to get provider binding for model '{model_name}'"
                     )
 
-                # Étape 3: Préparer le prompt
-                translations_json = json.dumps(
-                    en_translations, ensure_ascii=False, indent=2
-                )
-
-                if custom_prompt:
-                    prompt = custom_prompt.replace("{{language_name}}", name)
-                    prompt = prompt.replace("{{language_code}}", code)
-                    prompt = prompt.replace("{{translations_json}}", translations_json)
-                else:
-                    prompt = (
+                # Étape 3: Préparer le prompt (appliqué à chaque lot)
+                def _build_prompt(batch: dict[str, str]) -> str:
+                    translations_json = json.dumps(batch, ensure_ascii=False, indent=2)
+                    if custom_prompt:
+                        prompt = custom_prompt.replace("{{language_name}}", name)
+                        prompt = prompt.replace("{{language_code}}", code)
+                        return prompt.replace(
+                            "{{translations_json}}", translations_json
+                        )
+                    return (
                         "You are a professional translator. Translate the "
                         "following JSON object containing interface strings "
                         f"from English to {name} ({code}).\n\n"
@@ -178,28 +181,8 @@ def generate_language_task(
                     meta={"current": 20, "total": 100, "status": "Creating agent..."},
                 )
 
-                # Étape 4: Créer l'agent et exécuter
+                # Étape 4: Préparer le modèle partagé par les lots
                 model_instance = create_litellm_model(model_name, provider_binding)
-                agent = Agent(
-                    name="Language Translator",
-                    model=model_instance,
-                    instructions=prompt,
-                )
-                agent._chatkit_provider_binding = provider_binding
-
-                # Mettre à jour progress = 30
-                task.progress = 30
-                session.commit()
-                self.update_state(
-                    state="PROGRESS",
-                    meta={
-                        "current": 30,
-                        "total": 100,
-                        "status": "Translating with AI...",
-                    },
-                )
-
-                logger.info(f"Task {task_id}: Executing translation agent")
 
                 run_config_kwargs = {}
                 if provider_binding is not None and provider_binding.provider is not None:
@@ -211,17 +194,64 @@ def generate_language_task(
                     run_config_kwargs.pop("model_provider", None)
                     run_config = RunConfig(**run_config_kwargs)
 
-                # Exécuter de manière synchrone dans le worker Celery
-                # Celery workers peuvent gérer les appels async
-                result = asyncio.run(
-                    Runner.run(
+                async def _translate_batch(batch: dict[str, str]) -> str:
+                    agent = Agent(
+                        name="Language Translator",
+                        model=model_instance,
+                        instructions=_build_prompt(batch),
+                    )
+                    agent._chatkit_provider_binding = provider_binding
+                    result = await Runner.run(
                         agent,
                         input="Translate the provided JSON to the target language.",
                         run_config=run_config,
                     )
+                    return str(result.final_output)
+
+                # Mettre à jour progress = 30
+                task.progress = 30
+                session.commit()
+                self.update_state(
+                    state="PROGRESS",
+                    meta={
+                        "current": 30,
+                        "total": 100,
+                        "status": "Translating with AI...",
+                    },
                 )
 
-                # Mettre à jour progress = 80
+                # Étape 5: Traduire par lots (30 -> 80 %)
+                def _on_progress(done: int, total: int) -> None:
+                    progress = 30 + (50 * done) // max(total, 1)
+                    if progress == task.progress:
+                        return
+                    task.progress = progress
+                    session.commit()
+                    self.update_state(
+                        state="PROGRESS",
+                        meta={
+                            "current": progress,
+                            "total": 100,
+                            "status": f"Translating with AI ({done}/{total})...",
+                        },
+                    )
+
+                report = TranslationReport()
+                logger.info(f"Task {task_id}: Executing batched translation")
+                translated_dict = asyncio.run(
+                    translate_dictionary(
+                        session,
+                        code,
+                        en_translations,
+                        _translate_batch,
+                        incremental=incremental,
+                        context=translation_context(model_name, custom_prompt),
+                        report=report,
+                        on_progress=_on_progress,
+                    )
+                )
+
+                # Mettre à jour progress = 80 (et valider la mémoire de traduction)
                 task.progress = 80
                 session.commit()
                 self.update_state(
@@ -233,31 +263,15 @@ def generate_language_task(
                     },
                 )
 
-                logger.info(f"Task {task_id}: Translation completed, processing result")
-
-                # Étape 5: Extraire et parser la réponse
-                response_text = (
-                    result.output if hasattr(result, "output") else str(result)
-                )
-                json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-                if not json_match:
-                    raise ValueError("Failed to extract JSON from AI response")
-
-                translated_dict = json.loads(json_match.group(0))
                 logger.info(
                     f"Task {task_id}: Successfully translated "
-                    f"{len(translated_dict)} keys"
+                    f"{len(translated_dict)} keys ({report.reused_keys} from memory, "
+                    f"{report.sent_keys} sent in {report.batches} batches, "
+                    f"{report.retried_keys} retried)"
                 )
 
                 # Étape 6: Générer le fichier .ts
-                file_content = (
-                    'import type { TranslationDictionary } from "./translations";\n\n'
-                    f"export const {code}: TranslationDictionary = {{\n"
-                )
-                for key, value in translated_dict.items():
-                    escaped_value = value.replace("\\", "\\\\").replace('"', '\\"')
-                    file_content += f'  "{key}": "{escaped_value}",\n'
-                file_content += "};\n"
+                file_content = render_translation_file(code, translated_dict)
 
                 task.file_content = file_content
 
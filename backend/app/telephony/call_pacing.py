@@ -0,0 +1,165 @@
+"""Contrôle d'admission des appels sortants par compte SIP.
+
+Chaque compte SIP dispose d'un :class:`CallPacer` qui borne le nombre
+d'appels simultanés et espace les débuts d'appel (appels par seconde), pour
+ne pas saturer le trunk SIP ni l'API Realtime lorsqu'une liste d'appels est
+lancée d'un coup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+from ..config import env_float, env_int
+from ..models import SipAccount
+
+logger = logging.getLogger("chatkit.telephony.pacing")
+
+
+# Valeurs par défaut, surchargées par compte SIP (max_concurrent_calls,
+# calls_per_second).
+OUTBOUND_MAX_CONCURRENT_CALLS = env_int("OUTBOUND_MAX_CONCURRENT_CALLS", 5, minimum=1)
+OUTBOUND_CALLS_PER_SECOND = max(0.0, env_float("OUTBOUND_CALLS_PER_SECOND", 1.0))
+
+
+class CallPacer:
+    """Limite d'appels simultanés et cadence des débuts d'appel.
+
+    Un créneau est réservé (:meth:`reserve` ou :meth:`acquire`) avant de
+    composer et libéré (:meth:`release`) à la fin de l'appel ;
+    :meth:`wait_turn` espace ensuite les débuts d'appel de
+    ``1 / calls_per_second`` secondes (0 désactive la cadence).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = OUTBOUND_MAX_CONCURRENT_CALLS,
+        calls_per_second: float = OUTBOUND_CALLS_PER_SECOND,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrent = 1
+        self.calls_per_second = 0.0
+        self.in_flight = 0
+        self._interval = 0.0
+        self._next_start = 0.0
+        self._clock = clock
+        self._freed = asyncio.Event()
+        self.configure(max_concurrent, calls_per_second)
+
+    def configure(self, max_concurrent: int, calls_per_second: float) -> None:
+        """Met à jour les limites (les appels en cours ne sont pas affectés)."""
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.calls_per_second = max(0.0, float(calls_per_second))
+        self._interval = (
+            1.0 / self.calls_per_second if self.calls_per_second > 0 else 0.0
+        )
+
+    @property
+    def available(self) -> int:
+        return max(0, self.max_concurrent - self.in_flight)
+
+    def reserve(self) -> bool:
+        """Réserve un créneau sans attendre ; ``False`` si tout est occupé."""
+        if self.in_flight >= self.max_concurrent:
+            return False
+        self.in_flight += 1
+        return True
+
+    async def acquire(self) -> None:
+        """Attend un créneau libre puis le tour de cadence."""
+        while not self.reserve():
+            self._freed.clear()
+            await self._freed.wait()
+        try:
+            await self.wait_turn()
+        except BaseException:
+            self.release()
+            raise
+
+    async def wait_turn(self) -> None:
+        """Espace les débuts d'appel selon ``calls_per_second``."""
+        if self._interval <= 0:
+            return
+        now = self._clock()
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._freed.set()
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "calls_per_second": self.calls_per_second,
+        }
+
+
+class CallPacerRegistry:
+    """Un :class:`CallPacer` par compte SIP, partagé par tous les appels."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = OUTBOUND_MAX_CONCURRENT_CALLS,
+        calls_per_second: float = OUTBOUND_CALLS_PER_SECOND,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.calls_per_second = calls_per_second
+        self._clock = clock
+        self._pacers: dict[int, CallPacer] = {}
+
+    def for_account(
+        self,
+        sip_account_id: int,
+        *,
+        max_concurrent: int | None = None,
+        calls_per_second: float | None = None,
+    ) -> CallPacer:
+        """Retourne le pacer du compte, (re)configuré avec ses limites."""
+        limit = max_concurrent if max_concurrent else self.max_concurrent
+        rate = (
+            calls_per_second
+            if calls_per_second is not None
+            else self.calls_per_second
+        )
+        pacer = self._pacers.get(sip_account_id)
+        if pacer is None:
+            pacer = CallPacer(limit, rate, clock=self._clock)
+            self._pacers[sip_account_id] = pacer
+        elif (pacer.max_concurrent, pacer.calls_per_second) != (limit, rate):
+            pacer.configure(limit, rate)
+        return pacer
+
+    def for_sip_account(self, db: Session, sip_account_id: int) -> CallPacer:
+        """Comme :meth:`for_account`, avec les limites persistées du compte."""
+        account = db.get(SipAccount, sip_account_id)
+        return self.for_account(
+            sip_account_id,
+            max_concurrent=getattr(account, "max_concurrent_calls", None),
+            calls_per_second=getattr(account, "calls_per_second", None),
+        )
+
+    def stats(self) -> dict[int, dict[str, float | int]]:
+        return {account: pacer.stats() for account, pacer in self._pacers.items()}
+
+
+_call_pacers: CallPacerRegistry | None = None
+
+
+def get_call_pacers() -> CallPacerRegistry:
+    """Récupère le registre global des pacers d'appels sortants."""
+    global _call_pacers
+    if _call_pacers is None:
+        _call_pacers = CallPacerRegistry()
+    return _call_pacers
@@ -6,6 +6,7 @@ from __future__ import annotations
 import asyncio
 from typing import TYPE_CHECKING, Any
 
+from ..metrics import record_rtp_stats
 from .async_helpers import schedule_coroutine_from_thread
 from .call_diagnostics import CallDiagnostics
 from .media import AudioMediaPort
@@ -163,6 +164,22 @@ class PJSUACall(pj.Call if PJSUA_AVAILABLE else object):
                 logger=logger,
             )
 
+    def onStreamDestroyed(self, prm: Any) -> None:
+        """Publie la gigue et les pertes RTP du flux avant sa destruction."""
+        if not PJSUA_AVAILABLE:
+            return
+
+        try:
+            rx_stat = self.getStreamStat(prm.streamIdx).rtcp.rxStat
+            record_rtp_stats(
+                "pjsua",
+                jitter_seconds=rx_stat.jitterUsec.mean / 1_000_000,
+                packets_received=int(rx_stat.pkt),
+                packets_lost=int(rx_stat.loss),
+            )
+        except Exception as exc:
+            logger.debug("Statistiques RTP indisponibles (stream=%s): %s", getattr(prm, "streamIdx", "?"), exc)
+
     def _disconnect_conference_bridge(self, call_id: int) -> None:
         """Disconnect the conference bridge if it is still active."""
 
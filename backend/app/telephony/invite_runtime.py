@@ -7,6 +7,7 @@ import datetime
 import logging
 import os
 import re
+import time
 import uuid
 from collections.abc import Awaitable, Callable
 from typing import Any
@@ -21,7 +22,7 @@ from ..chatkit_sessions import SessionSecretParser
 from ..config import settings_proxy
 from ..database import SessionLocal
 from ..models import SipAccount
-from ..realtime_runner import open_voice_session
+from ..realtime_runner import open_voice_session, prewarm_voice_session
 from ..workflows.service import WorkflowService
 from .invite_handler import InviteHandlingError, handle_incoming_invite, send_sip_reply
 from .multi_sip_manager import MultiSIPRegistrationManager
@@ -39,6 +40,45 @@ logger = logging.getLogger("chatkit.server")
 settings = settings_proxy
 
 
+_TRANSFER_TOOL_CONFIG: dict[str, Any] = {
+    "type": "function",
+    "name": "transfer_call",
+    "description": (
+        "Transfère l'appel en cours vers un autre numéro de téléphone. "
+        "Utilisez cette fonction lorsque l'appelant demande à être "
+        "transféré vers un service spécifique, un département, ou une personne."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "phone_number": {
+                "type": "string",
+                "description": (
+                    "Le numéro de téléphone vers lequel transférer l'appel. "
+                    "Format recommandé: E.164 (ex: +33123456789)"
+                ),
+            },
+            "announcement": {
+                "type": "string",
+                "description": (
+                    "Message optionnel à annoncer à l'appelant avant le "
+                    "transfert"
+                ),
+            },
+        },
+        "required": ["phone_number"],
+    },
+}
+
+
+def _telephony_voice_tools(voice_tools: Any) -> list[Any]:
+    """Outils de la session vocale d'un appel : ceux du workflow + transfert."""
+
+    telephony_tools = list(voice_tools) if voice_tools else []
+    telephony_tools.append(copy.deepcopy(_TRANSFER_TOOL_CONFIG))
+    return telephony_tools
+
+
 class InviteRuntime:
     """Orchestrates SIP invite lifecycle for telephony calls."""
 
@@ -445,7 +485,42 @@ class InviteRuntime:
                 context.route.priority,
             )
 
+        self._prewarm_voice_session(session)
+
+    def _prewarm_voice_session(self, session: SipCallSession) -> None:
+        """Prépare la session Realtime pendant la sonnerie.
+
+        Le client secret et les serveurs MCP sont obtenus en arrière-plan ;
+        :meth:`_start_rtp` les récupère au décroché au lieu de les attendre.
+        """
+
+        metadata = session.metadata.get("telephony") or {}
+        voice_model = metadata.get("voice_model")
+        instructions = metadata.get("voice_instructions")
+        if not voice_model or not instructions:
+            return
+        try:
+            prewarm_voice_session(
+                user_id=f"sip:{session.call_id}",
+                model=voice_model,
+                instructions=instructions,
+                voice=metadata.get("voice_voice"),
+                provider_id=metadata.get("voice_provider_id"),
+                provider_slug=metadata.get("voice_provider_slug"),
+                tools=_telephony_voice_tools(metadata.get("voice_tools")),
+                handoffs=metadata.get("voice_handoffs") or None,
+                realtime={},
+            )
+        except Exception:  # pragma: no cover - best effort
+            logger.debug(
+                "Préchauffage de la session vocale impossible (Call-ID=%s)",
+                session.call_id,
+                exc_info=True,
+            )
+
     async def _start_rtp(self, session: SipCallSession) -> None:
+        # Décroché : référence du délai avant le premier son entendu.
+        answered_at = time.monotonic()
         metadata = session.metadata.get("telephony") or {}
         voice_model = metadata.get("voice_model")
         instructions = metadata.get("voice_instructions")
@@ -549,37 +624,7 @@ class InviteRuntime:
         if isinstance(thread_identifier, str) and thread_identifier.strip():
             metadata_extras["thread_id"] = thread_identifier.strip()
 
-        telephony_tools = list(voice_tools) if voice_tools else []
-        transfer_tool_config = {
-            "type": "function",
-            "name": "transfer_call",
-            "description": (
-                "Transfère l'appel en cours vers un autre numéro de téléphone. "
-                "Utilisez cette fonction lorsque l'appelant demande à être "
-                "transféré vers un service spécifique, un département, ou une personne."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "phone_number": {
-                        "type": "string",
-                        "description": (
-                            "Le numéro de téléphone vers lequel transférer l'appel. "
-                            "Format recommandé: E.164 (ex: +33123456789)"
-                        ),
-                    },
-                    "announcement": {
-                        "type": "string",
-                        "description": (
-                            "Message optionnel à annoncer à l'appelant avant le "
-                            "transfert"
-                        ),
-                    },
-                },
-                "required": ["phone_number"],
-            },
-        }
-        telephony_tools.append(transfer_tool_config)
+        telephony_tools = _telephony_voice_tools(voice_tools)
         logger.info(
             "Ajout du tool de transfert d'appel (total tools: %d)",
             len(telephony_tools),
@@ -692,6 +737,7 @@ class InviteRuntime:
                 tools=voice_tools,
                 handoffs=voice_handoffs,
                 speak_first=speak_first,
+                started_at=answered_at,
             )
         except Exception as exc:  # pragma: no cover - dépend réseau
             logger.exception(
@@ -707,6 +753,7 @@ class InviteRuntime:
                 "inbound_audio_bytes": stats.inbound_audio_bytes,
                 "outbound_audio_bytes": stats.outbound_audio_bytes,
                 "transcript_count": stats.transcript_count,
+                "time_to_first_audio": stats.time_to_first_audio,
                 "error": repr(stats.error) if stats.error else None,
             }
             logger.info(
@@ -9,6 +9,7 @@ from typing import Any
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ..metrics import SIP_REGISTERED_ACCOUNTS
 from ..models import SipAccount
 from .registration import SIPRegistrationConfig, SIPRegistrationManager, InviteRouteHandler
 
@@ -154,6 +155,7 @@ class MultiSIPRegistrationManager:
                     account_id,
                     exc_info=exc,
                 )
+        SIP_REGISTERED_ACCOUNTS.set(len(self._managers))
 
     def _build_config_from_account(self, account: SipAccount) -> SIPRegistrationConfig:
         """Construit une SIPRegistrationConfig depuis un SipAccount.
@@ -213,6 +215,7 @@ class MultiSIPRegistrationManager:
                 )
 
         self._managers.clear()
+        SIP_REGISTERED_ACCOUNTS.set(0)
 
     def get_manager_for_account(self, account_id: int | None) -> SIPRegistrationManager | None:
         """Récupère le gestionnaire SIP pour un compte donné.
@@ -17,6 +17,7 @@ from ..database import SessionLocal
 from ..models import OutboundCall, SipAccount, WorkflowDefinition
 from ..realtime_runner import close_voice_session, open_voice_session
 from ..workflows.service import resolve_start_telephony_config
+from .call_pacing import get_call_pacers
 from .outbound_events_manager import get_outbound_events_manager
 from .rtp_server import RtpServer, RtpServerConfig
 from .voice_bridge import TelephonyVoiceBridge, VoiceBridgeHooks
@@ -49,6 +50,19 @@ except ImportError as e:
     logger.warning("PJSUA non disponible: %s", e)
 
 
+BUSY_SIP_CODES = frozenset({486, 600})
+NO_ANSWER_SIP_CODES = frozenset({408, 480, 487})
+
+
+def sip_status_to_call_status(status_code: int | None) -> str:
+    """Traduit le code SIP final d'un appel non décroché en statut d'appel."""
+    if status_code in BUSY_SIP_CODES:
+        return "busy"
+    if status_code in NO_ANSWER_SIP_CODES:
+        return "no_answer"
+    return "failed"
+
+
 class OutboundCallSession:
     """Représente une session d'appel sortant active."""
 
@@ -187,6 +201,47 @@ class OutboundCallManager:
         db.commit()
         db.refresh(call_record)
 
+        self._launch_call(db, session, call_record.id, admitted=False)
+        return session
+
+    def start_queued_call(
+        self, db: Session, call_record: OutboundCall
+    ) -> OutboundCallSession:
+        """Compose un appel déjà persisté (file d'attente d'une campagne).
+
+        Contrairement à :meth:`initiate_call`, l'enregistrement existe déjà :
+        on réutilise son ``call_sid`` et sa configuration. L'appelant a déjà
+        obtenu un créneau auprès du pacer du compte SIP.
+
+        Returns:
+            OutboundCallSession lancée en arrière-plan
+        """
+        session = OutboundCallSession(
+            call_id=call_record.call_sid,
+            to_number=call_record.to_number,
+            from_number=call_record.from_number,
+            workflow_id=call_record.workflow_id,
+            sip_account_id=call_record.sip_account_id,
+            metadata=dict(call_record.metadata_ or {}),
+        )
+        self._launch_call(db, session, call_record.id)
+        return session
+
+    def _launch_call(
+        self,
+        db: Session,
+        session: OutboundCallSession,
+        call_db_id: int,
+        *,
+        admitted: bool = True,
+    ) -> None:
+        """Enregistre la session active et lance l'appel en arrière-plan.
+
+        Sans ``admitted``, l'appel attend d'abord un créneau du pacer de son
+        compte SIP et reste ``queued`` en attendant.
+        """
+        call_id = session.call_id
+
         # Enregistrer la session active
         self.active_calls[call_id] = session
 
@@ -195,20 +250,36 @@ class OutboundCallManager:
         asyncio.create_task(events_mgr.emit_event({
             "type": "call_started",
             "call_id": call_id,
-            "to_number": to_number,
-            "from_number": from_number,
+            "to_number": session.to_number,
+            "from_number": session.from_number,
         }))
         logger.info("Emitted call_started event for call %s", call_id)
 
         # Lancer l'appel en background avec PJSUA ou aiosip
         if PJSUA_AVAILABLE and self._pjsua_adapter is not None:
             logger.info("Utilisation de PJSUA pour l'appel sortant")
-            asyncio.create_task(self._execute_call_pjsua(db, session, call_record.id))
+            execution = self._execute_call_pjsua(db, session, call_db_id)
         else:
             logger.info("Utilisation d'aiosip pour l'appel sortant (legacy)")
-            asyncio.create_task(self._execute_call_sip(db, session, call_record.id))
+            execution = self._execute_call_sip(db, session, call_db_id)
+        if not admitted:
+            execution = self._execute_paced(db, session, execution)
+        asyncio.create_task(execution)
 
-        return session
+    async def _execute_paced(
+        self, db: Session, session: OutboundCallSession, execution: Any
+    ) -> None:
+        """Exécute l'appel une fois un créneau obtenu pour son compte SIP."""
+        pacer = get_call_pacers().for_sip_account(db, session.sip_account_id)
+        try:
+            await pacer.acquire()
+        except BaseException:
+            execution.close()
+            raise
+        try:
+            await execution
+        finally:
+            pacer.release()
 
     async def _execute_call_pjsua(
         self, db: Session, session: OutboundCallSession, call_db_id: int
@@ -285,6 +356,8 @@ class OutboundCallManager:
 
             # Callback pour nettoyer les ressources quand l'appel se termine
             cleanup_done = asyncio.Event()
+            # Dernier code SIP reçu (486 occupé, 480/487 sans réponse, ...)
+            last_status_code: list[int | None] = [None]
 
             # Sauvegarder le callback précédent s'il existe
             previous_call_state_callback = getattr(self._pjsua_adapter, '_call_state_callback', None)
@@ -302,6 +375,7 @@ class OutboundCallManager:
                 if pjsua_call_ref[0] and active_call == pjsua_call_ref[0]:
                     # Si l'appel est déconnecté, nettoyer les ressources
                     if call_info.state == 6:  # PJSUA_CALL_STATE_DISCONNECTED
+                        last_status_code[0] = getattr(call_info, "lastStatusCode", None)
                         if not cleanup_done.is_set():
                             logger.info("📞 Appel sortant déconnecté - nettoyage des ressources (call_id=%s)", session.call_id)
 
@@ -360,6 +434,7 @@ class OutboundCallManager:
                 # Si l'appel a été déconnecté (cleanup_done), arrêter ici
                 if cleanup_done.is_set():
                     logger.warning("❌ Appel déconnecté avant que le média soit actif (call_id=%s)", session.call_id)
+                    self._mark_unanswered(db, session, call_db_id, last_status_code[0])
                     return
 
                 logger.info("✅ Média actif confirmé (call_id=%s)", session.call_id)
@@ -367,6 +442,7 @@ class OutboundCallManager:
                 # Vérifier si l'appel est toujours connecté
                 if cleanup_done.is_set():
                     logger.warning("❌ Appel déconnecté pendant l'attente du média (call_id=%s)", session.call_id)
+                    self._mark_unanswered(db, session, call_db_id, last_status_code[0])
                     return
 
                 logger.warning("⚠️ Timeout attente média actif - on continue quand même (call_id=%s)", session.call_id)
@@ -1520,6 +1596,29 @@ a=sendrecv
 
         return connection_address, media_port
 
+    def _mark_unanswered(
+        self,
+        db: Session,
+        session: OutboundCallSession,
+        call_db_id: int,
+        status_code: int | None,
+    ) -> None:
+        """Enregistre l'issue d'un appel raccroché avant le décroché."""
+        status = sip_status_to_call_status(status_code)
+        session.status = status
+        self._update_call_status(
+            db,
+            call_db_id,
+            status,
+            ended_at=datetime.now(UTC),
+            sip_response_code=status_code,
+            failure_reason=(
+                f"SIP status {status_code}"
+                if status == "failed" and status_code
+                else None
+            ),
+        )
+
     def _update_call_status(
         self,
         db: Session,
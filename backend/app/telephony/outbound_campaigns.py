@@ -0,0 +1,388 @@
+"""Campagnes d'appels sortants : file persistée, cadence et relances.
+
+Les numéros d'une campagne sont enregistrés comme lignes ``OutboundCall``
+(statut ``queued``, ``campaign_id`` commun). Le :class:`OutboundCampaignDialer`
+les compose au fil de l'eau en respectant, pour chaque compte SIP, le nombre
+d'appels simultanés et la cadence de son :class:`~.call_pacing.CallPacer`.
+Les appels occupés ou sans réponse sont replanifiés avec un délai croissant
+jusqu'à ``max_attempts`` tentatives.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from ..config import env_float, env_int
+from ..database import SessionLocal
+from ..models import OutboundCall
+from .call_pacing import CallPacer, CallPacerRegistry, get_call_pacers
+from .outbound_events_manager import get_outbound_events_manager
+
+logger = logging.getLogger("chatkit.telephony.campaigns")
+
+
+OUTBOUND_CAMPAIGN_MAX_ATTEMPTS = env_int(
+    "OUTBOUND_CAMPAIGN_MAX_ATTEMPTS", 3, minimum=1
+)
+# Délai avant la première relance, multiplié par OUTBOUND_RETRY_BACKOFF à
+# chaque tentative suivante.
+OUTBOUND_RETRY_DELAY = max(0.0, env_float("OUTBOUND_RETRY_DELAY", 300.0))
+OUTBOUND_RETRY_BACKOFF = max(1.0, env_float("OUTBOUND_RETRY_BACKOFF", 2.0))
+OUTBOUND_DIALER_POLL_INTERVAL = max(
+    0.05, env_float("OUTBOUND_DIALER_POLL_INTERVAL", 1.0)
+)
+
+RETRYABLE_STATUSES = frozenset({"busy", "no_answer"})
+IN_PROGRESS_STATUSES = frozenset({"dialing", "initiating", "ringing", "answered"})
+
+DialFunction = Callable[[Session, OutboundCall], Awaitable[str]]
+
+
+async def dial_with_outbound_manager(db: Session, call: OutboundCall) -> str:
+    """Compose l'appel via l'``OutboundCallManager`` et attend son issue."""
+    from .outbound_call_manager import get_outbound_call_manager
+
+    session = get_outbound_call_manager().start_queued_call(db, call)
+    await session.wait_until_complete()
+    return session.status
+
+
+class OutboundCampaignDialer:
+    """Compose les appels en file d'attente, compte SIP par compte SIP.
+
+    Args:
+        session_factory: Fabrique de sessions SQLAlchemy.
+        dial: Coroutine qui compose un appel et retourne son statut final
+            (``completed``, ``busy``, ``no_answer``, ``failed``...).
+        pacers: Registre des pacers, partagé avec les appels directs.
+        poll_interval: Intervalle de scrutation de la file (secondes).
+        retry_delay: Délai avant la première relance (secondes).
+        retry_backoff: Facteur appliqué au délai à chaque relance.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session] = SessionLocal,
+        dial: DialFunction = dial_with_outbound_manager,
+        pacers: CallPacerRegistry | None = None,
+        poll_interval: float = OUTBOUND_DIALER_POLL_INTERVAL,
+        retry_delay: float = OUTBOUND_RETRY_DELAY,
+        retry_backoff: float = OUTBOUND_RETRY_BACKOFF,
+    ) -> None:
+        self._session_factory = session_factory
+        self._dial = dial
+        self._pacers = pacers or get_call_pacers()
+        self._poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.retry_backoff = retry_backoff
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._calls: set[asyncio.Task[None]] = set()
+
+    # -- File d'attente -------------------------------------------------
+
+    def enqueue_campaign(
+        self,
+        db: Session,
+        *,
+        targets: Iterable[str | Mapping[str, Any]],
+        workflow_id: int,
+        sip_account_id: int,
+        from_number: str,
+        max_attempts: int = OUTBOUND_CAMPAIGN_MAX_ATTEMPTS,
+        retry_delay: float | None = None,
+        metadata: Mapping[str, Any] | None = None,
+        campaign_id: str | None = None,
+    ) -> str:
+        """Persiste les numéros d'une campagne et réveille le dialer.
+
+        Chaque cible est un numéro ou un dictionnaire ``{"to_number": ...,
+        "metadata": {...}}`` dont les métadonnées complètent celles de la
+        campagne.
+        """
+        campaign_id = campaign_id or str(uuid.uuid4())
+        now = datetime.now(UTC)
+        campaign_info: dict[str, Any] = {"id": campaign_id}
+        if retry_delay is not None:
+            campaign_info["retry_delay"] = retry_delay
+        records = []
+        for target in targets:
+            if isinstance(target, Mapping):
+                to_number = str(target["to_number"])
+                extra = dict(target.get("metadata") or {})
+            else:
+                to_number, extra = str(target), {}
+            call_metadata = {**(metadata or {}), **extra, "campaign": campaign_info}
+            records.append(
+                OutboundCall(
+                    call_sid=str(uuid.uuid4()),
+                    to_number=to_number,
+                    from_number=from_number,
+                    workflow_id=workflow_id,
+                    sip_account_id=sip_account_id,
+                    status="queued",
+                    metadata_=call_metadata,
+                    queued_at=now,
+                    campaign_id=campaign_id,
+                    attempt_count=0,
+                    max_attempts=max(1, max_attempts),
+                    next_attempt_at=now,
+                    triggered_by_workflow_id=call_metadata.get("triggered_by_workflow_id"),
+                    triggered_by_session_id=call_metadata.get("triggered_by_session_id"),
+                    trigger_node_slug=call_metadata.get("trigger_node_slug"),
+                )
+            )
+        db.add_all(records)
+        db.commit()
+        logger.info(
+            "Campagne %s : %d appel(s) en file sur le compte SIP %s",
+            campaign_id,
+            len(records),
+            sip_account_id,
+        )
+        self.wake()
+        return campaign_id
+
+    def cancel_campaign(self, db: Session, campaign_id: str) -> int:
+        """Annule les appels pas encore composés ; les appels en cours continuent."""
+        result = db.execute(
+            update(OutboundCall)
+            .where(
+                OutboundCall.campaign_id == campaign_id,
+                OutboundCall.status == "queued",
+            )
+            .values(
+                status="cancelled", next_attempt_at=None, ended_at=datetime.now(UTC)
+            )
+        )
+        db.commit()
+        return result.rowcount or 0
+
+    def campaign_stats(self, db: Session, campaign_id: str) -> dict[str, Any] | None:
+        """Progression d'une campagne : statuts, tentatives, prochaine relance."""
+        rows = db.execute(
+            select(
+                OutboundCall.status,
+                func.count(),
+                func.sum(OutboundCall.attempt_count),
+                func.min(OutboundCall.next_attempt_at),
+            )
+            .where(OutboundCall.campaign_id == campaign_id)
+            .group_by(OutboundCall.status)
+        ).all()
+        if not rows:
+            return None
+        by_status = {status: count for status, count, _, _ in rows}
+        total = sum(by_status.values())
+        queued = by_status.get("queued", 0)
+        in_progress = sum(by_status.get(status, 0) for status in IN_PROGRESS_STATUSES)
+        next_attempt = next(
+            (due for status, _, _, due in rows if status == "queued"), None
+        )
+        return {
+            "campaign_id": campaign_id,
+            "total": total,
+            "queued": queued,
+            "in_progress": in_progress,
+            "finished": total - queued - in_progress,
+            "attempts": sum(int(attempts or 0) for _, _, attempts, _ in rows),
+            "by_status": by_status,
+            "progress": round((total - queued - in_progress) / total, 4),
+            "next_attempt_at": next_attempt.isoformat() if next_attempt else None,
+        }
+
+    # -- Boucle de composition ------------------------------------------
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Démarre la boucle de composition (idempotent)."""
+        if self.running:
+            return
+        self._requeue_interrupted()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info("Dialer de campagnes démarré")
+
+    async def stop(self) -> None:
+        """Arrête de composer ; les appels en cours vont à leur terme."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        # Le drapeau arrête la boucle même si l'annulation est absorbée par
+        # ``asyncio.wait_for`` (course connue en Python 3.11).
+        self._stopping = True
+        self.wake()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        logger.info("Dialer de campagnes arrêté")
+
+    async def wait_idle(self) -> None:
+        """Attend la fin des appels lancés par ce dialer."""
+        while self._calls:
+            await asyncio.gather(*list(self._calls), return_exceptions=True)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                self.dispatch_due_calls()
+            except Exception:
+                logger.exception("Erreur lors de la composition des appels de campagne")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def dispatch_due_calls(self) -> int:
+        """Lance les appels échus dans la limite des créneaux libres."""
+        launched = 0
+        now = datetime.now(UTC)
+        with self._session_factory() as db:
+            account_ids = db.scalars(
+                select(OutboundCall.sip_account_id)
+                .where(
+                    OutboundCall.campaign_id.is_not(None),
+                    OutboundCall.status == "queued",
+                    OutboundCall.next_attempt_at <= now,
+                )
+                .distinct()
+            ).all()
+            for account_id in account_ids:
+                pacer = self._pacers.for_sip_account(db, account_id)
+                if pacer.available <= 0:
+                    continue
+                calls = db.scalars(
+                    select(OutboundCall)
+                    .where(
+                        OutboundCall.campaign_id.is_not(None),
+                        OutboundCall.sip_account_id == account_id,
+                        OutboundCall.status == "queued",
+                        OutboundCall.next_attempt_at <= now,
+                    )
+                    .order_by(OutboundCall.next_attempt_at, OutboundCall.id)
+                    .limit(pacer.available)
+                    .with_for_update(skip_locked=True)
+                ).all()
+                for call in calls:
+                    call.status = "dialing"
+                    call.attempt_count += 1
+                db.commit()
+                for call in calls:
+                    pacer.reserve()
+                    task = asyncio.create_task(self._place_call(call.id, pacer))
+                    self._calls.add(task)
+                    task.add_done_callback(self._calls.discard)
+                launched += len(calls)
+        return launched
+
+    async def _place_call(self, call_db_id: int, pacer: CallPacer) -> None:
+        try:
+            try:
+                await pacer.wait_turn()
+                with self._session_factory() as db:
+                    call = db.get(OutboundCall, call_db_id)
+                    if call is None:
+                        return
+                    status = await self._dial(db, call)
+            except Exception as exc:
+                logger.exception("Échec de l'appel de campagne %s", call_db_id)
+                status = "failed"
+                self._record_outcome(call_db_id, status, failure_reason=str(exc))
+            else:
+                self._record_outcome(call_db_id, status)
+        finally:
+            pacer.release()
+            self.wake()
+
+    def _retry_delay(self, call: OutboundCall) -> float:
+        campaign = (call.metadata_ or {}).get("campaign") or {}
+        base = campaign.get("retry_delay", self.retry_delay)
+        delay = float(base) * self.retry_backoff ** max(0, call.attempt_count - 1)
+        # Un peu d'aléa pour ne pas relancer tous les numéros au même instant.
+        return delay * random.uniform(1.0, 1.1)
+
+    def _record_outcome(
+        self, call_db_id: int, status: str, *, failure_reason: str | None = None
+    ) -> None:
+        with self._session_factory() as db:
+            call = db.get(OutboundCall, call_db_id)
+            if call is None:
+                return
+            if status in RETRYABLE_STATUSES and call.attempt_count < call.max_attempts:
+                delay = self._retry_delay(call)
+                call.status = "queued"
+                call.next_attempt_at = datetime.now(UTC) + timedelta(seconds=delay)
+                logger.info(
+                    "Appel %s %s (tentative %d/%d), relance dans %.0f s",
+                    call.call_sid,
+                    status,
+                    call.attempt_count,
+                    call.max_attempts,
+                    delay,
+                )
+            else:
+                call.status = status
+                call.next_attempt_at = None
+                if failure_reason:
+                    call.failure_reason = failure_reason[:256]
+                if call.ended_at is None:
+                    call.ended_at = datetime.now(UTC)
+            history = list((call.metadata_ or {}).get("attempts") or [])
+            history.append({"status": status, "at": datetime.now(UTC).isoformat()})
+            call.metadata_ = {**(call.metadata_ or {}), "attempts": history}
+            campaign_id = call.campaign_id
+            db.commit()
+            stats = self.campaign_stats(db, campaign_id) if campaign_id else None
+        if stats is not None:
+            events_mgr = get_outbound_events_manager()
+            asyncio.create_task(
+                events_mgr.emit_event(
+                    {"type": "campaign_progress", "call_id": None, **stats}
+                )
+            )
+
+    def _requeue_interrupted(self) -> None:
+        """Remet en file les appels réservés mais jamais composés (arrêt brutal)."""
+        with self._session_factory() as db:
+            result = db.execute(
+                update(OutboundCall)
+                .where(
+                    OutboundCall.campaign_id.is_not(None),
+                    OutboundCall.status == "dialing",
+                )
+                .values(status="queued", attempt_count=OutboundCall.attempt_count - 1)
+            )
+            db.commit()
+            if result.rowcount:
+                logger.info(
+                    "%d appel(s) de campagne interrompu(s) remis en file",
+                    result.rowcount,
+                )
+
+
+_outbound_campaign_dialer: OutboundCampaignDialer | None = None
+
+
+def get_outbound_campaign_dialer() -> OutboundCampaignDialer:
+    """Récupère l'instance globale du dialer de campagnes."""
+    global _outbound_campaign_dialer
+    if _outbound_campaign_dialer is None:
+        _outbound_campaign_dialer = OutboundCampaignDialer()
+    return _outbound_campaign_dialer
@@ -20,6 +20,7 @@ from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from typing import Any
 
+from ..metrics import SIP_ACTIVE_CALLS
 from .call_diagnostics import CallDiagnostics
 from .callbacks import PJSUAAccount, PJSUACall
 from .config import (
@@ -512,6 +513,7 @@ class PJSUAAdapter:
                     logger.error("⚠️ Erreur cleanup forcé ancien appel: %s", cleanup_err)
 
         self._active_calls[call_info.id] = call
+        SIP_ACTIVE_CALLS.set(len(self._active_calls))
 
         if self._incoming_call_callback:
             await self._incoming_call_callback(call, call_info)
@@ -539,6 +541,7 @@ class PJSUAAdapter:
             logger.info("📞 Appel DISCONNECTED détecté - nettoyage immédiat (call_id=%s)", call_info.id)
 
             self._active_calls.pop(call_info.id, None)
+            SIP_ACTIVE_CALLS.set(len(self._active_calls))
 
             # SÉQUENCE DE NETTOYAGE CORRECTE (ordre critique pour éviter race condition) :
             #
@@ -780,6 +783,7 @@ class PJSUAAdapter:
 
             # Retirer de active_calls
             self._active_calls.pop(call_id, None)
+            SIP_ACTIVE_CALLS.set(len(self._active_calls))
 
             # CRITIQUE: Destruction explicite de l'objet Call pour libérer les ressources PJSUA
             # Sans cela, PJSUA peut garder des références internes et ne pas libérer les ports RTP
@@ -869,6 +873,7 @@ class PJSUAAdapter:
                 )
 
         self._active_calls[ci.id] = call
+        SIP_ACTIVE_CALLS.set(len(self._active_calls))
 
         logger.info("Appel sortant initié vers %s", dest_uri)
         return call
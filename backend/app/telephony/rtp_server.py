@@ -11,6 +11,7 @@ from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Any
 
+from ..metrics import record_rtp_stats
 from .voice_bridge import RtpPacket
 
 logger = logging.getLogger("chatkit.telephony.rtp")
@@ -27,6 +28,54 @@ class RtpServerConfig:
     payload_type: int = 0  # PCMU par défaut
     output_codec: str = "pcmu"
     ssrc: int | None = None
+    clock_rate: int = 8000  # Horloge RTP du flux reçu (8 kHz pour G.711)
+
+
+class RtpReceptionStats:
+    """Gigue et pertes d'un flux RTP reçu, calculées comme en RFC 3550 (A.3, A.8)."""
+
+    def __init__(self, clock_rate: int = 8000) -> None:
+        self.clock_rate = clock_rate
+        self.received = 0
+        self._base_seq: int | None = None
+        self._max_seq = 0
+        self._cycles = 0
+        self._last_arrival = 0.0
+        self._last_timestamp = 0
+        self._jitter = 0.0  # En unités d'horloge RTP
+
+    def update(self, sequence_number: int, timestamp: int, arrival: float) -> None:
+        self.received += 1
+        if self._base_seq is None:
+            self._base_seq = self._max_seq = sequence_number
+        else:
+            delta = (sequence_number - self._max_seq) & 0xFFFF
+            if 0 < delta < 0x8000:  # En ordre, éventuellement après un trou
+                if sequence_number < self._max_seq:
+                    self._cycles += 1 << 16
+                self._max_seq = sequence_number
+            # Différence de temps de transit entre deux paquets consécutifs.
+            timestamp_delta = (timestamp - self._last_timestamp) & 0xFFFFFFFF
+            if timestamp_delta >= 1 << 31:
+                timestamp_delta -= 1 << 32
+            arrival_delta = (arrival - self._last_arrival) * self.clock_rate
+            self._jitter += (abs(arrival_delta - timestamp_delta) - self._jitter) / 16
+        self._last_arrival = arrival
+        self._last_timestamp = timestamp
+
+    @property
+    def expected(self) -> int:
+        if self._base_seq is None:
+            return 0
+        return self._cycles + self._max_seq - self._base_seq + 1
+
+    @property
+    def lost(self) -> int:
+        return max(0, self.expected - self.received)
+
+    @property
+    def jitter_seconds(self) -> float:
+        return self._jitter / self.clock_rate
 
 
 class RtpServer:
@@ -57,6 +106,7 @@ class RtpServer:
         self._protocol = _RtpProtocol(
             packet_queue=self._packet_queue,
             on_remote_discovered=self._on_remote_discovered,
+            stats=RtpReceptionStats(self._config.clock_rate),
         )
 
         try:
@@ -106,7 +156,22 @@ class RtpServer:
             self._transport.close()
             self._transport = None
 
-        logger.info("Serveur RTP arrêté")
+        stats = self.reception_stats
+        if stats is not None:
+            record_rtp_stats(
+                "rtp_server",
+                jitter_seconds=stats.jitter_seconds,
+                packets_received=stats.received,
+                packets_lost=stats.lost,
+            )
+            logger.info(
+                "Serveur RTP arrêté (reçus=%d, perdus=%d, gigue=%.1f ms)",
+                stats.received,
+                stats.lost,
+                stats.jitter_seconds * 1000,
+            )
+        else:
+            logger.info("Serveur RTP arrêté")
 
     def _on_remote_discovered(self, addr: tuple[str, int]) -> None:
         """Callback appelé quand l'adresse distante est découverte (premier paquet RTP reçu)."""
@@ -337,6 +402,11 @@ class RtpServer:
         """Port local sur lequel le serveur écoute."""
         return self._config.local_port
 
+    @property
+    def reception_stats(self) -> RtpReceptionStats | None:
+        """Statistiques de réception du flux courant (après :meth:`start`)."""
+        return self._protocol.stats if self._protocol is not None else None
+
 
 class _RtpProtocol(asyncio.DatagramProtocol):
     """Protocole pour recevoir les paquets RTP UDP."""
@@ -345,10 +415,12 @@ class _RtpProtocol(asyncio.DatagramProtocol):
         self,
         packet_queue: asyncio.Queue[RtpPacket | None],
         on_remote_discovered: Any,
+        stats: RtpReceptionStats | None = None,
     ) -> None:
         self._packet_queue = packet_queue
         self._on_remote_discovered = on_remote_discovered
         self._remote_addr: tuple[str, int] | None = None
+        self.stats = stats or RtpReceptionStats()
 
     def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
         """Callback appelé quand un datagramme UDP est reçu."""
@@ -361,6 +433,9 @@ class _RtpProtocol(asyncio.DatagramProtocol):
         # Parser le paquet RTP
         packet = self._parse_rtp_packet(data)
         if packet:
+            self.stats.update(
+                packet.sequence_number, packet.timestamp, time.monotonic()
+            )
             # Mettre dans la queue de manière non-bloquante
             try:
                 self._packet_queue.put_nowait(packet)
@@ -429,4 +504,4 @@ class _RtpProtocol(asyncio.DatagramProtocol):
             return None
 
 
-__all__ = ["RtpServer", "RtpServerConfig"]
+__all__ = ["RtpReceptionStats", "RtpServer", "RtpServerConfig"]
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
@@ -61,6 +62,8 @@ class RealtimeEventRouter:
         self._error_factory = error_factory
 
         self.outbound_audio_bytes = 0
+        # ``time.monotonic()`` du premier audio envoyé à l'appelant.
+        self.first_audio_at: float | None = None
         self.error: Exception | None = None
 
     async def run(self) -> None:
@@ -286,6 +289,8 @@ class RealtimeEventRouter:
                             self._sip_sync.handle_first_tts_chunk(pcm_data)
 
                         if pcm_data:
+                            if self.first_audio_at is None:
+                                self.first_audio_at = time.monotonic()
                             self.outbound_audio_bytes += len(pcm_data)
                             logger.debug(
                                 "🎵 Envoi de %d bytes d'audio vers téléphone",
@@ -12,6 +12,7 @@ import logging
 import time
 import uuid
 import wave
+from collections import deque
 from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -129,6 +130,8 @@ class VoiceBridgeStats:
     inbound_audio_file: str | None = None
     outbound_audio_file: str | None = None
     mixed_audio_file: str | None = None
+    # Délai (s) entre le décroché et le premier audio envoyé à l'appelant.
+    time_to_first_audio: float | None = None
 
     @property
     def transcript_count(self) -> int:
@@ -146,9 +149,12 @@ class VoiceBridgeMetricsRecorder:
         self._total_inbound = 0
         self._total_outbound = 0
         self._last_error: str | None = None
+        self._first_audio_delays: deque[float] = deque(maxlen=200)
 
     async def record(self, stats: VoiceBridgeStats) -> None:
         async with self._lock:
+            if stats.time_to_first_audio is not None:
+                self._first_audio_delays.append(stats.time_to_first_audio)
             self._total_sessions += 1
             self._total_duration += stats.duration_seconds
             self._total_inbound += stats.inbound_audio_bytes
@@ -158,7 +164,16 @@ class VoiceBridgeMetricsRecorder:
                 self._last_error = repr(stats.error)
 
     def snapshot(self) -> dict[str, Any]:
+        delays = sorted(self._first_audio_delays)
         return {
+            "time_to_first_audio_p50": (
+                delays[len(delays) // 2] if delays else None
+            ),
+            "time_to_first_audio_p95": (
+                delays[min(len(delays) - 1, int(len(delays) * 0.95))]
+                if delays
+                else None
+            ),
             "total_sessions": self._total_sessions,
             "total_errors": self._total_errors,
             "total_duration": self._total_duration,
@@ -487,10 +502,15 @@ class TelephonyVoiceBridge:
         tools: list[Any] | None = None,
         handoffs: list[Any] | None = None,
         speak_first: bool = False,
+        started_at: float | None = None,
         _existing_session: Any | None = None,
         _existing_playback_tracker: Any | None = None,
     ) -> VoiceBridgeStats:
-        """Démarre le pont voix jusqu'à la fin de session ou erreur."""
+        """Démarre le pont voix jusqu'à la fin de session ou erreur.
+
+        ``started_at`` (``time.monotonic()``) date le décroché pour mesurer
+        le délai avant le premier audio ; par défaut, le démarrage du pont.
+        """
 
         logger.info(
             "Ouverture de la session Realtime voix avec runner (modèle=%s, voix=%s)",
@@ -707,6 +727,15 @@ class TelephonyVoiceBridge:
                     logger.error("Failed to close audio recorder: %s", exc)
 
             duration = time.monotonic() - start_time
+            time_to_first_audio = None
+            if event_router is not None and event_router.first_audio_at is not None:
+                time_to_first_audio = event_router.first_audio_at - (
+                    start_time if started_at is None else started_at
+                )
+                logger.info(
+                    "Premier audio envoyé %.0f ms après le décroché",
+                    time_to_first_audio * 1000,
+                )
             stats = VoiceBridgeStats(
                 duration_seconds=duration,
                 inbound_audio_bytes=inbound_audio_bytes,
@@ -716,6 +745,7 @@ class TelephonyVoiceBridge:
                 inbound_audio_file=inbound_audio_file,
                 outbound_audio_file=outbound_audio_file,
                 mixed_audio_file=mixed_audio_file,
+                time_to_first_audio=time_to_first_audio,
             )
             await self._metrics.record(stats)
             await self._teardown(transcripts, error)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app import dependencies  # noqa: E402
+from app.auth_cache import UserPrincipalCache  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.models import Base, User  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+
+
+def _user(user_id: int = 7, *, is_admin: bool = False) -> User:
+    now = datetime.datetime.now(datetime.UTC)
+    return User(
+        id=user_id,
+        email=f"user{user_id}@example.com",
+        password_hash="hash",
+        is_admin=is_admin,
+        is_lti=False,
+        display_name="Ada",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_returns_detached_copies_until_expiry() -> None:
+    clock = _Clock()
+    cache = UserPrincipalCache(ttl=10, max_entries=2, clock=clock)
+    cache.put("7", _user(7, is_admin=True))
+
+    first = cache.get("7")
+    second = cache.get("7")
+    assert first is not None and second is not None
+    assert first is not second
+    assert (first.id, first.is_admin, first.email) == (7, True, "user7@example.com")
+    assert first.password_hash is None
+
+    clock.now = 11
+    assert cache.get("7") is None
+    assert cache.stats.as_dict()["hits"] == 2
+    assert cache.stats.misses == 1
+
+
+def test_cache_is_bounded_and_invalidated() -> None:
+    cache = UserPrincipalCache(ttl=10, max_entries=2)
+    for user_id in (1, 2, 3):
+        cache.put(str(user_id), _user(user_id))
+
+    assert len(cache) == 2
+    assert cache.get("1") is None
+
+    cache.invalidate(3)
+    assert cache.get("3") is None
+    assert cache.stats.invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_hits_database_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = UserPrincipalCache(ttl=30, max_entries=16)
+    monkeypatch.setattr(dependencies, "user_principal_cache", cache)
+    lookups: list[int] = []
+
+    class _Session:
+        def get(self, model, user_id):  # type: ignore[no-untyped-def]
+            lookups.append(user_id)
+            return _user(user_id)
+
+    session = _Session()
+    Base.metadata.create_all(engine)
+    token = create_access_token(_user(7))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    for _ in range(5):
+        user = await dependencies.get_current_user(credentials, session)
+        assert user.id == 7
+
+    assert len(lookups) == 1
+    assert cache.stats.db_lookups == 1
+    assert cache.stats.hits == 4
+
+    cache.invalidate(7)
+    await dependencies.get_current_user(credentials, session)
+    assert len(lookups) == 2
+
+    with pytest.raises(HTTPException):
+        await dependencies.get_current_user(None, session)
+    assert cache.stats.rejected == 1
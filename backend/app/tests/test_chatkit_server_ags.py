@@ -18,6 +18,8 @@ os.environ.setdefault("AUTH_SECRET_KEY", "secret")
 
 import backend.app.tests.test_workflows_nested as _workflow_test_stubs  # noqa: F401
 from backend.app.chatkit_server.ags import (
+    AGSPublishQueue,
+    AGSTransientError,
     NullAGSClient,
     process_workflow_end_state_ags,
 )
@@ -184,3 +186,84 @@ async def test_process_workflow_end_state_missing_data_skips_calls() -> None:
     assert client.ensure_calls == []
     assert client.publish_calls == []
 
+
+
+class _FlakyAGSClient(_StubAGSClient):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self._failures = failures
+
+    async def publish_score(self, **kwargs) -> None:
+        if self._failures > 0:
+            self._failures -= 1
+            raise AGSTransientError("503")
+        await super().publish_score(**kwargs)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_publish_queue_retries_transient_errors() -> None:
+    client = _FlakyAGSClient(failures=2)
+    delays: list[float] = []
+
+    async def _sleep(delay: float) -> None:
+        delays.append(delay)
+
+    queue = AGSPublishQueue(client, base_delay=1.0, sleep=_sleep)
+    end_state = WorkflowEndState(
+        slug="end",
+        status_type="closed",
+        status_reason="done",
+        message="Terminé",
+        ags_variable_id="score-3",
+        ags_score_value=7.0,
+        ags_score_maximum=10.0,
+    )
+
+    assert queue.submit(end_state=end_state, context=None) is True
+    await queue.join()
+    await queue.aclose()
+
+    assert len(client.publish_calls) == 1
+    assert len(client.ensure_calls) == 3
+    assert len(delays) == 2
+    assert 0.5 <= delays[0] <= 1.0
+    assert 1.0 <= delays[1] <= 2.0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_publish_queue_drains_pending_grades_on_close() -> None:
+    client = _FlakyAGSClient(failures=0)
+    queue = AGSPublishQueue(client)
+    for index in range(3):
+        queue.submit(
+            end_state=WorkflowEndState(
+                slug="end",
+                status_type="closed",
+                status_reason="done",
+                message="Terminé",
+                ags_variable_id=f"score-{index}",
+                ags_score_value=5.0,
+                ags_score_maximum=10.0,
+            ),
+            context=None,
+        )
+
+    await queue.aclose()
+
+    assert len(client.publish_calls) == 3
+
+
+@pytest.mark.anyio("asyncio")
+async def test_publish_queue_ignores_end_state_without_grade() -> None:
+    queue = AGSPublishQueue(_StubAGSClient())
+    end_state = WorkflowEndState(
+        slug="end",
+        status_type="closed",
+        status_reason=None,
+        message=None,
+        ags_variable_id=None,
+        ags_score_value=None,
+        ags_score_maximum=None,
+    )
+
+    assert queue.submit(end_state=end_state, context=None) is False
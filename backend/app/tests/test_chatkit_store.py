@@ -6,6 +6,7 @@ import pytest
 from backend.app.chatkit_store import PostgresChatKitStore
 from backend.app.models import Base, ChatThread
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from chatkit.store import NotFoundError
@@ -195,3 +196,63 @@ def test_save_thread_strips_null_bytes_from_metadata(tmp_path) -> None:
             assert metadata.get("bad_text") == "abcdef"
 
     asyncio.run(_run())
+
+
+@pytest.mark.parametrize("use_async_engine", [False, True])
+def test_store_round_trip(tmp_path, use_async_engine: bool) -> None:
+    async def _run() -> None:
+        database_path = tmp_path / "store-round-trip.db"
+        store, factory = _build_store(database_path, _StubWorkflowService())
+        if use_async_engine:
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+            store = PostgresChatKitStore(
+                factory,
+                workflow_service=_StubWorkflowService(),
+                async_session_factory=async_sessionmaker(
+                    async_engine, expire_on_commit=False, autoflush=False
+                ),
+            )
+        context = SimpleNamespace(user_id="user-1", is_admin=False, branch_id=None)
+
+        await store.save_thread(
+            ThreadMetadata(id="thread-1", created_at=dt.datetime.now(dt.UTC)), context
+        )
+        for index, text in enumerate(["Bonjour", "Salut"]):
+            await store.add_thread_item(
+                "thread-1",
+                UserMessageItem(
+                    id=f"item-{index}",
+                    thread_id="thread-1",
+                    created_at=dt.datetime.now(dt.UTC),
+                    content=[UserMessageTextContent(text=text)],
+                    attachments=[],
+                    inference_options=InferenceOptions(),
+                ),
+                context,
+            )
+
+        page = await store.load_thread_items("thread-1", None, 10, "asc", context)
+        assert [item.id for item in page.data] == ["item-0", "item-1"]
+
+        edited = page.data[0].model_copy(
+            update={"content": [UserMessageTextContent(text="Bonsoir")]}
+        )
+        await store.save_item("thread-1", edited, context)
+        loaded = await store.load_item("thread-1", "item-0", context)
+        assert loaded.content[0].text == "Bonsoir"
+
+        await store.delete_thread_item("thread-1", "item-1", context)
+        page = await store.load_thread_items("thread-1", None, 10, "desc", context)
+        assert [item.id for item in page.data] == ["item-0"]
+
+        threads = await store.load_threads(10, None, "desc", context)
+        assert [thread.id for thread in threads.data] == ["thread-1"]
+
+        await store.delete_thread("thread-1", context)
+        with pytest.raises(NotFoundError):
+            await store.load_thread("thread-1", context)
+
+        if use_async_engine:
+            await async_engine.dispose()
+
+    asyncio.run(_run())
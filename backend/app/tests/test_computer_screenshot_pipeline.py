@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.computer import hosted_browser  # noqa: E402
+from app.computer.screenshot_pipeline import (  # noqa: E402
+    ScreenshotPipeline,
+    ScreenshotSettings,
+)
+
+
+def test_screenshot_settings_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CHATKIT_HOSTED_BROWSER_SCREENSHOT_FORMAT", "JPG")
+    monkeypatch.setenv("CHATKIT_HOSTED_BROWSER_SCREENSHOT_QUALITY", "250")
+    monkeypatch.setenv("CHATKIT_HOSTED_BROWSER_SCREENSHOT_FULL_PAGE", "true")
+    monkeypatch.setenv("CHATKIT_HOSTED_BROWSER_SCREENSHOT_DEDUPE", "off")
+
+    settings = ScreenshotSettings.from_env()
+
+    assert settings.format == "jpeg"
+    assert settings.capture_type == "jpeg"
+    assert settings.quality == 100
+    assert settings.full_page is True
+    assert settings.dedupe is False
+    assert ScreenshotSettings(format="webp").capture_type == "png"
+    assert ScreenshotSettings(format="gif").format == "png"
+
+
+def test_pipeline_dedupes_unchanged_frames() -> None:
+    pipeline = ScreenshotPipeline(settings=ScreenshotSettings(format="png"))
+
+    first = pipeline.process(b"frame-a")
+    second = pipeline.process(b"frame-a")
+    third = pipeline.process(b"frame-b")
+
+    assert second is first
+    assert base64.b64decode(third) == b"frame-b"
+    stats = pipeline.stats.as_dict()
+    assert stats["frames"] == 3
+    assert stats["deduplicated_frames"] == 1
+    assert stats["deduplicated_bytes"] == len(b"frame-a")
+    assert stats["bytes_saved"] == len(b"frame-a")
+
+    pipeline.reset()
+    assert pipeline.process(b"frame-b") == third
+    assert pipeline.stats.deduplicated_frames == 1
+
+
+def test_pipeline_without_dedupe_keeps_every_frame() -> None:
+    pipeline = ScreenshotPipeline(settings=ScreenshotSettings(dedupe=False))
+
+    pipeline.process(b"frame")
+    pipeline.process(b"frame")
+
+    assert pipeline.stats.deduplicated_frames == 0
+    assert pipeline.stats.encoded_bytes == 2 * len(b"frame")
+
+
+def test_hosted_browser_uses_viewport_capture_settings(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(hosted_browser, "async_playwright", None)
+    captures: list[dict[str, object]] = []
+    original_capture = hosted_browser._FallbackDriver.capture
+
+    async def _recording_capture(self, **kwargs):
+        captures.append(kwargs)
+        return await original_capture(self, **kwargs)
+
+    monkeypatch.setattr(hosted_browser._FallbackDriver, "capture", _recording_capture)
+
+    async def _run() -> None:
+        browser = hosted_browser.HostedBrowser(
+            width=320,
+            height=240,
+            environment="browser",
+            screenshot_settings=ScreenshotSettings(format="jpeg", quality=60),
+        )
+        try:
+            first = await browser.screenshot()
+            second = await browser.screenshot()
+            assert second == first
+            assert browser.screenshot_stats.deduplicated_frames == 1
+        finally:
+            await browser.close()
+
+    asyncio.run(_run())
+
+    assert captures[0] == {"full_page": False, "image_type": "jpeg", "quality": 60}
+
+
+def test_pipeline_downscales_and_reencodes_with_pillow() -> None:
+    image_module = pytest.importorskip("PIL.Image")
+
+    source = io.BytesIO()
+    image_module.new("RGB", (200, 100), (10, 20, 30)).save(source, format="PNG")
+    settings = ScreenshotSettings(format="webp", max_width=100)
+    pipeline = ScreenshotPipeline(settings=settings)
+
+    scale = settings.scale_for(200, 100)
+    encoded = pipeline.process(source.getvalue(), scale=scale)
+
+    assert scale == 0.5
+    result = image_module.open(io.BytesIO(base64.b64decode(encoded)))
+    assert result.format == "WEBP"
+    assert result.size == (100, 50)
+
+
+def test_pipeline_keeps_small_changes_unless_perceptual_dedupe() -> None:
+    image_module = pytest.importorskip("PIL.Image")
+
+    def _frame(caret: bool) -> bytes:
+        image = image_module.new("RGB", (200, 100), (255, 255, 255))
+        if caret:
+            image.putpixel((50, 50), (0, 0, 0))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    exact = ScreenshotPipeline(settings=ScreenshotSettings(format="png"))
+    exact.process(_frame(False))
+    assert base64.b64decode(exact.process(_frame(True))) == _frame(True)
+    assert exact.stats.deduplicated_frames == 0
+
+    perceptual = ScreenshotPipeline(
+        settings=ScreenshotSettings(
+            format="png", perceptual_dedupe=True, hash_threshold=8
+        )
+    )
+    first = perceptual.process(_frame(False))
+    assert perceptual.process(_frame(True)) is first
+    assert perceptual.stats.deduplicated_frames == 1
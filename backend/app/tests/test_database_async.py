@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app import database  # noqa: E402
+
+
+def test_async_database_url_mapping(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("DATABASE_ASYNC_URL", raising=False)
+    monkeypatch.delenv("DATABASE_ASYNC_ENABLED", raising=False)
+    available = {"asyncpg", "aiosqlite", "psycopg"}
+    monkeypatch.setattr(
+        database.importlib.util,
+        "find_spec",
+        lambda name: object() if name in available else None,
+    )
+
+    assert (
+        database._async_database_url(
+            "postgresql+psycopg://u:p@db/chatkit?sslmode=require"
+        )
+        == "postgresql+asyncpg://u:p@db/chatkit?ssl=require"
+    )
+    assert database._async_database_url("sqlite:///./chatkit.db") == (
+        "sqlite+aiosqlite:///./chatkit.db"
+    )
+    assert database._async_database_url("sqlite://") is None
+    assert database._async_database_url("sqlite:///:memory:") is None
+
+    available.discard("asyncpg")
+    assert database._async_database_url("postgresql://u:p@db/chatkit") == (
+        "postgresql+psycopg://u:p@db/chatkit"
+    )
+
+    monkeypatch.setenv("DATABASE_ASYNC_ENABLED", "false")
+    assert database._async_database_url("postgresql://u:p@db/chatkit") is None
+
+
+@pytest.mark.asyncio
+async def test_run_in_session_falls_back_to_thread_pool(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    monkeypatch.setattr(database, "AsyncSessionLocal", None)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=engine))
+
+    result = await database.run_in_session(
+        lambda session: session.execute(text("SELECT 42")).scalar_one()
+    )
+
+    assert result == 42
+    engine.dispose()
+
+
+def test_async_pool_is_sized_separately(monkeypatch: pytest.MonkeyPatch) -> None:
+    captured: dict[str, object] = {}
+
+    def _fake_create_async_engine(url: str, **options: object) -> object:
+        captured.update(options)
+        return object()
+
+    monkeypatch.setattr(database, "create_async_engine", _fake_create_async_engine)
+    monkeypatch.setattr(
+        database,
+        "_async_database_url",
+        lambda _url: "postgresql+asyncpg://u:p@db/chatkit",
+    )
+    monkeypatch.delenv("DATABASE_ASYNC_POOL_SIZE", raising=False)
+    monkeypatch.delenv("DATABASE_ASYNC_MAX_OVERFLOW", raising=False)
+
+    database._create_async_engine("postgresql://u:p@db/chatkit")
+    assert (captured["pool_size"], captured["max_overflow"]) == (5, 5)
+
+    monkeypatch.setenv("DATABASE_ASYNC_POOL_SIZE", "2")
+    monkeypatch.setenv("DATABASE_ASYNC_MAX_OVERFLOW", "0")
+    database._create_async_engine("postgresql://u:p@db/chatkit")
+    assert (captured["pool_size"], captured["max_overflow"]) == (2, 0)
+
+
+@pytest.mark.asyncio
+async def test_run_in_session_uses_async_engine(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'a.db'}")
+    monkeypatch.setattr(
+        database, "AsyncSessionLocal", async_sessionmaker(bind=async_engine)
+    )
+    monkeypatch.setattr(database, "SessionLocal", None)
+
+    try:
+        result = await database.run_in_session(
+            lambda session: session.execute(text("SELECT 42")).scalar_one()
+        )
+    finally:
+        await async_engine.dispose()
+
+    assert result == 42
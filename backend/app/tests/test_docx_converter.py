@@ -2,6 +2,8 @@
 Tests pour le module de conversion DOCX vers PDF.
 """
 
+import asyncio
+import os
 import shutil
 import tempfile
 from pathlib import Path
@@ -12,6 +14,8 @@ import pytest
 from app.docx_converter import (
     DOCX_EXTENSIONS,
     DOCX_MIME_TYPES,
+    DocxConversionPool,
+    _hash_file,
     convert_docx_to_pdf,
     convert_docx_to_pdf_sync,
     get_libreoffice_path,
@@ -148,6 +152,111 @@ class TestConvertDocxToPdfAsync:
                 temp_path.unlink(missing_ok=True)
 
 
+@pytest.mark.asyncio
+class TestDocxConversionPool:
+    """Tests pour le pool de conversion DOCX avec cache."""
+
+    @staticmethod
+    def _fake_converter(calls: list[Path], delay: float = 0.0):
+        async def _convert(input_path, output_path, timeout=60, user_installation=None):
+            calls.append(user_installation)
+            await asyncio.sleep(delay)
+            output_path.write_bytes(b"%PDF-" + input_path.read_bytes())
+            return output_path
+
+        return _convert
+
+    async def test_identical_documents_are_converted_once(self, tmp_path):
+        """Un document identique est servi depuis le cache par empreinte."""
+        calls: list[Path] = []
+        pool = DocxConversionPool(size=2, cache_dir=tmp_path / "cache")
+        first = tmp_path / "a.docx"
+        second = tmp_path / "b.docx"
+        first.write_bytes(b"same")
+        second.write_bytes(b"same")
+        try:
+            with patch(
+                "app.docx_converter.convert_docx_to_pdf", self._fake_converter(calls)
+            ):
+                await pool.convert(first, tmp_path / "a.pdf")
+                await pool.convert(second, tmp_path / "b.pdf")
+        finally:
+            await pool.aclose()
+
+        assert len(calls) == 1
+        assert calls[0] is not None  # profil LibreOffice dédié au worker
+        assert (tmp_path / "b.pdf").read_bytes() == b"%PDF-same"
+        assert pool.stats.conversions == 1
+        assert pool.stats.cache_hits == 1
+
+    async def test_concurrent_identical_uploads_share_one_job(self, tmp_path):
+        """Des conversions simultanées du même contenu partagent un seul job."""
+        calls: list[Path] = []
+        pool = DocxConversionPool(size=1)
+        sources = []
+        for index in range(3):
+            source = tmp_path / f"doc{index}.docx"
+            source.write_bytes(b"payload")
+            sources.append(source)
+        try:
+            with patch(
+                "app.docx_converter.convert_docx_to_pdf",
+                self._fake_converter(calls, delay=0.01),
+            ):
+                await asyncio.gather(*(pool.convert(source) for source in sources))
+        finally:
+            await pool.aclose()
+
+        assert len(calls) == 1
+        assert pool.stats.shared_inflight == 2
+        for source in sources:
+            assert source.with_suffix(".pdf").read_bytes() == b"%PDF-payload"
+
+    async def test_cache_is_bounded(self, tmp_path):
+        """Les entrées les plus anciennes sont évincées au-delà de la limite."""
+        calls: list[Path] = []
+        cache_dir = tmp_path / "cache"
+        pool = DocxConversionPool(size=1, cache_dir=cache_dir, cache_max_entries=2)
+        try:
+            with patch(
+                "app.docx_converter.convert_docx_to_pdf", self._fake_converter(calls)
+            ):
+                for index in range(3):
+                    source = tmp_path / f"doc{index}.docx"
+                    source.write_bytes(f"document {index}".encode())
+                    await pool.convert(source)
+                    os.utime(pool._cache_path(_hash_file(source)), ns=(index, index))
+        finally:
+            await pool.aclose()
+
+        assert len(calls) == 3
+        assert sorted(cache_dir.iterdir()) == sorted(
+            pool._cache_path(_hash_file(tmp_path / f"doc{index}.docx"))
+            for index in (1, 2)
+        )
+        # Les PDF déjà remis survivent à l'éviction de leur entrée.
+        assert (tmp_path / "doc0.pdf").read_bytes() == b"%PDF-document 0"
+
+    async def test_failures_are_propagated(self, tmp_path):
+        """Les erreurs de conversion remontent à l'appelant."""
+
+        async def _failing(*_args, **_kwargs):
+            raise RuntimeError("Timeout lors de la conversion DOCX vers PDF")
+
+        pool = DocxConversionPool(size=1, cache_dir=tmp_path / "cache")
+        source = tmp_path / "doc.docx"
+        source.write_bytes(b"broken")
+        try:
+            with patch("app.docx_converter.convert_docx_to_pdf", _failing):
+                with pytest.raises(RuntimeError, match="Timeout"):
+                    await pool.convert(source)
+        finally:
+            await pool.aclose()
+
+        assert pool.stats.failures == 1
+        assert list((tmp_path / "cache").iterdir()) == []
+
+
 class TestDocxConstants:
     """Tests pour les constantes du module."""
 
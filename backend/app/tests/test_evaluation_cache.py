@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.workflows.handlers import evaluated_step as evaluated_step_module  # noqa: E402
+from app.workflows.handlers.evaluated_step import EvaluatedStepHandler  # noqa: E402
+from app.workflows.runtime.evaluation_cache import (  # noqa: E402
+    EvaluationCache,
+    EvaluatorAgentPool,
+    normalize_answer,
+)
+from app.workflows.runtime.state_machine import ExecutionContext  # noqa: E402
+
+_UPDATED_AT = datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+
+
+def _node(**parameters: Any) -> SimpleNamespace:
+    return SimpleNamespace(
+        slug="quiz",
+        kind="evaluated_step",
+        definition_id=7,
+        parameters={"model": "gpt-4o-mini", **parameters},
+    )
+
+
+def _context(updated_at: datetime.datetime = _UPDATED_AT) -> ExecutionContext:
+    return ExecutionContext(
+        state={},
+        conversation_history=[],
+        last_step_context=None,
+        steps=[],
+        nodes_by_slug={},
+        edges_by_source={},
+        current_slug="quiz",
+        runtime_vars={"definition": SimpleNamespace(updated_at=updated_at)},
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> EvaluationCache:
+    cache = EvaluationCache(ttl=60, max_entries=32)
+    monkeypatch.setattr(evaluated_step_module, "evaluation_cache", cache)
+    from app.workflows.runtime import evaluation_cache as module
+
+    monkeypatch.setattr(module, "evaluation_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def llm_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+
+    async def _fake_run_agent(self, node, instructions, user_message):  # type: ignore[no-untyped-def]
+        calls.append(user_message)
+        passed = "paris" in user_message.lower()
+        return json.dumps({"passed": passed, "feedback": "ok" if passed else "non"})
+
+    monkeypatch.setattr(EvaluatedStepHandler, "_run_agent", _fake_run_agent)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_identical_answers_skip_the_model(
+    cache: EvaluationCache, llm_calls: list[str]
+) -> None:
+    handler = EvaluatedStepHandler()
+    node = _node()
+
+    first = await handler._call_ai_evaluation(node, _context(), "prompt", "Paris")
+    again = await handler._call_ai_evaluation(node, _context(), "prompt", "  paris ")
+    assert first == again == (True, "ok")
+    assert len(llm_calls) == 1
+
+    # Nouvelle version de la définition ou nouveau prompt : nouvel appel.
+    later = _UPDATED_AT + datetime.timedelta(minutes=1)
+    await handler._call_ai_evaluation(node, _context(later), "prompt", "Paris")
+    await handler._call_ai_evaluation(node, _context(), "autre prompt", "Paris")
+    assert len(llm_calls) == 3
+    assert cache.stats.hits == 1
+    assert cache.stats.hit_rate == pytest.approx(0.25)
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_bypassed_per_node(
+    cache: EvaluationCache, llm_calls: list[str]
+) -> None:
+    handler = EvaluatedStepHandler()
+    node = _node(cache_evaluations=False)
+
+    for _ in range(3):
+        await handler._call_ai_evaluation(node, _context(), "prompt", "Lyon")
+    assert len(llm_calls) == 3
+    assert cache.stats.bypassed == 3
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_model_errors_are_not_cached(
+    cache: EvaluationCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def _broken(self, node, instructions, user_message):  # type: ignore[no-untyped-def]
+        return "pas du JSON"
+
+    monkeypatch.setattr(EvaluatedStepHandler, "_run_agent", _broken)
+    passed, _ = await EvaluatedStepHandler()._call_ai_evaluation(
+        _node(), _context(), "prompt", "Paris"
+    )
+    assert passed is False
+    assert len(cache) == 0
+
+
+def test_entries_expire_and_agents_are_reused() -> None:
+    clock = [0.0]
+    cache = EvaluationCache(ttl=10, max_entries=4, clock=lambda: clock[0])
+    key = EvaluationCache.make_key(
+        node_slug="quiz", version="7:x", prompt="p", answer="Paris"
+    )
+    assert key == EvaluationCache.make_key(
+        node_slug="quiz", version="7:x", prompt="p", answer="PARIS\n"
+    )
+    cache.put(key, (True, "ok"))
+    assert cache.get(key) == (True, "ok")
+    clock[0] = 11
+    assert cache.get(key) is None
+
+    pool = EvaluatorAgentPool()
+    built: list[int] = []
+
+    def _factory() -> tuple[Any, Any]:
+        built.append(1)
+        return object(), object()
+
+    agent_key = EvaluatorAgentPool.make_key("evaluated_step", "quiz", {}, "p")
+    assert pool.get_or_create(agent_key, _factory) is pool.get_or_create(
+        agent_key, _factory
+    )
+    assert len(built) == 1
+
+
+@pytest.mark.asyncio
+async def test_class_of_300_students_reuses_evaluations(
+    cache: EvaluationCache, llm_calls: list[str]
+) -> None:
+    handler = EvaluatedStepHandler()
+    variants = ("Paris", " paris", "PARIS", "Lyon", "Marseille")
+    answers = [variants[index % len(variants)] for index in range(300)]
+
+    for answer in answers:
+        await handler._call_ai_evaluation(_node(), _context(), "prompt", answer)
+
+    assert len(llm_calls) == len({normalize_answer(answer) for answer in answers})
+    assert cache.stats.hit_rate > 0.9
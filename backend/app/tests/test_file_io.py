@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app import file_io  # noqa: E402
+from app.attachment_store import LocalAttachmentStore  # noqa: E402
+from chatkit.types import FileAttachment  # noqa: E402
+
+
+def _reader(payload: bytes):
+    stream = io.BytesIO(payload)
+
+    async def _read(size: int) -> bytes:
+        return stream.read(size)
+
+    return _read
+
+
+@pytest.mark.asyncio
+async def test_write_stream_computes_sha256(tmp_path: Path) -> None:
+    payload = b"x" * 2_500
+    destination = tmp_path / "upload.bin"
+
+    written = await file_io.write_stream(
+        _reader(payload), destination, chunk_size=1_000
+    )
+
+    assert destination.read_bytes() == payload
+    assert written.size == len(payload)
+    assert written.sha256 == hashlib.sha256(payload).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_write_stream_removes_partial_file_when_too_large(tmp_path: Path) -> None:
+    destination = tmp_path / "upload.bin"
+
+    with pytest.raises(file_io.UploadTooLargeError):
+        await file_io.write_stream(
+            _reader(b"y" * 50), destination, max_size=10, chunk_size=8
+        )
+
+    assert not destination.exists()
+
+
+def test_conditional_file_response_supports_etag_and_range(tmp_path: Path) -> None:
+    target = tmp_path / "document.pdf"
+    target.write_bytes(b"0123456789")
+
+    app = FastAPI()
+
+    @app.get("/file")
+    async def _serve(request: Request):
+        return await file_io.conditional_file_response(
+            request, target, media_type="application/pdf"
+        )
+
+    client = TestClient(app)
+
+    full = client.get("/file")
+    assert full.status_code == 200
+    assert full.content == b"0123456789"
+    etag = full.headers["etag"]
+
+    cached = client.get("/file", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    partial = client.get("/file", headers={"Range": "bytes=2-5"})
+    assert partial.status_code == 206
+    assert partial.content == b"2345"
+
+
+class _StubStore:
+    def __init__(self) -> None:
+        self.saved: dict[str, FileAttachment] = {}
+
+    async def save_attachment(self, attachment, context) -> None:
+        self.saved[attachment.id] = attachment
+
+    async def load_attachment(self, attachment_id, context):
+        return self.saved[attachment_id]
+
+
+class _StubUpload:
+    def __init__(self, payload: bytes) -> None:
+        self.read = _reader(payload)
+
+    async def close(self) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_attachment_store_deduplicates_identical_uploads(tmp_path: Path) -> None:
+    store = _StubStore()
+    attachments = LocalAttachmentStore(store, base_dir=tmp_path)
+    context = SimpleNamespace(user_id="42", is_admin=False, public_base_url=None)
+
+    paths = []
+    for attachment_id in ("att_1", "att_2"):
+        store.saved[attachment_id] = FileAttachment(
+            id=attachment_id, name="notes.txt", mime_type="text/plain"
+        )
+        await attachments.finalize_upload(attachment_id, _StubUpload(b"same"), context)
+        path, _mime, _name = await attachments.open_attachment(attachment_id, context)
+        paths.append(path)
+
+    assert paths[0].read_bytes() == paths[1].read_bytes() == b"same"
+    assert paths[0].stat().st_ino == paths[1].stat().st_ino
+
+    await attachments.delete_attachment("att_1", context)
+    assert not paths[0].exists()
+    assert paths[1].read_bytes() == b"same"
+
+    await attachments.delete_attachment("att_2", context)
+    assert list((tmp_path / ".blobs").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_attachment_store_releases_cached_pdf_with_last_attachment(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def _convert(input_path, output_path, timeout=60, user_installation=None):
+        output_path.write_bytes(b"%PDF-" + input_path.read_bytes())
+        return output_path
+
+    monkeypatch.setattr("app.docx_converter.convert_docx_to_pdf", _convert)
+    store = _StubStore()
+    attachments = LocalAttachmentStore(
+        store, base_dir=tmp_path, async_docx_conversion=False
+    )
+    context = SimpleNamespace(user_id="42", is_admin=False, public_base_url=None)
+    cache_dir = tmp_path / ".docx_pdf_cache"
+
+    for attachment_id in ("att_1", "att_2"):
+        store.saved[attachment_id] = FileAttachment(
+            id=attachment_id, name="cours.docx", mime_type="application/msword"
+        )
+        await attachments.finalize_upload(attachment_id, _StubUpload(b"doc"), context)
+    assert len(list(cache_dir.glob("*.pdf"))) == 1
+
+    await attachments.delete_attachment("att_1", context)
+    assert len(list(cache_dir.glob("*.pdf"))) == 1
+    path, _mime, _name = await attachments.open_attachment("att_2", context)
+    assert path.read_bytes() == b"%PDF-doc"
+
+    await attachments.delete_attachment("att_2", context)
+    assert list(cache_dir.glob("*.pdf")) == []
+    await attachments._docx_pool.aclose()
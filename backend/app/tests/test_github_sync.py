@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.github import api_service  # noqa: E402
+from app.github import sync_service as sync_module  # noqa: E402
+from app.github.api_service import GitHubAPIError, GitHubAPIService  # noqa: E402
+from app.github.sync_service import WorkflowSyncService  # noqa: E402
+from app.models import (  # noqa: E402
+    Base,
+    GitHubIntegration,
+    GitHubRepoSync,
+    Workflow,
+    WorkflowDefinition,
+    WorkflowGitHubMapping,
+)
+from app.secret_utils import encrypt_secret  # noqa: E402
+from benchmarks.fake_github import FakeGitHub, git_blob_sha  # noqa: E402
+
+REPO = "acme/workflows"
+
+
+def _workflow_json(label: str) -> str:
+    return json.dumps({"nodes": [{"slug": label}], "edges": []})
+
+
+class _FakeImporter:
+    """Remplace ``WorkflowPersistenceService.import_workflow`` sans graphe réel."""
+
+    def __init__(self) -> None:
+        self.imports: list[str] = []
+
+    def import_workflow(self, *, graph_payload, session, workflow_id=None, slug=None,
+                        display_name=None, **kwargs):
+        self.imports.append(graph_payload["nodes"][0]["slug"])
+        if workflow_id is None:
+            workflow = Workflow(slug=slug, display_name=display_name)
+            session.add(workflow)
+            session.flush()
+            workflow_id = workflow.id
+        return SimpleNamespace(id=len(self.imports), workflow_id=workflow_id)
+
+
+@pytest.fixture
+def fake() -> FakeGitHub:
+    api_service.etag_cache.clear()
+    return FakeGitHub(
+        {
+            f"workflows/flow-{index}.json": _workflow_json(f"flow-{index}")
+            for index in range(6)
+        }
+        | {"README.md": "# demo"}
+    )
+
+
+@pytest.fixture
+def setup(fake: FakeGitHub, monkeypatch: pytest.MonkeyPatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    integration = GitHubIntegration(
+        user_id=1,
+        access_token_encrypted=encrypt_secret("token"),
+        github_user_id=1,
+        github_username="octo",
+        scopes="repo",
+    )
+    session.add(integration)
+    session.flush()
+    repo_sync = GitHubRepoSync(
+        integration_id=integration.id,
+        repo_full_name=REPO,
+        branch="main",
+        file_pattern="workflows/*.json",
+    )
+    session.add(repo_sync)
+    session.commit()
+
+    service = WorkflowSyncService(session)
+    importer = _FakeImporter()
+    service.workflow_service = importer
+    monkeypatch.setattr(
+        service,
+        "_get_api_service",
+        lambda repo_sync: GitHubAPIService(
+            repo_sync.integration,
+            base_url="http://github.test",
+            transport=fake.transport(),
+        ),
+    )
+    yield SimpleNamespace(
+        session=session, repo_sync=repo_sync, service=service, importer=importer
+    )
+    session.close()
+    engine.dispose()
+
+
+def _pull(setup, **kwargs):
+    result = asyncio.run(setup.service.pull_workflows(setup.repo_sync, **kwargs))
+    setup.session.refresh(setup.repo_sync)
+    return result
+
+
+def test_first_pull_downloads_all_blobs_concurrently(setup, fake: FakeGitHub) -> None:
+    result = _pull(setup)
+
+    assert (result["imported"], result["skipped"], result["errors"]) == (6, 0, [])
+    assert fake.count("GET", "/git/blobs/") == 6
+    assert fake.count("GET", "/contents/") == 0
+    assert setup.repo_sync.last_tree_sha == fake.tree_sha
+    assert setup.repo_sync.last_tree_mapping_count == 6
+
+
+def test_unchanged_tree_skips_everything(setup, fake: FakeGitHub) -> None:
+    _pull(setup)
+    fake.requests.clear()
+
+    result = _pull(setup)
+
+    assert result["tree_unchanged"] is True
+    assert result["api_requests"] == 1
+    # La branche est revalidée par ETag : 304 sans corps.
+    assert fake.requests == [("GET", f"/repos/{REPO}/branches/main", 304)]
+
+
+def test_only_changed_blobs_are_fetched(setup, fake: FakeGitHub) -> None:
+    _pull(setup)
+    fake.files["workflows/flow-2.json"] = _workflow_json("flow-2-v2")
+    fake.files["workflows/flow-9.json"] = _workflow_json("flow-9")
+    fake.requests.clear()
+    setup.importer.imports.clear()
+
+    result = _pull(setup)
+
+    assert (result["imported"], result["updated"], result["skipped"]) == (1, 1, 5)
+    assert sorted(setup.importer.imports) == ["flow-2-v2", "flow-9"]
+    assert fake.count("GET", "/git/blobs/") == 2
+    mapping = setup.session.query(WorkflowGitHubMapping).filter_by(
+        file_path="workflows/flow-2.json"
+    ).one()
+    assert mapping.github_sha == git_blob_sha(fake.files["workflows/flow-2.json"])
+
+
+def test_deleted_mapping_forces_a_tree_diff(setup, fake: FakeGitHub) -> None:
+    _pull(setup)
+    mapping = setup.session.query(WorkflowGitHubMapping).filter_by(
+        file_path="workflows/flow-0.json"
+    ).one()
+    setup.session.delete(mapping)
+    setup.session.commit()
+    setup.session.refresh(setup.repo_sync)
+    fake.requests.clear()
+
+    result = _pull(setup)
+
+    assert result["tree_unchanged"] is False
+    assert result["imported"] == 1
+    assert fake.count("GET", "/git/blobs/") == 1
+
+
+def test_pooled_client_reuses_etags() -> None:
+    api_service.etag_cache.clear()
+    fake = FakeGitHub({"a.json": "{}"})
+    integration = SimpleNamespace(id=1, access_token_encrypted=encrypt_secret("t"))
+
+    async def _run() -> list[str]:
+        async with GitHubAPIService(
+            integration, base_url="http://github.test", transport=fake.transport()
+        ) as api:
+            blob_sha = git_blob_sha("{}")
+            blobs = await api.fetch_blobs(REPO, [blob_sha, blob_sha])
+            again = await api.get_blob(REPO, git_blob_sha("{}"))
+            missing = await api.fetch_blobs(REPO, ["0" * 40])
+        return [blobs[git_blob_sha("{}")], again, missing["0" * 40].status_code]
+
+    assert asyncio.run(_run()) == ["{}", "{}", 404]
+    assert [status for _, _, status in fake.requests] == [200, 304, 404]
+
+
+def _edit_locally(setup, monkeypatch: pytest.MonkeyPatch, *paths: str) -> None:
+    monkeypatch.setattr(
+        sync_module,
+        "serialize_definition_graph",
+        lambda definition: {"nodes": [{"slug": definition.name}], "edges": []},
+    )
+    for path in paths:
+        mapping = setup.session.query(WorkflowGitHubMapping).filter_by(
+            file_path=path
+        ).one()
+        definition = WorkflowDefinition(
+            workflow_id=mapping.workflow_id, name=f"{path}-local", version=2
+        )
+        setup.session.add(definition)
+        setup.session.flush()
+        mapping.workflow.active_version_id = definition.id
+        mapping.sync_status = "local_changes"
+    setup.session.commit()
+
+
+def test_batched_push_creates_a_single_commit(
+    setup, fake: FakeGitHub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _pull(setup)
+    paths = [f"workflows/flow-{index}.json" for index in (1, 3, 4)]
+    _edit_locally(setup, monkeypatch, *paths)
+    fake.requests.clear()
+
+    result = asyncio.run(setup.service.push_workflows(setup.repo_sync))
+
+    assert (result["pushed"], result["errors"]) == (3, [])
+    assert result["commit_sha"] == fake.head
+    assert [commit["message"] for commit in fake.commits.values()] == [
+        "Update 3 workflows"
+    ]
+    # Branche, arbre, nouvel arbre, commit, référence : indépendant de N.
+    assert result["api_requests"] == 5
+    for path in paths:
+        mapping = setup.session.query(WorkflowGitHubMapping).filter_by(
+            file_path=path
+        ).one()
+        assert mapping.sync_status == "synced"
+        assert mapping.github_sha == git_blob_sha(fake.files[path])
+        assert mapping.github_commit_sha == fake.head
+
+
+def test_batched_push_reports_conflicts_and_retries_moved_branch(
+    setup, fake: FakeGitHub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _pull(setup)
+    _edit_locally(setup, monkeypatch, "workflows/flow-1.json", "workflows/flow-2.json")
+    fake.files["workflows/flow-2.json"] = _workflow_json("edited-on-github")
+
+    original = GitHubAPIService.create_commit
+    moved: list[bool] = []
+
+    async def _racing_create_commit(self, *args, **kwargs):
+        if not moved:
+            moved.append(True)
+            fake.files["README.md"] = "# concurrent push"
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(GitHubAPIService, "create_commit", _racing_create_commit)
+
+    result = asyncio.run(setup.service.push_workflows(setup.repo_sync))
+
+    assert result["pushed"] == 1
+    assert [error["file_path"] for error in result["errors"]] == [
+        "workflows/flow-2.json"
+    ]
+    assert fake.count("PATCH", "/git/refs/") == 2
+    assert fake.files["README.md"] == "# concurrent push"
+    assert "flow-1.json-local" in fake.files["workflows/flow-1.json"]
+    statuses = {
+        m.file_path: m.sync_status
+        for m in setup.session.query(WorkflowGitHubMapping)
+    }
+    assert statuses["workflows/flow-1.json"] == "synced"
+    assert statuses["workflows/flow-2.json"] == "conflict"
+
+
+def test_failed_push_keeps_the_pull_result(
+    setup, fake: FakeGitHub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _pull(setup)
+    _edit_locally(setup, monkeypatch, "workflows/flow-1.json")
+
+    async def _failing_create_tree(self, *args, **kwargs):
+        raise GitHubAPIError("boom", status_code=500)
+
+    monkeypatch.setattr(GitHubAPIService, "create_tree", _failing_create_tree)
+
+    result = asyncio.run(setup.service.sync_bidirectional(setup.repo_sync))
+
+    assert result["pull"]["operation"] == "pull"
+    assert result["push"]["pushed"] == 0
+    assert [error["file_path"] for error in result["push"]["errors"]] == [
+        "workflows/flow-1.json"
+    ]
+    mapping = setup.session.query(WorkflowGitHubMapping).filter_by(
+        file_path="workflows/flow-1.json"
+    ).one()
+    assert mapping.sync_status == "local_changes"
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.i18n_translation import (  # noqa: E402
+    TranslationBatchError,
+    TranslationReport,
+    parse_source_translations,
+    render_translation_file,
+    split_batches,
+    translate_dictionary,
+    translate_entries,
+    translation_context,
+    validate_batch,
+)
+from app.models import Base, TranslationMemory  # noqa: E402
+
+
+@pytest.fixture
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=[TranslationMemory.__table__])
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+class _Translator:
+    """Traducteur simulé : préfixe chaque valeur et journalise les lots reçus."""
+
+    def __init__(self) -> None:
+        self.batches: list[dict[str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, batch: dict[str, str]) -> str:
+        self.batches.append(dict(batch))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        translated = {key: f"fr:{value}" for key, value in batch.items()}
+        return "```json\n" + json.dumps(translated) + "\n```"
+
+
+def test_parse_and_render_round_trip() -> None:
+    content = (
+        'export const en: TranslationDictionary = {\n'
+        '  "a.title": "Hello",\n'
+        '  "a.quote":\n    "Editing \\"{{model}}\\".",\n'
+        "};\n"
+    )
+
+    parsed = parse_source_translations(content)
+
+    assert parsed == {"a.title": "Hello", "a.quote": 'Editing "{{model}}".'}
+    assert parse_source_translations(render_translation_file("de", parsed)) == parsed
+
+
+def test_split_batches_bounds_keys_and_size() -> None:
+    entries = {f"k{i}": "x" * 10 for i in range(7)}
+
+    by_keys = split_batches(entries, max_keys=3, max_chars=1000)
+    by_size = split_batches(entries, max_keys=10, max_chars=25)
+
+    assert [len(batch) for batch in by_keys] == [3, 3, 1]
+    assert [len(batch) for batch in by_size] == [2, 2, 2, 1]
+
+
+def test_validate_batch_checks_keys_and_placeholders() -> None:
+    source = {"a": "{{count}} items", "b": "Save", "c": "Close"}
+
+    valid, errors = validate_batch(
+        source, {"a": "{{total}} éléments", "b": "", "x": "?"}
+    )
+
+    assert valid == {}
+    assert errors == {"a": "placeholders", "b": "empty", "c": "missing"}
+
+
+def test_batches_run_concurrently_and_deduplicate() -> None:
+    translator = _Translator()
+    entries = {f"k{i}": f"text {i % 5}" for i in range(20)}
+    report = TranslationReport()
+
+    result = asyncio.run(
+        translate_entries(
+            entries, translator, batch_size=2, concurrency=2, report=report
+        )
+    )
+
+    assert result == {key: f"fr:{value}" for key, value in entries.items()}
+    assert report.sent_keys == 5 and report.batches == 3
+    assert translator.max_in_flight == 2
+
+
+def test_invalid_keys_are_retried_alone() -> None:
+    calls: list[list[str]] = []
+
+    async def _flaky(batch: dict[str, str]) -> str:
+        calls.append(sorted(batch))
+        payload = {k: f"fr:{v}" for k, v in batch.items()}
+        if len(calls) == 1:
+            payload["b"] = "sans espace réservé"
+            del payload["c"]
+        return json.dumps(payload)
+
+    entries = {"a": "A", "b": "{{n}} B", "c": "C"}
+    result = asyncio.run(translate_entries(entries, _flaky, retry_delay=0))
+
+    assert calls == [["a", "b", "c"], ["b", "c"]]
+    assert result == {"a": "fr:A", "b": "fr:{{n}} B", "c": "fr:C"}
+
+
+def test_exhausted_retries_raise() -> None:
+    async def _broken(batch: dict[str, str]) -> str:
+        return "not json"
+
+    with pytest.raises(TranslationBatchError, match="2 clé\\(s\\) non traduite\\(s\\)"):
+        asyncio.run(
+            translate_entries(
+                {"a": "A", "b": "B"}, _broken, max_attempts=2, retry_delay=0
+            )
+        )
+
+
+def test_incremental_mode_only_sends_new_or_changed_strings(session: Session) -> None:
+    translator = _Translator()
+    source = {"a": "Hello", "b": "Save", "c": "Close"}
+    asyncio.run(translate_dictionary(session, "de", source, translator, batch_size=10))
+    session.commit()
+    assert session.scalar(select(TranslationMemory).limit(1)) is not None
+
+    translator.batches.clear()
+    updated = {"a": "Hello", "b": "Save changes", "c": "Close", "d": "New"}
+    report = TranslationReport()
+    result = asyncio.run(
+        translate_dictionary(session, "de", updated, translator, report=report)
+    )
+
+    assert translator.batches == [{"b": "Save changes", "d": "New"}]
+    assert report.reused_keys == 2
+    assert list(result) == ["a", "b", "c", "d"]
+    assert result["a"] == "fr:Hello" and result["b"] == "fr:Save changes"
+
+    translator.batches.clear()
+    asyncio.run(
+        translate_dictionary(session, "de", updated, translator, incremental=False)
+    )
+    assert len(translator.batches[0]) == 4
+
+
+def test_memory_is_scoped_to_model_and_prompt(session: Session) -> None:
+    translator = _Translator()
+    source = {"a": "Hello", "b": "Save"}
+    default = translation_context("gpt-4o")
+    asyncio.run(
+        translate_dictionary(session, "de", source, translator, context=default)
+    )
+
+    translator.batches.clear()
+    custom = translation_context("gpt-4o", "Translate formally: {{translations_json}}")
+    asyncio.run(translate_dictionary(session, "de", source, translator, context=custom))
+    assert translator.batches == [source]
+
+    translator.batches.clear()
+    other_model = translation_context("gpt-4o-mini")
+    asyncio.run(
+        translate_dictionary(session, "de", source, translator, context=other_model)
+    )
+    assert translator.batches == [source]
+
+    translator.batches.clear()
+    asyncio.run(translate_dictionary(session, "de", source, translator, context=custom))
+    assert translator.batches == []
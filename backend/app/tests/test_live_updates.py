@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.live_updates import (  # noqa: E402
+    LiveUpdateManager,
+    RedisLiveUpdateManager,
+    StepContentUpdate,
+)
+
+
+def _id(entry_id: str) -> tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class _StreamRedis:
+    """Sous-ensemble de ``redis.asyncio.Redis`` (flux et hash) en mémoire.
+
+    Partagé entre plusieurs gestionnaires, il simule un Redis commun à
+    plusieurs workers uvicorn.
+    """
+
+    def __init__(self) -> None:
+        self.streams: dict[str, list[tuple[str, dict[str, str]]]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.available = True
+        self._counter = 0
+        self._changed = asyncio.Condition()
+
+    def _check(self) -> None:
+        if not self.available:
+            raise ConnectionError("redis down")
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        self._check()
+        self._counter += 1
+        entry_id = f"{self._counter}-0"
+        entries = self.streams.setdefault(key, [])
+        entries.append((entry_id, dict(fields)))
+        if maxlen is not None:
+            del entries[:-maxlen]
+        async with self._changed:
+            self._changed.notify_all()
+        return entry_id
+
+    async def xrange(self, key, min="-", max="+"):
+        self._check()
+        exclusive = min.startswith("(")
+        low = (0, 0) if min == "-" else _id(min.lstrip("("))
+        high = None if max == "+" else _id(max)
+        return [
+            (entry_id, fields)
+            for entry_id, fields in self.streams.get(key, [])
+            if (_id(entry_id) > low if exclusive else _id(entry_id) >= low)
+            and (high is None or _id(entry_id) <= high)
+        ]
+
+    async def xrevrange(self, key, max="+", min="-", count=None):
+        entries = list(reversed(await self.xrange(key, min, max)))
+        return entries[:count] if count else entries
+
+    async def xread(self, streams, count=None, block=None):
+        self._check()
+        (key, cursor), = streams.items()
+
+        def _pending():
+            return [
+                entry
+                for entry in self.streams.get(key, [])
+                if _id(entry[0]) > _id(cursor)
+            ][:count]
+
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(_pending), timeout=(block or 0) / 1000
+                )
+            except asyncio.TimeoutError:
+                return []
+        return [[key, _pending()]]
+
+    async def hset(self, key, field, value):
+        self._check()
+        self.hashes.setdefault(key, {})[field] = value
+
+    async def hget(self, key, field):
+        self._check()
+        return self.hashes.get(key, {}).get(field)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _update(workflow_id: int, text: str) -> StepContentUpdate:
+    return StepContentUpdate(workflow_id=workflow_id, step_slug="intro", new_text=text)
+
+
+async def _drain(queue: asyncio.Queue, count: int) -> list:
+    return [
+        await asyncio.wait_for(queue.get(), timeout=1.0) for _ in range(count)
+    ]
+
+
+@pytest.fixture
+def redis_managers():
+    fake = _StreamRedis()
+    managers = [
+        RedisLiveUpdateManager(fake, block_ms=200, retry_delay=0.01, queue_size=4)
+        for _ in range(2)
+    ]
+    return fake, managers
+
+
+def test_memory_replays_missed_events_in_order() -> None:
+    async def _run():
+        manager = LiveUpdateManager()
+        first = await manager.subscribe(1)
+        for text in ("a", "b", "c"):
+            await manager.publish(_update(1, text))
+        received = await _drain(first, 3)
+        manager.unsubscribe(1, first)
+
+        again = await manager.subscribe(1, last_event_id=received[0].event_id)
+        await manager.publish(_update(1, "d"))
+        replayed = await _drain(again, 3)
+        return [e.new_text for e in replayed], await manager.get_last_updated(1)
+
+    texts, last_updated = asyncio.run(_run())
+    assert texts == ["b", "c", "d"]
+    assert last_updated > 0
+
+
+def test_slow_subscriber_is_closed_instead_of_growing() -> None:
+    async def _run():
+        manager = LiveUpdateManager(queue_size=3)
+        slow = await manager.subscribe(7)
+        fast = await manager.subscribe(7)
+        for index in range(3):
+            await manager.publish(_update(7, str(index)))
+            await fast.get()
+        await manager.publish(_update(7, "overflow"))
+        return slow, fast, manager
+
+    slow, fast, manager = asyncio.run(_run())
+    assert slow.get_nowait() is None
+    assert fast.get_nowait().new_text == "overflow"
+    assert manager._subscribers[7] == [fast]
+
+
+def test_redis_fans_out_across_workers(redis_managers) -> None:
+    fake, (worker_a, worker_b) = redis_managers
+
+    async def _run():
+        queue_a = await worker_a.subscribe(1)
+        queue_b = await worker_b.subscribe(1)
+        other = await worker_b.subscribe(2)
+        await worker_a.publish(_update(1, "hello"))
+        received = [(await _drain(q, 1))[0] for q in (queue_a, queue_b)]
+        polled = await worker_b.get_last_updated(1)
+        assert other.empty()
+        for manager in (worker_a, worker_b):
+            await manager.aclose()
+        return received, polled
+
+    received, polled = asyncio.run(_run())
+    assert [e.new_text for e in received] == ["hello", "hello"]
+    assert received[0].event_id == received[1].event_id == "1-0"
+    assert polled == pytest.approx(worker_a._last_updated[1])
+
+
+def test_redis_replays_from_last_event_id(redis_managers) -> None:
+    fake, (worker_a, worker_b) = redis_managers
+
+    async def _run():
+        for text in ("a", "b", "c"):
+            await worker_a.publish(_update(1, text))
+        queue = await worker_b.subscribe(1, last_event_id="1-0")
+        await worker_a.publish(_update(1, "d"))
+        events = await _drain(queue, 3)
+        await worker_a.aclose()
+        await worker_b.aclose()
+        return events
+
+    events = asyncio.run(_run())
+    assert [(e.event_id, e.new_text) for e in events] == [
+        ("2-0", "b"),
+        ("3-0", "c"),
+        ("4-0", "d"),
+    ]
+
+
+def test_redis_reader_stops_with_last_subscriber(redis_managers) -> None:
+    fake, (worker, _) = redis_managers
+
+    async def _run():
+        queue = await worker.subscribe(3)
+        reader = worker._readers[3]
+        worker.unsubscribe(3, queue)
+        await asyncio.gather(reader, return_exceptions=True)
+        return reader
+
+    reader = asyncio.run(_run())
+    assert reader.cancelled()
+    assert worker._readers == {} and worker._cursors == {}
+
+
+def test_redis_outage_falls_back_to_local_delivery(redis_managers) -> None:
+    fake, (worker, _) = redis_managers
+
+    async def _run():
+        queue = await worker.subscribe(1)
+        fake.available = False
+        await worker.publish(_update(1, "offline"))
+        event = queue.get_nowait()
+        polled = await worker.get_last_updated(1)
+        fake.available = True
+        await worker.aclose()
+        return event, polled
+
+    event, polled = asyncio.run(_run())
+    assert (event.new_text, event.event_id) == ("offline", None)
+    assert polled > 0
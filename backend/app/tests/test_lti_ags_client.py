@@ -6,6 +6,7 @@ import sys
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
 import httpx
@@ -158,6 +159,9 @@ async def test_lti_ags_client_creates_line_item_and_publishes_score():
                     "scoreMaximum": 25.0,
                 },
             )
+        if request.method == "PUT" and request.url.path == "/lineitems/score-1":
+            assert json.loads(request.content.decode())["scoreMaximum"] == 30.0
+            return httpx.Response(200)
         if request.method == "POST" and request.url.path == "/lineitems/score-1/scores":
             payload = json.loads(request.content.decode())
             assert payload["userId"] == "platform-user"
@@ -217,11 +221,39 @@ async def test_lti_ags_client_creates_line_item_and_publishes_score():
         ("POST", "/token"),
         ("GET", "/lineitems"),
         ("POST", "/lineitems"),
-        ("POST", "/token"),
         ("GET", "/lineitems/score-1"),
         ("POST", "/lineitems/score-1/scores"),
     ]
 
+    requests.clear()
+    await ags_client.ensure_line_item(
+        context=chatkit_context,
+        variable_id="score-1",
+        max_score=None,
+        comment="Excellent",
+    )
+    await ags_client.publish_score(
+        context=chatkit_context,
+        line_item_id=line_item_id,
+        variable_id="score-1",
+        score=18.0,
+        max_score=20.0,
+    )
+
+    # Token et line item sont servis depuis le cache.
+    assert requests == [("POST", "/lineitems/score-1/scores")]
+
+    # Le line item en cache est déjà à jour : aucun PUT.
+    requests.clear()
+    for max_score in (20.0, 30.0, 30.0):
+        await ags_client.ensure_line_item(
+            context=chatkit_context,
+            variable_id="score-1",
+            max_score=max_score,
+            comment="Excellent",
+        )
+    assert requests == [("PUT", "/lineitems/score-1")]
+
 
 @pytest.mark.anyio
 async def test_publish_score_preserves_query_string_for_line_item():
@@ -365,3 +397,53 @@ def test_normalize_score_clamps_within_bounds():
     assert normalize(150, 100) == pytest.approx(1.0)
     assert normalize(-10, 100) == pytest.approx(0.0)
     assert normalize(5, 0) == pytest.approx(0.0)
+
+
+@pytest.mark.anyio
+async def test_access_token_is_cached_until_expiry():
+    config = importlib.import_module("backend.app.config")
+    ags_module = importlib.import_module("backend.app.lti.ags")
+
+    token_requests: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        token_requests.append(request.url.path)
+        return httpx.Response(
+            200,
+            json={"access_token": f"token-{len(token_requests)}", "expires_in": 90},
+        )
+
+    transport = httpx.MockTransport(handler)
+
+    @asynccontextmanager
+    async def client_factory() -> AsyncIterator[httpx.AsyncClient]:
+        async with httpx.AsyncClient(transport=transport, timeout=5.0) as client:
+            yield client
+
+    now = [1_000.0]
+    ags_client = ags_module.LTIAGSClient(
+        session_factory=lambda: None,
+        settings=config.get_settings(),
+        http_client_factory=client_factory,
+        clock=lambda: now[0],
+    )
+    registration = SimpleNamespace(
+        id=1,
+        client_id="platform-client",
+        token_endpoint="https://platform.example/token",
+    )
+    scopes = ["https://purl.imsglobal.org/spec/lti-ags/scope/score"]
+
+    assert await ags_client._obtain_access_token(registration, scopes) == "token-1"
+    assert await ags_client._obtain_access_token(registration, scopes) == "token-1"
+
+    # Un autre ensemble de scopes exige un autre token.
+    other_scopes = [*scopes, "https://purl.imsglobal.org/spec/lti-ags/scope/lineitem"]
+    assert (
+        await ags_client._obtain_access_token(registration, other_scopes) == "token-2"
+    )
+
+    # expires_in (90 s) moins la marge de sécurité (30 s).
+    now[0] += 61
+    assert await ags_client._obtain_access_token(registration, scopes) == "token-3"
+    assert len(token_requests) == 3
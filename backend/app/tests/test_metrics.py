@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app import metrics  # noqa: E402
+from app.auth_cache import UserPrincipalCache  # noqa: E402
+from app.routes import metrics as metrics_routes  # noqa: E402
+from app.telephony.rtp_server import RtpReceptionStats  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from prometheus_client import REGISTRY  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError  # noqa: E402
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_instrumented_pool_reports_checkouts_and_timeouts(tmp_path) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=metrics.InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    checkouts = _sample("chatkit_db_pool_checkouts_total", engine="sync")
+    waits = _sample("chatkit_db_pool_checkout_wait_seconds_count", engine="sync")
+    timeouts = _sample("chatkit_db_pool_timeouts_total", engine="sync")
+    in_use = _sample("chatkit_db_pool_checked_out", engine="sync")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert _sample("chatkit_db_pool_checked_out", engine="sync") == in_use + 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    engine.dispose()
+
+    assert _sample("chatkit_db_pool_checkouts_total", engine="sync") == checkouts + 1
+    assert (
+        _sample("chatkit_db_pool_checkout_wait_seconds_count", engine="sync")
+        == waits + 2
+    )
+    assert _sample("chatkit_db_pool_timeouts_total", engine="sync") == timeouts + 1
+    assert _sample("chatkit_db_pool_checked_out", engine="sync") == in_use
+
+
+def test_rtp_reception_stats_counts_losses_across_wraparound() -> None:
+    stats = RtpReceptionStats(clock_rate=8000)
+    sequence = [65533, 65534, 65535, 1, 2, 4]  # 0 et 3 manquent
+    for index, seq in enumerate(sequence):
+        stats.update(seq, (index * 160) & 0xFFFFFFFF, index * 0.02)
+    assert stats.received == 6
+    assert stats.expected == 8
+    assert stats.lost == 2
+    assert stats.jitter_seconds == pytest.approx(0.0, abs=1e-9)
+
+    jittery = RtpReceptionStats(clock_rate=8000)
+    for index in range(50):
+        arrival = index * 0.02 + (0.01 if index % 2 else 0.0)
+        jittery.update(index, 0xFFFFFF00 + index * 160, arrival)
+    # Écart alterné de 10 ms : l'estimateur converge vers 10 ms.
+    assert jittery.lost == 0
+    assert jittery.jitter_seconds == pytest.approx(0.01, rel=0.05)
+
+
+def test_workflow_and_model_helpers_feed_metrics() -> None:
+    runs = _sample(
+        "chatkit_workflow_run_seconds_count", workflow="quiz", outcome="success"
+    )
+    agent_nodes = _sample("chatkit_workflow_node_executions_total", node_type="agent")
+    tokens = _sample("chatkit_model_tokens_total", model="gpt-test", direction="output")
+
+    metrics.observe_workflow_run(
+        "quiz", 1.5, nodes=3, handler_calls={"agent": 2, "end": 1}, outcome="success"
+    )
+    metrics.record_model_tokens("gpt-test", 0, 42)
+    metrics.record_rtp_stats(
+        "test", jitter_seconds=0.004, packets_received=0, packets_lost=0
+    )
+
+    assert (
+        _sample(
+            "chatkit_workflow_run_seconds_count", workflow="quiz", outcome="success"
+        )
+        == runs + 1
+    )
+    assert (
+        _sample("chatkit_workflow_node_executions_total", node_type="agent")
+        == agent_nodes + 2
+    )
+    assert (
+        _sample("chatkit_model_tokens_total", model="gpt-test", direction="output")
+        == tokens + 42
+    )
+    assert (
+        _sample("chatkit_model_tokens_total", model="gpt-test", direction="input") == 0
+    )
+    assert _sample("chatkit_rtp_jitter_seconds_count", source="test") == 0
+
+
+def test_auth_cache_events_are_exported() -> None:
+    misses = _sample("chatkit_auth_user_cache_events_total", event="misses")
+    rejected = _sample("chatkit_auth_user_cache_events_total", event="rejected")
+
+    cache = UserPrincipalCache(ttl=5, max_entries=4)
+    assert cache.get("7") is None
+    cache.stats.record("rejected")
+
+    assert _sample("chatkit_auth_user_cache_events_total", event="misses") == (
+        misses + 1
+    )
+    assert _sample("chatkit_auth_user_cache_events_total", event="rejected") == (
+        rejected + 1
+    )
+    assert cache.stats.as_dict()["misses"] == 1
+
+
+def test_metrics_endpoint_requires_configured_token(monkeypatch) -> None:
+    app = FastAPI()
+    app.include_router(metrics_routes.router)
+    client = TestClient(app)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "chatkit_store_operation_seconds" in response.text
+
+    monkeypatch.setattr(metrics, "METRICS_BEARER_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    authorized = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert authorized.status_code == 200
+
+
+_WORKER = textwrap.dedent("""
+    import sys
+    from app import metrics
+
+    metrics.SIP_ACTIVE_CALLS.set(2)
+    metrics.record_model_tokens("m", 5, 0)
+    if sys.argv[1] == "exit":
+        metrics.mark_process_dead()
+    """)
+
+_SCRAPER = textwrap.dedent("""
+    from app import metrics
+
+    print(metrics.render_latest()[0].decode())
+    """)
+
+
+def test_multiprocess_mode_aggregates_workers(tmp_path) -> None:
+    env = {
+        **os.environ,
+        "PROMETHEUS_MULTIPROC_DIR": str(tmp_path),
+        "CHATKIT_SKIP_APP_BOOTSTRAP": "1",
+        "METRICS_CELERY_QUEUES": "",
+    }
+
+    def _run(script: str, *args: str) -> str:
+        return subprocess.run(
+            [sys.executable, "-c", script, *args],
+            cwd=ROOT_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        ).stdout
+
+    _run(_WORKER, "exit")
+    _run(_WORKER, "stay")
+    exposition = _run(_SCRAPER)
+    assert 'chatkit_model_tokens_total{direction="input",model="m"} 10.0' in exposition
+    # Le worker arrêté proprement ne compte plus dans la jauge.
+    assert "chatkit_sip_active_calls 2.0" in exposition
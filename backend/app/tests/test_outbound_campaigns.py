@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.models import Base, OutboundCall, SipAccount  # noqa: E402
+from app.telephony.call_pacing import CallPacer, CallPacerRegistry  # noqa: E402
+from app.telephony.outbound_campaigns import OutboundCampaignDialer  # noqa: E402
+from benchmarks.fake_sip import FakeSipEndpoint  # noqa: E402
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        engine, tables=[SipAccount.__table__, OutboundCall.__table__]
+    )
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as db:
+        db.add(SipAccount(id=1, label="trunk", trunk_uri="sip:bot@trunk.test"))
+        db.commit()
+    return factory
+
+
+def _dialer(
+    session_factory, trunk: FakeSipEndpoint, **limits
+) -> OutboundCampaignDialer:
+    return OutboundCampaignDialer(
+        session_factory=session_factory,
+        dial=trunk.dial,
+        pacers=CallPacerRegistry(
+            max_concurrent=limits.get("max_concurrent", 3),
+            calls_per_second=limits.get("calls_per_second", 0),
+        ),
+        poll_interval=0.01,
+        retry_delay=0,
+    )
+
+
+def _enqueue(dialer, session_factory, targets, **kwargs) -> str:
+    with session_factory() as db:
+        return dialer.enqueue_campaign(
+            db,
+            targets=targets,
+            workflow_id=1,
+            sip_account_id=1,
+            from_number="bot",
+            **kwargs,
+        )
+
+
+async def _run_campaign(dialer, session_factory, campaign_id) -> dict:
+    dialer.start()
+    try:
+        for _ in range(500):
+            with session_factory() as db:
+                stats = dialer.campaign_stats(db, campaign_id)
+            if stats["queued"] == 0 and stats["in_progress"] == 0:
+                return stats
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"campagne inachevée : {stats}")
+    finally:
+        await dialer.stop()
+        await dialer.wait_idle()
+
+
+def test_campaign_respects_account_concurrency(session_factory) -> None:
+    with session_factory() as db:
+        db.get(SipAccount, 1).max_concurrent_calls = 2
+        db.commit()
+    trunk = FakeSipEndpoint(call_duration=0.03, max_channels=2)
+    dialer = _dialer(session_factory, trunk, max_concurrent=10)
+    targets = [f"+33100000{index:02d}" for index in range(12)]
+
+    async def _run():
+        campaign_id = _enqueue(dialer, session_factory, targets)
+        return await _run_campaign(dialer, session_factory, campaign_id)
+
+    stats = asyncio.run(_run())
+    assert stats["by_status"] == {"completed": 12}
+    assert stats["progress"] == 1.0 and stats["attempts"] == 12
+    assert trunk.peak_active == 2 and trunk.rejected == 0
+
+
+def test_campaign_paces_call_starts(session_factory) -> None:
+    trunk = FakeSipEndpoint()
+    dialer = _dialer(session_factory, trunk, max_concurrent=10, calls_per_second=40)
+
+    async def _run():
+        campaign_id = _enqueue(dialer, session_factory, [f"+3320{i}" for i in range(6)])
+        return await _run_campaign(dialer, session_factory, campaign_id)
+
+    asyncio.run(_run())
+    starts = [at for at, _ in trunk.invites]
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:], strict=False)]
+    assert len(starts) == 6
+    assert min(gaps) >= 0.02
+    assert trunk.invite_rate() <= 40 * 1.05
+
+
+def test_busy_and_unanswered_calls_are_retried(session_factory) -> None:
+    trunk = FakeSipEndpoint(
+        script={"+331": [486, 480, 200], "+332": [486], "+333": [404]}
+    )
+    dialer = _dialer(session_factory, trunk)
+
+    async def _run():
+        campaign_id = _enqueue(
+            dialer, session_factory, ["+331", "+332", "+333"], max_attempts=3
+        )
+        return await _run_campaign(dialer, session_factory, campaign_id)
+
+    stats = asyncio.run(_run())
+    assert stats["by_status"] == {"completed": 1, "busy": 1, "failed": 1}
+    assert stats["attempts"] == 3 + 3 + 1
+    with session_factory() as db:
+        calls = {call.to_number: call for call in db.query(OutboundCall)}
+    assert [a["status"] for a in calls["+331"].metadata_["attempts"]] == [
+        "busy",
+        "no_answer",
+        "completed",
+    ]
+    assert calls["+332"].next_attempt_at is None
+
+
+def test_cancel_and_restart_recovery(session_factory) -> None:
+    trunk = FakeSipEndpoint()
+    dialer = _dialer(session_factory, trunk)
+    campaign_id = _enqueue(dialer, session_factory, ["+1", "+2", "+3"])
+    with session_factory() as db:
+        interrupted = db.query(OutboundCall).filter_by(to_number="+1").one()
+        interrupted.status, interrupted.attempt_count = "dialing", 1
+        db.commit()
+        assert dialer.cancel_campaign(db, campaign_id) == 2
+
+    stats = asyncio.run(_run_campaign(dialer, session_factory, campaign_id))
+    assert stats["by_status"] == {"completed": 1, "cancelled": 2}
+    assert [number for _, number in trunk.invites] == ["+1"]
+    assert stats["attempts"] == 1
+
+
+def test_pacer_blocks_until_a_slot_is_released() -> None:
+    async def _run():
+        pacer = CallPacer(max_concurrent=1, calls_per_second=0)
+        await pacer.acquire()
+        waiter = asyncio.create_task(pacer.acquire())
+        await asyncio.sleep(0.01)
+        blocked = not waiter.done()
+        pacer.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        return blocked, pacer.in_flight, pacer.reserve()
+
+    blocked, in_flight, reserved = asyncio.run(_run())
+    assert blocked and in_flight == 1 and not reserved
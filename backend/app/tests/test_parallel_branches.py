@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.workflows import executor as executor_module  # noqa: E402
+from app.workflows.handlers.parallel import ParallelSplitNodeHandler  # noqa: E402
+from app.workflows.runtime.branch_state import CopyOnWriteState  # noqa: E402
+from app.workflows.runtime.state_machine import ExecutionContext  # noqa: E402
+
+
+def test_copy_on_write_state_isolates_branch_writes() -> None:
+    parent: dict[str, Any] = {"profile": {"tags": ["a"]}, "count": 1, "items": [1]}
+    branch = CopyOnWriteState(parent)
+
+    assert branch.shared_keys == {"profile", "items"}
+    branch["profile"]["tags"].append("b")
+    branch.setdefault("items", []).append(2)
+    branch["count"] += 1
+
+    assert parent == {"profile": {"tags": ["a"]}, "count": 1, "items": [1]}
+    assert branch == {"profile": {"tags": ["a", "b"]}, "count": 2, "items": [1, 2]}
+    assert branch.shared_keys == frozenset()
+
+    snapshot = copy.deepcopy(CopyOnWriteState(parent))
+    assert type(snapshot) is dict and snapshot == parent
+    assert snapshot["profile"] is not parent["profile"]
+
+
+def test_copy_on_write_state_nests_and_guards_iteration() -> None:
+    parent: dict[str, Any] = {
+        "state": {"profile": {"tags": ["a"]}, "large": list(range(100))},
+        "items": [1],
+    }
+    branch = CopyOnWriteState(parent)
+
+    nested = branch["state"]
+    assert isinstance(nested, CopyOnWriteState)
+    nested["profile"]["tags"].append("b")
+    assert nested.shared_keys == {"large"}
+    assert branch["state"]["profile"]["tags"] == ["a", "b"]
+
+    for view in (dict(branch), {**branch}):
+        view["items"].append(2)
+    for value in CopyOnWriteState(parent).values():
+        value.clear()
+    for _key, value in CopyOnWriteState(parent).items():
+        value.clear()
+
+    assert parent == {
+        "state": {"profile": {"tags": ["a"]}, "large": list(range(100))},
+        "items": [1],
+    }
+
+
+def _split_context(state: dict[str, Any], branches: int, **params: Any):
+    split = SimpleNamespace(
+        slug="split",
+        kind="parallel_split",
+        display_name="Split",
+        parameters={"join_slug": "join", **params},
+    )
+    join = SimpleNamespace(
+        slug="join", kind="parallel_join", display_name=None, parameters={}
+    )
+    edges = [
+        SimpleNamespace(target_step=SimpleNamespace(slug=f"branch-{index}"))
+        for index in range(branches)
+    ]
+    agent_setup = object()
+    context = ExecutionContext(
+        state=state,
+        conversation_history=[{"role": "user", "content": "x" * 1000}] * 200,
+        last_step_context={"output": {"value": 1}},
+        steps=[],
+        nodes_by_slug={"split": split, "join": join},
+        edges_by_source={"split": edges},
+        current_slug="split",
+        runtime_vars={"agent_setup": agent_setup},
+    )
+    return split, context, agent_setup
+
+
+@pytest.mark.asyncio
+async def test_parallel_split_bounds_concurrency_and_reuses_agents(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    state = {"shared": {"counter": 0}}
+    split, context, agent_setup = _split_context(state, 6, max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def _fake_run_workflow(  # type: ignore[no-untyped-def]
+        workflow_input, *, runtime_snapshot, **kwargs
+    ):
+        nonlocal running, peak
+        assert runtime_snapshot.isolated is True
+        assert runtime_snapshot.agent_setup is agent_setup
+        assert runtime_snapshot.stop_at_slug == "join"
+        running += 1
+        peak = max(peak, running)
+        runtime_snapshot.state["shared"]["counter"] += 1
+        runtime_snapshot.conversation_history.append({"role": "assistant"})
+        await asyncio.sleep(0.01)
+        running -= 1
+        return executor_module.WorkflowRunSummary(
+            steps=[],
+            final_output={"branch": runtime_snapshot.branch_id},
+            state=runtime_snapshot.state,
+            last_context=runtime_snapshot.last_step_context,
+        )
+
+    monkeypatch.setattr(executor_module, "run_workflow", _fake_run_workflow)
+
+    result = await ParallelSplitNodeHandler().execute(split, context)
+
+    assert peak == 2
+    assert result.next_slug == "join"
+    branches = context.state["parallel_outputs"]["join"]["branches"]
+    assert len(branches) == 6
+    assert all(
+        branch["state"]["shared"]["counter"] == 1 for branch in branches.values()
+    )
+    assert state["shared"] == {"counter": 0}
+    assert len(context.conversation_history) == 200
+
+
+@pytest.mark.asyncio
+async def test_parallel_branches_do_not_share_nested_state(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    state: dict[str, Any] = {"state": {"answers": {"count": 0}, "log": []}}
+    split, context, _agent_setup = _split_context(state, 2)
+
+    async def _fake_run_workflow(  # type: ignore[no-untyped-def]
+        workflow_input, *, runtime_snapshot, **kwargs
+    ):
+        branch_id = runtime_snapshot.branch_id
+        nested = runtime_snapshot.state["state"]
+        nested["answers"]["count"] += 1
+        await asyncio.sleep(0)
+        nested["answers"][branch_id] = True
+        nested["log"].append(branch_id)
+        nested["owner"] = branch_id
+        return executor_module.WorkflowRunSummary(
+            steps=[],
+            final_output=None,
+            state=runtime_snapshot.state,
+            last_context=runtime_snapshot.last_step_context,
+        )
+
+    monkeypatch.setattr(executor_module, "run_workflow", _fake_run_workflow)
+
+    await ParallelSplitNodeHandler().execute(split, context)
+
+    assert state["state"] == {"answers": {"count": 0}, "log": []}
+    branches = context.state["parallel_outputs"]["join"]["branches"]
+    for branch_id, branch in branches.items():
+        assert branch["state"]["state"] == {
+            "answers": {"count": 1, branch_id: True},
+            "log": [branch_id],
+            "owner": branch_id,
+        }
+
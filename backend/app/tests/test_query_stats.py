@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.database.query_stats import (  # noqa: E402
+    QueryBudgetExceeded,
+    QueryStatsMiddleware,
+    assert_max_queries,
+    enforce_query_budgets,
+    install_query_instrumentation,
+    query_budget,
+    query_metrics,
+    track_queries,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    install_query_instrumentation(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO item (id) VALUES (1), (2), (3)"))
+    query_metrics.reset()
+    yield engine
+    query_metrics.reset()
+    engine.dispose()
+
+
+def _build_app(engine) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, expose_headers=True)
+
+    @app.get("/items")
+    @query_budget(2)
+    def list_items() -> list[int]:
+        with engine.connect() as connection:
+            ids = connection.execute(text("SELECT id FROM item")).scalars().all()
+            # N+1 volontaire : une requête par élément.
+            for item_id in ids:
+                connection.execute(
+                    text("SELECT id FROM item WHERE id = :id"), {"id": item_id}
+                )
+        return list(ids)
+
+    return app
+
+
+def test_middleware_exposes_headers_and_metrics(engine) -> None:
+    client = TestClient(_build_app(engine))
+
+    response = client.get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["x-db-query-count"] == "4"
+    assert float(response.headers["x-db-query-time-ms"]) >= 0
+    metric = query_metrics.snapshot()["GET /items"]
+    assert metric["calls"] == 1
+    assert metric["queries"] == 4
+    assert metric["budget_violations"] == 1
+
+
+def test_unmatched_requests_share_one_label(engine) -> None:
+    client = TestClient(_build_app(engine))
+
+    for index in range(3):
+        assert client.get(f"/scan-{index}").status_code == 404
+    assert client.request("PURGE", "/items").status_code == 405
+
+    snapshot = query_metrics.snapshot()
+    assert set(snapshot) == {"<unmatched>"}
+    assert snapshot["<unmatched>"]["calls"] == 4
+
+
+def test_route_budget_and_n_plus_one_detection(
+    engine, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr("app.database.query_stats.N_PLUS_ONE_THRESHOLD", 3)
+    client = TestClient(_build_app(engine))
+
+    with caplog.at_level(logging.WARNING, logger="chatkit.server"):
+        with pytest.raises(QueryBudgetExceeded, match="GET /items : 4 requêtes"):
+            with enforce_query_budgets():
+                client.get("/items")
+
+    assert "Suspicion de N+1 dans GET /items" in caplog.text
+    assert query_metrics.snapshot()["GET /items"]["n_plus_one"] == 1
+
+
+def test_assert_max_queries(engine) -> None:
+    with assert_max_queries(1) as stats:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    assert stats.queries == 1
+
+    with pytest.raises(QueryBudgetExceeded, match="2 requêtes SQL"):
+        with assert_max_queries(1):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
+
+    assert query_metrics.snapshot() == {}
+
+
+def test_nested_scopes_follow_worker_threads(engine) -> None:
+    def _query() -> None:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT id FROM item"))
+
+    async def _run() -> None:
+        with track_queries("outer") as outer:
+            with track_queries("inner") as inner:
+                await asyncio.to_thread(_query)
+            _query()
+        assert (inner.queries, outer.queries) == (1, 2)
+
+    asyncio.run(_run())
+    snapshot = query_metrics.snapshot()
+    assert snapshot["inner"]["queries"] == 1
+    assert snapshot["outer"]["queries"] == 2
+
+
+def test_store_calls_are_labelled_by_method(engine) -> None:
+    from app.chatkit_store import PostgresChatKitStore
+    from app.models import Base
+
+    Base.metadata.create_all(engine)
+    store = PostgresChatKitStore(
+        sessionmaker(bind=engine),
+        workflow_service=SimpleNamespace(
+            get_current=lambda *args, **kwargs: SimpleNamespace(
+                id=10, workflow=SimpleNamespace(id=1, slug="demo")
+            )
+        ),
+    )
+    query_metrics.reset()
+
+    async def _run() -> None:
+        await store.load_threads(
+            limit=10, after=None, order="desc", context=SimpleNamespace(user_id="u")
+        )
+
+    asyncio.run(_run())
+
+    metric = query_metrics.snapshot()["store.load_threads"]
+    assert metric["calls"] == 1
+    assert metric["queries"] >= 1
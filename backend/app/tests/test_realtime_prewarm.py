@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app import realtime_gateway, realtime_runner  # noqa: E402
+from app.realtime_prewarm import ClientSecretPool, McpServerPool  # noqa: E402
+from app.telephony.voice_bridge.voice_bridge import (  # noqa: E402
+    VoiceBridgeMetricsRecorder,
+    VoiceBridgeStats,
+)
+
+
+class _Minter:
+    def __init__(self, *, delay: float = 0.0, expires_at: float | None = None) -> None:
+        self.calls = 0
+        self.delay = delay
+        self.expires_at = expires_at
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        payload: dict = {"value": f"ek_{self.calls}"}
+        if self.expires_at is not None:
+            payload["expires_at"] = self.expires_at
+        return payload
+
+
+def test_prewarmed_secret_is_served_and_refilled() -> None:
+    async def _run():
+        pool = ClientSecretPool(size=1)
+        mint = _Minter()
+        await pool.prewarm("key", mint)
+        inline = _Minter()
+        first = await pool.acquire("key", inline)
+        await asyncio.sleep(0)  # laisse partir le réapprovisionnement
+        second = await pool.acquire("key", inline)
+        await pool.aclose()
+        return first, second, inline.calls, mint.calls, pool.stats()
+
+    first, second, inline_calls, minted, stats = asyncio.run(_run())
+    assert (first["value"], second["value"]) == ("ek_1", "ek_2")
+    assert inline_calls == 0
+    assert minted >= 2
+    assert (stats["hits"], stats["misses"]) == (2, 0)
+
+
+def test_acquire_joins_a_mint_in_flight() -> None:
+    async def _run():
+        pool = ClientSecretPool(size=1)
+        mint = _Minter(delay=0.05)
+        pool.prewarm("key", mint)
+        inline = _Minter()
+        payload = await pool.acquire("key", inline)
+        await pool.aclose()
+        return payload, inline.calls
+
+    payload, inline_calls = asyncio.run(_run())
+    assert payload["value"] == "ek_1"
+    assert inline_calls == 0
+
+
+def test_secrets_close_to_expiry_are_not_served() -> None:
+    now = [1000.0]
+
+    async def _run():
+        pool = ClientSecretPool(size=1, min_ttl=10.0, clock=lambda: now[0])
+        await pool.prewarm("key", _Minter(expires_at=1030.0))
+        now[0] = 1025.0  # plus que 5 s de validité
+        pool._slots["key"].mint = None  # pas de réapprovisionnement
+        inline = _Minter()
+        payload = await pool.acquire("key", inline)
+        return payload, inline.calls, pool.stats()
+
+    payload, inline_calls, stats = asyncio.run(_run())
+    assert payload["value"] == "ek_1" and inline_calls == 1
+    assert stats["expired"] == 1
+
+
+def test_cold_keys_are_minted_inline_without_refill() -> None:
+    async def _run():
+        pool = ClientSecretPool(size=2)
+        inline = _Minter()
+        await pool.acquire("cold", inline)
+        await asyncio.sleep(0)
+        return inline.calls, pool.stats()
+
+    calls, stats = asyncio.run(_run())
+    assert calls == 1
+    assert stats["pooled"] == 0 and stats["minted"] == 0
+
+
+def test_prewarmed_mcp_servers_are_handed_over_once_and_expire() -> None:
+    cleaned: list[list[str]] = []
+
+    async def _cleanup(servers):
+        cleaned.append(list(servers))
+
+    async def _run():
+        pool = McpServerPool(ttl=0.05)
+        counter = iter(range(100))
+
+        async def _connect():
+            return [f"server-{next(counter)}"]
+
+        await pool.prewarm("mcp", _connect, _cleanup)
+        taken = await pool.acquire("mcp", _connect)
+        again = await pool.acquire("mcp", _connect)
+        await pool.prewarm("mcp", _connect, _cleanup)
+        await asyncio.sleep(0.1)
+        return taken, again, pool.stats()
+
+    taken, again, stats = asyncio.run(_run())
+    assert taken == ["server-0"] and again == ["server-1"]
+    assert cleaned == [["server-2"]]
+    assert (stats["hits"], stats["misses"], stats["ready"]) == (1, 1, 0)
+
+
+def test_open_voice_session_uses_prewarmed_resources(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    orchestrator = realtime_runner.RealtimeVoiceSessionOrchestrator()
+    monkeypatch.setattr(realtime_runner, "_ORCHESTRATOR", orchestrator)
+    monkeypatch.setattr(realtime_gateway, "get_realtime_gateway", lambda: None)
+    monkeypatch.setattr(
+        realtime_runner, "RealtimeRunner", lambda agent, config=None: object()
+    )
+    requests: list[str] = []
+    connections: list[int] = []
+
+    async def _request_client_secret(self, **kwargs):
+        requests.append(kwargs["user_id"])
+        await asyncio.sleep(0.02)
+        return {"value": f"ek_{kwargs['user_id']}", "expires_at": 9_999_999_999}
+
+    async def _connect(configs):
+        connections.append(len(configs))
+        return []
+
+    monkeypatch.setattr(
+        realtime_runner.RealtimeVoiceSessionOrchestrator,
+        "_request_client_secret",
+        _request_client_secret,
+    )
+    monkeypatch.setattr(realtime_runner, "_connect_mcp_servers", _connect)
+
+    session = {
+        "model": "gpt-realtime",
+        "instructions": "Bonjour",
+        "voice": "verse",
+        "provider_slug": "openai",
+        "realtime": {},
+        "tools": [
+            {"type": "mcp", "url": "https://example.com/mcp", "transport": "http_sse"},
+            {"type": "function", "name": "transfer_call", "parameters": {}},
+        ],
+    }
+
+    async def _run():
+        realtime_runner.prewarm_voice_session(user_id="caller", **session)
+        handle = await realtime_runner.open_voice_session(user_id="caller", **session)
+        # Les secrets réservés à « caller » ne sont jamais remis à un autre.
+        other = await realtime_runner.open_voice_session(user_id="other", **session)
+        await orchestrator.aclose()
+        return handle, other
+
+    handle, other = asyncio.run(_run())
+    assert handle.client_secret == "ek_caller"
+    assert other.client_secret == "ek_other"
+    # Le premier secret est préémis et le premier jeu MCP préconnecté.
+    assert requests[0] == "caller" and requests.count("other") == 1
+    assert connections == [1, 1]
+    stats = orchestrator.prewarm_stats()
+    assert stats["client_secrets"]["hits"] == 1
+    assert stats["mcp_servers"]["hits"] == 1
+
+
+def test_voice_bridge_metrics_track_time_to_first_audio() -> None:
+    recorder = VoiceBridgeMetricsRecorder()
+
+    async def _run():
+        for delay in (0.4, 0.2, None, 0.3):
+            await recorder.record(
+                VoiceBridgeStats(
+                    duration_seconds=1.0,
+                    inbound_audio_bytes=0,
+                    outbound_audio_bytes=0,
+                    time_to_first_audio=delay,
+                )
+            )
+
+    asyncio.run(_run())
+    snapshot = recorder.snapshot()
+    assert snapshot["time_to_first_audio_p50"] == 0.3
+    assert snapshot["time_to_first_audio_p95"] == 0.4
+    assert snapshot["total_sessions"] == 4
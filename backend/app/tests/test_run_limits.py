@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.run_limits import (  # noqa: E402
+    MemoryRunLimitStore,
+    RedisRunLimitStore,
+    RunLimiter,
+    RunLimitExceeded,
+    RunTicket,
+    ScopeLimits,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limiter(store=None, **limits) -> RunLimiter:
+    return RunLimiter(
+        store,
+        limits={
+            kind: limits.get(kind, ScopeLimits())
+            for kind in ("user", "context", "workflow")
+        },
+        token_window=60,
+        queue_timeout=2,
+        poll_interval=0.01,
+    )
+
+
+async def _queued(limiter: RunLimiter, scopes, positions: list[int]) -> RunTicket:
+    async for admission in limiter.queue(scopes):
+        if isinstance(admission, RunTicket):
+            return admission
+        positions.append(admission)
+    raise AssertionError("no ticket")
+
+
+def test_scopes_skip_missing_and_unlimited_dimensions() -> None:
+    limiter = _limiter(
+        user=ScopeLimits(max_concurrent=2), workflow=ScopeLimits(token_budget=500)
+    )
+    scopes = limiter.scopes_for(user_id="7", context_id="1:course", workflow=None)
+    assert [scope.key for scope in scopes] == ["user:7"]
+    scopes = limiter.scopes_for(user_id="7", workflow="quiz")
+    assert [(s.key, s.max_concurrent, s.token_budget) for s in scopes] == [
+        ("user:7", 2, 0),
+        ("workflow:quiz", 0, 500),
+    ]
+    assert not _limiter().enabled
+
+
+def test_runs_queue_in_order_without_blocking_other_scopes() -> None:
+    async def _run():
+        limiter = _limiter(user=ScopeLimits(max_concurrent=1))
+        alice = limiter.scopes_for(user_id="alice")
+        first = await limiter.admit(alice)
+        positions: dict[str, list[int]] = {"second": [], "third": []}
+        second = asyncio.create_task(_queued(limiter, alice, positions["second"]))
+        await asyncio.sleep(0.02)
+        third = asyncio.create_task(_queued(limiter, alice, positions["third"]))
+        await asyncio.sleep(0.02)
+
+        bob_scopes = limiter.scopes_for(user_id="bob")
+        bob = await asyncio.wait_for(limiter.admit(bob_scopes), 0.5)
+        assert not second.done() and not third.done()
+
+        await first.release(tokens=10)
+        second_ticket = await asyncio.wait_for(second, 1)
+        assert not third.done()
+        await second_ticket.release()
+        await (await asyncio.wait_for(third, 1)).release()
+        await bob.release()
+        return positions, await limiter.usage("user:alice")
+
+    positions, usage = asyncio.run(_run())
+    assert positions == {"second": [1], "third": [2, 1]}
+    assert usage == {"running": 0, "tokens": 10}
+
+
+def test_token_budget_blocks_until_window_rolls_over() -> None:
+    clock = _Clock()
+
+    async def _run():
+        limiter = _limiter(
+            MemoryRunLimitStore(clock=clock),
+            workflow=ScopeLimits(token_budget=100),
+        )
+        scopes = limiter.scopes_for(workflow="quiz")
+        ticket = await limiter.admit(scopes)
+        await ticket.release(tokens=150)
+
+        with pytest.raises(RunLimitExceeded) as excinfo:
+            async for _ in limiter.queue(scopes, timeout=0.05):
+                pass
+        assert excinfo.value.reason == "tokens"
+        assert excinfo.value.scope.key == "workflow:quiz"
+        assert limiter.queue_length() == 0
+
+        clock.now += 61
+        ticket = await asyncio.wait_for(limiter.admit(scopes), 0.5)
+        await ticket.release()
+
+    asyncio.run(_run())
+
+
+def test_abandoned_waiter_leaves_the_queue() -> None:
+    async def _run():
+        limiter = _limiter(context=ScopeLimits(max_concurrent=1))
+        scopes = limiter.scopes_for(context_id="1:course")
+        holder = await limiter.admit(scopes)
+        waiter = asyncio.create_task(limiter.admit(scopes))
+        await asyncio.sleep(0.02)
+        assert limiter.queue_length() == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.queue_length() == 0
+        await holder.release()
+        return await limiter.usage("context:1:course")
+
+    assert asyncio.run(_run())["running"] == 0
+
+
+def test_ticket_is_released_when_its_task_ends_early() -> None:
+    async def _run():
+        limiter = _limiter(user=ScopeLimits(max_concurrent=1))
+        scopes = limiter.scopes_for(user_id="alice")
+        usage = {"tokens": 0}
+
+        async def _workflow() -> None:
+            usage["tokens"] = 40
+            raise RuntimeError("boom")
+
+        failed = asyncio.create_task(_workflow())
+        (await limiter.admit(scopes)).release_when_done(
+            failed, lambda: usage["tokens"]
+        )
+        with pytest.raises(RuntimeError):
+            await failed
+
+        # Cancelled before its first step: the coroutine never runs.
+        ticket = await asyncio.wait_for(limiter.admit(scopes), 0.5)
+        cancelled = asyncio.create_task(_workflow())
+        ticket.release_when_done(cancelled, lambda: 0)
+        cancelled.cancel()
+
+        final = await asyncio.wait_for(limiter.admit(scopes), 0.5)
+        assert cancelled.cancelled()
+        await final.release()
+        return await limiter.usage("user:alice")
+
+    assert asyncio.run(_run()) == {"running": 0, "tokens": 40}
+
+
+@pytest.mark.skipif(
+    not os.getenv("RUN_LIMITS_TEST_REDIS_URL"),
+    reason="RUN_LIMITS_TEST_REDIS_URL non défini",
+)
+def test_redis_store_shares_slots_and_tokens() -> None:
+    async def _run():
+        store = RedisRunLimitStore(
+            url=os.environ["RUN_LIMITS_TEST_REDIS_URL"],
+            prefix=f"test:run_limits:{os.getpid()}",
+        )
+        first = _limiter(store, user=ScopeLimits(max_concurrent=1, token_budget=100))
+        second = _limiter(store, user=ScopeLimits(max_concurrent=1, token_budget=100))
+        scopes = first.scopes_for(user_id="alice")
+        ticket = await first.admit(scopes)
+        with pytest.raises(RunLimitExceeded) as excinfo:
+            async for _ in second.queue(scopes, timeout=0.05):
+                pass
+        assert excinfo.value.reason == "concurrency"
+        await ticket.release(tokens=120)
+        with pytest.raises(RunLimitExceeded) as excinfo:
+            async for _ in second.queue(scopes, timeout=0.05):
+                pass
+        assert excinfo.value.reason == "tokens"
+        await store._redis.delete(
+            store._slots_key("user:alice"), store._tokens_key("user:alice")
+        )
+        await store.aclose()
+
+    asyncio.run(_run())
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.database import schema_version  # noqa: E402
+
+
+def _metadata(*extra_columns: str) -> MetaData:
+    metadata = MetaData()
+    Table(
+        "widgets",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        *(Column(name, String(20)) for name in extra_columns),
+    )
+    return metadata
+
+
+def test_fingerprint_tracks_models_and_migration_sources(tmp_path: Path) -> None:
+    source = tmp_path / "migrations.py"
+    source.write_text("STEP = 1\n")
+
+    base = schema_version.compute_schema_fingerprint(_metadata(), sources=(source,))
+    assert base == schema_version.compute_schema_fingerprint(
+        _metadata(), sources=(source,)
+    )
+    assert base != schema_version.compute_schema_fingerprint(
+        _metadata("label"), sources=(source,)
+    )
+
+    source.write_text("STEP = 2\n")
+    assert base != schema_version.compute_schema_fingerprint(
+        _metadata(), sources=(source,)
+    )
+
+
+def test_ensure_schema_up_to_date_runs_sweep_once(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    sweeps: list[str] = []
+
+    assert schema_version.read_fingerprint(engine) is None
+    assert schema_version.ensure_schema_up_to_date(
+        lambda: sweeps.append("v1"), engine=engine, fingerprint="a" * 64, force=False
+    )
+    assert not schema_version.ensure_schema_up_to_date(
+        lambda: sweeps.append("v1"), engine=engine, fingerprint="a" * 64, force=False
+    )
+    assert schema_version.ensure_schema_up_to_date(
+        lambda: sweeps.append("v2"), engine=engine, fingerprint="b" * 64, force=False
+    )
+    assert schema_version.ensure_schema_up_to_date(
+        lambda: sweeps.append("forced"), engine=engine, fingerprint="b" * 64, force=True
+    )
+
+    assert sweeps == ["v1", "v2", "forced"]
+    assert schema_version.read_fingerprint(engine) == "b" * 64
+    engine.dispose()
+
+
+def test_leader_lock_is_a_no_op_outside_postgres() -> None:
+    engine = create_engine("sqlite://")
+    with schema_version.leader_lock(engine, "seed", blocking=False) as acquired:
+        assert acquired is True
+    engine.dispose()
+
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.voice_relay_framing import (  # noqa: E402
+    FramingNegotiationError,
+    InvalidAudioPayloadError,
+    RelayFraming,
+    VoiceRelayStats,
+    client_audio_text,
+    extract_audio_delta,
+    upstream_append_from_bytes,
+    upstream_append_from_client,
+)
+
+# 20 ms de PCM16 mono à 24 kHz.
+_FRAME = bytes(range(256)) * 3 + bytes(192)
+
+
+def test_negotiate_defaults_to_json_transport() -> None:
+    framing = RelayFraming.negotiate({"type": "start", "workflow_id": 1})
+
+    assert framing == RelayFraming(binary=False, audio_format="pcm16")
+    assert framing.ready_payload(workflow_name="Demo") == {
+        "type": "ready",
+        "workflow_name": "Demo",
+        "audio_transport": "json",
+        "audio_format": "pcm16",
+    }
+
+
+def test_negotiate_binary_transport_and_rejects_unknown_formats() -> None:
+    framing = RelayFraming.negotiate(
+        {"audio_transport": "binary", "audio_format": "G711_ULAW"}
+    )
+    assert framing.binary is True
+    assert framing.audio_format == "g711_ulaw"
+    assert RelayFraming.negotiate({"binary": True}).binary is True
+
+    with pytest.raises(FramingNegotiationError):
+        RelayFraming.negotiate({"audio_transport": "binary", "audio_format": "opus"})
+    with pytest.raises(FramingNegotiationError):
+        RelayFraming.negotiate({"audio_transport": "carrier-pigeon"})
+
+
+def test_upstream_events_match_json_encoding() -> None:
+    audio_b64 = base64.b64encode(_FRAME).decode("ascii")
+    expected = {"type": "input_audio_buffer.append", "audio": audio_b64}
+
+    assert json.loads(upstream_append_from_bytes(_FRAME)) == expected
+    assert json.loads(upstream_append_from_client(audio_b64)) == expected
+    assert json.loads(client_audio_text(audio_b64)) == {
+        "type": "audio",
+        "data": audio_b64,
+    }
+
+
+def test_extract_audio_delta_fast_path_and_fallback() -> None:
+    audio_b64 = base64.b64encode(_FRAME).decode("ascii")
+    event = json.dumps(
+        {
+            "type": "response.audio.delta",
+            "event_id": "evt_1",
+            "response_id": "resp_1",
+            "delta": audio_b64,
+        }
+    )
+
+    assert extract_audio_delta(event) == audio_b64
+    assert extract_audio_delta(event.encode()) == audio_b64
+    assert extract_audio_delta(json.dumps({"type": "response.done"})) is None
+    # Sans séparateur compact, on retombe sur json.loads.
+    spaced = json.dumps({"type": "response.audio.delta", "delta": "QUJD"}, indent=1)
+    assert extract_audio_delta(spaced) == "QUJD"
+
+
+def test_client_audio_must_be_base64_string() -> None:
+    injected = 'QUJD","type":"session.update'
+
+    for data in (injected, None, 42, ["QUJD"], "QUJD!"):
+        with pytest.raises(InvalidAudioPayloadError):
+            upstream_append_from_client(data)
+
+
+def test_binary_transport_saves_client_bytes() -> None:
+    frames = 500  # 10 secondes d'audio dans chaque sens
+    audio_b64 = base64.b64encode(_FRAME).decode("ascii")
+    upstream_delta = json.dumps({"type": "response.audio.delta", "delta": audio_b64})
+    client_json = json.dumps({"type": "audio", "data": audio_b64})
+    json_stats = VoiceRelayStats(binary=False)
+    binary_stats = VoiceRelayStats(binary=True)
+
+    for _ in range(frames):
+        event = upstream_append_from_bytes(_FRAME)
+        binary_stats.record_inbound(len(_FRAME), len(event))
+        frame = base64.b64decode(extract_audio_delta(upstream_delta) or "")
+        binary_stats.record_outbound(len(frame))
+
+        message = json.loads(client_json)
+        event = upstream_append_from_client(message["data"])
+        json_stats.record_inbound(len(client_json), len(event))
+        text = client_audio_text(extract_audio_delta(upstream_delta) or "")
+        json_stats.record_outbound(len(text))
+
+    assert binary_stats.client_frames_in == json_stats.client_frames_in == frames
+    assert binary_stats.upstream_bytes_out <= json_stats.upstream_bytes_out
+    # Le base64 + l'enveloppe JSON gonflent le trafic client d'au moins 33 %.
+    assert json_stats.client_bytes_in >= binary_stats.client_bytes_in * 4 // 3
+    assert json_stats.client_bytes_out >= binary_stats.client_bytes_out * 4 // 3
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.chatkit_server.actions import _WidgetBinding  # noqa: E402
+from app.workflows.runtime.widget_streaming import (  # noqa: E402
+    _collect_widget_values_from_output,
+)
+
+
+def test_bindings_resolve_exact_then_first_nested_path() -> None:
+    output = {
+        "title": "Quiz",
+        "questions": [
+            {"prompt": "2 + 2 ?", "choices": ["3", "4"]},
+            {"prompt": "3 + 3 ?", "choices": ["6", "9"]},
+        ],
+        "image": {"src": ["https://example.test/a.png", "b.png"]},
+    }
+    bindings = {
+        "heading": _WidgetBinding(path=("title",)),
+        "first": _WidgetBinding(path=("questions",)),
+        "second": _WidgetBinding(path=("questions", 1, "choices"), sample=["x"]),
+        "cover": _WidgetBinding(path=("image",), value_key="src"),
+        "missing": _WidgetBinding(path=("answers",)),
+    }
+
+    values = _collect_widget_values_from_output(output, bindings=bindings)
+
+    assert values == {
+        "heading": "Quiz",
+        "first": "2 + 2 ?",
+        "second": ["6", "9"],
+        "cover": "https://example.test/a.png",
+        "questions.0.choices": ["3", "4"],
+        "questions.1.prompt": "3 + 3 ?",
+    }
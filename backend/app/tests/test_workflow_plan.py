@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.models import (  # noqa: E402
+    WorkflowDefinition,
+    WorkflowStep,
+    WorkflowTransition,
+)
+from app.workflows.runtime import plan as plan_module  # noqa: E402
+from app.workflows.runtime.agents import build_edges_by_source  # noqa: E402
+from app.workflows.runtime.plan import (  # noqa: E402
+    CompiledPlanCache,
+    compile_workflow_plan,
+)
+
+_UPDATED_AT = datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+
+
+def _definition(
+    node_count: int, *, definition_id: int | None = 1
+) -> WorkflowDefinition:
+    definition = WorkflowDefinition(
+        id=definition_id, workflow_id=1, version=1, updated_at=_UPDATED_AT
+    )
+    kinds = ("state", "agent", "widget", "condition")
+    steps = [WorkflowStep(slug="start", kind="start", position=0, is_enabled=True)]
+    for index in range(1, node_count - 1):
+        kind = kinds[index % len(kinds)]
+        parameters: dict[str, object] = {"title": f"Étape {index}"}
+        if kind == "state":
+            parameters["state"] = [
+                {"target": "state.counter", "expression": "state.counter"}
+            ]
+        elif kind == "widget":
+            parameters["widget"] = {
+                "source": "variable",
+                "definition_expression": "state.widget",
+            }
+        elif kind == "condition":
+            parameters["path"] = "state.counter"
+        elif kind == "agent" and index % 8 == 1:
+            parameters["workflow"] = {"slug": "nested"}
+        steps.append(
+            WorkflowStep(
+                slug=f"node-{index}",
+                kind=kind,
+                position=index,
+                is_enabled=True,
+                parameters=parameters,
+            )
+        )
+    steps.append(
+        WorkflowStep(slug="end", kind="end", position=node_count, is_enabled=True)
+    )
+    steps.append(
+        WorkflowStep(
+            slug="off", kind="agent", position=node_count + 1, is_enabled=False
+        )
+    )
+    definition.steps.extend(steps)
+    # Identifiants décroissants : l'ordre des arêtes doit suivre l'id.
+    transition_id = 10 * node_count
+    for source, target in zip(steps[:-2], steps[1:-1], strict=True):
+        definition.transitions.append(
+            WorkflowTransition(id=transition_id, source_step=source, target_step=target)
+        )
+        transition_id -= 1
+    definition.transitions.append(
+        WorkflowTransition(
+            id=transition_id, source_step=steps[0], target_step=steps[-2]
+        )
+    )
+    return definition
+
+
+def test_compiled_plan_binds_fresh_per_run_structures() -> None:
+    definition = _definition(10)
+    plan = compile_workflow_plan(definition)
+
+    nodes_by_slug, edges_by_source = plan.bind(definition)
+    assert "off" not in nodes_by_slug
+    assert nodes_by_slug["node-1"] is definition.steps[1]
+    assert edges_by_source == {
+        source: list(edges)
+        for source, edges in build_edges_by_source(definition.transitions).items()
+    }
+    assert [edge.target_step.slug for edge in edges_by_source["start"]] == [
+        "end",
+        "node-1",
+    ]
+    assert plan.start_slug == "start"
+    assert plan.agent_slugs == ("node-1", "node-5")
+    assert plan.nested_workflows["node-1"] == {"slug": "nested"}
+    assert plan.title_for("node-2") == "Étape 2"
+    assert plan.title_for("end") == "end"
+    assert plan.widget_configs["node-2"].source == "variable"
+
+    edges_by_source["start"].clear()
+    assert plan.bind(definition)[1]["start"]
+    with pytest.raises(TypeError):
+        plan.nodes["extra"] = plan.nodes["start"]  # type: ignore[index]
+
+
+def test_plan_cache_is_keyed_by_definition_version() -> None:
+    clock = [0.0]
+    cache = CompiledPlanCache(max_entries=2, ttl=60, clock=lambda: clock[0])
+    definition = _definition(6)
+
+    first = cache.get(definition)
+    assert cache.get(definition) is first
+    assert cache.stats.hits == 1
+
+    definition.updated_at = _UPDATED_AT + datetime.timedelta(seconds=1)
+    assert cache.get(definition) is not first
+
+    clock[0] = 61
+    cache.get(definition)
+    assert cache.stats.compilations == 3
+
+    unsaved = _definition(6, definition_id=None)
+    cache.get(unsaved)
+    assert len(cache) == 1
+
+
+def test_bind_resolves_nodes_by_slug() -> None:
+    plan = compile_workflow_plan(_definition(6))
+    # Une autre session peut charger les nœuds dans un autre ordre.
+    other = _definition(6)
+    other.steps.reverse()
+    other.transitions.reverse()
+
+    nodes_by_slug, edges_by_source = plan.bind(other)
+    assert all(step.slug == slug for slug, step in nodes_by_slug.items())
+    assert [edge.target_step.slug for edge in edges_by_source["start"]] == [
+        "end",
+        "node-1",
+    ]
+
+    next(step for step in other.steps if step.slug == "node-2").slug = "renamed"
+    with pytest.raises(LookupError):
+        plan.bind(other)
+
+
+def test_plan_cache_reuses_plan_across_turns(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(plan_module, "compiled_plan_cache", CompiledPlanCache())
+    definition = _definition(100)
+
+    for _ in range(5):
+        plan = plan_module.get_compiled_plan(definition)
+        nodes_by_slug, _ = plan.bind(definition)
+        assert len(nodes_by_slug) == 100
+
+    assert plan_module.compiled_plan_cache.stats.compilations == 1
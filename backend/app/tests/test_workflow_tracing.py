@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("AUTH_SECRET_KEY", "secret")
+
+from app.models import WorkflowStep  # noqa: E402
+from app.workflows import tracing  # noqa: E402
+from app.workflows.runtime.state_machine import (  # noqa: E402
+    ExecutionContext,
+    NodeHandler,
+    NodeResult,
+    WorkflowStateMachine,
+)
+from app.workflows.tracing import (  # noqa: E402
+    AgentsSdkSpanBridge,
+    OpenTelemetryExporter,
+    WorkflowTracer,
+    trace_span,
+    traced,
+)
+
+
+@pytest.fixture
+def tracer(monkeypatch: pytest.MonkeyPatch) -> WorkflowTracer:
+    instance = WorkflowTracer(sample_rate=1.0, ring_size=3, max_spans=50)
+    monkeypatch.setattr(tracing, "workflow_tracer", instance)
+    return instance
+
+
+def test_sampling_disabled_is_a_noop() -> None:
+    tracer = WorkflowTracer(sample_rate=0.0)
+
+    with tracer.start("workflow.run") as root:
+        with tracer.span("workflow.node") as child:
+            pass
+
+    assert root is None and child is None
+    assert tracer.recent() == []
+
+
+def test_nested_spans_across_tasks_and_errors(tracer: WorkflowTracer) -> None:
+    async def _branch(name: str) -> None:
+        with trace_span("branch", name=name):
+            await asyncio.sleep(0)
+
+    async def _run() -> None:
+        with tracer.start("workflow.run", workflow_slug="demo"):
+            await asyncio.gather(_branch("a"), _branch("b"))
+            with pytest.raises(RuntimeError):
+                with trace_span("store.save_item"):
+                    raise RuntimeError("boom")
+
+    asyncio.run(_run())
+
+    [summary] = tracer.recent()
+    assert summary["name"] == "workflow.run"
+    assert summary["attributes"] == {"workflow_slug": "demo"}
+    assert summary["error"] == "RuntimeError: boom"
+    trace = tracer.get(summary["trace_id"])
+    assert trace is not None
+    root_id = trace["spans"][0]["span_id"]
+    branches = [span for span in trace["spans"] if span["name"] == "branch"]
+    assert {span["attributes"]["name"] for span in branches} == {"a", "b"}
+    assert all(span["parent_id"] == root_id for span in branches)
+    profile = {entry["name"]: entry for entry in trace["profile"]}
+    assert profile["branch"]["count"] == 2
+
+
+def test_ring_and_span_limits() -> None:
+    tracer = WorkflowTracer(sample_rate=1.0, ring_size=2, max_spans=3)
+    for index in range(3):
+        with tracer.start(f"run-{index}"):
+            for _ in range(5):
+                with tracer.span("step"):
+                    pass
+
+    recent = tracer.recent()
+    assert [item["name"] for item in recent] == ["run-2", "run-1"]
+    assert recent[0]["span_count"] == 3
+    assert recent[0]["dropped_spans"] == 3
+
+
+def test_state_machine_emits_node_spans(tracer: WorkflowTracer) -> None:
+    class _Handler(NodeHandler):
+        async def execute(
+            self, node: WorkflowStep, context: ExecutionContext
+        ) -> NodeResult:
+            if node.slug == "end":
+                return NodeResult(finished=True)
+            return NodeResult(next_slug="end")
+
+    recorded: list[str] = []
+
+    async def _record_step(slug: str, title: str, payload: dict[str, Any]) -> None:
+        recorded.append(slug)
+
+    nodes = {
+        "start": WorkflowStep(slug="start", kind="start"),
+        "end": WorkflowStep(slug="end", kind="end"),
+    }
+    machine = WorkflowStateMachine()
+    machine.register_handler("start", _Handler())
+    machine.register_handler("end", _Handler())
+    context = ExecutionContext(
+        state={},
+        conversation_history=[],
+        last_step_context=None,
+        steps=[],
+        nodes_by_slug=nodes,
+        edges_by_source={},
+        current_slug="start",
+        record_step=_record_step,
+    )
+
+    @traced("workflow.run", root=True)
+    async def _run() -> None:
+        await machine.execute(context)
+
+    asyncio.run(_run())
+
+    assert recorded == ["start", "end"]
+    trace = tracer.get(tracer.recent()[0]["trace_id"])
+    assert trace is not None
+    names = [span["name"] for span in trace["spans"]]
+    assert names.count("workflow.node") == 2
+    assert {"handler.start", "handler.end", "workflow.update_metadata"} <= set(names)
+    node_ids = {
+        span["span_id"]: span["attributes"]["slug"]
+        for span in trace["spans"]
+        if span["name"] == "workflow.node"
+    }
+    handler_parents = {
+        span["name"]: node_ids[span["parent_id"]]
+        for span in trace["spans"]
+        if span["name"].startswith("handler.")
+    }
+    assert handler_parents == {"handler.start": "start", "handler.end": "end"}
+
+
+def test_agents_sdk_spans_are_attached(tracer: WorkflowTracer) -> None:
+    bridge = AgentsSdkSpanBridge(tracer)
+    started = datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+    sdk_span = SimpleNamespace(
+        span_data=SimpleNamespace(
+            type="function", name="search_docs", mcp_data={"server": "docs"}
+        ),
+        started_at=started.isoformat(),
+        ended_at=(started + datetime.timedelta(milliseconds=40)).isoformat(),
+        error=None,
+    )
+
+    bridge.on_span_end(sdk_span)  # hors trace : ignoré
+    with tracer.start("workflow.run"):
+        with trace_span("agent.model_stream"):
+            bridge.on_span_end(sdk_span)
+
+    trace = tracer.get(tracer.recent()[0]["trace_id"])
+    assert trace is not None
+    [tool_span] = [span for span in trace["spans"] if span["name"] == "tool.call"]
+    assert tool_span["attributes"] == {"tool": "search_docs", "mcp_server": "docs"}
+    assert tool_span["duration_ms"] == pytest.approx(40.0)
+
+
+def test_opentelemetry_exporter_replays_spans() -> None:
+    trace_api = pytest.importorskip("opentelemetry.trace")
+
+    class _FakeSpan(trace_api.NonRecordingSpan):
+        def __init__(self, name: str, context: Any, start_time: int) -> None:
+            super().__init__(trace_api.INVALID_SPAN_CONTEXT)
+            self.name = name
+            self.parent = (
+                trace_api.get_current_span(context) if context is not None else None
+            )
+            self.start_time = start_time
+            self.end_time: int | None = None
+            self.events: list[str] = []
+            self.status: Any = None
+
+        def add_event(self, name: str, attributes: Any, timestamp: int) -> None:
+            self.events.append(name)
+
+        def set_status(self, status: Any) -> None:
+            self.status = status
+
+        def end(self, end_time: int) -> None:
+            self.end_time = end_time
+
+    class _FakeTracer:
+        def __init__(self) -> None:
+            self.spans: list[_FakeSpan] = []
+
+        def start_span(
+            self, name: str, context: Any, start_time: int, attributes: Any
+        ) -> _FakeSpan:
+            span = _FakeSpan(name, context, start_time)
+            self.spans.append(span)
+            return span
+
+    fake_tracer = _FakeTracer()
+    tracer = WorkflowTracer(
+        sample_rate=1.0, exporters=[OpenTelemetryExporter(fake_tracer, trace_api)]
+    )
+    with tracer.start("workflow.run"):
+        with tracer.span("agent.model_stream") as span:
+            span.add_event("first_token")
+
+    root, child = fake_tracer.spans
+    assert (root.name, child.name) == ("workflow.run", "agent.model_stream")
+    assert child.parent is root
+    assert child.events == ["first_token"]
+    assert root.end_time is not None and root.end_time >= child.end_time
@@ -78,11 +78,23 @@ def _get_builder(name: str) -> Callable[[Any], Any]:
     if builder is None:
         module_key, attr = _BUILDER_REGISTRY[name]
         module = _load_module(module_key)
-        builder = getattr(module, attr)
+        builder = _traced_builder(module_key, getattr(module, attr))
         _BUILDER_CACHE[name] = builder
     return builder
 
 
+def _traced_builder(
+    module_key: str, builder: Callable[[Any], Any]
+) -> Callable[[Any], Any]:
+    from .workflows.tracing import trace_span
+
+    def _build(payload: Any) -> Any:
+        with trace_span("tool.build", tool=module_key):
+            return builder(payload)
+
+    return _build
+
+
 def build_web_search_tool(payload: Any) -> Any:
     return _get_builder("build_web_search_tool")(payload)
 
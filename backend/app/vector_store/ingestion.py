@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import functools
 import json
 import logging
 import re
@@ -79,6 +81,132 @@ def resolve_from_container(value: Any, path: str) -> Any:
     return _resolve(value, parts)
 
 
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_PATH_PATTERN = re.compile(r"[A-Za-z0-9_.]+")
+_EVAL_GLOBALS: dict[str, Any] = {"__builtins__": {}}
+_MISSING = object()
+
+
+class _ExpressionNamespace:
+    """Espace de noms paresseux utilisé comme ``locals`` par ``eval``.
+
+    Reproduit la priorité historique (variables d'entrée, puis ``input``,
+    puis clés de l'état, puis ``state``) sans copier l'état à chaque appel.
+    """
+
+    __slots__ = ("_state", "_context")
+
+    def __init__(self, state: Mapping[str, Any], context: Any) -> None:
+        self._state = state
+        self._context = context
+
+    def __getitem__(self, name: str) -> Any:
+        context = self._context
+        if isinstance(context, Mapping) and name in context:
+            return context[name]
+        if name == "input" and context is not None:
+            return context
+        if name in self._state:
+            return self._state[name]
+        if name == "state":
+            return self._state
+        raise KeyError(name)
+
+
+class _CompiledExpression:
+    """Expression d'état analysée une seule fois.
+
+    ``kind`` désigne le raccourci d'accès (``state``, ``input``,
+    ``identifier``, ``state_path``, ``input_path``) ou ``None`` ; le repli
+    est soit un littéral JSON, soit un objet code, soit le texte brut.
+    """
+
+    __slots__ = ("text", "kind", "path", "literal", "code")
+
+    def __init__(
+        self,
+        text: str,
+        kind: str | None = None,
+        path: str | None = None,
+        literal: Any = _MISSING,
+        code: Any = None,
+    ) -> None:
+        self.text = text
+        self.kind = kind
+        self.path = path
+        self.literal = literal
+        self.code = code
+
+    def evaluate(self, state: Mapping[str, Any], context: Any) -> Any:
+        kind = self.kind
+        if kind == "state":
+            return state
+        if kind == "input":
+            if context is None:
+                raise RuntimeError(
+                    "Aucun résultat précédent disponible pour l'expression 'input'."
+                )
+            return context
+        if kind == "identifier":
+            name = self.text
+            if name in state:
+                return state[name]
+            if context is not None and name in context:
+                return context[name]
+        elif kind == "state_path":
+            return resolve_from_container(state, self.path or "")
+        elif kind == "input_path":
+            if context is None:
+                raise RuntimeError(
+                    "Aucun résultat précédent disponible pour les expressions "
+                    "basées sur 'input'."
+                )
+            return resolve_from_container(context, self.path or "")
+
+        literal = self.literal
+        if literal is not _MISSING:
+            if isinstance(literal, dict | list):
+                return copy.deepcopy(literal)
+            return literal
+        if self.code is None:
+            return self.text
+        try:
+            return eval(self.code, _EVAL_GLOBALS, _ExpressionNamespace(state, context))
+        except Exception:
+            return self.text
+
+
+@functools.lru_cache(maxsize=2048)
+def compile_state_expression(expr: str) -> _CompiledExpression:
+    """Analyse ``expr`` (déjà épuré) et met le résultat en cache."""
+
+    if not expr:
+        return _CompiledExpression(expr, literal=None)
+    if expr in {"state", "input"}:
+        return _CompiledExpression(expr, kind=expr)
+
+    kind: str | None = None
+    path: str | None = None
+    if _IDENTIFIER_PATTERN.fullmatch(expr):
+        kind = "identifier"
+    elif expr.startswith("state.") and _PATH_PATTERN.fullmatch(expr[6:]):
+        kind, path = "state_path", expr[6:]
+    elif expr.startswith("input.") and _PATH_PATTERN.fullmatch(expr[6:]):
+        kind, path = "input_path", expr[6:]
+
+    try:
+        return _CompiledExpression(
+            expr, kind=kind, path=path, literal=json.loads(expr)
+        )
+    except json.JSONDecodeError:
+        pass
+    try:
+        code = compile(expr, "<state-expression>", "eval")
+    except (SyntaxError, ValueError):
+        code = None
+    return _CompiledExpression(expr, kind=kind, path=path, code=code)
+
+
 def evaluate_state_expression(
     expression: Any,
     *,
@@ -94,50 +222,37 @@ def evaluate_state_expression(
         expr = expression.strip()
         if not expr:
             return None
-        if expr == "state":
-            return state
         context = input_context if input_context is not None else default_input_context
-        if expr == "input":
-            if context is None:
-                raise RuntimeError(
-                    "Aucun résultat précédent disponible pour l'expression 'input'."
-                )
-            return context
-        identifier_match = re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", expr)
-        if identifier_match:
-            if expr in state:
-                return state[expr]
-            if context is not None and expr in context:
-                return context[expr]
-        if expr.startswith("state."):
-            state_path = expr[len("state.") :]
-            if re.fullmatch(r"[A-Za-z0-9_.]+", state_path):
-                return resolve_from_container(state, state_path)
-        if expr.startswith("input."):
-            input_path = expr[len("input.") :]
-            if re.fullmatch(r"[A-Za-z0-9_.]+", input_path):
-                if context is None:
-                    raise RuntimeError(
-                        "Aucun résultat précédent disponible pour les expressions "
-                        "basées sur 'input'."
-                    )
-                return resolve_from_container(context, input_path)
-        try:
-            return json.loads(expr)
-        except json.JSONDecodeError:
-            eval_context: dict[str, Any] = {"state": state, **dict(state)}
-            if context is not None:
-                eval_context["input"] = context
-                if isinstance(context, Mapping):
-                    eval_context.update(dict(context))
-
-            try:
-                return eval(expr, {"__builtins__": {}}, eval_context)
-            except Exception:
-                return expr
+        return compile_state_expression(expr).evaluate(state, context)
     return expression
 
 
+@functools.lru_cache(maxsize=512)
+def _compile_template(
+    template: str,
+) -> _CompiledExpression | tuple[str | _CompiledExpression, ...]:
+    """Découpe un template en segments littéraux et expressions compilées.
+
+    Un template constitué d'une unique expression renvoie directement
+    l'expression compilée afin de préserver le type de la valeur.
+    """
+
+    full_match = _MUSTACHE_FULL_PATTERN.match(template)
+    if full_match:
+        return compile_state_expression(full_match.group(1).strip())
+
+    segments: list[str | _CompiledExpression] = []
+    position = 0
+    for match in _MUSTACHE_PATTERN.finditer(template):
+        if match.start() > position:
+            segments.append(template[position : match.start()])
+        segments.append(compile_state_expression(match.group(1).strip()))
+        position = match.end()
+    if position < len(template):
+        segments.append(template[position:])
+    return tuple(segments)
+
+
 def _render_template_string(
     template: str,
     *,
@@ -145,50 +260,44 @@ def _render_template_string(
     default_input_context: Mapping[str, Any] | None = None,
     input_context: Mapping[str, Any] | None = None,
 ) -> Any:
-    full_match = _MUSTACHE_FULL_PATTERN.match(template)
-    if full_match:
-        expression = full_match.group(1).strip()
+    compiled = _compile_template(template)
+    context = input_context if input_context is not None else default_input_context
+
+    if isinstance(compiled, _CompiledExpression):
         try:
-            return evaluate_state_expression(
-                expression,
-                state=state,
-                default_input_context=default_input_context,
-                input_context=input_context,
-            )
+            return compiled.evaluate(state, context)
         except Exception:
             logger.debug(
                 "Impossible d'évaluer l'expression de template '%s'.",
-                expression,
+                compiled.text,
                 exc_info=True,
             )
             return None
 
-    def _replacement(match: re.Match[str]) -> str:
-        expression = match.group(1).strip()
+    parts: list[str] = []
+    for segment in compiled:
+        if isinstance(segment, str):
+            parts.append(segment)
+            continue
         try:
-            value = evaluate_state_expression(
-                expression,
-                state=state,
-                default_input_context=default_input_context,
-                input_context=input_context,
-            )
+            value = segment.evaluate(state, context)
         except Exception:
             logger.debug(
                 "Impossible d'évaluer l'expression de template '%s'.",
-                expression,
+                segment.text,
                 exc_info=True,
             )
-            return ""
+            continue
         if value is None:
-            return ""
+            continue
         if isinstance(value, dict | list):
             try:
-                return json.dumps(value, ensure_ascii=False)
+                parts.append(json.dumps(value, ensure_ascii=False))
             except TypeError:
-                return str(value)
-        return str(value)
-
-    return _MUSTACHE_PATTERN.sub(_replacement, template)
+                parts.append(str(value))
+            continue
+        parts.append(str(value))
+    return "".join(parts)
 
 
 def resolve_transform_value(
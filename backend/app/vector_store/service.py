@@ -19,6 +19,7 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..config import get_settings
+from ..metrics import VECTOR_SEARCH_SECONDS, timed
 from ..model_providers._shared import normalize_api_base
 from ..models import EMBEDDING_DIMENSION, JsonChunk, JsonDocument, JsonVectorStore
 from ..schemas import VectorStoreWorkflowBlueprint
@@ -906,6 +907,7 @@ class JsonVectorStoreService:
             return fused_results[:top_k]
         return fused_results
 
+    @timed(VECTOR_SEARCH_SECONDS, operation="search")
     def search(
         self,
         store_slug: str,
@@ -925,6 +927,7 @@ class JsonVectorStoreService:
             sparse_weight=sparse_weight,
         )
 
+    @timed(VECTOR_SEARCH_SECONDS, operation="search_document_chunks")
     def search_document_chunks(
         self,
         store_slug: str,
@@ -946,6 +949,7 @@ class JsonVectorStoreService:
             doc_id=doc_id,
         )
 
+    @timed(VECTOR_SEARCH_SECONDS, operation="search_documents")
     def search_documents(
         self,
         store_slug: str,
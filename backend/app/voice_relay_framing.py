@@ -0,0 +1,206 @@
+"""Encodage des trames audio du relais vocal (Wear OS ↔ OpenAI Realtime).
+
+Le protocole historique transporte chaque trame PCM16 en base64 dans un
+message JSON, dans les deux sens. Le client peut désormais négocier un mode
+binaire au message ``start`` : l'audio circule alors en messages WebSocket
+binaires bruts, seuls les événements de contrôle restent en JSON, et le
+base64 n'est produit qu'au moment d'alimenter l'API Realtime qui l'exige.
+
+Les événements ``input_audio_buffer.append`` issus de trames binaires et les
+``response.audio.delta`` sont construits et lus sans passer par :mod:`json` :
+l'alphabet base64 ne contient aucun caractère à échapper. L'audio reçu en JSON
+vient du client et n'offre pas cette garantie : il est validé puis sérialisé
+avec :func:`json.dumps`.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+# Formats d'entrée acceptés tels quels par l'API Realtime.
+SUPPORTED_AUDIO_FORMATS: frozenset[str] = frozenset(
+    {"pcm16", "g711_ulaw", "g711_alaw"}
+)
+
+_APPEND_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_CLIENT_AUDIO_PREFIX = '{"type":"audio","data":"'
+_JSON_SUFFIX = '"}'
+_DELTA_TYPE_MARKER = '"response.audio.delta"'
+_DELTA_KEY = '"delta":"'
+
+
+class FramingNegotiationError(ValueError):
+    """Levée lorsque le client demande un mode de transport non supporté."""
+
+
+class InvalidAudioPayloadError(ValueError):
+    """Levée lorsque l'audio d'un message JSON n'est pas du base64."""
+
+
+@dataclass(frozen=True)
+class RelayFraming:
+    """Mode de transport audio négocié avec le client."""
+
+    binary: bool = False
+    audio_format: str = "pcm16"
+
+    @classmethod
+    def negotiate(cls, start_message: dict[str, Any]) -> RelayFraming:
+        """Déduit le mode de transport du message ``start`` du client.
+
+        ``{"audio_transport": "binary"}`` (ou ``{"binary": true}``) active les
+        trames binaires ; ``audio_format`` précise l'encodage des échantillons.
+        """
+
+        transport = str(start_message.get("audio_transport") or "").strip().lower()
+        binary = transport == "binary" or start_message.get("binary") is True
+        if transport not in {"", "json", "binary"}:
+            raise FramingNegotiationError(f"Transport audio inconnu : {transport}")
+
+        audio_format = (
+            str(start_message.get("audio_format") or "pcm16").strip().lower()
+        )
+        if audio_format not in SUPPORTED_AUDIO_FORMATS:
+            raise FramingNegotiationError(
+                f"Format audio non supporté : {audio_format}"
+            )
+        return cls(binary=binary, audio_format=audio_format)
+
+    def ready_payload(self, **extra: Any) -> dict[str, Any]:
+        """Message ``ready`` confirmant au client le mode retenu."""
+
+        return {
+            "type": "ready",
+            **extra,
+            "audio_transport": "binary" if self.binary else "json",
+            "audio_format": self.audio_format,
+        }
+
+
+def upstream_append_from_client(data: Any) -> str:
+    """Événement ``input_audio_buffer.append`` pour le ``data`` d'un message
+    ``audio`` JSON.
+
+    ``data`` doit être une chaîne base64 valide ; sinon
+    :class:`InvalidAudioPayloadError` est levée.
+    """
+
+    if not isinstance(data, str):
+        raise InvalidAudioPayloadError("Le champ 'data' doit être une chaîne base64")
+    try:
+        base64.b64decode(data, validate=True)
+    except ValueError as exc:
+        raise InvalidAudioPayloadError(
+            "Le champ 'data' n'est pas du base64 valide"
+        ) from exc
+    return json.dumps({"type": "input_audio_buffer.append", "audio": data})
+
+
+def upstream_append_from_bytes(chunk: bytes) -> str:
+    """Événement ``input_audio_buffer.append`` pour une trame binaire brute."""
+
+    return _APPEND_PREFIX + base64.b64encode(chunk).decode("ascii") + _JSON_SUFFIX
+
+
+def client_audio_text(audio_b64: str) -> str:
+    """Message JSON ``audio`` du protocole historique."""
+
+    return _CLIENT_AUDIO_PREFIX + audio_b64 + _JSON_SUFFIX
+
+
+def extract_audio_delta(raw_message: str | bytes) -> str | None:
+    """Retourne le base64 d'un ``response.audio.delta`` sans décoder le JSON.
+
+    Retourne ``None`` pour tout autre événement, qui doit alors être analysé
+    normalement avec :func:`json.loads`.
+    """
+
+    if isinstance(raw_message, bytes):
+        raw_message = raw_message.decode("utf-8")
+    if _DELTA_TYPE_MARKER not in raw_message[:128]:
+        return None
+    start = raw_message.find(_DELTA_KEY)
+    if start < 0:
+        return _delta_from_json(raw_message)
+    start += len(_DELTA_KEY)
+    end = raw_message.find('"', start)
+    if end < 0:
+        return _delta_from_json(raw_message)
+    return raw_message[start:end]
+
+
+def _delta_from_json(raw_message: str) -> str | None:
+    event = json.loads(raw_message)
+    if event.get("type") != "response.audio.delta":
+        return None
+    return event.get("delta", "")
+
+
+@dataclass
+class VoiceRelayStats:
+    """Compteurs par session : trames, octets sur le fil et temps CPU."""
+
+    binary: bool = False
+    client_frames_in: int = 0
+    client_bytes_in: int = 0
+    client_frames_out: int = 0
+    client_bytes_out: int = 0
+    upstream_bytes_out: int = 0
+    framing_cpu_ns: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def record_inbound(self, wire_bytes: int, upstream_bytes: int) -> None:
+        self.client_frames_in += 1
+        self.client_bytes_in += wire_bytes
+        self.upstream_bytes_out += upstream_bytes
+
+    def record_outbound(self, wire_bytes: int) -> None:
+        self.client_frames_out += 1
+        self.client_bytes_out += wire_bytes
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "audio_transport": "binary" if self.binary else "json",
+            "client_frames_in": self.client_frames_in,
+            "client_bytes_in": self.client_bytes_in,
+            "client_frames_out": self.client_frames_out,
+            "client_bytes_out": self.client_bytes_out,
+            "upstream_bytes_out": self.upstream_bytes_out,
+            "framing_cpu_ms": round(self.framing_cpu_ns / 1_000_000, 3),
+            "duration_s": round(time.monotonic() - self.started_at, 3),
+        }
+
+
+class FramingTimer:
+    """Accumule le temps CPU passé à encoder/décoder les trames."""
+
+    __slots__ = ("_stats", "_start")
+
+    def __init__(self, stats: VoiceRelayStats) -> None:
+        self._stats = stats
+        self._start = 0
+
+    def __enter__(self) -> FramingTimer:
+        self._start = time.thread_time_ns()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stats.framing_cpu_ns += time.thread_time_ns() - self._start
+
+
+__all__ = [
+    "FramingNegotiationError",
+    "FramingTimer",
+    "InvalidAudioPayloadError",
+    "RelayFraming",
+    "SUPPORTED_AUDIO_FORMATS",
+    "VoiceRelayStats",
+    "client_audio_text",
+    "extract_audio_delta",
+    "upstream_append_from_client",
+    "upstream_append_from_bytes",
+]
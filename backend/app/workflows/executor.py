@@ -372,6 +372,11 @@ class WorkflowRuntimeSnapshot:
     branch_id: str | None = None
     branch_label: str | None = None
     wait_state: dict[str, Any] | None = None
+    # Les conteneurs ci-dessus appartiennent déjà à ce run (overlays
+    # copy-on-write d'une branche parallèle) : pas de nouvelle copie.
+    isolated: bool = False
+    # Agents déjà construits par le run parent, réutilisés par la branche.
+    agent_setup: Any | None = None
 
 
 @dataclass
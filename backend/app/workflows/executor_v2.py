@@ -18,8 +18,19 @@ from collections.abc import Awaitable, Callable, Mapping
 from dataclasses import asdict, dataclass, field
 from typing import TYPE_CHECKING, Any
 
+from ..metrics import (
+    observe_time_to_first_token,
+    observe_workflow_run,
+    record_model_tokens,
+)
 from .handlers.factory import create_state_machine
 from .runtime.state_machine import ExecutionContext
+from .tracing import (
+    current_span,
+    install_agents_sdk_bridge,
+    trace_span,
+    traced,
+)
 
 # Import litellm for cost calculation (optional dependency)
 try:
@@ -98,6 +109,7 @@ if TYPE_CHECKING:  # pragma: no cover
 logger = logging.getLogger("chatkit.server")
 
 
+@traced("workflow.run", root=True)
 async def run_workflow_v2(
     workflow_input: WorkflowInput,
     *,
@@ -119,6 +131,7 @@ async def run_workflow_v2(
     current_user_message: UserMessageItem | None = None,
     workflow_call_stack: tuple[tuple[str, str | int], ...] | None = None,
     runtime_snapshot: WorkflowRuntimeSnapshot | None = None,
+    usage: TokenUsage | None = None,
 ) -> WorkflowRunSummary:
     """Execute a workflow using the state machine architecture.
 
@@ -140,6 +153,8 @@ async def run_workflow_v2(
         current_user_message: Current user message
         workflow_call_stack: Stack for nested workflow detection
         runtime_snapshot: Snapshot for resuming execution
+        usage: Token totals to update as the run goes, so the caller can read
+            what a failed or cancelled run consumed
 
     Returns:
         WorkflowRunSummary with execution results
@@ -152,7 +167,7 @@ async def run_workflow_v2(
 
     start_time = time.time()
     handler_calls: defaultdict[str, int] = defaultdict(int)
-    total_usage = TokenUsage()
+    total_usage = usage if usage is not None else TokenUsage()
     agent_usage: dict[str, TokenUsage] = {}
 
     def _safe_int(value: Any) -> int:
@@ -281,20 +296,26 @@ async def run_workflow_v2(
         total_usage.input_tokens += usage.input_tokens
         total_usage.output_tokens += usage.output_tokens
         total_usage.cost += computed_cost
+        record_model_tokens(model_name, usage.input_tokens, usage.output_tokens)
+
+    run_span = current_span()
+    if run_span is not None:
+        install_agents_sdk_bridge()
 
     # Initialize runtime context (reuse existing logic)
-    initialization = await initialize_runtime_context(
-        workflow_input,
-        agent_context=agent_context,
-        workflow_service=workflow_service,
-        workflow_definition=workflow_definition,
-        workflow_slug=workflow_slug,
-        thread_item_converter=thread_item_converter,
-        thread_items_history=thread_items_history,
-        current_user_message=current_user_message,
-        workflow_call_stack=workflow_call_stack,
-        runtime_snapshot=runtime_snapshot,
-    )
+    with trace_span("workflow.initialize"):
+        initialization = await initialize_runtime_context(
+            workflow_input,
+            agent_context=agent_context,
+            workflow_service=workflow_service,
+            workflow_definition=workflow_definition,
+            workflow_slug=workflow_slug,
+            thread_item_converter=thread_item_converter,
+            thread_items_history=thread_items_history,
+            current_user_message=current_user_message,
+            workflow_call_stack=workflow_call_stack,
+            runtime_snapshot=runtime_snapshot,
+        )
 
     # Extract initialized values
     steps = initialization.steps
@@ -308,10 +329,19 @@ async def run_workflow_v2(
     if pending_wait_state is None and runtime_snapshot:
         pending_wait_state = runtime_snapshot.wait_state
 
-    # Build node maps
-    nodes_by_slug: dict[str, WorkflowStep] = {
-        step.slug: step for step in definition.steps if step.is_enabled
-    }
+    # Bind the compiled plan (built once per definition version)
+    from .executor import prepare_agents
+    from .runtime.plan import get_compiled_plan
+
+    plan = get_compiled_plan(definition)
+    nodes_by_slug, edges_by_source = plan.bind(definition)
+    if run_span is not None:
+        run_span.set_attributes(
+            workflow_slug=workflow_slug
+            or getattr(getattr(definition, "workflow", None), "slug", None),
+            definition_id=getattr(definition, "id", None),
+            branch_id=runtime_snapshot.branch_id if runtime_snapshot else None,
+        )
     if not nodes_by_slug:
         raise WorkflowExecutionError(
             "configuration",
@@ -320,34 +350,27 @@ async def run_workflow_v2(
             [],
         )
 
-    # Build edge maps
-    from .executor import AGENT_NODE_KINDS, build_edges_by_source, prepare_agents
-
-    edges_by_source = build_edges_by_source(definition.transitions)
-
     # Prepare agent steps
-    agent_steps_ordered = [
-        step
-        for step in sorted(definition.steps, key=lambda s: s.position)
-        if (
-            step.kind in AGENT_NODE_KINDS
-            and step.is_enabled
-            and step.slug in nodes_by_slug
-        )
-    ]
+    agent_steps_ordered = [nodes_by_slug[slug] for slug in plan.agent_slugs]
 
     agent_positions = {
-        step.slug: index for index, step in enumerate(agent_steps_ordered, start=1)
+        slug: index for index, slug in enumerate(plan.agent_slugs, start=1)
     }
 
-    # Prepare agents and extract configurations
-    agent_setup = prepare_agents(
-        definition=definition,
-        service=initialization.service,
-        agent_steps_ordered=agent_steps_ordered,
-        nodes_by_slug=nodes_by_slug,
-        model_override=workflow_input.model_override,
-    )
+    # Prepare agents and extract configurations (parallel branches reuse the
+    # agents already built by the parent run)
+    if runtime_snapshot is not None and runtime_snapshot.agent_setup is not None:
+        agent_setup = runtime_snapshot.agent_setup
+    else:
+        with trace_span("workflow.prepare_agents", agents=len(agent_steps_ordered)):
+            agent_setup = prepare_agents(
+                definition=definition,
+                service=initialization.service,
+                agent_steps_ordered=agent_steps_ordered,
+                nodes_by_slug=nodes_by_slug,
+                model_override=workflow_input.model_override,
+                plan=plan,
+            )
 
     agent_instances = agent_setup.agent_instances
     nested_workflow_configs = agent_setup.nested_workflow_configs
@@ -360,10 +383,7 @@ async def run_workflow_v2(
     elif pending_wait_state and pending_wait_state.get("slug"):
         start_slug = str(pending_wait_state["slug"])
     else:
-        for node in nodes_by_slug.values():
-            if node.kind == "start":
-                start_slug = node.slug
-                break
+        start_slug = plan.start_slug
 
     if not start_slug:
         raise WorkflowExecutionError(
@@ -386,7 +406,8 @@ async def run_workflow_v2(
         )
         steps.append(summary)
         if on_step is not None:
-            await on_step(summary, len(steps))
+            with trace_span("workflow.record_step", step=step_key):
+                await on_step(summary, len(steps))
 
     # Create ExecutionContext
     context = ExecutionContext(
@@ -395,8 +416,10 @@ async def run_workflow_v2(
         last_step_context=last_step_context,
         steps=steps,
         nodes_by_slug=nodes_by_slug,
-        edges_by_source=dict(edges_by_source),
+        edges_by_source=edges_by_source,
         current_slug=start_slug,
+        stop_at_slug=runtime_snapshot.stop_at_slug if runtime_snapshot else None,
+        plan=plan,
         record_step=record_step,
         handler_calls=handler_calls,
     )
@@ -712,12 +735,15 @@ async def run_workflow_v2(
         overridden_instructions: Any = None
         instructions_overridden = False
         if isinstance(raw_instructions, str):
-            rendered_instructions = render_agent_instructions(
-                raw_instructions,
-                state=state,
-                last_step_context=last_step_context,
-                run_context=run_context if isinstance(run_context, Mapping) else None,
-            )
+            with trace_span("agent.render_instructions"):
+                rendered_instructions = render_agent_instructions(
+                    raw_instructions,
+                    state=state,
+                    last_step_context=last_step_context,
+                    run_context=(
+                        run_context if isinstance(run_context, Mapping) else None
+                    ),
+                )
             if (
                 rendered_instructions is not None
                 and rendered_instructions != raw_instructions
@@ -745,7 +771,10 @@ async def run_workflow_v2(
             for server in mcp_servers:
                 if isinstance(server, MCPServer):
                     try:
-                        await server.connect()
+                        with trace_span(
+                            "tool.mcp_connect", mcp_server=getattr(server, "name", None)
+                        ):
+                            await server.connect()
                         connected_mcp_servers.append(server)
                     except Exception:
                         pass
@@ -903,11 +932,13 @@ async def run_workflow_v2(
                 content_summary,
             )
 
-        async def _run_and_stream(
+        async def _stream_into(
             _input: list,
             _previous_response_id: str | None,
+            stream_span: Any,
         ) -> Any:
             nonlocal accumulated_text
+            stream_started = time.perf_counter()
             _result = Runner.run_streamed(
                 agent,
                 input=_input,
@@ -942,6 +973,12 @@ async def run_workflow_v2(
                     _record_usage(agent_identifier, model_name, usage_from_event)
                 delta_text = _extract_delta(event)
                 if delta_text:
+                    if not accumulated_text:
+                        ttft = time.perf_counter() - stream_started
+                        observe_time_to_first_token(model_name, ttft)
+                        if stream_span is not None:
+                            stream_span.add_event("first_token")
+                            stream_span.set_attributes(ttft_ms=round(ttft * 1000, 3))
                     accumulated_text += delta_text
                     await _emit_step_stream(
                         WorkflowStepStreamUpdate(
@@ -955,6 +992,15 @@ async def run_workflow_v2(
                 await _inspect_event_for_images(event)
             return _result
 
+        async def _run_and_stream(
+            _input: list,
+            _previous_response_id: str | None,
+        ) -> Any:
+            with trace_span(
+                "agent.model_stream", agent=agent_identifier, model=model_name
+            ) as stream_span:
+                return await _stream_into(_input, _previous_response_id, stream_span)
+
         try:
             try:
                 result = await _run_and_stream(
@@ -1226,8 +1272,13 @@ async def run_workflow_v2(
             "initial_user_text": initial_user_text,
             "widget_configs_by_step": widget_configs_by_step,
             "nested_workflow_configs": nested_workflow_configs,
-            "active_branch_id": None,
-            "active_branch_label": None,
+            "active_branch_id": (
+                runtime_snapshot.branch_id if runtime_snapshot else None
+            ),
+            "active_branch_label": (
+                runtime_snapshot.branch_label if runtime_snapshot else None
+            ),
+            "agent_setup": agent_setup,
             "agent_instances": agent_instances,
             "agent_positions": agent_positions,
             "run_agent_step": run_agent_step,
@@ -1265,11 +1316,25 @@ async def run_workflow_v2(
     # Note: AgentNodeHandler will access dependencies via context.runtime_vars
     machine = create_state_machine(agent_executor=None)
 
+    resolved_slug = (
+        workflow_slug
+        or getattr(getattr(definition, "workflow", None), "slug", "")
+        or ""
+    )
+
     # Execute workflow
     try:
-        await machine.execute(context)
+        with trace_span("workflow.execute"):
+            await machine.execute(context)
     except Exception:
         logger.exception("Error executing workflow with state machine")
+        observe_workflow_run(
+            resolved_slug,
+            time.time() - start_time,
+            nodes=len(steps),
+            handler_calls=handler_calls,
+            outcome="error",
+        )
         raise
 
     # Build result summary
@@ -1281,11 +1346,7 @@ async def run_workflow_v2(
 
     metrics = WorkflowMetrics(
         executor_version="v2",
-        workflow_slug=(
-            workflow_slug
-            or getattr(getattr(definition, "workflow", None), "slug", "")
-            or ""
-        ),
+        workflow_slug=resolved_slug,
         execution_time_ms=(time.time() - start_time) * 1000,
         steps_count=len(steps),
         handler_calls=dict(handler_calls),
@@ -1303,6 +1364,14 @@ async def run_workflow_v2(
         },
     )
 
+    observe_workflow_run(
+        resolved_slug,
+        metrics.execution_time_ms / 1000,
+        nodes=metrics.steps_count,
+        handler_calls=metrics.handler_calls,
+        outcome="success",
+    )
+
     if metrics.input_tokens or metrics.output_tokens:
         logger.info(
             "Workflow %s usage: input_tokens=%s output_tokens=%s cost=$%.6f",
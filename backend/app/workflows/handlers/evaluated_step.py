@@ -25,6 +25,12 @@ from chatkit.types import (
     ThreadItemDoneEvent,
 )
 
+from ..runtime.evaluation_cache import (
+    EvaluatorAgentPool,
+    evaluation_cache,
+    evaluation_cache_key,
+    evaluator_agents,
+)
 from .base import BaseNodeHandler
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -50,6 +56,8 @@ class EvaluatedStepHandler(BaseNodeHandler):
         success_message: str - Message shown on successful evaluation
         escalation_message: str - Message shown when max attempts reached
         masked: bool - If true, mask user input (for password/code fields)
+        cache_evaluations: bool - Reuse cached AI verdicts for identical answers
+            (default: true)
     """
 
     async def execute(
@@ -526,7 +534,12 @@ class EvaluatedStepHandler(BaseNodeHandler):
         """Run a simple agent call using the agents SDK. Returns the text output."""
         from agents import Runner
 
-        agent, run_config = self._resolve_agent_and_config(node, instructions)
+        agent, run_config = evaluator_agents.get_or_create(
+            EvaluatorAgentPool.make_key(
+                "evaluated_step", node.slug, self._get_params(node), instructions
+            ),
+            lambda: self._resolve_agent_and_config(node, instructions),
+        )
         result = await Runner.run(
             agent,
             input=user_message,
@@ -545,6 +558,19 @@ class EvaluatedStepHandler(BaseNodeHandler):
         """Call AI to evaluate student response. Returns (passed, feedback)."""
         import json
 
+        cache_key = evaluation_cache_key(
+            node, context, self._get_params(node), system_prompt, user_message
+        )
+        if cache_key is not None:
+            cached = evaluation_cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    "[EVALUATED_STEP] Évaluation servie depuis le cache "
+                    "(taux de succès %.1f%%)",
+                    evaluation_cache.stats.hit_rate * 100,
+                )
+                return cached
+
         try:
             raw = await self._run_agent(node, system_prompt, user_message)
             logger.info("[EVALUATED_STEP] AI evaluation response: %s", raw[:200])
@@ -561,6 +587,8 @@ class EvaluatedStepHandler(BaseNodeHandler):
             result = json.loads(json_str)
             passed = bool(result.get("passed", False))
             feedback = str(result.get("feedback", ""))
+            if cache_key is not None:
+                evaluation_cache.put(cache_key, (passed, feedback))
             return passed, feedback
 
         except Exception as e:
@@ -575,8 +603,21 @@ class EvaluatedStepHandler(BaseNodeHandler):
         user_message: str,
     ) -> str:
         """Call AI to generate feedback for the student."""
+        cache_key = evaluation_cache_key(
+            node, context, self._get_params(node), system_prompt, user_message
+        )
+        if cache_key is not None:
+            cached = evaluation_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            return await self._run_agent(node, system_prompt, user_message) or "Essayez encore."
+            feedback = await self._run_agent(node, system_prompt, user_message)
+            if not feedback:
+                return "Essayez encore."
+            if cache_key is not None:
+                evaluation_cache.put(cache_key, feedback)
+            return feedback
         except Exception as e:
             logger.error("[EVALUATED_STEP] AI feedback error: %s", e, exc_info=True)
             return "Ce n'est pas tout à fait correct. Veuillez réessayer."
@@ -26,6 +26,12 @@ from chatkit.types import (
     ThreadItemDoneEvent,
 )
 
+from ..runtime.evaluation_cache import (
+    EvaluatorAgentPool,
+    evaluation_cache,
+    evaluation_cache_key,
+    evaluator_agents,
+)
 from .base import BaseNodeHandler
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -58,6 +64,8 @@ class GuidedExerciseHandler(BaseNodeHandler):
         model: str - AI model name
         model_provider_id: str
         model_provider_slug: str
+        cache_evaluations: bool - Reuse cached AI verdicts for identical answers
+            (default: true)
     """
 
     async def execute(
@@ -607,7 +615,12 @@ class GuidedExerciseHandler(BaseNodeHandler):
     ) -> str:
         from agents import Runner
 
-        agent, run_config = self._resolve_agent_and_config(node, instructions)
+        agent, run_config = evaluator_agents.get_or_create(
+            EvaluatorAgentPool.make_key(
+                "guided_exercise", node.slug, self._get_params(node), instructions
+            ),
+            lambda: self._resolve_agent_and_config(node, instructions),
+        )
         result = await Runner.run(
             agent, input=user_message, run_config=run_config, max_turns=1,
         )
@@ -619,6 +632,19 @@ class GuidedExerciseHandler(BaseNodeHandler):
     ) -> tuple[bool, str]:
         import json
 
+        cache_key = evaluation_cache_key(
+            node, context, self._get_params(node), system_prompt, user_message
+        )
+        if cache_key is not None:
+            cached = evaluation_cache.get(cache_key)
+            if cached is not None:
+                logger.info(
+                    "[GUIDED_EXERCISE] Évaluation servie depuis le cache "
+                    "(taux de succès %.1f%%)",
+                    evaluation_cache.stats.hit_rate * 100,
+                )
+                return cached
+
         try:
             raw = await self._run_agent(node, system_prompt, user_message)
             logger.info("[GUIDED_EXERCISE] AI evaluation response: %s", raw[:200])
@@ -633,6 +659,8 @@ class GuidedExerciseHandler(BaseNodeHandler):
             result = json.loads(json_str)
             passed = bool(result.get("passed", False))
             feedback = str(result.get("feedback", ""))
+            if cache_key is not None:
+                evaluation_cache.put(cache_key, (passed, feedback))
             return passed, feedback
 
         except Exception as e:
@@ -643,8 +671,21 @@ class GuidedExerciseHandler(BaseNodeHandler):
         self, node: WorkflowStep, context: ExecutionContext,
         system_prompt: str, user_message: str,
     ) -> str:
+        cache_key = evaluation_cache_key(
+            node, context, self._get_params(node), system_prompt, user_message
+        )
+        if cache_key is not None:
+            cached = evaluation_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            return await self._run_agent(node, system_prompt, user_message) or "Essayez encore."
+            feedback = await self._run_agent(node, system_prompt, user_message)
+            if not feedback:
+                return "Essayez encore."
+            if cache_key is not None:
+                evaluation_cache.put(cache_key, feedback)
+            return feedback
         except Exception as e:
             logger.error("[GUIDED_EXERCISE] AI feedback error: %s", e, exc_info=True)
             return "Ce n'est pas tout à fait correct. Veuillez réessayer."
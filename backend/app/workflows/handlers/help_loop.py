@@ -24,6 +24,10 @@ from chatkit.types import (
     ThreadItemDoneEvent,
 )
 
+from ..runtime.evaluation_cache import (
+    EvaluatorAgentPool,
+    evaluator_agents,
+)
 from .base import BaseNodeHandler
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -496,7 +500,12 @@ class HelpLoopHandler(BaseNodeHandler):
         """Run a simple agent call using the agents SDK."""
         from agents import Runner
 
-        agent, run_config = self._resolve_agent_and_config(node, instructions)
+        agent, run_config = evaluator_agents.get_or_create(
+            EvaluatorAgentPool.make_key(
+                "help_loop", node.slug, self._get_params(node), instructions
+            ),
+            lambda: self._resolve_agent_and_config(node, instructions),
+        )
         result = await Runner.run(
             agent,
             input=user_message,
@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 import asyncio
-import copy
 import json
 import logging
 from collections.abc import Mapping, Sequence
+from contextlib import nullcontext
 from typing import TYPE_CHECKING, Any
 
+from ..runtime.branch_state import CopyOnWriteState, cow_mapping
 from .base import BaseNodeHandler
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -42,9 +43,10 @@ class ParallelJoinNodeHandler(BaseNodeHandler):
             if isinstance(candidate, Mapping):
                 join_payload = candidate
 
-        sanitized_join_payload = (
-            copy.deepcopy(dict(join_payload)) if join_payload is not None else {}
-        )
+        # The entry is removed from the state below, so the join owns it; the
+        # branch states inside are copy-on-write views whose untouched values
+        # are still shared with the parent state and must be treated read-only.
+        sanitized_join_payload = dict(join_payload) if join_payload is not None else {}
 
         # Record step
         if context.record_step:
@@ -76,10 +78,24 @@ class ParallelJoinNodeHandler(BaseNodeHandler):
         )
 
 
+def _parse_max_concurrency(value: Any) -> int | None:
+    """Return the branch concurrency limit (``None`` means unbounded)."""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        logger.warning("max_concurrency invalide pour parallel_split : %r", value)
+        return None
+    return limit if limit > 0 else None
+
+
 class ParallelSplitNodeHandler(BaseNodeHandler):
     """Handler for parallel_split nodes.
 
     Executes multiple workflow branches concurrently and merges results.
+    Branches share a copy-on-write snapshot of the parent state and reuse the
+    parent's agents; ``max_concurrency`` bounds how many run at once.
     """
 
     async def execute(
@@ -136,6 +152,24 @@ class ParallelSplitNodeHandler(BaseNodeHandler):
                             else None
                         )
 
+        max_concurrency = _parse_max_concurrency(params.get("max_concurrency"))
+        semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+        )
+
+        # Runtime dependencies shared by every branch
+        workflow_input = context.runtime_vars.get("workflow_input")
+        agent_context = context.runtime_vars.get("agent_context")
+        on_step_stream = context.runtime_vars.get("on_step_stream")
+        on_stream_event = context.runtime_vars.get("on_stream_event")
+        on_widget_step = context.runtime_vars.get("on_widget_step")
+        workflow_service = context.runtime_vars.get("workflow_service")
+        definition = context.runtime_vars.get("definition")
+        workflow_slug = context.runtime_vars.get("workflow_slug")
+        current_user_message = context.runtime_vars.get("current_user_message")
+        workflow_call_stack = context.runtime_vars.get("workflow_call_stack", ())
+        agent_setup = context.runtime_vars.get("agent_setup")
+
         # Execute each branch concurrently
         async def _execute_branch(
             edge: WorkflowTransition,
@@ -145,58 +179,46 @@ class ParallelSplitNodeHandler(BaseNodeHandler):
             branch_label = branches_metadata.get(branch_slug)
             branch_steps: list[WorkflowStepSummary] = []
 
-            # Create snapshot for this branch
+            # Branches start from copy-on-write views of the parent's state:
+            # values are only copied when the branch touches them.
             branch_snapshot = WorkflowRuntimeSnapshot(
-                state=copy.deepcopy(context.state),
-                conversation_history=copy.deepcopy(context.conversation_history),
-                last_step_context=(
-                    copy.deepcopy(context.last_step_context)
-                    if context.last_step_context is not None
-                    else None
-                ),
+                state=CopyOnWriteState(context.state),
+                conversation_history=list(context.conversation_history),
+                last_step_context=cow_mapping(context.last_step_context),
                 steps=branch_steps,
                 current_slug=branch_slug,
                 stop_at_slug=join_slug,
                 branch_id=branch_slug,
                 branch_label=branch_label,
+                isolated=True,
+                agent_setup=agent_setup,
             )
 
-            # Get runtime dependencies for recursive call
-            workflow_input = context.runtime_vars.get("workflow_input")
-            agent_context = context.runtime_vars.get("agent_context")
-            on_step_stream = context.runtime_vars.get("on_step_stream")
-            on_stream_event = context.runtime_vars.get("on_stream_event")
-            on_widget_step = context.runtime_vars.get("on_widget_step")
-            workflow_service = context.runtime_vars.get("workflow_service")
-            definition = context.runtime_vars.get("definition")
-            workflow_slug = context.runtime_vars.get("workflow_slug")
-            current_user_message = context.runtime_vars.get("current_user_message")
-            workflow_call_stack = context.runtime_vars.get("workflow_call_stack", ())
-
             # Execute branch as sub-workflow
-            branch_summary = await run_workflow(
-                workflow_input,
-                agent_context=agent_context,
-                on_step=None,  # Don't stream individual steps during parallel execution
-                on_step_stream=on_step_stream,
-                on_stream_event=on_stream_event,
-                on_widget_step=on_widget_step,
-                workflow_service=workflow_service,
-                workflow_definition=definition,
-                workflow_slug=workflow_slug,
-                thread_item_converter=None,
-                thread_items_history=None,
-                current_user_message=current_user_message,
-                workflow_call_stack=workflow_call_stack,
-                runtime_snapshot=branch_snapshot,
-            )
-
-            # Build branch payload
+            async with semaphore if semaphore is not None else nullcontext():
+                branch_summary = await run_workflow(
+                    workflow_input,
+                    agent_context=agent_context,
+                    on_step=None,  # Don't stream individual steps during parallel execution
+                    on_step_stream=on_step_stream,
+                    on_stream_event=on_stream_event,
+                    on_widget_step=on_widget_step,
+                    workflow_service=workflow_service,
+                    workflow_definition=definition,
+                    workflow_slug=workflow_slug,
+                    thread_item_converter=None,
+                    thread_items_history=None,
+                    current_user_message=current_user_message,
+                    workflow_call_stack=workflow_call_stack,
+                    runtime_snapshot=branch_snapshot,
+                )
+
+            # The branch run owns its results: no need to copy them again
             branch_payload: dict[str, Any] = {
                 "label": branch_label,
-                "final_output": copy.deepcopy(branch_summary.final_output),
-                "last_context": copy.deepcopy(branch_summary.last_context),
-                "state": copy.deepcopy(branch_summary.state),
+                "final_output": branch_summary.final_output,
+                "last_context": branch_summary.last_context,
+                "state": branch_summary.state,
                 "final_node_slug": branch_summary.final_node_slug,
                 "steps": [
                     {
@@ -234,7 +256,7 @@ class ParallelSplitNodeHandler(BaseNodeHandler):
             updated_parallel = dict(existing_parallel)
         else:
             updated_parallel = {}
-        updated_parallel[join_slug] = copy.deepcopy(parallel_payload)
+        updated_parallel[join_slug] = parallel_payload
         context.state["parallel_outputs"] = updated_parallel
 
         # Record step
@@ -19,6 +19,8 @@ from chatkit.types import (
     ThreadStreamEvent,
 )
 
+from ..tracing import trace_span
+
 if TYPE_CHECKING:  # pragma: no cover
     from ...chatkit_server.actions import _ResponseWidgetConfig
     from ...models import WorkflowStep, WorkflowTransition
@@ -217,21 +219,23 @@ class AgentStepExecutor:
             await self.deps.emit_stream_event(ThreadItemDoneEvent(item=links_message))
 
         # Ingest to vector store
-        await self.deps.ingest_vector_store_step(
-            (current_node.parameters or {}).get("vector_store_ingestion"),
-            step_slug=self.deps.branch_prefixed_slug(current_node.slug),
-            step_title=title,
-            step_context=last_step_context,
-            state=context.state,
-            default_input_context=last_step_context,
-            session_factory=self.deps.session_factory,
-        )
+        with trace_span("agent.vector_ingestion"):
+            await self.deps.ingest_vector_store_step(
+                (current_node.parameters or {}).get("vector_store_ingestion"),
+                step_slug=self.deps.branch_prefixed_slug(current_node.slug),
+                step_title=title,
+                step_context=last_step_context,
+                state=context.state,
+                default_input_context=last_step_context,
+                session_factory=self.deps.session_factory,
+            )
 
         # Handle widgets
         if widget_config is not None:
-            last_step_context = await self._handle_widget(
-                current_node, widget_config, last_step_context, context
-            )
+            with trace_span("agent.widget"):
+                last_step_context = await self._handle_widget(
+                    current_node, widget_config, last_step_context, context
+                )
 
         # Find next transition
         next_edge_func = context.runtime_vars.get("next_edge")
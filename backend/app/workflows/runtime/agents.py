@@ -30,6 +30,7 @@ from ..service import (
     WorkflowValidationError,
     WorkflowVersionNotFoundError,
 )
+from .plan import CompiledWorkflowPlan
 
 logger = logging.getLogger("chatkit.server")
 
@@ -50,12 +51,22 @@ def prepare_agents(
     agent_steps_ordered: Sequence[WorkflowStep],
     nodes_by_slug: Mapping[str, WorkflowStep],
     model_override: str | None = None,
+    plan: CompiledWorkflowPlan | None = None,
 ) -> AgentSetupResult:
-    """Build agent instances and helper caches for workflow execution."""
+    """Build agent instances and helper caches for workflow execution.
+
+    When a compiled ``plan`` is provided, widget configurations and nested
+    workflow references are taken from it instead of being parsed again.
+    """
 
     widget_configs_by_step: dict[str, _ResponseWidgetConfig] = {}
 
     def _register_widget_config(step: WorkflowStep) -> _ResponseWidgetConfig | None:
+        if plan is not None:
+            widget_config = plan.widget_configs.get(step.slug)
+            if widget_config is not None:
+                widget_configs_by_step[step.slug] = widget_config
+            return widget_config
         widget_config = _parse_response_widget_config(step.parameters)
         if widget_config is None:
             return None
@@ -141,7 +152,10 @@ def prepare_agents(
 
         widget_config = _register_widget_config(step)
 
-        workflow_reference = (step.parameters or {}).get("workflow")
+        if plan is not None:
+            workflow_reference = plan.nested_workflows.get(step.slug)
+        else:
+            workflow_reference = (step.parameters or {}).get("workflow")
         if step.kind == "agent" and isinstance(workflow_reference, Mapping):
             nested_workflow_configs[step.slug] = dict(workflow_reference)
             logger.info(
@@ -0,0 +1,147 @@
+"""État copy-on-write partagé entre les branches d'un ``parallel_split``.
+
+Chaque branche recevait une copie profonde complète de l'état, de
+l'historique de conversation et du dernier contexte, puis le moteur en
+refaisait une seconde à l'initialisation du sous-workflow. Avec de nombreuses
+branches et un long historique, ces copies dominaient la mémoire et le CPU du
+nœud. :class:`CopyOnWriteState` démarre au contraire sur les références du
+parent et ne copie une valeur mutable qu'au moment où la branche y accède.
+"""
+
+from __future__ import annotations
+
+import copy
+from collections.abc import ItemsView, Iterator, Mapping, ValuesView
+from typing import Any
+
+_MUTABLE_TYPES = (dict, list, set, bytearray)
+
+
+class CopyOnWriteState(dict):
+    """Dictionnaire initialisé sur les valeurs d'un état parent sans les copier.
+
+    Les valeurs immuables sont partagées telles quelles. Une valeur mutable
+    reste partagée avec le parent jusqu'au premier accès par clé
+    (``state[key]``, ``get``, ``setdefault``, ``pop``) : un dictionnaire est
+    alors enveloppé dans un nouveau :class:`CopyOnWriteState`, ce qui étend le
+    copy-on-write aux niveaux imbriqués (``state["state"][...]``), et les
+    autres valeurs sont copiées en profondeur une seule fois. Les écritures en
+    place de la branche ne touchent donc jamais le parent. L'itération sur les
+    valeurs (``items()``, ``values()``, ``dict(state)``, ``{**state}``) passe
+    par le même mécanisme et n'expose aucun objet du parent.
+    """
+
+    __slots__ = ("_shared",)
+
+    def __init__(self, base: Mapping[str, Any] | None = None) -> None:
+        if isinstance(base, CopyOnWriteState):
+            # Lecture brute : ne pas approprier les valeurs de l'état de base.
+            base = dict(dict.items(base))
+        super().__init__(base or {})
+        self._shared: set[Any] = {
+            key
+            for key, value in dict.items(self)
+            if isinstance(value, _MUTABLE_TYPES)
+        }
+
+    @property
+    def shared_keys(self) -> frozenset[Any]:
+        """Clés dont la valeur est encore partagée avec l'état parent."""
+
+        return frozenset(self._shared)
+
+    def _own(self, key: Any) -> None:
+        if key in self._shared:
+            self._shared.discard(key)
+            if dict.__contains__(self, key):
+                dict.__setitem__(self, key, _detach(dict.__getitem__(self, key)))
+
+    def _own_all(self) -> None:
+        for key in list(self._shared):
+            self._own(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        # Sans surcharge, ``dict(state)`` et ``{**state}`` liraient les valeurs
+        # brutes ; avec, ils passent par ``keys()`` puis ``__getitem__``.
+        return dict.__iter__(self)
+
+    def __getitem__(self, key: Any) -> Any:
+        self._own(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self._own(key)
+        return dict.get(self, key, default)
+
+    def items(self) -> ItemsView[Any, Any]:
+        self._own_all()
+        return dict.items(self)
+
+    def values(self) -> ValuesView[Any]:
+        self._own_all()
+        return dict.values(self)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._own(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key: Any, *args: Any) -> Any:
+        self._own(key)
+        return dict.pop(self, key, *args)
+
+    def popitem(self) -> tuple[Any, Any]:
+        key, value = dict.popitem(self)
+        if key in self._shared:
+            self._shared.discard(key)
+            value = _detach(value)
+        return key, value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._shared.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self._shared.discard(key)
+        dict.__delitem__(self, key)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self) -> None:
+        self._shared.clear()
+        dict.clear(self)
+
+    def copy(self) -> CopyOnWriteState:
+        return CopyOnWriteState(self)
+
+    def __copy__(self) -> CopyOnWriteState:
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[Any, Any]:
+        return {
+            copy.deepcopy(key, memo): copy.deepcopy(value, memo)
+            for key, value in dict.items(self)
+        }
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (dict, (dict(dict.items(self)),))
+
+
+def _detach(value: Any) -> Any:
+    """Copie propre à une branche d'une valeur mutable encore partagée."""
+
+    if type(value) in (dict, CopyOnWriteState):
+        return CopyOnWriteState(value)
+    return copy.deepcopy(value)
+
+
+def cow_mapping(value: Mapping[str, Any] | None) -> CopyOnWriteState | None:
+    """Retourne un état copy-on-write sur ``value`` (``None`` conservé)."""
+
+    if value is None:
+        return None
+    return CopyOnWriteState(value)
+
+
+__all__ = ["CopyOnWriteState", "cow_mapping"]
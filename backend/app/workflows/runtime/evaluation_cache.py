@@ -0,0 +1,281 @@
+"""Cache des évaluations IA et des agents évaluateurs pédagogiques.
+
+Les nœuds ``evaluated_step`` et ``guided_exercise`` lançaient un appel au
+modèle pour chaque soumission, alors que dans une classe nombreuse beaucoup de
+réponses sont identiques à la casse et aux espaces près. Ce module conserve,
+pour une durée limitée, le verdict (et le retour associé) indexé par le nœud,
+la version de la définition, l'empreinte du prompt et la réponse normalisée.
+Il mémorise aussi les couples ``(Agent, RunConfig)`` des évaluateurs afin de
+ne pas les reconstruire à chaque appel.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from ...config import env_float, env_int
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ...models import WorkflowStep
+    from .state_machine import ExecutionContext
+
+logger = logging.getLogger("chatkit.server")
+
+_V = TypeVar("_V")
+
+_FALSE_VALUES = {"0", "false", "no", "off", "non"}
+
+
+def normalize_answer(text: str) -> str:
+    """Normalise une réponse : casse ignorée et espaces consécutifs fusionnés."""
+
+    return " ".join(str(text or "").split()).casefold()
+
+
+@dataclass
+class EvaluationCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    bypassed: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class _TTLCache(Generic[_V]):
+    """Cache LRU borné dont les entrées expirent après ``ttl`` secondes."""
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._max_entries = max(0, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, _V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and self._max_entries > 0
+
+    def get(self, key: str) -> _V | None:
+        if not self.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, value: _V) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _digest(*parts: Any) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def definition_version(node: WorkflowStep, context: ExecutionContext) -> str:
+    """Identifie la version de la définition qui porte ``node``."""
+
+    plan = getattr(context, "plan", None)
+    updated_at = getattr(plan, "updated_at", None)
+    if updated_at is None:
+        definition = context.runtime_vars.get("definition")
+        updated_at = getattr(definition, "updated_at", None)
+    definition_id = getattr(node, "definition_id", None)
+    stamp = updated_at.isoformat() if updated_at is not None else ""
+    return f"{definition_id}:{stamp}"
+
+
+def evaluation_cache_enabled(params: Mapping[str, Any]) -> bool:
+    """Le paramètre de nœud ``cache_evaluations`` permet de désactiver le cache."""
+
+    value = params.get("cache_evaluations", True)
+    if isinstance(value, str):
+        return value.strip().lower() not in _FALSE_VALUES
+    return bool(value)
+
+
+class EvaluationCache:
+    """Résultats d'évaluation IA indexés par nœud, version, prompt et réponse."""
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 3600.0,
+        max_entries: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._entries: _TTLCache[tuple[bool, str] | str] = _TTLCache(
+            ttl=ttl, max_entries=max_entries, clock=clock
+        )
+        self.stats = EvaluationCacheStats()
+
+    @classmethod
+    def from_env(cls) -> EvaluationCache:
+        return cls(
+            ttl=env_float("WORKFLOW_EVALUATION_CACHE_TTL", 3600.0),
+            max_entries=env_int("WORKFLOW_EVALUATION_CACHE_SIZE", 4096),
+        )
+
+    @staticmethod
+    def make_key(
+        *,
+        node_slug: str,
+        version: str,
+        prompt: str,
+        answer: str,
+        model: str = "",
+    ) -> str:
+        prompt_hash = _digest(model, prompt)
+        return _digest(node_slug, version, prompt_hash, normalize_answer(answer))
+
+    def get(self, key: str) -> Any | None:
+        value = self._entries.get(key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: str, value: tuple[bool, str] | str) -> None:
+        self._entries.put(key, value)
+        self.stats.stores += 1
+
+    def record_bypass(self) -> None:
+        self.stats.bypassed += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def evaluation_cache_key(
+    node: WorkflowStep,
+    context: ExecutionContext,
+    params: Mapping[str, Any],
+    system_prompt: str,
+    user_message: str,
+) -> str | None:
+    """Clé de cache d'un appel d'évaluation, ou ``None`` si le nœud s'en passe."""
+
+    if not evaluation_cache_enabled(params):
+        evaluation_cache.record_bypass()
+        return None
+    model = "|".join(
+        str(params.get(name) or "")
+        for name in ("model", "model_provider_id", "model_provider_slug")
+    )
+    return EvaluationCache.make_key(
+        node_slug=node.slug,
+        version=definition_version(node, context),
+        prompt=system_prompt,
+        answer=user_message,
+        model=model,
+    )
+
+
+class EvaluatorAgentPool:
+    """Réutilise les couples ``(Agent, RunConfig)`` des nœuds pédagogiques.
+
+    La durée de vie courte couvre la rotation des identifiants d'un
+    fournisseur de modèles.
+    """
+
+    def __init__(self, *, ttl: float = 300.0, max_entries: int = 256) -> None:
+        self._entries: _TTLCache[tuple[Any, Any]] = _TTLCache(
+            ttl=ttl, max_entries=max_entries
+        )
+
+    @staticmethod
+    def make_key(
+        kind: str, node_slug: str, params: Mapping[str, Any], instructions: str
+    ) -> str:
+        return _digest(
+            kind,
+            node_slug,
+            params.get("model", ""),
+            params.get("model_provider_id", ""),
+            params.get("model_provider_slug", ""),
+            instructions,
+        )
+
+    def get_or_create(
+        self, key: str, factory: Callable[[], tuple[Any, Any]]
+    ) -> tuple[Any, Any]:
+        cached = self._entries.get(key)
+        if cached is not None:
+            return cached
+        created = factory()
+        self._entries.put(key, created)
+        return created
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+evaluation_cache = EvaluationCache.from_env()
+evaluator_agents = EvaluatorAgentPool(
+    ttl=env_float("WORKFLOW_EVALUATOR_AGENT_TTL", 300.0)
+)
+
+
+__all__ = [
+    "EvaluationCache",
+    "EvaluationCacheStats",
+    "EvaluatorAgentPool",
+    "definition_version",
+    "evaluation_cache",
+    "evaluation_cache_enabled",
+    "evaluation_cache_key",
+    "evaluator_agents",
+    "normalize_answer",
+]
@@ -0,0 +1,263 @@
+"""Plans d'exécution compilés par définition de workflow.
+
+À chaque tour, l'exécuteur reconstruisait ``nodes_by_slug`` et
+``edges_by_source``, analysait les configurations de widget (dont la
+génération du modèle de sortie Pydantic), résolvait les références de
+workflows imbriqués et recalculait les titres des nœuds à chaque visite. Un
+:class:`CompiledWorkflowPlan` regroupe ces structures, immuables pour un couple
+``(definition.id, definition.updated_at)`` donné, et n'est construit qu'une
+fois. Une exécution se contente ensuite de lier le plan aux objets ORM de sa
+propre session via :meth:`CompiledWorkflowPlan.bind`, par slug de nœud ; les
+transitions y sont regroupées par nœud source, ce qui ne coûte qu'un tri.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from ...chatkit_server.actions import (
+    _ensure_widget_output_model,
+    _parse_response_widget_config,
+    _ResponseWidgetConfig,
+)
+from ...config import env_float, env_int
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ...models import WorkflowDefinition, WorkflowStep, WorkflowTransition
+
+logger = logging.getLogger("chatkit.server")
+
+
+def node_title(step: WorkflowStep) -> str:
+    """Titre affiché d'un nœud : display_name, puis parameters["title"], puis slug."""
+
+    if step.display_name:
+        return step.display_name
+    if step.parameters and step.parameters.get("title"):
+        return str(step.parameters.get("title"))
+    return step.slug
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledNode:
+    """Métadonnées immuables d'un nœud actif."""
+
+    slug: str
+    kind: str
+    title: str
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledWorkflowPlan:
+    """Structures d'exécution précalculées pour une version de workflow.
+
+    Les nœuds sont référencés par leur slug, ce qui permet de lier le plan aux
+    objets ORM de n'importe quelle session chargeant la même version.
+    """
+
+    definition_id: int | None
+    updated_at: datetime.datetime | None
+    step_count: int
+    transition_count: int
+    nodes: Mapping[str, CompiledNode]
+    agent_slugs: tuple[str, ...]
+    start_slug: str | None
+    widget_configs: Mapping[str, _ResponseWidgetConfig]
+    nested_workflows: Mapping[str, Mapping[str, Any]]
+
+    @property
+    def titles(self) -> dict[str, str]:
+        return {slug: node.title for slug, node in self.nodes.items()}
+
+    def title_for(self, slug: str) -> str | None:
+        node = self.nodes.get(slug)
+        return node.title if node is not None else None
+
+    def matches(self, definition: WorkflowDefinition) -> bool:
+        return (
+            self.definition_id is not None
+            and self.definition_id == getattr(definition, "id", None)
+            and self.updated_at == getattr(definition, "updated_at", None)
+            and self.step_count == len(definition.steps)
+            and self.transition_count == len(definition.transitions)
+        )
+
+    def bind(
+        self, definition: WorkflowDefinition
+    ) -> tuple[dict[str, WorkflowStep], dict[str, list[WorkflowTransition]]]:
+        """Associe le plan aux objets ORM de ``definition`` pour une exécution.
+
+        Retourne des dictionnaires neufs que l'exécution peut modifier sans
+        affecter le plan partagé. Lève :class:`LookupError` si un nœud du plan
+        est absent de ``definition``.
+        """
+
+        from .agents import build_edges_by_source
+
+        steps_by_slug = {
+            step.slug: step for step in definition.steps if step.is_enabled
+        }
+        try:
+            nodes_by_slug = {slug: steps_by_slug[slug] for slug in self.nodes}
+        except KeyError as exc:
+            raise LookupError(
+                f"Nœud {exc.args[0]!r} absent de la définition {self.definition_id}"
+            ) from None
+        return nodes_by_slug, build_edges_by_source(definition.transitions)
+
+
+def compile_workflow_plan(definition: WorkflowDefinition) -> CompiledWorkflowPlan:
+    """Construit le plan d'exécution de ``definition`` sans passer par le cache."""
+
+    from ..executor import AGENT_NODE_KINDS
+
+    nodes: dict[str, CompiledNode] = {}
+    enabled_steps: list[WorkflowStep] = []
+    start_slug: str | None = None
+    for step in definition.steps:
+        if not step.is_enabled:
+            continue
+        nodes[step.slug] = CompiledNode(
+            slug=step.slug, kind=step.kind, title=node_title(step)
+        )
+        enabled_steps.append(step)
+        if start_slug is None and step.kind == "start":
+            start_slug = step.slug
+
+    ordered_steps = sorted(enabled_steps, key=lambda step: step.position)
+    agent_slugs = tuple(
+        step.slug for step in ordered_steps if step.kind in AGENT_NODE_KINDS
+    )
+
+    widget_configs: dict[str, _ResponseWidgetConfig] = {}
+    nested_workflows: dict[str, Mapping[str, Any]] = {}
+    for step in ordered_steps:
+        if step.kind != "widget" and step.kind not in AGENT_NODE_KINDS:
+            continue
+        widget_config = _parse_response_widget_config(step.parameters)
+        if widget_config is not None:
+            widget_configs[step.slug] = _ensure_widget_output_model(widget_config)
+        reference = (step.parameters or {}).get("workflow")
+        if step.kind == "agent" and isinstance(reference, Mapping):
+            nested_workflows[step.slug] = MappingProxyType(dict(reference))
+
+    return CompiledWorkflowPlan(
+        definition_id=getattr(definition, "id", None),
+        updated_at=getattr(definition, "updated_at", None),
+        step_count=len(definition.steps),
+        transition_count=len(definition.transitions),
+        nodes=MappingProxyType(nodes),
+        agent_slugs=agent_slugs,
+        start_slug=start_slug,
+        widget_configs=MappingProxyType(widget_configs),
+        nested_workflows=MappingProxyType(nested_workflows),
+    )
+
+
+@dataclass
+class PlanCacheStats:
+    hits: int = 0
+    misses: int = 0
+    compilations: int = 0
+
+
+class CompiledPlanCache:
+    """Cache LRU des plans, indexé par ``(definition.id, updated_at)``.
+
+    La durée de vie bornée couvre les modifications que ``updated_at`` ne
+    reflète pas, comme l'édition d'un widget de la bibliothèque dans un autre
+    worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 128,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(0, max_entries)
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[
+            tuple[int, datetime.datetime | None],
+            tuple[float, CompiledWorkflowPlan],
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = PlanCacheStats()
+
+    @classmethod
+    def from_env(cls) -> CompiledPlanCache:
+        return cls(
+            max_entries=env_int("WORKFLOW_PLAN_CACHE_SIZE", 128),
+            ttl=env_float("WORKFLOW_PLAN_CACHE_TTL", 300.0),
+        )
+
+    def get(self, definition: WorkflowDefinition) -> CompiledWorkflowPlan:
+        definition_id = getattr(definition, "id", None)
+        if definition_id is None or self._max_entries == 0 or self._ttl <= 0:
+            # Définition non persistée (tests, aperçus) : pas de clé stable.
+            self.stats.compilations += 1
+            return compile_workflow_plan(definition)
+
+        key = (definition_id, getattr(definition, "updated_at", None))
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1].matches(definition):
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry[1]
+            self.stats.misses += 1
+
+        plan = compile_workflow_plan(definition)
+        with self._lock:
+            self.stats.compilations += 1
+            # Les versions précédentes de la même définition sont périmées.
+            for stale_key in [k for k in self._entries if k[0] == definition_id]:
+                del self._entries[stale_key]
+            self._entries[key] = (now + self._ttl, plan)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+compiled_plan_cache = CompiledPlanCache.from_env()
+
+
+def get_compiled_plan(definition: WorkflowDefinition) -> CompiledWorkflowPlan:
+    """Retourne le plan compilé de ``definition``, depuis le cache si possible."""
+
+    return compiled_plan_cache.get(definition)
+
+
+def clear_compiled_plans() -> None:
+    compiled_plan_cache.clear()
+
+
+__all__ = [
+    "CompiledNode",
+    "CompiledPlanCache",
+    "CompiledWorkflowPlan",
+    "clear_compiled_plans",
+    "compile_workflow_plan",
+    "compiled_plan_cache",
+    "get_compiled_plan",
+    "node_title",
+]
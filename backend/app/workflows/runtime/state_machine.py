@@ -14,11 +14,14 @@ from typing import TYPE_CHECKING, Any
 
 from agents import TResponseInputItem
 
+from ..tracing import trace_span
+
 logger = logging.getLogger("chatkit.server")
 
 if TYPE_CHECKING:  # pragma: no cover
     from ...models import WorkflowStep, WorkflowTransition
     from ..executor import WorkflowStepSummary
+    from .plan import CompiledWorkflowPlan
 
 
 async def _update_workflow_metadata(
@@ -102,6 +105,7 @@ class ExecutionContext:
 
     # Execution tracking
     current_slug: str
+    stop_at_slug: str | None = None
     guard_counter: int = 0
     max_iterations: int = 1000
     handler_calls: dict[str, int] | None = None
@@ -117,6 +121,9 @@ class ExecutionContext:
     # Additional dependencies (populated as needed)
     runtime_vars: dict[str, Any] = field(default_factory=dict)
 
+    # Immutable structures shared by every run of this definition version
+    plan: CompiledWorkflowPlan | None = None
+
 
 @dataclass
 class NodeResult:
@@ -180,6 +187,63 @@ class WorkflowStateMachine:
         """Register a handler for a specific node type."""
         self.handlers[kind] = handler
 
+    @staticmethod
+    def _resolve_node_title(
+        node: WorkflowStep, handler: NodeHandler, context: ExecutionContext
+    ) -> str:
+        """Return the node title, precomputed by the compiled plan when available."""
+        if context.plan is not None:
+            title = context.plan.title_for(node.slug)
+            if title is not None:
+                return title
+        if node.display_name:
+            return node.display_name
+        if node.parameters and node.parameters.get("title"):
+            return str(node.parameters.get("title"))
+        if hasattr(handler, "_node_title"):
+            return handler._node_title(node)
+        return node.slug
+
+    @staticmethod
+    def _prewarm_voice_successors(
+        node: WorkflowStep, context: ExecutionContext
+    ) -> None:
+        """Start preparing realtime sessions for reachable ``voice_agent`` nodes.
+
+        Minting the client secret and connecting MCP servers then overlaps
+        with the current node instead of delaying the first audio frame.
+        """
+        manager = context.runtime_vars.get("voice_session_manager")
+        if manager is None or not hasattr(manager, "prewarm_voice_session"):
+            return
+        prewarmed: set[str] = context.runtime_vars.setdefault("voice_prewarmed", set())
+        # Même utilisateur que celui retenu par VoiceAgentNodeHandler à
+        # l'ouverture : les secrets préémis ne servent qu'à lui.
+        request_context = getattr(
+            context.runtime_vars.get("agent_context"), "request_context", None
+        )
+        user_id = getattr(request_context, "user_id", None) or "unknown"
+        for transition in context.edges_by_source.get(node.slug, ()):
+            target = getattr(transition, "target_step", None)
+            if target is None or target.kind != "voice_agent":
+                continue
+            if target.slug in prewarmed:
+                continue
+            prewarmed.add(target.slug)
+            try:
+                from .voice_context import _resolve_voice_agent_configuration
+
+                _, event_context = _resolve_voice_agent_configuration(
+                    target, overrides=context.runtime_vars.get("voice_overrides")
+                )
+                manager.prewarm_voice_session(event_context, user_id=user_id)
+            except Exception:  # pragma: no cover - best effort
+                logger.debug(
+                    "Préchauffage vocal impossible pour l'étape %s",
+                    target.slug,
+                    exc_info=True,
+                )
+
     async def execute(self, context: ExecutionContext) -> ExecutionContext:
         """Execute the workflow state machine.
 
@@ -199,6 +263,14 @@ class WorkflowStateMachine:
         ):
             context.guard_counter += 1
 
+            # Parallel branches stop right before their join node
+            if (
+                context.stop_at_slug is not None
+                and context.current_slug == context.stop_at_slug
+            ):
+                context.is_finished = True
+                break
+
             # Get current node
             current_node = context.nodes_by_slug.get(context.current_slug)
             if current_node is None:
@@ -235,69 +307,46 @@ class WorkflowStateMachine:
             steps_before = len(context.steps)
 
             # Mettre à jour le titre du workflow dès que l'étape commence
-            node_title = ""
-            if current_node.display_name:
-                node_title = current_node.display_name
-            elif current_node.parameters and current_node.parameters.get("title"):
-                node_title = str(current_node.parameters.get("title"))
-            elif hasattr(handler, "_node_title"):
-                node_title = handler._node_title(current_node)
-            else:
-                node_title = current_node.slug
-
-            await _update_workflow_metadata(
-                context.runtime_vars.get("thread"),
-                current_node.slug,
-                node_title,
-                context.steps,
-            )
-
-            # Execute handler
-            result = await handler.execute(current_node, context)
-
-            # If handler didn't record the step, do it automatically
-            # This ensures all steps (including start, condition, etc.) appear in history
-            steps_after = len(context.steps)
-            if steps_after == steps_before and context.record_step is not None:
-                # Get step title
-                node_title = ""
-                if current_node.display_name:
-                    node_title = current_node.display_name
-                elif current_node.parameters and current_node.parameters.get("title"):
-                    node_title = str(current_node.parameters.get("title"))
-                elif hasattr(handler, "_node_title"):
-                    node_title = handler._node_title(current_node)
-                else:
-                    node_title = current_node.slug
-
-                # Record the step with minimal payload
-                await context.record_step(
-                    current_node.slug,
-                    node_title,
-                    {"type": current_node.kind, "slug": current_node.slug},
-                )
+            node_title = self._resolve_node_title(current_node, handler, context)
+
+            with trace_span(
+                "workflow.node", slug=current_node.slug, kind=current_node.kind
+            ):
+                with trace_span("workflow.update_metadata"):
+                    await _update_workflow_metadata(
+                        context.runtime_vars.get("thread"),
+                        current_node.slug,
+                        node_title,
+                        context.steps,
+                    )
 
-            # Update workflow metadata for monitoring (after each step execution)
-            thread = context.runtime_vars.get("thread")
-            if thread is not None:
-                # Try multiple sources for the title
-                node_title = ""
-                # 1. Try display_name
-                if current_node.display_name:
-                    node_title = current_node.display_name
-                # 2. Try parameters["title"]
-                elif current_node.parameters and current_node.parameters.get("title"):
-                    node_title = str(current_node.parameters.get("title"))
-                # 3. Fallback to handler's _node_title method
-                elif hasattr(handler, "_node_title"):
-                    node_title = handler._node_title(current_node)
-
-                await _update_workflow_metadata(
-                    thread,
-                    current_node.slug,
-                    node_title,
-                    context.steps,
-                )
+                self._prewarm_voice_successors(current_node, context)
+
+                # Execute handler
+                with trace_span(f"handler.{current_node.kind}"):
+                    result = await handler.execute(current_node, context)
+
+                # If handler didn't record the step, do it automatically
+                # This ensures all steps (including start, condition, etc.) appear in history
+                steps_after = len(context.steps)
+                if steps_after == steps_before and context.record_step is not None:
+                    # Record the step with minimal payload
+                    await context.record_step(
+                        current_node.slug,
+                        node_title,
+                        {"type": current_node.kind, "slug": current_node.slug},
+                    )
+
+                # Update workflow metadata for monitoring (after each step execution)
+                thread = context.runtime_vars.get("thread")
+                if thread is not None:
+                    with trace_span("workflow.update_metadata"):
+                        await _update_workflow_metadata(
+                            thread,
+                            current_node.slug,
+                            node_title,
+                            context.steps,
+                        )
 
             if debug_enabled:
                 logger.debug(
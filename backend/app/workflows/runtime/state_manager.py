@@ -192,6 +192,13 @@ class StateInitializer:
             if restored_state:
                 state.update(restored_state)
             last_step_context = None
+        elif runtime_snapshot.isolated:
+            initial_user_text = _normalize_user_text(
+                workflow_payload.get("input_as_text", "")
+            )
+            conversation_history = runtime_snapshot.conversation_history
+            state = runtime_snapshot.state
+            last_step_context = runtime_snapshot.last_step_context
         else:
             initial_user_text = _normalize_user_text(
                 workflow_payload.get("input_as_text", "")
@@ -21,6 +21,7 @@ from chatkit.types import (
 
 from ...chatkit_server.actions import _ResponseWidgetConfig
 from ...models import WorkflowStep, WorkflowTransition
+from ..tracing import trace_span
 
 logger = logging.getLogger("chatkit.server")
 
@@ -253,27 +254,29 @@ async def process_agent_step(
         await emit_stream_event(ThreadItemAddedEvent(item=links_message))
         await emit_stream_event(ThreadItemDoneEvent(item=links_message))
 
-    await ingest_vector_store_step(
-        (current_node.parameters or {}).get("vector_store_ingestion"),
-        step_slug=branch_prefixed_slug(current_node.slug),
-        step_title=title,
-        step_context=last_step_context,
-        state=state,
-        default_input_context=last_step_context,
-        session_factory=session_factory,
-    )
-
-    if widget_config is not None:
-        rendered_widget = await stream_widget(
-            widget_config,
+    with trace_span("agent.vector_ingestion"):
+        await ingest_vector_store_step(
+            (current_node.parameters or {}).get("vector_store_ingestion"),
             step_slug=branch_prefixed_slug(current_node.slug),
             step_title=title,
             step_context=last_step_context,
             state=state,
-            last_step_context=last_step_context,
-            agent_context=agent_context,
-            emit_stream_event=emit_stream_event,
+            default_input_context=last_step_context,
+            session_factory=session_factory,
         )
+
+    if widget_config is not None:
+        with trace_span("agent.widget"):
+            rendered_widget = await stream_widget(
+                widget_config,
+                step_slug=branch_prefixed_slug(current_node.slug),
+                step_title=title,
+                step_context=last_step_context,
+                state=state,
+                last_step_context=last_step_context,
+                agent_context=agent_context,
+                emit_stream_event=emit_stream_event,
+            )
         widget_identifier = (
             widget_config.slug
             if widget_config.source == "library"
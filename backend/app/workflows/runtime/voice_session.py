@@ -23,7 +23,11 @@ from chatkit.types import (
 
 from ...chatkit_server.context import _set_wait_state_metadata
 from ..utils import _clone_conversation_history_snapshot, _json_safe_copy
-from ...realtime_runner import close_voice_session, open_voice_session
+from ...realtime_runner import (
+    close_voice_session,
+    open_voice_session,
+    prewarm_voice_session,
+)
 from .vector_ingestion import ingest_vector_store_step
 
 logger = logging.getLogger("chatkit.server")
@@ -53,9 +57,34 @@ class VoiceSessionManager:
         *,
         open_session: Callable[..., Awaitable[Any]] = open_voice_session,
         close_session: Callable[..., Awaitable[Any]] = close_voice_session,
+        prewarm_session: Callable[..., Any] | None = None,
     ) -> None:
         self._open_session = open_session
         self._close_session = close_session
+        # Le préchauffage alimente les réserves de l'orchestrateur Realtime :
+        # il n'a de sens que si les sessions sont ouvertes par lui.
+        if prewarm_session is None and open_session is open_voice_session:
+            prewarm_session = prewarm_voice_session
+        self._prewarm_session = prewarm_session
+
+    def prewarm_voice_session(
+        self, event_context: Mapping[str, Any], *, user_id: str
+    ) -> None:
+        """Prépare la session d'un nœud ``voice_agent`` sur le point d'être atteint."""
+
+        if self._prewarm_session is None:
+            return
+        self._prewarm_session(
+            user_id=user_id,
+            model=event_context["model"],
+            voice=event_context.get("voice"),
+            instructions=event_context["instructions"],
+            provider_id=event_context.get("model_provider_id"),
+            provider_slug=event_context.get("model_provider_slug"),
+            realtime=event_context.get("realtime"),
+            tools=event_context.get("tools"),
+            handoffs=event_context.get("handoffs"),
+        )
 
     async def start_voice_session(
         self,
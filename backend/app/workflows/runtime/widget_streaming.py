@@ -136,6 +136,15 @@ def _collect_widget_values_from_output(
     if not bindings:
         return collected
 
+    # Premier chemin (dans l'ordre de parcours) sous chaque préfixe, pour
+    # résoudre les liaisons sans rebalayer toutes les clés à chaque fois.
+    first_key_by_prefix: dict[str, str] = {}
+    for key in collected:
+        position = key.find(".")
+        while position != -1:
+            first_key_by_prefix.setdefault(key[:position], key)
+            position = key.find(".", position + 1)
+
     enriched = dict(collected)
     consumed_keys: set[str] = set()
     for identifier, binding in bindings.items():
@@ -152,15 +161,10 @@ def _collect_widget_values_from_output(
             candidate = collected[candidate_key]
         else:
             candidate = None
-            for key, value in collected.items():
-                if not key.startswith(candidate_key + "."):
-                    continue
-                suffix = key[len(candidate_key) + 1 :]
-                if not suffix:
-                    continue
-                candidate_key = key
-                candidate = value
-                break
+            nested_key = first_key_by_prefix.get(candidate_key)
+            if nested_key is not None:
+                candidate_key = nested_key
+                candidate = collected[nested_key]
         if candidate is None:
             continue
         consumed_keys.add(candidate_key)
@@ -301,9 +305,15 @@ async def _stream_response_widget(
         resolved[variable_id] = value
 
     if step_context:
+        # Les agents exposent souvent le même objet sous plusieurs clés : on ne
+        # l'aplatit qu'une fois.
+        walked: set[int] = set()
         for key in ("output_structured", "output_parsed", "output"):
             if key not in step_context:
                 continue
+            if id(step_context[key]) in walked:
+                continue
+            walked.add(id(step_context[key]))
             auto_values = _collect_widget_values_from_output(
                 step_context[key], bindings=bindings
             )
@@ -857,6 +857,21 @@ class WorkflowGraphValidator:
 
                 parameters["branches"] = sanitized_branches
 
+                max_concurrency_raw = parameters.get("max_concurrency")
+                if max_concurrency_raw in (None, ""):
+                    parameters.pop("max_concurrency", None)
+                else:
+                    try:
+                        max_concurrency = int(max_concurrency_raw)
+                    except (TypeError, ValueError):
+                        max_concurrency = 0
+                    if isinstance(max_concurrency_raw, bool) or max_concurrency < 1:
+                        raise WorkflowValidationError(
+                            f"Le paramètre max_concurrency du nœud parallel_split "
+                            f"{slug} doit être un entier positif."
+                        )
+                    parameters["max_concurrency"] = max_concurrency
+
             node = NormalizedNode(
                 slug=slug,
                 kind=kind,
@@ -2935,6 +2950,8 @@ class WorkflowService:
             params = dict(step.parameters or {})
             params[message_key] = new_message
             step.parameters = params
+            # Invalide les plans d'exécution compilés pour cette définition.
+            definition.updated_at = datetime.datetime.now(datetime.UTC)
             db.flush()
 
             # Update stored thread items that came from this step.
@@ -3041,6 +3058,7 @@ class WorkflowService:
             params = dict(step.parameters or {})
             params[field_key] = new_value
             step.parameters = params
+            definition.updated_at = datetime.datetime.now(datetime.UTC)
             db.commit()
             db.refresh(step)
             return step
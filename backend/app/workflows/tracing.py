@@ -0,0 +1,569 @@
+"""Traçage par spans de l'exécution des workflows.
+
+``WorkflowMetrics`` ne donne que des totaux par exécution. Ce module découpe
+un tour en spans imbriqués (nœuds du state machine, persistance des étapes,
+rendu des instructions, construction des agents, flux du modèle avec son
+délai avant le premier jeton, appels d'outils, écritures du store) afin de
+voir où le temps est passé.
+
+* L'échantillonnage se décide à la racine (``WORKFLOW_TRACE_SAMPLE_RATE``,
+  désactivé par défaut). Hors trace, :func:`trace_span` renvoie un contexte
+  partagé qui ne fait rien : le coût se limite à une lecture de
+  ``ContextVar``.
+* Les traces terminées sont conservées dans un anneau en mémoire consulté
+  par le moniteur d'administration, et peuvent être rejouées vers
+  OpenTelemetry (``WORKFLOW_TRACE_OTEL``) lorsque ``opentelemetry-api`` est
+  installé.
+* :class:`AgentsSdkSpanBridge` rattache à la trace courante les spans émis
+  par le SDK Agents (réponses du modèle, appels de fonctions et d'outils MCP).
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Protocol, TypeVar
+
+from ..config import env_flag, env_float, env_int
+
+logger = logging.getLogger("chatkit.server")
+
+_T = TypeVar("_T")
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+@dataclass(slots=True)
+class TraceSpan:
+    """Intervalle chronométré d'une trace, horodaté en nanosecondes."""
+
+    name: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    events: list[tuple[str, int, dict[str, Any]]] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append((name, time.time_ns(), attributes))
+
+    def as_dict(self, origin_ns: int) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "offset_ms": round((self.start_ns - origin_ns) / 1_000_000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": dict(self.attributes),
+            "events": [
+                {
+                    "name": name,
+                    "offset_ms": round((timestamp - origin_ns) / 1_000_000, 3),
+                    "attributes": dict(attributes),
+                }
+                for name, timestamp, attributes in self.events
+            ],
+            "error": self.error,
+        }
+
+
+@dataclass(slots=True)
+class WorkflowTrace:
+    """Ensemble des spans d'une exécution échantillonnée."""
+
+    trace_id: str
+    root: TraceSpan
+    max_spans: int
+    spans: list[TraceSpan] = field(default_factory=list)
+    dropped_spans: int = 0
+
+    def __post_init__(self) -> None:
+        self.spans.append(self.root)
+
+    @property
+    def name(self) -> str:
+        return self.root.name
+
+    def add(self, span: TraceSpan) -> bool:
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return False
+        self.spans.append(span)
+        return True
+
+    def profile(self) -> list[dict[str, Any]]:
+        """Temps cumulé par nom de span, du plus coûteux au moins coûteux."""
+
+        totals: dict[str, list[float]] = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, [0, 0.0, 0.0])
+            duration = span.duration_ms
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+        return [
+            {
+                "name": name,
+                "count": int(count),
+                "total_ms": round(total, 3),
+                "max_ms": round(longest, 3),
+            }
+            for name, (count, total, longest) in sorted(
+                totals.items(), key=lambda item: item[1][1], reverse=True
+            )
+        ]
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": datetime.fromtimestamp(
+                self.root.start_ns / 1_000_000_000, UTC
+            ).isoformat(),
+            "duration_ms": round(self.root.duration_ms, 3),
+            "span_count": len(self.spans),
+            "dropped_spans": self.dropped_spans,
+            "error": self.root.error
+            or next((span.error for span in self.spans if span.error), None),
+            "attributes": dict(self.root.attributes),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        origin = self.root.start_ns
+        return {
+            **self.summary(),
+            "profile": self.profile(),
+            "spans": [span.as_dict(origin) for span in self.spans],
+        }
+
+
+_current: ContextVar[tuple[WorkflowTrace, TraceSpan] | None] = ContextVar(
+    "workflow_trace_span", default=None
+)
+
+
+class TraceExporter(Protocol):
+    def export(self, trace: WorkflowTrace) -> None: ...
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class _SpanScope:
+    __slots__ = ("_finish", "_span", "_token", "_trace")
+
+    def __init__(
+        self,
+        trace: WorkflowTrace,
+        span: TraceSpan,
+        finish: Callable[[WorkflowTrace], None] | None = None,
+    ) -> None:
+        self._trace = trace
+        self._span = span
+        self._finish = finish
+        self._token: Any = None
+
+    def __enter__(self) -> TraceSpan:
+        self._token = _current.set((self._trace, self._span))
+        return self._span
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        span = self._span
+        span.end_ns = time.time_ns()
+        if exc is not None:
+            span.error = f"{type(exc).__name__}: {exc}"
+        _current.reset(self._token)
+        if self._finish is not None:
+            self._finish(self._trace)
+
+
+class WorkflowTracer:
+    """Échantillonne les traces, les conserve en mémoire et les exporte."""
+
+    def __init__(
+        self,
+        *,
+        sample_rate: float = 0.0,
+        ring_size: int = 100,
+        max_spans: int = 1000,
+        exporters: list[TraceExporter] | None = None,
+    ) -> None:
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.max_spans = max(1, max_spans)
+        self.exporters: list[TraceExporter] = list(exporters or [])
+        self._ring: deque[WorkflowTrace] = deque(maxlen=max(1, ring_size))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> WorkflowTracer:
+        exporters: list[TraceExporter] = []
+        if env_flag("WORKFLOW_TRACE_OTEL"):
+            exporter = OpenTelemetryExporter.create()
+            if exporter is not None:
+                exporters.append(exporter)
+        return cls(
+            sample_rate=env_float("WORKFLOW_TRACE_SAMPLE_RATE", 0.0),
+            ring_size=env_int("WORKFLOW_TRACE_RING_SIZE", 100),
+            max_spans=env_int("WORKFLOW_TRACE_MAX_SPANS", 1000),
+            exporters=exporters,
+        )
+
+    # ── Création des spans ───────────────────────────────────────────────
+
+    def start(self, name: str, /, **attributes: Any) -> _SpanScope | _NoopScope:
+        """Ouvre une trace racine, ou un span enfant si une trace est active."""
+
+        if _current.get() is not None:
+            return self.span(name, **attributes)
+        if self.sample_rate <= 0.0 or (
+            self.sample_rate < 1.0 and random.random() >= self.sample_rate
+        ):
+            return _NOOP_SCOPE
+        root = TraceSpan(
+            name=name,
+            span_id=_new_span_id(),
+            parent_id=None,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        trace = WorkflowTrace(
+            trace_id=uuid.uuid4().hex, root=root, max_spans=self.max_spans
+        )
+        return _SpanScope(trace, root, self._finish)
+
+    def span(self, name: str, /, **attributes: Any) -> _SpanScope | _NoopScope:
+        """Ouvre un span enfant du span courant ; sans trace active, ne fait rien."""
+
+        current = _current.get()
+        if current is None:
+            return _NOOP_SCOPE
+        trace, parent = current
+        span = TraceSpan(
+            name=name,
+            span_id=_new_span_id(),
+            parent_id=parent.span_id,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        if not trace.add(span):
+            return _NOOP_SCOPE
+        return _SpanScope(trace, span)
+
+    def record_span(
+        self,
+        name: str,
+        *,
+        start_ns: int,
+        end_ns: int,
+        attributes: Mapping[str, Any] | None = None,
+        error: str | None = None,
+    ) -> TraceSpan | None:
+        """Ajoute au span courant un enfant déjà terminé (spans externes)."""
+
+        current = _current.get()
+        if current is None:
+            return None
+        trace, parent = current
+        span = TraceSpan(
+            name=name,
+            span_id=_new_span_id(),
+            parent_id=parent.span_id,
+            start_ns=start_ns,
+            end_ns=end_ns,
+            attributes=dict(attributes or {}),
+            error=error,
+        )
+        return span if trace.add(span) else None
+
+    def _finish(self, trace: WorkflowTrace) -> None:
+        with self._lock:
+            self._ring.append(trace)
+        for exporter in self.exporters:
+            try:
+                exporter.export(trace)
+            except Exception:  # pragma: no cover - exportateur défaillant
+                logger.warning(
+                    "Export de la trace %s impossible", trace.trace_id, exc_info=True
+                )
+
+    # ── Consultation ─────────────────────────────────────────────────────
+
+    def recent(self, limit: int = 20) -> list[dict[str, Any]]:
+        with self._lock:
+            traces = list(self._ring)[-limit:] if limit > 0 else []
+        return [trace.summary() for trace in reversed(traces)]
+
+    def get(self, trace_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            trace = next(
+                (item for item in self._ring if item.trace_id == trace_id), None
+            )
+        return trace.as_dict() if trace is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ring.clear()
+
+
+def _otel_value(value: Any) -> Any:
+    if isinstance(value, bool | int | float | str):
+        return value
+    return str(value)
+
+
+class OpenTelemetryExporter:
+    """Rejoue chaque trace terminée sur un tracer OpenTelemetry.
+
+    Les spans sont créés avec leurs horodatages d'origine ; le SDK et
+    l'exportateur (OTLP, console…) relèvent de la configuration OpenTelemetry
+    du processus.
+    """
+
+    def __init__(self, tracer: Any, trace_api: Any) -> None:
+        self._tracer = tracer
+        self._trace_api = trace_api
+
+    @classmethod
+    def create(cls) -> OpenTelemetryExporter | None:
+        try:
+            from opentelemetry import trace as trace_api
+        except ImportError:
+            logger.warning(
+                "WORKFLOW_TRACE_OTEL est actif mais opentelemetry-api n'est pas "
+                "installé : export OpenTelemetry désactivé"
+            )
+            return None
+        return cls(trace_api.get_tracer("chatkit.workflows"), trace_api)
+
+    def export(self, trace: WorkflowTrace) -> None:
+        exported: dict[str, Any] = {}
+        for span in sorted(trace.spans, key=lambda item: item.start_ns):
+            parent = exported.get(span.parent_id or "")
+            otel_span = self._tracer.start_span(
+                span.name,
+                context=(
+                    self._trace_api.set_span_in_context(parent)
+                    if parent is not None
+                    else None
+                ),
+                start_time=span.start_ns,
+                attributes={
+                    "chatkit.trace_id": trace.trace_id,
+                    **{
+                        key: _otel_value(value)
+                        for key, value in span.attributes.items()
+                        if value is not None
+                    },
+                },
+            )
+            for name, timestamp, attributes in span.events:
+                otel_span.add_event(
+                    name,
+                    attributes={
+                        key: _otel_value(value) for key, value in attributes.items()
+                    },
+                    timestamp=timestamp,
+                )
+            if span.error is not None:
+                otel_span.set_status(
+                    self._trace_api.Status(
+                        self._trace_api.StatusCode.ERROR, span.error
+                    )
+                )
+            otel_span.end(end_time=span.end_ns or time.time_ns())
+            exported[span.span_id] = otel_span
+
+
+def _iso_to_ns(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value).timestamp() * 1_000_000_000)
+    except ValueError:
+        return None
+
+
+try:
+    from agents.tracing import TracingProcessor as _TracingProcessorBase
+except ImportError:  # pragma: no cover - SDK Agents absent
+    _TracingProcessorBase = object  # type: ignore[assignment,misc]
+
+
+class AgentsSdkSpanBridge(_TracingProcessorBase):  # type: ignore[misc,valid-type]
+    """Processeur du SDK Agents qui recopie ses spans dans la trace courante.
+
+    Le SDK exécute le run dans une tâche créée depuis le span
+    ``agent.model_stream`` : la ``ContextVar`` de la trace y est donc visible.
+    """
+
+    _SPAN_NAMES = {
+        "response": "model.response",
+        "generation": "model.generation",
+        "function": "tool.call",
+        "mcp_tools": "tool.mcp_list_tools",
+        "guardrail": "agent.guardrail",
+        "handoff": "agent.handoff",
+    }
+
+    def __init__(self, tracer: WorkflowTracer) -> None:
+        self._tracer = tracer
+
+    def on_trace_start(self, trace: Any) -> None:
+        return None
+
+    def on_trace_end(self, trace: Any) -> None:
+        return None
+
+    def on_span_start(self, span: Any) -> None:
+        return None
+
+    def on_span_end(self, span: Any) -> None:
+        if _current.get() is None:
+            return
+        data = getattr(span, "span_data", None)
+        name = self._SPAN_NAMES.get(getattr(data, "type", ""))
+        if name is None:
+            return
+        start_ns = _iso_to_ns(getattr(span, "started_at", None))
+        end_ns = _iso_to_ns(getattr(span, "ended_at", None))
+        if start_ns is None or end_ns is None:
+            return
+        error = getattr(span, "error", None)
+        self._tracer.record_span(
+            name,
+            start_ns=start_ns,
+            end_ns=end_ns,
+            attributes=self._attributes(data),
+            error=str(error.get("message")) if isinstance(error, Mapping) else None,
+        )
+
+    @staticmethod
+    def _attributes(data: Any) -> dict[str, Any]:
+        kind = getattr(data, "type", "")
+        if kind == "function":
+            attributes: dict[str, Any] = {"tool": getattr(data, "name", None)}
+            mcp_data = getattr(data, "mcp_data", None)
+            if isinstance(mcp_data, Mapping) and mcp_data.get("server"):
+                attributes["mcp_server"] = mcp_data["server"]
+            return attributes
+        if kind == "mcp_tools":
+            return {"mcp_server": getattr(data, "server", None)}
+        if kind == "response":
+            response = getattr(data, "response", None)
+            hosted_calls = [
+                getattr(item, "type", "")
+                for item in getattr(response, "output", None) or []
+                if str(getattr(item, "type", "")).endswith("_call")
+                and getattr(item, "type", "") != "function_call"
+            ]
+            attributes = {"model": getattr(response, "model", None)}
+            if hosted_calls:
+                # file_search, web_search… sont exécutés côté fournisseur.
+                attributes["hosted_tool_calls"] = ",".join(hosted_calls)
+            return attributes
+        if kind == "generation":
+            return {"model": getattr(data, "model", None)}
+        return {"name": getattr(data, "name", None)}
+
+    def shutdown(self) -> None:
+        return None
+
+    def force_flush(self) -> None:
+        return None
+
+
+workflow_tracer = WorkflowTracer.from_env()
+
+_sdk_bridge_installed = False
+
+
+def install_agents_sdk_bridge() -> None:
+    """Enregistre :class:`AgentsSdkSpanBridge` auprès du SDK (une seule fois)."""
+
+    global _sdk_bridge_installed
+    if _sdk_bridge_installed or _TracingProcessorBase is object:
+        return
+    from agents.tracing import add_trace_processor
+
+    add_trace_processor(AgentsSdkSpanBridge(workflow_tracer))
+    _sdk_bridge_installed = True
+
+
+def trace_span(name: str, /, **attributes: Any) -> _SpanScope | _NoopScope:
+    """Span enfant du span courant de :data:`workflow_tracer`."""
+
+    return workflow_tracer.span(name, **attributes)
+
+
+def current_span() -> TraceSpan | None:
+    current = _current.get()
+    return current[1] if current is not None else None
+
+
+def traced(
+    name: str, *, root: bool = False
+) -> Callable[[Callable[..., Awaitable[_T]]], Callable[..., Awaitable[_T]]]:
+    """Décore une coroutine pour l'exécuter dans un span (ou une trace racine)."""
+
+    def _decorate(
+        func: Callable[..., Awaitable[_T]],
+    ) -> Callable[..., Awaitable[_T]]:
+        @functools.wraps(func)
+        async def _wrapper(*args: Any, **kwargs: Any) -> _T:
+            if not root and _current.get() is None:
+                return await func(*args, **kwargs)
+            scope = (
+                workflow_tracer.start(name) if root else workflow_tracer.span(name)
+            )
+            with scope:
+                return await func(*args, **kwargs)
+
+        return _wrapper
+
+    return _decorate
+
+
+__all__ = [
+    "AgentsSdkSpanBridge",
+    "OpenTelemetryExporter",
+    "TraceExporter",
+    "TraceSpan",
+    "WorkflowTrace",
+    "WorkflowTracer",
+    "current_span",
+    "install_agents_sdk_bridge",
+    "trace_span",
+    "traced",
+    "workflow_tracer",
+]
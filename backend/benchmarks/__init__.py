@@ -0,0 +1 @@
+"""Bancs de mesure de performance du backend (hors suite de tests)."""
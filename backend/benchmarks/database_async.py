@@ -0,0 +1,143 @@
+"""Banc de l'effet des requêtes ORM sur les flux SSE concurrents.
+
+Simule ``--streams`` flux SSE (un tick toutes les 2 ms) pendant que
+``--queries`` requêtes SQLite coûteuses s'exécutent, et mesure le p99 du
+retard des ticks :
+
+* ``sync`` : session synchrone ouverte directement sur la boucle d'événements
+  (ancien comportement) ;
+* ``async`` : :func:`app.database.run_in_session` avec un moteur
+  ``sqlite+aiosqlite``, qui rend la main à la boucle pendant la requête.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.database_async --streams 20 --queries 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+from app import database  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+
+def _slow_query(rows: int) -> Any:
+    return text(
+        "WITH RECURSIVE cnt(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM cnt "
+        f"WHERE x < {int(rows)}) SELECT count(*) FROM cnt"
+    )
+
+
+async def _stream_p99(
+    query_runner: Callable[[], Awaitable[None]], *, streams: int, queries: int
+) -> float:
+    """p99 du retard (ms) des ticks SSE simulés pendant les requêtes."""
+
+    lateness: list[float] = []
+    stop = asyncio.Event()
+    interval = 0.002
+
+    async def _stream() -> None:
+        while not stop.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lateness.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    tasks = [asyncio.create_task(_stream()) for _ in range(streams)]
+    await asyncio.sleep(0.01)
+    for _ in range(queries):
+        await query_runner()
+    stop.set()
+    await asyncio.gather(*tasks)
+    return statistics.quantiles(lateness, n=100)[98]
+
+
+async def _run(args: argparse.Namespace, db_path: Path) -> list[dict[str, Any]]:
+    query = _slow_query(args.rows)
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    sync_factory = sessionmaker(bind=sync_engine)
+    database.AsyncSessionLocal = async_sessionmaker(bind=async_engine)
+
+    async def _blocking_query() -> None:
+        with sync_factory() as session:
+            session.execute(query).scalar_one()
+
+    async def _async_query() -> None:
+        await database.run_in_session(
+            lambda session: session.execute(query).scalar_one()
+        )
+
+    reports = []
+    try:
+        for mode, runner in (("sync", _blocking_query), ("async", _async_query)):
+            p99 = await _stream_p99(runner, streams=args.streams, queries=args.queries)
+            reports.append(
+                {
+                    "mode": mode,
+                    "streams": args.streams,
+                    "queries": args.queries,
+                    "p99_lateness_ms": round(p99, 1),
+                }
+            )
+    finally:
+        await async_engine.dispose()
+        sync_engine.dispose()
+    return reports
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory(prefix="chatkit-bench-db-") as directory:
+        return asyncio.run(_run(args, Path(directory) / "load.db"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Retard des flux SSE pendant des requêtes ORM."
+    )
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument(
+        "--rows", type=int, default=300_000, help="Taille de la requête coûteuse."
+    )
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""Banc du cache d'évaluation des étapes évaluées (``evaluated_step``).
+
+Simule une classe de ``--students`` élèves qui soumettent des réponses
+majoritairement identiques à une question corrigée par un modèle (latence
+simulée de ``--latency-ms``), avec et sans ``cache_evaluations``, et compte
+les appels au modèle et la durée totale.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.evaluation_cache --students 300 --latency-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+from app.workflows.handlers import evaluated_step as evaluated_step_module  # noqa: E402
+from app.workflows.handlers.evaluated_step import EvaluatedStepHandler  # noqa: E402
+from app.workflows.runtime import evaluation_cache as cache_module  # noqa: E402
+from app.workflows.runtime.evaluation_cache import EvaluationCache  # noqa: E402
+from app.workflows.runtime.state_machine import ExecutionContext  # noqa: E402
+
+_ANSWERS = ("Paris", " paris", "PARIS", "Lyon", "Marseille")
+
+
+def _context() -> ExecutionContext:
+    return ExecutionContext(
+        state={},
+        conversation_history=[],
+        last_step_context=None,
+        steps=[],
+        nodes_by_slug={},
+        edges_by_source={},
+        current_slug="quiz",
+        runtime_vars={
+            "definition": SimpleNamespace(
+                updated_at=datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+            )
+        },
+    )
+
+
+async def _class_session(args: argparse.Namespace, *, cached: bool) -> dict[str, Any]:
+    cache = EvaluationCache(ttl=3600, max_entries=4096)
+    evaluated_step_module.evaluation_cache = cache
+    cache_module.evaluation_cache = cache
+    calls = 0
+
+    async def _model(self, node, instructions, user_message):  # type: ignore[no-untyped-def]
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(args.latency_ms / 1000)
+        return json.dumps({"passed": "paris" in user_message.lower(), "feedback": ""})
+
+    EvaluatedStepHandler._run_agent = _model  # type: ignore[method-assign]
+    handler = EvaluatedStepHandler()
+    node = SimpleNamespace(
+        slug="quiz",
+        kind="evaluated_step",
+        definition_id=7,
+        parameters={"model": "gpt-4o-mini", "cache_evaluations": cached},
+    )
+
+    started = time.perf_counter()
+    for index in range(args.students):
+        answer = _ANSWERS[index % len(_ANSWERS)]
+        await handler._call_ai_evaluation(node, _context(), "prompt", answer)
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": "cached" if cached else "uncached",
+        "students": args.students,
+        "model_calls": calls,
+        "hit_rate": round(cache.stats.hit_rate, 3),
+        "elapsed_ms": round(elapsed * 1000),
+    }
+
+
+async def _run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    return [
+        await _class_session(args, cached=False),
+        await _class_session(args, cached=True),
+    ]
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    return asyncio.run(_run(args))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Appels au modèle évités par le cache d'évaluation."
+    )
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,256 @@
+"""Serveur GitHub simulé pour les tests et bancs de synchronisation.
+
+:class:`FakeGitHub` garde un dépôt en mémoire (chemins -> contenu) et expose
+le sous-ensemble de l'API REST utilisé par :mod:`app.github` : branches,
+arbres récursifs, blobs et contenus en lecture ; API « Git Data » (arbres,
+commits, références) et API des contenus en écriture. Les SHA de blobs
+suivent le calcul de git ; une mise à jour de référence qui n'est pas une
+avance rapide est refusée (``422``) comme sur GitHub. Chaque lecture porte un
+``ETag`` ; un ``If-None-Match`` correspondant reçoit ``304 Not Modified``.
+Toutes les requêtes sont journalisées dans :attr:`FakeGitHub.requests` pour
+compter les allers-retours.
+
+Utilisation ::
+
+    fake = FakeGitHub({"workflows/a.json": "{...}"})
+    api = GitHubAPIService(integration, base_url="http://github.test",
+                           transport=fake.transport())
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+
+def git_blob_sha(content: str) -> str:
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@dataclass
+class FakeGitHub:
+    files: dict[str, str] = field(default_factory=dict)
+    branch: str = "main"
+    requests: list[tuple[str, str, int]] = field(default_factory=list)
+    commits: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.trees: dict[str, dict[str, str]] = {}
+        self.head: str | None = None
+        self.app = self._build_app()
+
+    # ── État du dépôt ──────────────────────────────────────────────────
+
+    def _store_tree(self, files: dict[str, str]) -> str:
+        listing = "\n".join(
+            f"{path} {git_blob_sha(content)}" for path, content in sorted(files.items())
+        )
+        sha = hashlib.sha1(f"tree {listing}".encode()).hexdigest()
+        self.trees.setdefault(sha, dict(files))
+        return sha
+
+    @property
+    def tree_sha(self) -> str:
+        return self._store_tree(self.files)
+
+    @property
+    def commit_sha(self) -> str:
+        tree_sha = self.tree_sha
+        if self.head and self.commits[self.head]["tree"] == tree_sha:
+            return self.head
+        # Fichiers modifiés directement par le test : commit implicite.
+        return hashlib.sha1(f"commit {tree_sha}".encode()).hexdigest()
+
+    def _commit(self, tree_sha: str, parents: list[str], message: str) -> str:
+        header = f"commit {tree_sha} {' '.join(parents)} {message}"
+        sha = hashlib.sha1(f"{header} {len(self.commits)}".encode()).hexdigest()
+        self.commits[sha] = {"tree": tree_sha, "parents": parents, "message": message}
+        return sha
+
+    def _move_head(self, commit_sha: str) -> None:
+        self.files = dict(self.trees[self.commits[commit_sha]["tree"]])
+        self.head = commit_sha
+
+    def blobs(self) -> dict[str, str]:
+        known = {git_blob_sha(content): content for content in self.files.values()}
+        for files in self.trees.values():
+            known.update((git_blob_sha(content), content) for content in files.values())
+        return known
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        return httpx.ASGITransport(app=self.app)
+
+    def count(self, method: str | None = None, prefix: str = "") -> int:
+        return sum(
+            1
+            for req_method, path, _ in self.requests
+            if (method is None or req_method == method) and prefix in path
+        )
+
+    # ── API ────────────────────────────────────────────────────────────
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def _log(request: Request, call_next: Any) -> Response:
+            response = await call_next(request)
+            self.requests.append(
+                (request.method, request.url.path, response.status_code)
+            )
+            return response
+
+        def _conditional(request: Request, payload: Any) -> Response:
+            body = json.dumps(payload, sort_keys=True)
+            etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag})
+            return JSONResponse(payload, headers={"ETag": etag})
+
+        def _not_found() -> JSONResponse:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+
+        @app.get("/repos/{owner}/{repo}/branches/{branch}")
+        async def get_branch(request: Request, owner: str, repo: str, branch: str):
+            if branch != self.branch:
+                return _not_found()
+            return _conditional(
+                request,
+                {
+                    "name": branch,
+                    "commit": {
+                        "sha": self.commit_sha,
+                        "commit": {"tree": {"sha": self.tree_sha}},
+                    },
+                },
+            )
+
+        @app.get("/repos/{owner}/{repo}/git/trees/{ref}")
+        async def get_tree(request: Request, owner: str, repo: str, ref: str):
+            tree_sha = self.tree_sha if ref == self.branch else ref
+            files = self.trees.get(tree_sha)
+            if files is None:
+                return _not_found()
+            return _conditional(
+                request,
+                {
+                    "sha": tree_sha,
+                    "truncated": False,
+                    "tree": [
+                        {
+                            "path": path,
+                            "type": "blob",
+                            "sha": git_blob_sha(content),
+                            "size": len(content.encode("utf-8")),
+                        }
+                        for path, content in sorted(files.items())
+                    ],
+                },
+            )
+
+        @app.post("/repos/{owner}/{repo}/git/trees")
+        async def create_tree(request: Request, owner: str, repo: str):
+            payload = await request.json()
+            base = payload.get("base_tree")
+            files = dict(self.trees.get(base, {})) if base else {}
+            if base and base not in self.trees:
+                return JSONResponse({"message": "base_tree not found"}, status_code=422)
+            blobs = self.blobs()
+            for entry in payload["tree"]:
+                if "content" in entry:
+                    files[entry["path"]] = entry["content"]
+                elif entry.get("sha") is None:
+                    files.pop(entry["path"], None)
+                else:
+                    files[entry["path"]] = blobs[entry["sha"]]
+            tree_sha = self._store_tree(files)
+            return JSONResponse({"sha": tree_sha, "tree": []}, status_code=201)
+
+        @app.post("/repos/{owner}/{repo}/git/commits")
+        async def create_commit(request: Request, owner: str, repo: str):
+            payload = await request.json()
+            if payload["tree"] not in self.trees:
+                return JSONResponse({"message": "tree not found"}, status_code=422)
+            sha = self._commit(payload["tree"], payload["parents"], payload["message"])
+            return JSONResponse(
+                {"sha": sha, "tree": {"sha": payload["tree"]}}, status_code=201
+            )
+
+        @app.patch("/repos/{owner}/{repo}/git/refs/heads/{branch:path}")
+        async def update_ref(request: Request, owner: str, repo: str, branch: str):
+            payload = await request.json()
+            commit = self.commits.get(payload["sha"])
+            if branch != self.branch or commit is None:
+                return _not_found()
+            if not payload.get("force") and commit["parents"] != [self.commit_sha]:
+                return JSONResponse(
+                    {"message": "Update is not a fast forward"}, status_code=422
+                )
+            self._move_head(payload["sha"])
+            return JSONResponse(
+                {"ref": f"refs/heads/{branch}", "object": {"sha": payload["sha"]}}
+            )
+
+        @app.get("/repos/{owner}/{repo}/git/blobs/{sha}")
+        async def get_blob(request: Request, owner: str, repo: str, sha: str):
+            content = self.blobs().get(sha)
+            if content is None:
+                return _not_found()
+            return _conditional(
+                request,
+                {
+                    "sha": sha,
+                    "encoding": "base64",
+                    "content": base64.b64encode(content.encode("utf-8")).decode(),
+                },
+            )
+
+        @app.get("/repos/{owner}/{repo}/contents/{path:path}")
+        async def get_contents(request: Request, owner: str, repo: str, path: str):
+            content = self.files.get(path)
+            if content is None:
+                return _not_found()
+            return _conditional(
+                request,
+                {
+                    "type": "file",
+                    "path": path,
+                    "sha": git_blob_sha(content),
+                    "content": base64.b64encode(content.encode("utf-8")).decode(),
+                },
+            )
+
+        @app.put("/repos/{owner}/{repo}/contents/{path:path}")
+        async def put_contents(request: Request, owner: str, repo: str, path: str):
+            payload = await request.json()
+            current = self.files.get(path)
+            if current is not None and payload.get("sha") != git_blob_sha(current):
+                return JSONResponse({"message": "sha mismatch"}, status_code=409)
+            files = dict(self.files)
+            files[path] = base64.b64decode(payload["content"]).decode("utf-8")
+            parent = self.commit_sha
+            commit_sha = self._commit(
+                self._store_tree(files), [parent], payload["message"]
+            )
+            self._move_head(commit_sha)
+            return JSONResponse(
+                {
+                    "content": {
+                        "path": path,
+                        "sha": git_blob_sha(files[path]),
+                        "html_url": f"https://github.test/{owner}/{repo}/blob/{path}",
+                    },
+                    "commit": {"sha": commit_sha},
+                },
+                status_code=201 if current is None else 200,
+            )
+
+        return app
@@ -0,0 +1,70 @@
+"""Trunk SIP simulé pour les tests et bancs des campagnes d'appels sortants.
+
+:class:`FakeSipEndpoint` répond aux INVITE comme un opérateur : chaque numéro
+reçoit un code SIP final scripté (``486`` occupé, ``480`` sans réponse,
+``200`` décroché...), après un délai de sonnerie ; un appel décroché dure
+``call_duration`` secondes. L'endpoint mesure le nombre d'appels simultanés
+et l'instant de chaque INVITE pour vérifier la cadence du dialer.
+
+Utilisation ::
+
+    trunk = FakeSipEndpoint(script={"+331": [486, 200]})
+    dialer = OutboundCampaignDialer(dial=trunk.dial, ...)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.telephony.outbound_call_manager import sip_status_to_call_status
+
+
+@dataclass
+class FakeSipEndpoint:
+    script: dict[str, list[int]] = field(default_factory=dict)
+    default_code: int = 200
+    ring_delay: float = 0.0
+    call_duration: float = 0.0
+    max_channels: int | None = None
+    invites: list[tuple[float, str]] = field(default_factory=list)
+    active: int = 0
+    peak_active: int = 0
+    rejected: int = 0
+    _attempts: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    async def invite(self, to_number: str) -> int:
+        """Traite un INVITE et retourne le code SIP final de l'appel."""
+        self.invites.append((time.monotonic(), to_number))
+        if self.max_channels is not None and self.active >= self.max_channels:
+            # Trunk saturé : 503 Service Unavailable.
+            self.rejected += 1
+            return 503
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            attempt = self._attempts[to_number]
+            self._attempts[to_number] += 1
+            codes = self.script.get(to_number) or [self.default_code]
+            code = codes[min(attempt, len(codes) - 1)]
+            await asyncio.sleep(self.ring_delay)
+            if code == 200:
+                await asyncio.sleep(self.call_duration)
+            return code
+        finally:
+            self.active -= 1
+
+    async def dial(self, db: Any, call: Any) -> str:
+        """Fonction ``dial`` d'``OutboundCampaignDialer`` branchée sur le trunk."""
+        code = await self.invite(call.to_number)
+        return "completed" if code == 200 else sip_status_to_call_status(code)
+
+    def invite_rate(self) -> float:
+        """Débit moyen d'INVITE (par seconde) sur toute la campagne."""
+        if len(self.invites) < 2:
+            return 0.0
+        elapsed = self.invites[-1][0] - self.invites[0][0]
+        return (len(self.invites) - 1) / elapsed if elapsed > 0 else float("inf")
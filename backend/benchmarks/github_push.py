@@ -0,0 +1,196 @@
+"""Banc des allers-retours GitHub lors d'un push de workflows.
+
+Compare, pour ``--workflows`` workflows modifiés localement, l'ancien push
+fichier par fichier (``push_workflow`` : lecture du contenu puis
+``PUT /contents``, un commit par fichier) et le push groupé
+(``push_workflows`` : un seul commit via l'API Git Data). Le serveur est
+:class:`benchmarks.fake_github.FakeGitHub` ; ``--latency-ms`` ajoute un délai
+par requête pour rendre les durées comparables à un vrai GitHub.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.github_push --workflows 50 --latency-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+import httpx  # noqa: E402
+
+from benchmarks.fake_github import FakeGitHub, git_blob_sha  # noqa: E402
+
+REPO = "bench/workflows"
+
+
+class _SlowTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, latency: float) -> None:
+        self.inner = inner
+        self.latency = latency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await self.inner.handle_async_request(request)
+
+
+def _graph(label: str) -> dict[str, Any]:
+    return {"nodes": [{"slug": label}], "edges": []}
+
+
+def _prepare(count: int, latency: float) -> tuple[Any, Any, FakeGitHub]:
+    from app.github import sync_service as sync_module
+    from app.github.api_service import GitHubAPIService, etag_cache
+    from app.models import (
+        Base,
+        GitHubIntegration,
+        GitHubRepoSync,
+        Workflow,
+        WorkflowDefinition,
+        WorkflowGitHubMapping,
+    )
+    from app.secret_utils import encrypt_secret
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+
+    etag_cache.clear()
+    sync_module.serialize_definition_graph = lambda definition: _graph(definition.name)
+
+    fake = FakeGitHub()
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    integration = GitHubIntegration(
+        user_id=1,
+        access_token_encrypted=encrypt_secret("bench"),
+        github_user_id=1,
+        github_username="bench",
+        scopes="repo",
+    )
+    session.add(integration)
+    session.flush()
+    repo_sync = GitHubRepoSync(
+        integration_id=integration.id,
+        repo_full_name=REPO,
+        branch="main",
+        file_pattern="workflows/*.json",
+    )
+    session.add(repo_sync)
+    session.flush()
+
+    for index in range(count):
+        path = f"workflows/flow-{index}.json"
+        remote = json.dumps(_graph(f"flow-{index}"), indent=2)
+        fake.files[path] = remote
+        workflow = Workflow(slug=f"flow-{index}", display_name=f"Flow {index}")
+        session.add(workflow)
+        session.flush()
+        definition = WorkflowDefinition(
+            workflow_id=workflow.id, name=f"flow-{index}-local", version=2
+        )
+        session.add(definition)
+        session.flush()
+        workflow.active_version_id = definition.id
+        session.add(
+            WorkflowGitHubMapping(
+                workflow_id=workflow.id,
+                repo_sync_id=repo_sync.id,
+                file_path=path,
+                github_sha=git_blob_sha(remote),
+                sync_status="local_changes",
+            )
+        )
+    session.commit()
+
+    service = sync_module.WorkflowSyncService(session)
+    service._get_api_service = lambda repo_sync: GitHubAPIService(
+        repo_sync.integration,
+        base_url="http://github.test",
+        transport=_SlowTransport(fake.transport(), latency),
+    )
+    return service, repo_sync, fake
+
+
+async def _legacy(service: Any, repo_sync: Any) -> None:
+    for mapping in list(repo_sync.workflow_mappings):
+        await service.push_workflow(mapping)
+
+
+async def _batched(service: Any, repo_sync: Any) -> None:
+    await service.push_workflows(repo_sync)
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    reports = []
+    for mode, push in (("per-file", _legacy), ("batched", _batched)):
+        service, repo_sync, fake = _prepare(args.workflows, args.latency_ms / 1000)
+        started = time.perf_counter()
+        await push(service, repo_sync)
+        elapsed = time.perf_counter() - started
+        synced = sum(m.sync_status == "synced" for m in repo_sync.workflow_mappings)
+        reports.append(
+            {
+                "mode": mode,
+                "workflows": synced,
+                "round_trips": len(fake.requests),
+                "round_trips_per_workflow": round(
+                    len(fake.requests) / max(synced, 1), 2
+                ),
+                "commits": len(fake.commits),
+                "wall_s": round(elapsed, 3),
+            }
+        )
+        service.session.close()
+    return reports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Allers-retours GitHub par workflow poussé (serveur simulé)."
+    )
+    parser.add_argument("--workflows", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    print(
+        f"{'mode':<10}{'workflows':>10}{'requêtes':>10}{'req/wf':>8}"
+        f"{'commits':>9}{'durée (s)':>11}"
+    )
+    for report in reports:
+        print(
+            f"{report['mode']:<10}{report['workflows']:>10}{report['round_trips']:>10}"
+            f"{report['round_trips_per_workflow']:>8}{report['commits']:>9}"
+            f"{report['wall_s']:>11}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,174 @@
+"""Banc de la génération de langues sur un dictionnaire synthétique.
+
+Compare, pour un dictionnaire de ``--keys`` entrées (5 000 par défaut),
+l'ancien envoi en un seul appel, la traduction par lots concurrents de
+:mod:`app.i18n_translation` et une régénération incrémentale après
+modification d'une fraction des chaînes. Le modèle est simulé : chaque appel
+coûte ``--latency-ms`` plus ``--ms-per-key`` par clé envoyée, ce qui reproduit
+le coût dominant de la génération des jetons de sortie.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.language_generation --keys 5000 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+_WORDS = (
+    "save cancel delete workflow agent thread model provider settings "
+    "language vector store widget message update create select open close"
+).split()
+_COMMON = ["Cancel", "Save", "Delete", "Close", "Loading…", "Edit", "Confirm"]
+
+
+def synthetic_dictionary(size: int, *, seed: int = 7) -> dict[str, str]:
+    """Clés d'interface réalistes : ~5 % de libellés communs, des espaces réservés."""
+
+    rng = random.Random(seed)
+    entries: dict[str, str] = {}
+    for index in range(size):
+        key = f"section{index // 50}.{rng.choice(_WORDS)}.{index}"
+        if rng.random() < 0.05:
+            entries[key] = rng.choice(_COMMON)
+            continue
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 12)))
+        if rng.random() < 0.2:
+            words += " {{count}}"
+        entries[key] = f"{words.capitalize()} #{index}"
+    return entries
+
+
+class SimulatedModel:
+    def __init__(self, latency: float, per_key: float) -> None:
+        self.latency = latency
+        self.per_key = per_key
+        self.calls = 0
+        self.keys = 0
+
+    async def __call__(self, batch: dict[str, str]) -> str:
+        self.calls += 1
+        self.keys += len(batch)
+        await asyncio.sleep(self.latency + self.per_key * len(batch))
+        return json.dumps({key: f"[xx] {value}" for key, value in batch.items()})
+
+
+async def _measure(label: str, model: SimulatedModel, coro: Any) -> dict[str, Any]:
+    started = time.perf_counter()
+    result = await coro
+    return {
+        "mode": label,
+        "keys": len(result),
+        "wall_s": round(time.perf_counter() - started, 3),
+        "model_calls": model.calls,
+        "keys_sent": model.keys,
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    from app.i18n_translation import translate_dictionary, translate_entries
+    from app.models import Base, TranslationMemory
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+
+    source = synthetic_dictionary(args.keys)
+    latency, per_key = args.latency_ms / 1000, args.ms_per_key / 1000
+    options = {
+        "batch_size": args.batch_size,
+        "concurrency": args.concurrency,
+        "retry_delay": 0,
+    }
+    reports = []
+
+    model = SimulatedModel(latency, per_key)
+    reports.append(
+        await _measure(
+            "single-call",
+            model,
+            translate_entries(
+                source, model, batch_size=len(source), max_chars=10**9, concurrency=1
+            ),
+        )
+    )
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[TranslationMemory.__table__])
+    with Session(engine) as session:
+        model = SimulatedModel(latency, per_key)
+        reports.append(
+            await _measure(
+                "batched",
+                model,
+                translate_dictionary(session, "xx", source, model, **options),
+            )
+        )
+        session.commit()
+
+        rng = random.Random(11)
+        changed = dict(source)
+        for key in rng.sample(list(source), int(len(source) * args.changed)):
+            changed[key] = f"{source[key]} (updated)"
+        model = SimulatedModel(latency, per_key)
+        reports.append(
+            await _measure(
+                f"incremental ({args.changed:.0%} changed)",
+                model,
+                translate_dictionary(session, "xx", changed, model, **options),
+            )
+        )
+    engine.dispose()
+    return reports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Banc de la génération de langues par lots (modèle simulé)."
+    )
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--changed", type=float, default=0.02)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--ms-per-key", type=float, default=2.0)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    print(f"{'mode':<28}{'clés':>7}{'durée (s)':>11}{'appels':>8}{'envoyées':>10}")
+    for report in reports:
+        print(
+            f"{report['mode']:<28}{report['keys']:>7}{report['wall_s']:>11}"
+            f"{report['model_calls']:>8}{report['keys_sent']:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+"""Banc des campagnes d'appels sortants sur un trunk SIP simulé.
+
+Compose une liste de numéros via :class:`OutboundCampaignDialer` contre
+:class:`benchmarks.fake_sip.FakeSipEndpoint` (trunk à ``--channels`` canaux,
+une part de numéros occupés ou sans réponse), et compare au lancement de tous
+les appels d'un coup (une tâche par appel, comme ``initiate_call`` avant la
+file de campagnes) : appels simultanés au pic, INVITE refusés par le trunk
+(``503``), débit d'INVITE et durée totale.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.outbound_campaign --calls 500 --max-concurrent 20 --cps 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.models import Base, OutboundCall, SipAccount  # noqa: E402
+from app.telephony.call_pacing import CallPacerRegistry  # noqa: E402
+from app.telephony.outbound_campaigns import OutboundCampaignDialer  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from benchmarks.fake_sip import FakeSipEndpoint  # noqa: E402
+
+
+def _numbers(count: int) -> list[str]:
+    return [f"+3360000{index:04d}" for index in range(count)]
+
+
+def _trunk(args: argparse.Namespace) -> FakeSipEndpoint:
+    rng = random.Random(args.seed)
+    script = {}
+    for number in _numbers(args.calls):
+        roll = rng.random()
+        if roll < args.busy_ratio:
+            script[number] = [486, 200]
+        elif roll < args.busy_ratio + args.no_answer_ratio:
+            script[number] = [480, 480, 200]
+    return FakeSipEndpoint(
+        script=script,
+        ring_delay=args.ring_ms / 1000,
+        call_duration=args.call_ms / 1000,
+        max_channels=args.channels,
+    )
+
+
+async def _burst(args: argparse.Namespace) -> dict[str, Any]:
+    trunk = _trunk(args)
+    started = time.perf_counter()
+    codes = await asyncio.gather(*(trunk.invite(n) for n in _numbers(args.calls)))
+    return {
+        "mode": "burst",
+        "calls": args.calls,
+        "completed": sum(code == 200 for code in codes),
+        "peak_concurrent": trunk.peak_active,
+        "rejected_503": trunk.rejected,
+        "invites": len(trunk.invites),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+async def _campaign(args: argparse.Namespace) -> dict[str, Any]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        engine, tables=[SipAccount.__table__, OutboundCall.__table__]
+    )
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as db:
+        db.add(SipAccount(id=1, label="bench", trunk_uri="sip:bench@trunk.test"))
+        db.commit()
+
+    trunk = _trunk(args)
+    dialer = OutboundCampaignDialer(
+        session_factory=factory,
+        dial=trunk.dial,
+        pacers=CallPacerRegistry(
+            max_concurrent=args.max_concurrent, calls_per_second=args.cps
+        ),
+        poll_interval=0.02,
+        retry_delay=args.retry_ms / 1000,
+    )
+    started = time.perf_counter()
+    with factory() as db:
+        campaign_id = dialer.enqueue_campaign(
+            db,
+            targets=_numbers(args.calls),
+            workflow_id=1,
+            sip_account_id=1,
+            from_number="bench",
+            max_attempts=3,
+        )
+    dialer.start()
+    while True:
+        with factory() as db:
+            stats = dialer.campaign_stats(db, campaign_id)
+        if stats["queued"] == 0 and stats["in_progress"] == 0:
+            break
+        await asyncio.sleep(0.05)
+    await dialer.stop()
+    await dialer.wait_idle()
+    return {
+        "mode": f"campaign ({args.max_concurrent} simultanés, {args.cps:g}/s)",
+        "calls": args.calls,
+        "completed": stats["by_status"].get("completed", 0),
+        "peak_concurrent": trunk.peak_active,
+        "rejected_503": trunk.rejected,
+        "invites": len(trunk.invites),
+        "invites_per_s": round(trunk.invite_rate(), 1),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    return [asyncio.run(_burst(args)), asyncio.run(_campaign(args))]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Campagne d'appels sortants contre un trunk SIP simulé."
+    )
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--channels", type=int, default=30, help="Canaux du trunk.")
+    parser.add_argument("--max-concurrent", type=int, default=20)
+    parser.add_argument("--cps", type=float, default=50.0, help="Appels par seconde.")
+    parser.add_argument("--ring-ms", type=float, default=50.0)
+    parser.add_argument("--call-ms", type=float, default=200.0)
+    parser.add_argument("--retry-ms", type=float, default=100.0)
+    parser.add_argument("--busy-ratio", type=float, default=0.1)
+    parser.add_argument("--no-answer-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+"""Banc de l'instantané d'état pris pour chaque branche d'un ``parallel_split``.
+
+Compare, pour ``--branches`` branches partant d'un état de ``--keys`` clés et
+d'un historique de ``--history`` messages :
+
+* ``deepcopy`` : l'ancien comportement, qui copiait l'état et l'historique
+  dans le handler puis à nouveau à l'initialisation de la branche ;
+* ``copy-on-write`` : :class:`app.workflows.runtime.branch_state.CopyOnWriteState`
+  et une copie superficielle de l'historique, la branche n'écrivant qu'une clé.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.parallel_branches --branches 8 --keys 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+from app.workflows.runtime.branch_state import CopyOnWriteState  # noqa: E402
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    state = {f"key-{index}": {"values": list(range(50))} for index in range(args.keys)}
+    history = [
+        {"role": "user", "content": [{"type": "input_text", "text": "x" * 500}]}
+    ] * args.history
+
+    def _deepcopy() -> None:
+        for _ in range(2):
+            copy.deepcopy(state)
+            copy.deepcopy(history)
+
+    def _copy_on_write() -> None:
+        branch_state = CopyOnWriteState(state)
+        list(history)
+        branch_state["key-0"]["values"].append(-1)
+
+    def _measure(snapshot: Callable[[], None]) -> float:
+        started = time.perf_counter()
+        for _ in range(args.branches):
+            snapshot()
+        return time.perf_counter() - started
+
+    return [
+        {
+            "mode": mode,
+            "branches": args.branches,
+            "keys": args.keys,
+            "history": args.history,
+            "snapshot_ms": round(min(_measure(snapshot) for _ in range(3)) * 1000, 2),
+        }
+        for mode, snapshot in (
+            ("deepcopy", _deepcopy),
+            ("copy-on-write", _copy_on_write),
+        )
+    ]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Coût de l'instantané d'état des branches parallèles."
+    )
+    parser.add_argument("--branches", type=int, default=8)
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--history", type=int, default=300)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
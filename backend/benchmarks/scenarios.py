@@ -0,0 +1,214 @@
+"""Workflows scriptés utilisés par le banc de charge ChatKit.
+
+Chaque scénario fournit le graphe publié comme workflow ChatKit par défaut,
+les messages envoyés par un utilisateur virtuel (un par tour) et les règles
+du modèle simulé nécessaires pour que le parcours soit déterministe.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+_MODEL = "gpt-4o-mini"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    graph: Mapping[str, Any]
+    messages: tuple[str, ...]
+    rules: tuple[Mapping[str, str], ...] = field(default_factory=tuple)
+
+
+def _agent(slug: str, instructions: str, **parameters: Any) -> dict[str, Any]:
+    return {
+        "slug": slug,
+        "kind": "agent",
+        "display_name": slug.replace("-", " ").capitalize(),
+        "parameters": {"instructions": instructions, "model": _MODEL, **parameters},
+    }
+
+
+def _chain(*slugs: str) -> list[dict[str, str]]:
+    return [
+        {"source": source, "target": target}
+        for source, target in zip(slugs, slugs[1:], strict=False)
+    ]
+
+
+AGENT = Scenario(
+    name="agent",
+    description="Un agent unique qui répond en streaming.",
+    graph={
+        "nodes": [
+            {"slug": "start", "kind": "start"},
+            _agent("assistant", "Réponds brièvement à la question de l'élève."),
+            {"slug": "end", "kind": "end"},
+        ],
+        "edges": _chain("start", "assistant", "end"),
+    },
+    messages=("Quelle est la capitale de la France ?",),
+)
+
+CONDITION = Scenario(
+    name="condition",
+    description="Un classifieur structuré suivi d'un aiguillage conditionnel.",
+    graph={
+        "nodes": [
+            {"slug": "start", "kind": "start"},
+            _agent(
+                "classifier",
+                "Classe la demande [bench:classifier].",
+                response_format={
+                    "type": "json_schema",
+                    "name": "classification",
+                    "schema": {
+                        "type": "object",
+                        "properties": {"topic": {"type": "string"}},
+                        "required": ["topic"],
+                        "additionalProperties": False,
+                    },
+                },
+            ),
+            {
+                "slug": "route",
+                "kind": "condition",
+                "parameters": {
+                    "path": "input.output_parsed.topic",
+                    "mode": "equals",
+                    "value": "math",
+                },
+            },
+            _agent("math-tutor", "Aide en mathématiques."),
+            _agent("general-tutor", "Aide générale."),
+            {"slug": "end", "kind": "end"},
+        ],
+        "edges": [
+            *_chain("start", "classifier", "route"),
+            {"source": "route", "target": "math-tutor", "condition": "true"},
+            {"source": "route", "target": "general-tutor", "condition": "false"},
+            {"source": "math-tutor", "target": "end"},
+            {"source": "general-tutor", "target": "end"},
+        ],
+    },
+    messages=("Combien font 12 fois 7 ?",),
+    rules=({"match": r"\[bench:classifier\]", "reply": '{"topic": "math"}'},),
+)
+
+PARALLEL = Scenario(
+    name="parallel",
+    description="Trois agents exécutés en parallèle puis rejoints.",
+    graph={
+        "nodes": [
+            {"slug": "start", "kind": "start"},
+            {
+                "slug": "split",
+                "kind": "parallel_split",
+                "parameters": {
+                    "join_slug": "join",
+                    "branches": [
+                        {"slug": "branch-a", "label": "Résumé"},
+                        {"slug": "branch-b", "label": "Exemples"},
+                        {"slug": "branch-c", "label": "Exercices"},
+                    ],
+                },
+            },
+            _agent("summary", "Résume la notion."),
+            _agent("examples", "Donne des exemples."),
+            _agent("exercises", "Propose des exercices."),
+            {"slug": "join", "kind": "parallel_join", "parameters": {}},
+            {"slug": "end", "kind": "end"},
+        ],
+        "edges": [
+            *_chain("start", "split"),
+            {"source": "split", "target": "summary"},
+            {"source": "split", "target": "examples"},
+            {"source": "split", "target": "exercises"},
+            {"source": "summary", "target": "join"},
+            {"source": "examples", "target": "join"},
+            {"source": "exercises", "target": "join"},
+            {"source": "join", "target": "end"},
+        ],
+    },
+    messages=("Explique les fractions.",),
+)
+
+WIDGET = Scenario(
+    name="widget",
+    description="Un widget rendu depuis l'état, puis un agent.",
+    graph={
+        "nodes": [
+            {"slug": "start", "kind": "start"},
+            {
+                "slug": "prepare-card",
+                "kind": "state",
+                "parameters": {
+                    "state": [
+                        {
+                            "target": "state.card",
+                            "expression": (
+                                '{"type": "Card", "children": '
+                                '[{"type": "Text", "value": "Fiche de révision"}]}'
+                            ),
+                        }
+                    ]
+                },
+            },
+            {
+                "slug": "card",
+                "kind": "widget",
+                "parameters": {
+                    "widget": {
+                        "source": "variable",
+                        "definition_expression": "state.card",
+                        "await_action": False,
+                    }
+                },
+            },
+            _agent("commentary", "Commente la fiche."),
+            {"slug": "end", "kind": "end"},
+        ],
+        "edges": _chain("start", "prepare-card", "card", "commentary", "end"),
+    },
+    messages=("Montre-moi ma fiche.",),
+)
+
+EVALUATED_STEP = Scenario(
+    name="evaluated_step",
+    description="Une consigne évaluée par l'IA : consigne au premier tour, "
+    "réponse évaluée au second.",
+    graph={
+        "nodes": [
+            {"slug": "start", "kind": "start"},
+            {
+                "slug": "quiz",
+                "kind": "evaluated_step",
+                "parameters": {
+                    "instruction": "Quelle est la capitale de la France ?",
+                    "evaluation_prompt": "La réponse attendue est Paris.",
+                    "model": _MODEL,
+                },
+            },
+            {"slug": "end", "kind": "end"},
+        ],
+        "edges": _chain("start", "quiz", "end"),
+    },
+    messages=("Bonjour", "Paris"),
+    rules=(
+        {
+            "match": r"évaluateur pédagogique",
+            "reply": '{"passed": true, "feedback": "Correct."}',
+        },
+    ),
+)
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (AGENT, CONDITION, PARALLEL, WIDGET, EVALUATED_STEP)
+}
+
+
+__all__ = ["SCENARIOS", "Scenario"]
@@ -0,0 +1,84 @@
+"""Banc de l'étape de schéma exécutée au démarrage de chaque worker.
+
+Enchaîne ``--boots`` démarrages sur une base SQLite : le premier applique les
+migrations (``create_all``) et enregistre l'empreinte du schéma, les suivants
+la relisent et ne balaient plus rien.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.schema_version --boots 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+from app.database import schema_version  # noqa: E402
+from app.models import Base  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    fingerprint = schema_version.compute_schema_fingerprint()
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="chatkit-bench-schema-") as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'boot.db'}")
+        try:
+            for boot in range(args.boots):
+                started = time.perf_counter()
+                migrated = schema_version.ensure_schema_up_to_date(
+                    lambda: Base.metadata.create_all(bind=engine),
+                    engine=engine,
+                    fingerprint=fingerprint,
+                    force=False,
+                )
+                reports.append(
+                    {
+                        "boot": boot + 1,
+                        "migrated": migrated,
+                        "schema_ms": round((time.perf_counter() - started) * 1000, 2),
+                    }
+                )
+        finally:
+            engine.dispose()
+    return reports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Coût de l'étape de schéma au démarrage, à froid et à chaud."
+    )
+    parser.add_argument("--boots", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
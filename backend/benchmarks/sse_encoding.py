@@ -0,0 +1,184 @@
+"""Banc d'encodage du flux SSE de ``ChatKitServer``.
+
+Compare, sur un flux synthétique dominé par des deltas de texte (comme une
+réponse d'agent en streaming), l'ancien chemin
+(``model_dump_json(...).encode()`` pour chaque événement) et l'encodeur de
+:mod:`chatkit.sse` (gabarits d'octets pour les deltas, sérialiseur compilé
+pour le reste), puis l'effet du regroupement des deltas
+(``stream_coalesce_window``) sur le nombre de trames et d'octets émis.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.sse_encoding --events 200000 --coalesce-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections.abc import AsyncIterator, Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from chatkit.sse import coalesce_deltas, encode_event  # noqa: E402
+from chatkit.types import (  # noqa: E402
+    AssistantMessageContent,
+    AssistantMessageContentPartDone,
+    AssistantMessageContentPartTextDelta,
+    ProgressUpdateEvent,
+    ThreadItemUpdated,
+    WidgetStreamingTextValueDelta,
+)
+
+_WORDS = ["le", "modèle", "répond", "« vite »", "🚀", "token", "\n", "données,"]
+
+
+def build_events(count: int, seed: int = 0) -> list[Any]:
+    rng = random.Random(seed)
+    events: list[Any] = []
+    for index in range(count):
+        roll = rng.random()
+        if roll < 0.9:
+            events.append(
+                ThreadItemUpdated(
+                    item_id=f"msg_{index // 500}",
+                    update=AssistantMessageContentPartTextDelta(
+                        content_index=0, delta=" " + rng.choice(_WORDS)
+                    ),
+                )
+            )
+        elif roll < 0.97:
+            events.append(
+                ThreadItemUpdated(
+                    item_id="wdg_1",
+                    update=WidgetStreamingTextValueDelta(
+                        component_id="summary", delta=rng.choice(_WORDS), done=False
+                    ),
+                )
+            )
+        elif roll < 0.99:
+            events.append(ProgressUpdateEvent(text=f"Étape {index}"))
+        else:
+            events.append(
+                ThreadItemUpdated(
+                    item_id=f"msg_{index // 500}",
+                    update=AssistantMessageContentPartDone(
+                        content_index=0,
+                        content=AssistantMessageContent(text="fin " * 20),
+                    ),
+                )
+            )
+    return events
+
+
+def _legacy(event: Any) -> bytes:
+    return (
+        b"data: "
+        + event.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+        + b"\n\n"
+    )
+
+
+def _time_encoder(encoder: Any, events: list[Any], rounds: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        size = sum(len(encoder(event)) for event in events)
+        best = min(best, time.perf_counter() - started)
+    return best, size
+
+
+async def _paced(events: list[Any], interval: float) -> AsyncIterator[Any]:
+    for event in events:
+        if interval:
+            await asyncio.sleep(interval)
+        yield event
+
+
+async def _coalesced(
+    events: list[Any], window: float, interval: float
+) -> tuple[int, int]:
+    frames = 0
+    size = 0
+    async for event in coalesce_deltas(_paced(events, interval), window):
+        frames += 1
+        size += len(encode_event(event))
+    return frames, size
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    events = build_events(args.events)
+    # Équivalence stricte avant toute mesure.
+    for event in events[:2000]:
+        assert encode_event(event) == _legacy(event)
+
+    reports = []
+    for mode, encoder in (("model_dump_json", _legacy), ("chatkit.sse", encode_event)):
+        elapsed, size = _time_encoder(encoder, events, args.rounds)
+        reports.append(
+            {
+                "mode": mode,
+                "frames": len(events),
+                "bytes": size,
+                "events_per_s": round(len(events) / elapsed),
+                "mb_per_s": round(size / elapsed / 1e6, 1),
+            }
+        )
+
+    if args.coalesce_ms > 0:
+        sample = events[: args.coalesce_sample]
+        frames, size = asyncio.run(
+            _coalesced(sample, args.coalesce_ms / 1000, args.token_interval_ms / 1000)
+        )
+        reports.append(
+            {
+                "mode": f"coalesce {args.coalesce_ms:g} ms",
+                "events": len(sample),
+                "frames": frames,
+                "bytes": size,
+                "bytes_uncoalesced": sum(len(encode_event(e)) for e in sample),
+            }
+        )
+    return reports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Débit d'encodage des événements SSE ChatKit."
+    )
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--coalesce-ms", type=float, default=20.0)
+    parser.add_argument(
+        "--token-interval-ms",
+        type=float,
+        default=2.0,
+        help="Intervalle simulé entre deux jetons pour le regroupement.",
+    )
+    parser.add_argument("--coalesce-sample", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""Banc de l'évaluation des expressions d'état et des gabarits d'instructions.
+
+Compare, sur ``--turns`` tours d'un agent qui évalue quelques conditions et
+rend ses instructions :
+
+* ``legacy`` : copie de l'état puis ``eval()`` du texte à chaque appel ;
+* ``compiled`` : :func:`app.vector_store.ingestion.evaluate_state_expression`
+  (expressions compilées et mises en cache, espace de noms paresseux) suivi du
+  rendu des instructions avec le gabarit compilé.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.state_expressions --turns 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+from app.vector_store.ingestion import (  # noqa: E402
+    _render_template_string,
+    evaluate_state_expression,
+)
+
+_EXPRESSIONS = (
+    "attempts < 3 and score >= 0.5",
+    "len(answers) > 5",
+    "user['level'] + attempts",
+    "output_text == 'ok'",
+)
+_INSTRUCTIONS = (
+    "Tu aides {{ state.user.name }} (niveau {{ user }}). "
+    "Tentatives : {{ attempts }}. Dernière réponse : {{ input.output_text }}."
+)
+
+
+def _legacy_evaluate(expression: str, state: dict, context: dict | None) -> Any:
+    eval_context = {"state": state, **dict(state)}
+    if context is not None:
+        eval_context["input"] = context
+        eval_context.update(dict(context))
+    try:
+        return eval(expression, {"__builtins__": {}}, eval_context)
+    except Exception:
+        return expression
+
+
+def _state(variables: int) -> dict[str, Any]:
+    state: dict[str, Any] = {f"var_{index}": index for index in range(variables)}
+    state.update(
+        {
+            "user": {"name": "Ada", "level": 3},
+            "attempts": 2,
+            "answers": [{"score": value} for value in range(10)],
+        }
+    )
+    return state
+
+
+def _measure(turns: int, step: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    for _ in range(turns):
+        step()
+    return time.perf_counter() - started
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    state = _state(args.variables)
+    context = {"output_text": "ok", "score": 0.8}
+
+    def _legacy() -> None:
+        for expression in _EXPRESSIONS:
+            _legacy_evaluate(expression, state, context)
+
+    def _compiled() -> None:
+        for expression in _EXPRESSIONS:
+            evaluate_state_expression(expression, state=state, input_context=context)
+        _render_template_string(_INSTRUCTIONS, state=state, input_context=context)
+
+    return [
+        {
+            "mode": mode,
+            "turns": args.turns,
+            "variables": args.variables,
+            "total_ms": round(
+                min(_measure(args.turns, step) for _ in range(3)) * 1000, 2
+            ),
+        }
+        for mode, step in (("legacy", _legacy), ("compiled", _compiled))
+    ]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Coût des expressions d'état et des gabarits d'instructions."
+    )
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument(
+        "--variables", type=int, default=60, help="Variables d'état en plus."
+    )
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+"""Banc de l'encodage des trames du relais vocal (Wear OS ↔ OpenAI Realtime).
+
+Rejoue une session aller-retour trame par trame, comme le relais, et compare :
+
+* ``json`` : le protocole historique (``json.loads`` du message client, audio
+  en base64 validé puis ``json.dumps`` vers l'amont, ``json.loads`` des deltas
+  et ``json.dumps`` vers le client) ;
+* ``json-fast`` : le même transport avec les gabarits de
+  :mod:`app.voice_relay_framing` sur le chemin descendant ;
+* ``binary`` : trames WebSocket binaires, base64 uniquement vers l'amont.
+
+Les octets comptés sont ceux du fil (client et amont) ; le temps est le temps
+CPU du processus.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.voice_relay_framing --frames 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+from app.voice_relay_framing import (  # noqa: E402
+    VoiceRelayStats,
+    client_audio_text,
+    extract_audio_delta,
+    upstream_append_from_bytes,
+    upstream_append_from_client,
+)
+
+# 20 ms de PCM16 mono à 24 kHz.
+_FRAME = bytes(range(256)) * 3 + bytes(192)
+
+
+def _session(mode: str, frames: int) -> tuple[VoiceRelayStats, float]:
+    stats = VoiceRelayStats(binary=mode == "binary")
+    audio_b64 = base64.b64encode(_FRAME).decode("ascii")
+    upstream_delta = json.dumps({"type": "response.audio.delta", "delta": audio_b64})
+    client_json = json.dumps({"type": "audio", "data": audio_b64})
+
+    started = time.process_time()
+    for _ in range(frames):
+        if mode == "binary":
+            event = upstream_append_from_bytes(_FRAME)
+            stats.record_inbound(len(_FRAME), len(event))
+            frame = base64.b64decode(extract_audio_delta(upstream_delta) or "")
+            stats.record_outbound(len(frame))
+            continue
+        message = json.loads(client_json)
+        event = upstream_append_from_client(message["data"])
+        stats.record_inbound(len(client_json), len(event))
+        if mode == "json-fast":
+            text = client_audio_text(extract_audio_delta(upstream_delta) or "")
+        else:
+            delta = json.loads(upstream_delta)["delta"]
+            text = json.dumps({"type": "audio", "data": delta})
+        stats.record_outbound(len(text))
+    return stats, time.process_time() - started
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    reports = []
+    for mode in ("json", "json-fast", "binary"):
+        best = float("inf")
+        stats = VoiceRelayStats()
+        for _ in range(args.rounds):
+            stats, elapsed = _session(mode, args.frames)
+            best = min(best, elapsed)
+        counters = stats.as_dict()
+        reports.append(
+            {
+                "mode": mode,
+                "frames": args.frames,
+                "cpu_ms": round(best * 1000, 2),
+                "client_bytes_in": counters["client_bytes_in"],
+                "client_bytes_out": counters["client_bytes_out"],
+                "upstream_bytes_out": counters["upstream_bytes_out"],
+            }
+        )
+    return reports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Coût de l'encodage des trames du relais vocal."
+    )
+    parser.add_argument(
+        "--frames", type=int, default=500, help="Trames de 20 ms par sens."
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,295 @@
+"""Banc du diff des widgets diffusés par ``stream_widget``.
+
+Diffuse un widget de quiz d'environ 1 000 nœuds en 200 mises à jour (texte
+ajouté aux réponses, badge de statut changé toutes les dix mises à jour) et
+compare :
+
+* ``legacy`` : l'ancien ``diff_widget`` (comparaison complète des deux arbres,
+  égalité Pydantic à chaque niveau, puis index des textes reconstruit) ;
+* ``state`` : :class:`chatkit.widget_diff.WidgetState` sur des arbres
+  reconstruits entièrement à chaque mise à jour ;
+* ``state-shared`` : le même, quand le producteur ne recopie que le chemin
+  modifié (``model_copy``) ;
+* ``state-dirty`` : mutations ``append_text`` / ``update_component`` suivies
+  de ``flush``, sans aucune comparaison.
+
+Le temps de construction des arbres n'est pas compté. Les octets sont ceux
+des trames SSE émises.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.widget_diff --nodes 1000 --updates 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from chatkit.sse import encode_event  # noqa: E402
+from chatkit.types import (  # noqa: E402
+    ThreadItemUpdated,
+    WidgetRootUpdated,
+    WidgetStreamingTextValueDelta,
+)
+from chatkit.widget_diff import WidgetState  # noqa: E402
+from chatkit.widgets import (  # noqa: E402
+    Badge,
+    Card,
+    Col,
+    Divider,
+    Markdown,
+    Row,
+    Text,
+    WidgetComponentBase,
+)
+
+# Nœuds par question : Col, Row, Text, Badge, Markdown, Divider, Row et 3 Text.
+_NODES_PER_QUESTION = 10
+
+
+def _question(index: int, answer: str, status: str) -> Col:
+    return Col(
+        id=f"q{index}",
+        children=[
+            Row(
+                children=[
+                    Text(value=f"Question {index + 1}"),
+                    Badge(label=status),
+                ]
+            ),
+            Markdown(id=f"a{index}", value=answer, streaming=True),
+            Divider(),
+            Row(children=[Text(value=choice) for choice in ("A", "B", "C")]),
+        ],
+    )
+
+
+def _chunk(step: int) -> str:
+    return f" mot{step}"
+
+
+def _status(step: int) -> str:
+    return f"étape {step // 10 + 1}"
+
+
+def build_states(questions: int, updates: int, *, shared: bool) -> list[Card]:
+    """États successifs : chaque mise à jour touche une question."""
+
+    answers = [""] * questions
+    statuses = ["étape 0"] * questions
+    children = [_question(i, "", "étape 0") for i in range(questions)]
+    states = [Card(children=list(children))]
+    for step in range(updates):
+        target = step % questions
+        answers[target] += _chunk(step)
+        if step % 10 == 0:
+            statuses[target] = _status(step)
+        if shared:
+            children[target] = _question(target, answers[target], statuses[target])
+            states.append(states[-1].model_copy(update={"children": list(children)}))
+        else:
+            states.append(
+                Card(
+                    children=[
+                        _question(i, answers[i], statuses[i]) for i in range(questions)
+                    ]
+                )
+            )
+    return states
+
+
+def _legacy_diff(before: Any, after: Any) -> list[Any]:
+    """``diff_widget`` tel qu'il était avant ``WidgetState``."""
+
+    def full_replace(before: Any, after: Any) -> bool:
+        if (
+            before.type != after.type
+            or before.id != after.id
+            or before.key != after.key
+        ):
+            return True
+
+        def full_replace_value(before_value: Any, after_value: Any) -> bool:
+            if isinstance(before_value, list) and isinstance(after_value, list):
+                if len(before_value) != len(after_value):
+                    return True
+                pairs = zip(before_value, after_value, strict=True)
+                for nth_before, nth_after in pairs:
+                    if full_replace_value(nth_before, nth_after):
+                        return True
+            elif before_value != after_value:
+                if isinstance(before_value, WidgetComponentBase) and isinstance(
+                    after_value, WidgetComponentBase
+                ):
+                    return full_replace(before_value, after_value)
+                return True
+            return False
+
+        for field in before.model_fields_set.union(after.model_fields_set):
+            if (
+                isinstance(before, (Markdown, Text))
+                and isinstance(after, (Markdown, Text))
+                and field == "value"
+                and after.value.startswith(before.value)
+            ):
+                continue
+            if full_replace_value(getattr(before, field), getattr(after, field)):
+                return True
+        return False
+
+    if full_replace(before, after):
+        return [WidgetRootUpdated(widget=after)]
+
+    def streaming_text(root: Any) -> dict[str, Any]:
+        found: dict[str, Any] = {}
+
+        def recurse(node: Any) -> None:
+            if isinstance(node, (Markdown, Text)) and node.id:
+                found[node.id] = node
+            for child in getattr(node, "children", None) or []:
+                recurse(child)
+
+        recurse(root)
+        return found
+
+    before_nodes = streaming_text(before)
+    deltas = []
+    for node_id, after_node in streaming_text(after).items():
+        before_node = before_nodes[node_id]
+        if before_node.value != after_node.value:
+            deltas.append(
+                WidgetStreamingTextValueDelta(
+                    component_id=node_id,
+                    delta=after_node.value[len(before_node.value) :],
+                    done=not after_node.streaming,
+                )
+            )
+    return deltas
+
+
+def _replay(states: list[Card], differ: Callable[[Any, Any], list[Any]]) -> list[Any]:
+    updates: list[Any] = []
+    for before, after in itertools.pairwise(states):
+        updates.extend(differ(before, after))
+    return updates
+
+
+def _stateful(states: list[Card]) -> list[Any]:
+    state = WidgetState(states[0])
+    updates: list[Any] = []
+    for after in states[1:]:
+        updates.extend(state.diff(after))
+    return updates
+
+
+def _dirty(questions: int, updates: int) -> tuple[list[Any], Card]:
+    state = WidgetState(build_states(questions, 0, shared=True)[0])
+    emitted: list[Any] = []
+    for step in range(updates):
+        target = step % questions
+        state.append_text(f"a{target}", _chunk(step))
+        if step % 10:
+            emitted.extend(state.flush())
+            continue
+        # Le badge n'a pas d'id : c'est la question entière qui est renvoyée.
+        question = state.root.children[target]
+        header = question.children[0]
+        header = header.model_copy(
+            update={"children": [header.children[0], Badge(label=_status(step))]}
+        )
+        children = [header, *question.children[1:]]
+        state.update_component(f"q{target}", children=children)
+        emitted.extend(state.flush())
+    return emitted, state.root
+
+
+def _measure(
+    name: str, rounds: int, replay: Callable[[], list[Any]], nodes: int
+) -> dict[str, Any]:
+    best = float("inf")
+    updates: list[Any] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        updates = replay()
+        best = min(best, time.perf_counter() - started)
+    counts: dict[str, int] = {}
+    for update in updates:
+        counts[update.type] = counts.get(update.type, 0) + 1
+    size = sum(
+        len(encode_event(ThreadItemUpdated(item_id="wdg", update=update)))
+        for update in updates
+    )
+    return {
+        "mode": name,
+        "nodes": nodes,
+        "diff_ms": round(best * 1000, 2),
+        "events": len(updates),
+        "root_updates": counts.get("widget.root.updated", 0),
+        "component_updates": counts.get("widget.component.updated", 0),
+        "text_deltas": counts.get("widget.streaming_text.value_delta", 0),
+        "bytes": size,
+    }
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    questions = max(1, args.nodes // _NODES_PER_QUESTION)
+    nodes = questions * _NODES_PER_QUESTION + 1
+    rebuilt = build_states(questions, args.updates, shared=False)
+    shared = build_states(questions, args.updates, shared=True)
+    dirty_updates, dirty_root = _dirty(questions, args.updates)
+    # Les trois chemins aboutissent au même widget.
+    assert rebuilt[-1] == shared[-1] == dirty_root
+
+    return [
+        _measure(
+            "legacy",
+            args.rounds,
+            lambda: _replay(rebuilt, _legacy_diff),
+            nodes,
+        ),
+        _measure("state", args.rounds, lambda: _stateful(rebuilt), nodes),
+        _measure("state-shared", args.rounds, lambda: _stateful(shared), nodes),
+        _measure(
+            "state-dirty",
+            args.rounds,
+            lambda: _dirty(questions, args.updates)[0],
+            nodes,
+        ),
+    ]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Coût du diff des widgets diffusés en continu."
+    )
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
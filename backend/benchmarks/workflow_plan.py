@@ -0,0 +1,167 @@
+"""Banc du surcoût par tour de la préparation d'un workflow.
+
+Construit une définition de ``--nodes`` nœuds (états, agents, widgets,
+conditions) et compare, par tour :
+
+* ``legacy`` : reconstruction de ``nodes_by_slug`` et ``edges_by_source``,
+  analyse des widgets (dont le modèle de sortie Pydantic) et calcul des
+  titres à chaque visite ;
+* ``plan`` : :func:`app.workflows.runtime.plan.get_compiled_plan` (compilé une
+  fois puis servi depuis le cache) et :meth:`CompiledWorkflowPlan.bind`.
+
+Exemple (depuis ``backend/``) ::
+
+    python -m benchmarks.workflow_plan --nodes 100 --turns 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("AUTH_SECRET_KEY", "bench")
+
+from app.chatkit_server.actions import (  # noqa: E402
+    _ensure_widget_output_model,
+    _parse_response_widget_config,
+)
+from app.models import (  # noqa: E402
+    WorkflowDefinition,
+    WorkflowStep,
+    WorkflowTransition,
+)
+from app.workflows.runtime import plan as plan_module  # noqa: E402
+from app.workflows.runtime.agents import build_edges_by_source  # noqa: E402
+
+_KINDS = ("state", "agent", "widget", "condition")
+
+
+def build_definition(node_count: int) -> WorkflowDefinition:
+    definition = WorkflowDefinition(
+        id=1,
+        workflow_id=1,
+        version=1,
+        updated_at=datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC),
+    )
+    steps = [WorkflowStep(slug="start", kind="start", position=0, is_enabled=True)]
+    for index in range(1, node_count - 1):
+        kind = _KINDS[index % len(_KINDS)]
+        parameters: dict[str, object] = {"title": f"Étape {index}"}
+        if kind == "state":
+            parameters["state"] = [
+                {"target": "state.counter", "expression": "state.counter"}
+            ]
+        elif kind == "widget":
+            parameters["widget"] = {
+                "source": "variable",
+                "definition_expression": "state.widget",
+            }
+        elif kind == "condition":
+            parameters["path"] = "state.counter"
+        steps.append(
+            WorkflowStep(
+                slug=f"node-{index}",
+                kind=kind,
+                position=index,
+                is_enabled=True,
+                parameters=parameters,
+            )
+        )
+    steps.append(
+        WorkflowStep(slug="end", kind="end", position=node_count, is_enabled=True)
+    )
+    definition.steps.extend(steps)
+    for transition_id, (source, target) in enumerate(
+        zip(steps[:-1], steps[1:], strict=True), start=1
+    ):
+        definition.transitions.append(
+            WorkflowTransition(id=transition_id, source_step=source, target_step=target)
+        )
+    return definition
+
+
+def _legacy_turn(definition: WorkflowDefinition) -> None:
+    nodes_by_slug = {step.slug: step for step in definition.steps if step.is_enabled}
+    build_edges_by_source(definition.transitions)
+    for step in sorted(definition.steps, key=lambda s: s.position):
+        if step.slug in nodes_by_slug and step.kind in {"agent", "widget"}:
+            config = _parse_response_widget_config(step.parameters)
+            if config is not None:
+                _ensure_widget_output_model(config)
+    for step in nodes_by_slug.values():
+        for _ in range(3):
+            if not step.display_name and step.parameters:
+                str(step.parameters.get("title"))
+
+
+def _planned_turn(definition: WorkflowDefinition) -> None:
+    plan = plan_module.get_compiled_plan(definition)
+    nodes_by_slug, _ = plan.bind(definition)
+    for slug in nodes_by_slug:
+        plan.title_for(slug)
+
+
+def _measure(
+    turns: int, definition: WorkflowDefinition, turn: Callable[..., None]
+) -> float:
+    turn(definition)
+    started = time.perf_counter()
+    for _ in range(turns):
+        turn(definition)
+    return (time.perf_counter() - started) / turns
+
+
+def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    plan_module.compiled_plan_cache = plan_module.CompiledPlanCache()
+    definition = build_definition(args.nodes)
+    reports = []
+    for mode, turn in (("legacy", _legacy_turn), ("plan", _planned_turn)):
+        per_turn = _measure(args.turns, definition, turn)
+        reports.append(
+            {
+                "mode": mode,
+                "nodes": args.nodes,
+                "turns": args.turns,
+                "per_turn_us": round(per_turn * 1e6),
+            }
+        )
+    reports[-1]["compilations"] = plan_module.compiled_plan_cache.stats.compilations
+    return reports
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Surcoût par tour de la préparation d'un workflow."
+    )
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Rapport au format JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reports = run(args)
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+        return 0
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -79,3 +79,73 @@ def test_runner_uses_litellm_client(monkeypatch: pytest.MonkeyPatch) -> None:
         assert recorded_base.get("value") == expected_base
     finally:
         config.get_settings.cache_clear()
+
+
+def test_fake_provider_streams_deterministic_responses(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Le fournisseur simulé répond sans réseau, en streaming, de façon stable."""
+
+    import asyncio
+
+    from agents import function_tool, set_tracing_disabled
+    from agents.models import _openai_shared as openai_shared
+
+    fake = import_module("app.model_providers.fake")
+
+    monkeypatch.setenv("MODEL_PROVIDER", "fake")
+    monkeypatch.setenv("FAKE_MODEL_LATENCY_MS", "0")
+    monkeypatch.setenv("FAKE_MODEL_TOKENS_PER_SECOND", "0")
+    monkeypatch.setenv("FAKE_MODEL_TOOL_CALLS", "1")
+    monkeypatch.setenv(
+        "FAKE_MODEL_RULES", '[{"match": "évaluateur", "reply": "{\\"passed\\": true}"}]'
+    )
+    monkeypatch.delenv("MODEL_API_BASE", raising=False)
+    monkeypatch.delenv("MODEL_API_KEY_ENV", raising=False)
+    monkeypatch.setattr(
+        openai_shared,
+        "_default_openai_client",
+        openai_shared.get_default_openai_client(),
+    )
+    set_tracing_disabled(True)
+
+    config.get_settings.cache_clear()
+    try:
+        settings = config.get_settings()
+        assert settings.model_provider == "fake"
+        configure_model_provider(settings)
+        client = openai_shared.get_default_openai_client()
+        transport = fake.fake_transport_of(client)
+        assert transport is not None
+
+        calls: list[str] = []
+
+        @function_tool
+        def lookup(city: str) -> str:
+            calls.append(city)
+            return "ensoleillé"
+
+        async def _run() -> list[str]:
+            outputs = []
+            for _ in range(2):
+                streamed = Runner.run_streamed(
+                    Agent(name="bench", instructions="Réponds.", tools=[lookup]),
+                    input="Quel temps fait-il ?",
+                )
+                async for _event in streamed.stream_events():
+                    pass
+                outputs.append(streamed.final_output)
+            evaluation = await Runner.run(
+                Agent(name="eval", instructions="Tu es un évaluateur."), input="Paris"
+            )
+            outputs.append(evaluation.final_output)
+            return outputs
+
+        first, second, evaluation = asyncio.run(_run())
+        assert first == second and first
+        assert evaluation == '{"passed": true}'
+        assert calls == ["ok", "ok"]
+        assert transport.stats.tool_calls == 2
+        assert transport.stats.by_endpoint == {"responses": 5}
+    finally:
+        config.get_settings.cache_clear()
@@ -67,10 +67,12 @@ def _load_state_expression_helpers():
     sys.modules["app.vector_store.ingestion"] = module
     exec(compile(patched_source, str(ingestion_path), "exec"), module.__dict__)
 
-    return module.evaluate_state_expression, module._render_template_string
+    return module
 
 
-evaluate_state_expression, _render_template_string = _load_state_expression_helpers()
+_ingestion = _load_state_expression_helpers()
+evaluate_state_expression = _ingestion.evaluate_state_expression
+_render_template_string = _ingestion._render_template_string
 
 
 def test_evaluate_state_expression_reads_top_level_state_key() -> None:
@@ -96,3 +98,87 @@ def test_render_template_string_replaces_unprefixed_state_identifier() -> None:
 
     assert rendered == 'Liens images : ["https://image"]'
 
+
+
+def test_evaluate_state_expression_uses_lazy_namespace_precedence() -> None:
+    state = {"score": 3, "threshold": 2, "state": "shadowed"}
+    context = {"score": 9}
+
+    assert evaluate_state_expression(
+        "score > threshold", state=state, input_context=context
+    )
+    assert evaluate_state_expression("score", state=state, input_context=context) == 3
+    assert evaluate_state_expression(
+        "score * 2", state=state, input_context=context
+    ) == 18
+    assert evaluate_state_expression("state", state=state) is state
+    assert evaluate_state_expression(
+        "input.score", state=state, input_context=context
+    ) == 9
+    assert evaluate_state_expression("unknown_name + 1", state=state) == (
+        "unknown_name + 1"
+    )
+    assert evaluate_state_expression("  ", state=state) is None
+
+
+def test_compiled_literals_are_not_shared_between_calls() -> None:
+    first = evaluate_state_expression('{"items": []}', state={})
+    first["items"].append(1)
+
+    assert evaluate_state_expression('{"items": []}', state={}) == {"items": []}
+
+
+def test_render_template_string_caches_compiled_templates() -> None:
+    _ingestion._compile_template.cache_clear()
+    template = "Bonjour {{ state.user.name }}, score {{ score }}{{ state.missing }}."
+
+    for score in (1, 2):
+        rendered = _render_template_string(
+            template, state={"user": {"name": "Ada"}, "score": score}
+        )
+        assert rendered == f"Bonjour Ada, score {score}."
+
+    info = _ingestion._compile_template.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    assert _render_template_string("{{ score }}", state={"score": 4}) == 4
+
+
+def _legacy_evaluate(expression, state, context):
+    # Chemin historique : copie de l'état puis eval() du texte à chaque appel.
+    eval_context = {"state": state, **dict(state)}
+    if context is not None:
+        eval_context["input"] = context
+        eval_context.update(dict(context))
+    try:
+        return eval(expression, {"__builtins__": {}}, eval_context)
+    except Exception:
+        return expression
+
+
+def test_compiled_expressions_match_legacy_eval() -> None:
+    state = {f"var_{index}": index for index in range(60)}
+    state.update(
+        {
+            "user": {"name": "Ada", "level": 3},
+            "attempts": 2,
+            "answers": [{"score": value} for value in range(10)],
+        }
+    )
+    context = {"output_text": "ok", "score": 0.8}
+    expressions = [
+        "attempts < 3 and score >= 0.5",
+        "len(answers) > 5",
+        "user['level'] + attempts",
+        "output_text == 'ok'",
+    ]
+
+    for expression in expressions:
+        assert evaluate_state_expression(
+            expression, state=state, input_context=context
+        ) == _legacy_evaluate(expression, state, context)
+    assert _render_template_string(
+        "Tu aides {{ state.user.name }}. Tentatives : {{ attempts }}. "
+        "Dernière réponse : {{ input.output_text }}.",
+        state=state,
+        input_context=context,
+    ) == "Tu aides Ada. Tentatives : 2. Dernière réponse : ok."
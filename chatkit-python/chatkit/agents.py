@@ -673,7 +673,23 @@ class ComputerTaskTracker(BaseModel):
                         else:
                             # Assume it's base64 encoded image (from Playwright)
                             b64_image = source_data
-                            data_url = f"data:image/png;base64,{source_data}"
+                            data_url = _image_data_url(
+                                source_data, _sniff_b64_image_format(source_data)
+                            )
+
+                    # The hosted browser returns the previous payload verbatim
+                    # when the frame did not change: don't persist it twice.
+                    previous = self.task.screenshots[-1] if self.task.screenshots else None
+                    if (
+                        previous is not None
+                        and previous.id != screenshot_id
+                        and b64_image is not None
+                        and previous.b64_image == b64_image
+                    ):
+                        LOGGER.debug(
+                            f"[ComputerTaskTracker] Unchanged screenshot skipped: id={screenshot_id}"
+                        )
+                        return changed, previous_call_id
 
                     screenshot = ComputerUseScreenshot(
                         id=screenshot_id,
@@ -925,6 +941,16 @@ def _image_data_url(b64_data: str, output_format: str | None) -> str:
     return f"data:image/{fmt};base64,{b64_data}"
 
 
+def _sniff_b64_image_format(b64_data: str) -> str:
+    """Guess the image format of a base64 payload from its magic bytes."""
+
+    if b64_data.startswith("/9j/"):
+        return "jpeg"
+    if b64_data.startswith("UklGR"):
+        return "webp"
+    return "png"
+
+
 def _coerce_optional_str(value: Any) -> str | None:
     if isinstance(value, str):
         stripped = value.strip()
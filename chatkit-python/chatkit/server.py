@@ -25,6 +25,7 @@ from typing_extensions import TypeVar
 from chatkit.errors import CustomStreamError, StreamError
 
 from .logger import logger
+from .sse import coalesce_deltas, encode_event, serialize
 from .store import AttachmentStore, NotFoundError, Store, StoreItemType, default_generate_id
 from .types import (
     Action,
@@ -74,7 +75,8 @@ from .types import (
     is_streaming_req,
 )
 from .version import __version__
-from .widgets import Markdown, Text, WidgetComponent, WidgetComponentBase, WidgetRoot
+from .widget_diff import WidgetState
+from .widgets import WidgetRoot
 
 DEFAULT_PAGE_SIZE = 100
 DEFAULT_ERROR_MESSAGE = "An error occurred when generating a response."
@@ -86,94 +88,7 @@ def diff_widget(
     """
     Compare two WidgetRoots and return a list of deltas.
     """
-
-    def full_replace(before: WidgetComponentBase, after: WidgetComponentBase) -> bool:
-        if (
-            before.type != after.type
-            or before.id != after.id
-            or before.key != after.key
-        ):
-            return True
-
-        def full_replace_value(before_value: Any, after_value: Any) -> bool:
-            if isinstance(before_value, list) and isinstance(after_value, list):
-                if len(before_value) != len(after_value):
-                    return True
-                for nth_before_value, nth_after_value in zip(before_value, after_value):
-                    if full_replace_value(nth_before_value, nth_after_value):
-                        return True
-            elif before_value != after_value:
-                if isinstance(before_value, WidgetComponentBase) and isinstance(
-                    after_value, WidgetComponentBase
-                ):
-                    return full_replace(before_value, after_value)
-                else:
-                    return True
-            return False
-
-        for field in before.model_fields_set.union(after.model_fields_set):
-            if (
-                isinstance(before, (Markdown, Text))
-                and isinstance(after, (Markdown, Text))
-                and field == "value"
-                and after.value.startswith(before.value)
-            ):
-                # Appends to the value prop of Markdown or Text do not trigger a full replace
-                continue
-            if full_replace_value(getattr(before, field), getattr(after, field)):
-                return True
-
-        return False
-
-    if full_replace(before, after):
-        return [WidgetRootUpdated(widget=after)]
-
-    deltas: list[
-        WidgetStreamingTextValueDelta | WidgetComponentUpdated | WidgetRootUpdated
-    ] = []
-
-    def find_all_streaming_text_components(
-        component: WidgetComponent | WidgetRoot,
-    ) -> dict[str, Markdown | Text]:
-        components = {}
-
-        def recurse(component: WidgetComponent | WidgetRoot):
-            if isinstance(component, (Markdown, Text)) and component.id:
-                components[component.id] = component
-
-            if hasattr(component, "children"):
-                children = getattr(component, "children", None) or []
-                for child in children:
-                    recurse(child)
-
-        recurse(component)
-        return components
-
-    before_nodes = find_all_streaming_text_components(before)
-    after_nodes = find_all_streaming_text_components(after)
-
-    for id, after_node in after_nodes.items():
-        before_node = before_nodes.get(id)
-        if before_node is None:
-            raise ValueError(
-                f"Node {id} was not present when the widget was initially rendered. All nodes with ID must persist across all widget updates."
-            )
-
-        if before_node.value != after_node.value:
-            if not after_node.value.startswith(before_node.value):
-                raise ValueError(
-                    f"Node {id} was updated with a new value that is not a prefix of the initial value. All widget updates must be cumulative."
-                )
-            done = not after_node.streaming
-            deltas.append(
-                WidgetStreamingTextValueDelta(
-                    component_id=id,
-                    delta=after_node.value[len(before_node.value) :],
-                    done=done,
-                )
-            )
-
-    return deltas
+    return WidgetState(before).diff(after)
 
 
 async def stream_widget(
@@ -208,22 +123,21 @@ async def stream_widget(
 
     yield ThreadItemAddedEvent(item=item)
 
-    last_state = initial_state
+    state = WidgetState(initial_state)
 
     while widget:
         try:
             new_state = await widget.__anext__()
-            for update in diff_widget(last_state, new_state):
+            for update in state.diff(new_state):
                 yield ThreadItemUpdated(
                     item_id=item_id,
                     update=update,
                 )
-            last_state = new_state
         except StopAsyncIteration:
             break
 
     yield ThreadItemDoneEvent(
-        item=item.model_copy(update={"widget": last_state}),
+        item=item.model_copy(update={"widget": state.root}),
     )
 
 
@@ -262,6 +176,10 @@ TContext = TypeVar("TContext", default=Any)
 
 
 class ChatKitServer(ABC, Generic[TContext]):
+    stream_coalesce_window: float = 0.0
+    """Seconds during which consecutive text deltas for the same target are
+    merged into one SSE frame. ``0`` sends every delta as soon as it is produced."""
+
     def __init__(
         self,
         store: Store[TContext],
@@ -440,10 +358,17 @@ class ChatKitServer(ABC, Generic[TContext]):
     async def _process_streaming(
         self, request: StreamingReq, context: TContext
     ) -> AsyncGenerator[bytes, None]:
+        events = self._process_streaming_impl(request, context)
+        if self.stream_coalesce_window > 0:
+            events = coalesce_deltas(events, self.stream_coalesce_window)
+        # Byte templates for hot events, unless a subclass customizes _serialize.
+        fast_path = type(self)._serialize is ChatKitServer._serialize
         try:
-            async for event in self._process_streaming_impl(request, context):
-                b = self._serialize(event)
-                yield b"data: " + b + b"\n\n"
+            async for event in events:
+                if fast_path:
+                    yield encode_event(event)
+                else:
+                    yield b"data: " + self._serialize(event) + b"\n\n"
         except Exception:
             logger.exception("Error while generating streamed response")
             raise
@@ -894,7 +819,7 @@ class ChatKitServer(ABC, Generic[TContext]):
             after = items.after
 
     def _serialize(self, obj: BaseModel) -> bytes:
-        return obj.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+        return serialize(obj)
 
     def _to_thread_response(self, thread: ThreadMetadata | Thread) -> Thread:
         def is_hidden(item: ThreadItem) -> bool:
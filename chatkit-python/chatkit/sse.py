@@ -0,0 +1,216 @@
+"""Server-sent event encoding for streamed thread events.
+
+Text deltas dominate a streamed response, so they are framed from byte
+templates instead of going through a full Pydantic dump. Every other event is
+serialized with the model's compiled core serializer straight to bytes. The
+output is byte-for-byte identical to
+``model_dump_json(by_alias=True, exclude_none=True)``.
+
+`coalesce_deltas` optionally merges consecutive text deltas for the same
+content part (or streaming widget text) that arrive within a short window,
+trading a few milliseconds of latency for fewer, larger frames.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from json.encoder import encode_basestring
+from typing import Any
+
+from pydantic import BaseModel
+
+from .types import (
+    AssistantMessageContentPartTextDelta,
+    ThreadItemUpdated,
+    ThreadStreamEvent,
+    WidgetStreamingTextValueDelta,
+)
+
+_TEXT_DELTA_PREFIX = b'data: {"type":"thread.item.updated","item_id":'
+_TEXT_DELTA_UPDATE = (
+    b',"update":{"type":"assistant_message.content_part.text_delta","content_index":'
+)
+_WIDGET_DELTA_UPDATE = (
+    b',"update":{"type":"widget.streaming_text.value_delta","component_id":'
+)
+_FRAME_END = b"\n\n"
+_DELTA_TYPES = (AssistantMessageContentPartTextDelta, WidgetStreamingTextValueDelta)
+
+# Events read ahead of the consumer by `coalesce_deltas`.
+_READ_AHEAD = 16
+_END = object()
+_WAKE = object()
+
+
+def _json_str(value: str) -> bytes:
+    # Same escaping as pydantic-core: UTF-8 output, only quotes, backslashes
+    # and control characters escaped.
+    return encode_basestring(value).encode("utf-8")
+
+
+def serialize(obj: BaseModel) -> bytes:
+    """Serialize a model to JSON bytes without the intermediate ``str``."""
+    return obj.__pydantic_serializer__.to_json(obj, by_alias=True, exclude_none=True)
+
+
+def encode_text_delta(item_id: str, content_index: int, delta: str) -> bytes:
+    """Frame an ``assistant_message.content_part.text_delta`` update."""
+    return b"".join((
+        _TEXT_DELTA_PREFIX,
+        _json_str(item_id),
+        _TEXT_DELTA_UPDATE,
+        str(content_index).encode(),
+        b',"delta":',
+        _json_str(delta),
+        b"}}",
+        _FRAME_END,
+    ))
+
+
+def encode_widget_text_delta(
+    item_id: str, component_id: str, delta: str, done: bool
+) -> bytes:
+    """Frame a ``widget.streaming_text.value_delta`` update."""
+    return b"".join((
+        _TEXT_DELTA_PREFIX,
+        _json_str(item_id),
+        _WIDGET_DELTA_UPDATE,
+        _json_str(component_id),
+        b',"delta":',
+        _json_str(delta),
+        b',"done":true}}' if done else b',"done":false}}',
+        _FRAME_END,
+    ))
+
+
+def encode_event(event: BaseModel) -> bytes:
+    """Frame a stream event as one ``data:`` SSE message."""
+    if type(event) is ThreadItemUpdated:
+        update = event.update
+        if type(update) is AssistantMessageContentPartTextDelta:
+            return encode_text_delta(event.item_id, update.content_index, update.delta)
+        if type(update) is WidgetStreamingTextValueDelta:
+            return encode_widget_text_delta(
+                event.item_id, update.component_id, update.delta, update.done
+            )
+    return b"data: " + serialize(event) + _FRAME_END
+
+
+def _delta_key(event: Any) -> tuple[Any, ...] | None:
+    if type(event) is not ThreadItemUpdated:
+        return None
+    update = event.update
+    if type(update) is AssistantMessageContentPartTextDelta:
+        return ("text", event.item_id, update.content_index)
+    if type(update) is WidgetStreamingTextValueDelta:
+        return ("widget", event.item_id, update.component_id)
+    return None
+
+
+def _merge(events: list[ThreadItemUpdated]) -> ThreadItemUpdated:
+    if len(events) == 1:
+        return events[0]
+    updates = [event.update for event in events]
+    delta = "".join(
+        update.delta for update in updates if isinstance(update, _DELTA_TYPES)
+    )
+    first, last = updates[0], updates[-1]
+    update: Any
+    if isinstance(first, AssistantMessageContentPartTextDelta):
+        update = AssistantMessageContentPartTextDelta.model_construct(
+            content_index=first.content_index, delta=delta
+        )
+    elif isinstance(first, WidgetStreamingTextValueDelta) and isinstance(
+        last, WidgetStreamingTextValueDelta
+    ):
+        update = WidgetStreamingTextValueDelta.model_construct(
+            component_id=first.component_id, delta=delta, done=last.done
+        )
+    else:  # pragma: no cover - `_delta_key` only groups the two delta types
+        raise TypeError(f"Cannot merge {type(first).__name__} updates")
+    return ThreadItemUpdated.model_construct(item_id=events[0].item_id, update=update)
+
+
+async def coalesce_deltas(
+    events: AsyncIterator[ThreadStreamEvent], window: float
+) -> AsyncIterator[ThreadStreamEvent]:
+    """Merge consecutive deltas for the same target received within ``window`` seconds.
+
+    A buffered delta is released as soon as the window elapses, another kind
+    of event arrives, or the stream ends, so ordering is preserved and the
+    added latency is bounded by ``window``. A widget delta with ``done=True``
+    closes its group.
+
+    ``events`` is consumed by a single reader task for the whole stream, so
+    it keeps one context (and its context variables) from start to end.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=_READ_AHEAD)
+    failure: list[Exception] = []
+
+    async def read() -> None:
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as exc:
+            failure.append(exc)
+        await queue.put(_END)
+
+    def wake() -> None:
+        # Only needed when the consumer waits on an empty queue; otherwise it
+        # checks the deadline when the next event comes in.
+        if queue.empty():
+            queue.put_nowait(_WAKE)
+
+    reader = asyncio.create_task(read())
+    buffered: list[ThreadItemUpdated] = []
+    buffered_key: tuple[Any, ...] | None = None
+    deadline = 0.0
+    timer: asyncio.TimerHandle | None = None
+    try:
+        while True:
+            item = await queue.get()
+            if buffered and loop.time() >= deadline:
+                yield _merge(buffered)
+                buffered, buffered_key = [], None
+            if item is _WAKE:
+                continue
+            if item is _END:
+                break
+
+            key = _delta_key(item)
+            if buffered and key != buffered_key:
+                yield _merge(buffered)
+                buffered, buffered_key = [], None
+            if key is None:
+                yield item
+                continue
+            if not buffered:
+                buffered_key = key
+                deadline = loop.time() + window
+                if timer is not None:
+                    timer.cancel()
+                timer = loop.call_at(deadline, wake)
+            buffered.append(item)
+            if getattr(item.update, "done", False):
+                # A finished widget text closes its group.
+                yield _merge(buffered)
+                buffered, buffered_key = [], None
+        if buffered:
+            yield _merge(buffered)
+        if failure:
+            raise failure[0]
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if not reader.done():
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except RuntimeError:
+                pass
@@ -705,6 +705,8 @@ class FileAttachment(AttachmentBase):
     """Attachment representing a generic file."""
 
     type: Literal["file"] = "file"
+    conversion_status: Literal["pending", "completed", "failed"] | None = None
+    """Status of a server-side format conversion (e.g. DOCX to PDF), if any."""
 
 
 class ImageAttachment(AttachmentBase):
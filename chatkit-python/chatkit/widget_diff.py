@@ -0,0 +1,312 @@
+"""Incremental diffing for streamed widgets.
+
+A streamed widget used to be diffed by comparing the previous and next trees
+in full on every update, including a Pydantic equality check per subtree at
+each level, which grows with the size of the widget times the number of
+updates. `WidgetState` keeps the last state sent to the client and compares
+the next one node by node instead:
+
+* subtrees that are the same object in both trees are skipped, so a producer
+  that rebuilds only the changed path (e.g. with ``model_copy``) pays for that
+  path only;
+* appends to the ``value`` of an identified ``Markdown`` or ``Text`` become
+  ``widget.streaming_text.value_delta`` events, as before;
+* any other change is sent as a ``widget.component.updated`` for the nearest
+  enclosing component that has an id, and only falls back to
+  ``widget.root.updated`` when there is none.
+
+Producers that know what they changed can skip the comparison entirely with
+`WidgetState.append_text` and `WidgetState.update_component`, which copy the
+path to the component, record it as dirty and let `WidgetState.flush` emit the
+matching updates.
+"""
+
+from typing import Any
+
+from .types import (
+    WidgetComponentUpdated,
+    WidgetRootUpdated,
+    WidgetStreamingTextValueDelta,
+)
+from .widgets import Markdown, Text, WidgetComponentBase, WidgetRoot
+
+WidgetUpdate = (
+    WidgetStreamingTextValueDelta | WidgetRootUpdated | WidgetComponentUpdated
+)
+
+Path = tuple[int, ...]
+
+_STREAMING_TEXT = (Markdown, Text)
+
+
+def _children(node: WidgetComponentBase) -> list[WidgetComponentBase]:
+    # Fields live in __dict__; getattr on a model without children would go
+    # through Pydantic's slow __getattr__ fallback.
+    children = node.__dict__.get("children")
+    if isinstance(children, list):
+        return children
+    if isinstance(children, WidgetComponentBase):
+        # Transition wraps a single child.
+        return [children]
+    return []
+
+
+def _with_child(
+    node: WidgetComponentBase, index: int, child: WidgetComponentBase
+) -> WidgetComponentBase:
+    children = node.__dict__["children"]
+    if isinstance(children, list):
+        children = [*children[:index], child, *children[index + 1 :]]
+    else:
+        children = child
+    return node.model_copy(update={"children": children})
+
+
+def _can_update_in_place(node: WidgetComponentBase) -> bool:
+    # Streaming text only changes through value deltas, like before; other
+    # changes to it are re-sent with its container.
+    return bool(node.id) and not isinstance(node, _STREAMING_TEXT)
+
+
+def _keeps_fields(before: WidgetComponentBase, after: WidgetComponentBase) -> bool:
+    # Clients merge a component update into the existing props, so a prop
+    # that goes back to None can only be cleared by re-sending the parent.
+    for field in before.model_fields_set:
+        if before.__dict__[field] is not None and after.__dict__[field] is None:
+            return False
+    return True
+
+
+class WidgetState:
+    """Last widget state sent to the client, diffed incrementally."""
+
+    def __init__(self, root: WidgetRoot) -> None:
+        self._root: WidgetRoot = root
+        self._paths: dict[str, Path] | None = None
+        self._deltas: dict[str, tuple[Path, WidgetStreamingTextValueDelta]] = {}
+        self._dirty: dict[Path, None] = {}
+        self._replace_root = False
+
+    @property
+    def root(self) -> WidgetRoot:
+        return self._root
+
+    def diff(self, after: WidgetRoot) -> list[WidgetUpdate]:
+        """Return the updates turning the current state into ``after``.
+
+        Pending updates recorded with `append_text` or `update_component` are
+        flushed first.
+        """
+        updates = self.flush()
+        before = self._root
+        self._root = after
+        if before is after:
+            return updates
+        changes: list[WidgetUpdate] = []
+        if self._diff_node(before, after, changes, is_root=True):
+            self._paths = None
+            updates.append(WidgetRootUpdated(widget=after))
+            return updates
+        if any(isinstance(change, WidgetComponentUpdated) for change in changes):
+            # Updated components may have gained or lost identified children.
+            self._paths = None
+        updates.extend(changes)
+        return updates
+
+    def append_text(self, component_id: str, delta: str) -> None:
+        """Append ``delta`` to the value of an identified Markdown or Text."""
+        path = self._path_of(component_id)
+        node = self._node_at(path)
+        if not isinstance(node, _STREAMING_TEXT):
+            raise ValueError(
+                f"Node {component_id} is a {node.type}; only Markdown and Text "
+                "values can be streamed."
+            )
+        updated = node.model_copy(update={"value": node.value + delta})
+        self._replace(path, updated)
+        if self._covered(path):
+            return
+        pending = self._deltas.get(component_id)
+        self._deltas[component_id] = (
+            path,
+            WidgetStreamingTextValueDelta(
+                component_id=component_id,
+                delta=(pending[1].delta if pending else "") + delta,
+                done=not updated.streaming,
+            ),
+        )
+
+    def update_component(self, component_id: str, **changes: Any) -> None:
+        """Set props of an identified component.
+
+        Values are assigned as-is, like ``model_copy(update=...)``: they are
+        not validated.
+        """
+        path = self._path_of(component_id)
+        node = self._node_at(path)
+        updated = node.model_copy(update=changes)
+        self._replace(path, updated)
+        if self._paths is not None and ("children" in changes or "id" in changes):
+            self._reindex(path, updated)
+        target = path if _keeps_fields(node, updated) else path[:-1]
+        while target and not _can_update_in_place(self._node_at(target)):
+            target = target[:-1]
+        if not target:
+            self._replace_root = True
+            return
+        self._dirty[target] = None
+
+    def flush(self) -> list[WidgetUpdate]:
+        """Return and clear the updates recorded since the last flush."""
+        if self._replace_root:
+            updates: list[WidgetUpdate] = [WidgetRootUpdated(widget=self._root)]
+        else:
+            updates = [
+                delta
+                for path, delta in self._deltas.values()
+                if not self._covered(path)
+            ]
+            dirty = [
+                path
+                for path in self._dirty
+                if not self._covered(path, include_self=False)
+            ]
+            for path in dirty:
+                node = self._node_at(path)
+                assert node.id is not None
+                updates.append(
+                    WidgetComponentUpdated(
+                        component_id=node.id,
+                        component=node,  # type: ignore[arg-type]
+                    )
+                )
+        self._deltas.clear()
+        self._dirty.clear()
+        self._replace_root = False
+        return updates
+
+    def _diff_node(
+        self,
+        before: WidgetComponentBase,
+        after: WidgetComponentBase,
+        updates: list[WidgetUpdate],
+        is_root: bool = False,
+    ) -> bool:
+        """Append the updates for ``after`` and tell whether it must be re-sent
+        by its parent instead."""
+        if before is after:
+            return False
+        if (
+            before.type != after.type
+            or before.id != after.id
+            or before.key != after.key
+        ):
+            return True
+
+        changed = False
+        text_delta: WidgetStreamingTextValueDelta | None = None
+        for field in before.model_fields_set | after.model_fields_set:
+            if field == "children":
+                continue
+            before_value = before.__dict__[field]
+            after_value = after.__dict__[field]
+            if before_value is after_value or before_value == after_value:
+                continue
+            if (
+                field == "value"
+                and after.id
+                and isinstance(after, _STREAMING_TEXT)
+                and after_value.startswith(before_value)
+            ):
+                text_delta = WidgetStreamingTextValueDelta(
+                    component_id=after.id,
+                    delta=after_value[len(before_value) :],
+                    done=not after.streaming,
+                )
+                continue
+            changed = True
+            break
+
+        child_updates: list[WidgetUpdate] = []
+        if not changed and before.__dict__.get("children") is not after.__dict__.get(
+            "children"
+        ):
+            before_children = _children(before)
+            after_children = _children(after)
+            if len(before_children) != len(after_children):
+                changed = True
+            else:
+                for before_child, after_child in zip(before_children, after_children):
+                    if self._diff_node(before_child, after_child, child_updates):
+                        changed = True
+                        break
+
+        if not changed:
+            if text_delta is not None:
+                updates.append(text_delta)
+            updates.extend(child_updates)
+            return False
+        if is_root or not _can_update_in_place(after):
+            return True
+        if not _keeps_fields(before, after):
+            return True
+        assert after.id is not None
+        updates.append(
+            WidgetComponentUpdated(
+                component_id=after.id,
+                component=after,  # type: ignore[arg-type]
+            )
+        )
+        return False
+
+    def _index(self) -> dict[str, Path]:
+        if self._paths is None:
+            self._paths = {}
+            self._visit(self._root, (), self._paths)
+        return self._paths
+
+    @classmethod
+    def _visit(
+        cls, node: WidgetComponentBase, path: Path, paths: dict[str, Path]
+    ) -> None:
+        if node.id:
+            paths.setdefault(node.id, path)
+        for position, child in enumerate(_children(node)):
+            cls._visit(child, (*path, position), paths)
+
+    def _reindex(self, path: Path, node: WidgetComponentBase) -> None:
+        assert self._paths is not None
+        depth = len(path)
+        self._paths = {
+            component_id: component_path
+            for component_id, component_path in self._paths.items()
+            if component_path[:depth] != path
+        }
+        self._visit(node, path, self._paths)
+
+    def _path_of(self, component_id: str) -> Path:
+        path = self._index().get(component_id)
+        if path is None:
+            raise ValueError(f"Node {component_id} is not part of the widget.")
+        return path
+
+    def _node_at(self, path: Path) -> WidgetComponentBase:
+        node: WidgetComponentBase = self._root
+        for position in path:
+            node = _children(node)[position]
+        return node
+
+    def _replace(self, path: Path, node: WidgetComponentBase) -> None:
+        # Copy the ancestors of the node only; every other subtree is shared.
+        ancestors: list[WidgetComponentBase] = [self._root]
+        for position in path[:-1]:
+            ancestors.append(_children(ancestors[-1])[position])
+        for parent, position in zip(reversed(ancestors), reversed(path)):
+            node = _with_child(parent, position, node)
+        self._root = node  # type: ignore[assignment]
+
+    def _covered(self, path: Path, include_self: bool = True) -> bool:
+        if self._replace_root:
+            return True
+        end = len(path) + 1 if include_self else len(path)
+        return any(path[:length] in self._dirty for length in range(1, end))
@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+from datetime import datetime
+
+import pytest
+
+from chatkit.sse import coalesce_deltas, encode_event, serialize
+from chatkit.types import (
+    AssistantMessageContent,
+    AssistantMessageContentPartDone,
+    AssistantMessageContentPartTextDelta,
+    Page,
+    ProgressUpdateEvent,
+    Thread,
+    ThreadItemUpdated,
+    ThreadUpdatedEvent,
+    WidgetStreamingTextValueDelta,
+)
+
+TRICKY_STRINGS = [
+    "",
+    "plain",
+    'quotes " and \\ backslashes',
+    "newline\n tab\t cr\r bell\x07 nul\x00 del\x7f",
+    "accents éàü — “smart” ‘quotes’ …   ",
+    "emoji 👩🏽‍💻 and CJK 漢字",
+    "</script><b>&amp;</b>",
+]
+
+
+def _reference(event) -> bytes:
+    return (
+        b"data: "
+        + event.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+        + b"\n\n"
+    )
+
+
+def _text_delta(delta: str, item_id: str = "msg_1", index: int = 0):
+    return ThreadItemUpdated(
+        item_id=item_id,
+        update=AssistantMessageContentPartTextDelta(content_index=index, delta=delta),
+    )
+
+
+def _widget_delta(delta: str, done: bool = False, component_id: str = "c1"):
+    return ThreadItemUpdated(
+        item_id="wdg_1",
+        update=WidgetStreamingTextValueDelta(
+            component_id=component_id, delta=delta, done=done
+        ),
+    )
+
+
+@pytest.mark.parametrize("text", TRICKY_STRINGS)
+def test_templates_match_pydantic_output(text: str):
+    for event in (
+        _text_delta(text, item_id=f"id-{text[:3]}", index=3),
+        _widget_delta(text, done=True, component_id=text or "c"),
+        _widget_delta(text, done=False),
+    ):
+        assert encode_event(event) == _reference(event)
+
+
+def test_other_events_use_compiled_serializer():
+    thread = Thread(
+        id="thr_1", created_at=datetime(2024, 1, 1), title=None, items=Page()
+    )
+    events = [
+        ThreadUpdatedEvent(thread=thread),
+        ProgressUpdateEvent(text="Working…", icon=None),
+        ThreadItemUpdated(
+            item_id="msg_1",
+            update=AssistantMessageContentPartDone(
+                content_index=0, content=AssistantMessageContent(text="done")
+            ),
+        ),
+    ]
+    for event in events:
+        assert encode_event(event) == _reference(event)
+        assert serialize(event) == _reference(event)[6:-2]
+
+
+async def _stream(*steps):
+    for step in steps:
+        if isinstance(step, float):
+            await asyncio.sleep(step)
+        else:
+            yield step
+
+
+async def _collect(stream, window: float):
+    return [event async for event in coalesce_deltas(stream, window)]
+
+
+async def test_coalesces_consecutive_deltas_per_target():
+    progress = ProgressUpdateEvent(text="step")
+    events = await _collect(
+        _stream(
+            _text_delta("Hel"),
+            _text_delta("lo"),
+            _text_delta(" world", index=1),
+            progress,
+            _text_delta("!"),
+        ),
+        window=1.0,
+    )
+
+    assert [encode_event(e) for e in events] == [
+        encode_event(_text_delta("Hello")),
+        encode_event(_text_delta(" world", index=1)),
+        encode_event(progress),
+        encode_event(_text_delta("!")),
+    ]
+
+
+async def test_window_bounds_added_latency():
+    events = await _collect(
+        _stream(_text_delta("a"), _text_delta("b"), 0.05, _text_delta("c")),
+        window=0.01,
+    )
+
+    assert [e.update.delta for e in events] == ["ab", "c"]
+
+
+async def test_widget_done_closes_group():
+    events = await _collect(
+        _stream(_widget_delta("a"), _widget_delta("b", done=True), _widget_delta("c")),
+        window=1.0,
+    )
+
+    assert [(e.update.delta, e.update.done) for e in events] == [
+        ("ab", True),
+        ("c", False),
+    ]
+
+
+async def test_buffered_delta_is_flushed_before_errors():
+    async def _failing():
+        yield _text_delta("partial")
+        raise RuntimeError("boom")
+
+    received = []
+
+    async def _consume():
+        async for event in coalesce_deltas(_failing(), 1.0):
+            received.append(event)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await _consume()
+
+    assert [e.update.delta for e in received] == ["partial"]
+
+
+async def test_source_keeps_one_context():
+    marker = contextvars.ContextVar("marker", default="lost")
+
+    async def _source():
+        marker.set(" kept")
+        yield _text_delta("context")
+        yield _text_delta(marker.get())
+
+    events = await _collect(_source(), window=1.0)
+
+    assert [e.update.delta for e in events] == ["context kept"]
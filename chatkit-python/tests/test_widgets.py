@@ -6,7 +6,8 @@ import pytest
 
 from chatkit.server import diff_widget
 from chatkit.types import WidgetItem
-from chatkit.widgets import Card, Text, WidgetRoot
+from chatkit.widget_diff import WidgetState
+from chatkit.widgets import Badge, Card, Col, Text, Transition, WidgetRoot
 
 
 @pytest.mark.parametrize(
@@ -46,6 +47,80 @@ def test_diff(
         assert diff[i].type == expected[i]
 
 
+def _quiz(label: str = "todo", answer: str = "") -> Card:
+    return Card(
+        children=[
+            Col(
+                id="question-1",
+                children=[Text(value="2 + 2 ?"), Badge(label=label, color="info")],
+            ),
+            Transition(children=Text(id="answer-1", value=answer, streaming=True)),
+        ]
+    )
+
+
+def test_diff_updates_the_nearest_identified_component():
+    diff = diff_widget(_quiz(answer="4"), _quiz(label="done", answer="4 !"))
+    assert [update.type for update in diff] == [
+        "widget.component.updated",
+        "widget.streaming_text.value_delta",
+    ]
+    assert diff[0].component_id == "question-1"
+    assert diff[0].component == _quiz(label="done").children[0]
+    assert diff[1].component_id == "answer-1"
+    assert diff[1].delta == " !"
+
+    # A cleared prop would survive a merge on the client: re-send the parent.
+    diff = diff_widget(
+        Card(children=[Col(id="question-1", gap=2, children=[])]),
+        Card(children=[Col(id="question-1", children=[])]),
+    )
+    assert [update.type for update in diff] == ["widget.root.updated"]
+
+
+def test_diff_skips_shared_subtrees():
+    before = _quiz()
+    after = before.model_copy(
+        update={
+            "children": [
+                before.children[0],
+                Transition(children=Text(id="answer-1", value="4", streaming=True)),
+            ]
+        }
+    )
+    state = WidgetState(before)
+    diff = state.diff(after)
+    assert [(update.type, update.delta) for update in diff] == [
+        ("widget.streaming_text.value_delta", "4")
+    ]
+    assert state.root is after
+
+
+def test_widget_state_records_dirty_paths_without_diffing():
+    state = WidgetState(_quiz())
+    state.append_text("answer-1", "4")
+    state.append_text("answer-1", " !")
+    state.update_component("question-1", align="center")
+    updates = state.flush()
+    assert [update.type for update in updates] == [
+        "widget.streaming_text.value_delta",
+        "widget.component.updated",
+    ]
+    assert updates[0].delta == "4 !"
+    assert updates[1].component.align == "center"
+    assert state.root.children[1].children.value == "4 !"
+    assert state.flush() == []
+
+    # Text inside a component that is re-sent anyway needs no delta.
+    state.update_component("question-1", align="start")
+    state.append_text("answer-1", "2")
+    state.update_component("answer-1", streaming=False)
+    assert [update.type for update in state.flush()] == ["widget.root.updated"]
+
+    with pytest.raises(ValueError):
+        state.append_text("question-1", "x")
+
+
 def test_json_dump_excludes_none_fields():
     widget = Card(children=[Text(value="Hello")])
 